@@ -10,70 +10,71 @@ EUKYO hatasından öğrenilenlerle yeni kriterler:
 - Likidite taban analizi
 """
 
-import yfinance as yf
-import talib
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple
-import requests
+import os
 import json
+import time
+from lazy_imports import lazy_import
+import providers
+from scan_journal import ScanJournal
+from symbol_universe import get_universe
+from prefilter import PreFilter
+from sector_engine import SectorEngine
+from shard_queue import ShardQueue
+from universe_scan import UniverseScanMixin
+from streaming_scan import ScanStream
 
-class AdvancedCeilingScanner:
-    def __init__(self):
-        self.bist_stocks = [
-            'AKBNK', 'GARAN', 'ISCTR', 'YKBNK', 'HALKB', 'VAKBN', 'SISE', 'THYAO', 'BIMAS', 'KOZAL',
-            'ASELS', 'KCHOL', 'EREGL', 'PETKM', 'TUPRS', 'TCELL', 'SAHOL', 'EKGYO', 'KOZAA', 'GUBRF',
-            'TOASO', 'TTKOM', 'FROTO', 'ARCLK', 'AKSA', 'KRDMD', 'TAVHL', 'PGSUS', 'MGROS', 'VESTL',
-            'SOKM', 'BRMEN', 'SAMAT', 'EKIZ', 'KAPLM', 'MRSHL', 'EUKYO', 'ICBCT', 'SAFKR', 'BARMA',
-            'ADEL', 'AEFES', 'AFYON', 'AGESA', 'AGHOL', 'AGROT', 'AHGAZ', 'AKENR', 'AKGRT',
-            'AKMGY', 'ALARK', 'ALBRK', 'ALKIM', 'ALMAD', 'ANADOLU', 'ANACM', 'ASUZU', 'ATEKS',
-            'AVGYO', 'AVHOL', 'AVISA', 'AVTUR', 'AYDEM', 'AYEN', 'BAGFS', 'BAHKM', 'BAKAB',
-            'BANVT', 'BASCM', 'BASGZ', 'BAYRK', 'BERA', 'BEYAZ', 'BIGCH', 'BINHO', 'BIOEN',
-            'BIZIM', 'BJKAS', 'BLCYT', 'BNTAS', 'BOBET', 'BORLS', 'BOSSA', 'BRISA', 'BRKSN',
-            'BRKVY', 'BSOKE', 'BTCIM', 'BUCIM', 'BURCE', 'BURVA', 'CCOLA', 'CEMAS', 'CEMTS',
-            'CIMSA', 'CLEBI', 'CMBTN', 'CMENT', 'CONSE', 'COSMO', 'CRDFA', 'CRFSA', 'CUSAN',
-            'CVKMD', 'CWENE', 'DAGI', 'DAPGM', 'DARDL', 'DENGE', 'DERHL', 'DERIM', 'DESA',
-            'DESPC', 'DEVA', 'DGATE', 'DGNMO', 'DITAS', 'DMSAS', 'DOCO', 'DOGUB', 'DOHOL',
-            'DURDO', 'DYOBY', 'DZGYO', 'ECILC', 'ECZYT', 'EGEEN', 'EGGUB', 'EGPRO', 'EGSER',
-            'EKSUN', 'ELITE', 'EMKEL', 'EMNIS', 'ENERY', 'ENJSA', 'ENKAI', 'ERBOS', 'ERSU',
-            'ESCAR', 'EUKYO', 'EUREN', 'EUYO', 'EYGYO', 'FENER', 'FLAP', 'FMIZP', 'FONET',
-            'FORMT', 'FORTE', 'FRIGO', 'GEDIK', 'GEDZA', 'GENIL', 'GENTS', 'GEREL', 'GESAN',
-            'GIPTA', 'GLBMD', 'GLYHO', 'GMTAS', 'GOKNR', 'GOLTS', 'GOODY', 'GOZDE', 'GRNYO',
-            'GRSEL', 'GSDDE', 'GSDHO', 'GSRAY', 'GWIND', 'HATEK', 'HATSN', 'HDFGS', 'HEDEF',
-            'HEKTS', 'HURGZ', 'HUNER', 'HZNDR', 'ICBCT', 'IDGYO', 'IEYHO', 'IHEVA', 'IHGZT',
-            'IHLAS', 'IHLGM', 'IHYAY', 'IMASM', 'INDES', 'INFO', 'INTEM', 'INVES', 'IPEKE',
-            'ISBIR', 'ISBTR', 'ISGSY', 'ISKUR', 'ISMEN', 'IZENR', 'IZFAS', 'IZINV', 'JANTS',
-            'KAPLM', 'KAREL', 'KARSN', 'KARTN', 'KATMR', 'KAYSE', 'KENT', 'KERVN', 'KFEIN',
-            'KGYO', 'KIMMR', 'KLGYO', 'KLKIM', 'KLNMA', 'KLRHO', 'KLSER', 'KLSYN', 'KMPUR',
-            'KNFRT', 'KONKA', 'KONTR', 'KONYA', 'KOPOL', 'KORDC', 'KORDS', 'KOTON', 'KRDMA',
-            'KRDMB', 'KRGYO', 'KRONT', 'KRPLS', 'KRSTL', 'KRTEK', 'KRVGD', 'KSTUR', 'KUTPO',
-            'KZBGY', 'LIDER', 'LIDFA', 'LILAK', 'LINK', 'LKMNH', 'LOGO', 'LRSHO', 'LUKSK',
-            'MACKO', 'MAKIM', 'MAKTK', 'MANAS', 'MARBL', 'MARKA', 'MEDTR', 'MEGAP', 'MEPET',
-            'MERCN', 'MERKO', 'METRO', 'MHRGY', 'MMCAS', 'MNDTR', 'MOBTL', 'MPARK', 'MRSHL',
-            'MSGYO', 'MTRKS', 'MTRYO', 'MZHLD', 'NATEN', 'NETAS', 'NIBAS', 'NUGYO', 'NUHCM',
-            'ODAS', 'OFSYM', 'ONCSM', 'ORCAY', 'ORMA', 'OSTIM', 'OTKAR', 'OYAKC', 'OYYAT',
-            'OZBAL', 'OZGYO', 'OZKGY', 'OZRDN', 'OZSUB', 'PAPIL', 'PARSN', 'PASEU', 'PATEK',
-            'PCILT', 'PEGYO', 'PEKGY', 'PENGD', 'PENTA', 'PETUN', 'PINSU', 'PKART', 'PKENT',
-            'PLTUR', 'PNLSN', 'POLHO', 'POLTK', 'PRDGS', 'PRKAB', 'PRKME', 'PRZMA', 'PSDTC',
-            'QUAGR', 'RALYH', 'RAYSG', 'RNPOL', 'RODRG', 'ROYAL', 'RUBNS', 'RYGYO', 'SAFKR',
-            'SANEL', 'SANFM', 'SANKO', 'SARKY', 'SASA', 'SAYAS', 'SEKFK', 'SEKUR', 'SELEC',
-            'SELGD', 'SELVA', 'SEYKM', 'SILVR', 'SIMGE', 'SKBNK', 'SKYLP', 'SMART', 'SMRTG',
-            'SNKRN', 'SODA', 'SONME', 'SRVGY', 'SUMAS', 'SUNTK', 'SUWEN', 'TARKM', 'TATEN',
-            'TBORG', 'TDGYO', 'TEKTU', 'TERA', 'TEZOL', 'TMSN', 'TRCAS', 'TRGYO', 'TRILC',
-            'TSGYO', 'TSKB', 'TTRAK', 'TUCLK', 'TUKAS', 'TURGG', 'ULUUN', 'ULUSE', 'ULUFA',
-            'UMPAS', 'UNLU', 'USAK', 'VAKKO', 'VANGD', 'VBTYZ', 'VERUS', 'VESBE', 'VKGYO',
-            'VKING', 'VRGYO', 'YAPRK', 'YATAS', 'YAYLA', 'YESIL', 'YGGYO', 'YGYO', 'YKSLN',
-            'YUNSA', 'ZEDUR', 'ZOREN', 'ZRGYO'
-        ]
+# Ağır bağımlılıklar ilk kullanımda yüklenir
+talib = lazy_import('talib')
+requests = lazy_import('requests')
+
+class AdvancedCeilingScanner(UniverseScanMixin):
+    scanner_name = 'advanced'
+    score_key = 'total_score'
+    min_score = 2.0
+    scan_method = 'advanced_ceiling_scan'
+
+    def __init__(self, price_store=None, fundamentals_ttl_seconds: int = 24 * 3600,
+                 prefilter: PreFilter = None):
+        # Verilirse fiyat geçmişi bellekteki depodan okunur (daemon modu)
+        self.price_store = price_store
+        # talib ve ticker.info aşamalarından önce ucuz son bar süzgeci
+        self.prefilter = prefilter or PreFilter.preset('advanced')
+        # ticker.info yavaş ve gün içinde değişmez: sembol -> (zaman, bilgiler)
+        self.fundamentals_ttl_seconds = fundamentals_ttl_seconds
+        self.fundamentals_cache = {}
+        # Sembol listesi ve sektörler ortak evren dosyasından (bist_universe.json)
+        self.universe = get_universe()
+        self.bist_stocks = self.universe.symbols('extended')
+        self.sector_engine = SectorEngine(self.universe)
+    
+    def get_history(self, symbol: str, period: str) -> pd.DataFrame:
+        """Fiyat geçmişini depodan veya yfinance'ten getir"""
+        if self.price_store is not None:
+            data = self.price_store.get_history(symbol, period)
+            return data if data is not None else pd.DataFrame()
+        return providers.history(f"{symbol}.IS", period=period)
     
     def get_company_fundamentals(self, symbol: str) -> Dict:
         """
-        🏢 ŞİRKET TEMEL BİLGİLERİNİ ALIR
+        🏢 ŞİRKET TEMEL BİLGİLERİNİ ALIR (önbellekli)
         """
+        cached = self.fundamentals_cache.get(symbol)
+        if cached and time.time() - cached[0] <= self.fundamentals_ttl_seconds:
+            return cached[1]
+        
+        fundamentals = self._fetch_company_fundamentals(symbol)
+        if fundamentals.get('market_cap', 0) > 0:
+            self.fundamentals_cache[symbol] = (time.time(), fundamentals)
+        return fundamentals
+    
+    def _fetch_company_fundamentals(self, symbol: str) -> Dict:
+        """ticker.info üzerinden temel bilgileri çek"""
         try:
-            ticker = yf.Ticker(f"{symbol}.IS")
-            info = ticker.info
+            info = providers.info(f"{symbol}.IS")
             
             return {
                 'market_cap': info.get('marketCap', 0),
@@ -289,8 +290,7 @@ class AdvancedCeilingScanner:
         """
         try:
             # Veri çekme
-            ticker = yf.Ticker(f"{symbol}.IS")
-            data = ticker.history(period='30d')
+            data = self.get_history(symbol, '30d')
             fundamentals = self.get_company_fundamentals(symbol)
             
             if len(data) < 14:
@@ -375,11 +375,16 @@ class AdvancedCeilingScanner:
             if resistance_proximity >= 90:
                 all_signals.append(f'Direnç yakın %{resistance_proximity:.1f}')
             
+            # Sektör: önce kayıt defteri, sınıflandırılmamışsa ticker.info
+            sector = self.universe.sector_of(symbol, default=None) or fundamentals.get('sector', 'Unknown')
+            
             return {
                 'symbol': symbol,
                 'total_score': total_score,
                 'risk_level': risk_level,
                 'ceiling_probability': ceiling_probability,
+                'sector': sector,
+                'sector_stats': self.sector_engine.stats(symbol),
                 'fundamentals': fundamentals,
                 'volume_analysis': volume_analysis,
                 'momentum_analysis': momentum_analysis,
@@ -393,9 +398,26 @@ class AdvancedCeilingScanner:
         except Exception as e:
             return {'score': 0, 'signals': [], 'error': str(e)}
     
-    def daily_advanced_scan(self) -> List[Dict]:
+    def iter_advanced_scan(self, top_k: int = 10, on_provisional=None, max_workers: int = 4,
+                           min_score: float = 2.0, journal=None, tier: str = None,
+                           prefilter: bool = False) -> ScanStream:
+        """
+        ⚡ AKIŞLI GELİŞTİRİLMİŞ TARAMA
+        Her hisse tamamlandıkça sonucu üretir (bkz. streaming_scan.ScanStream)
+        """
+        symbols = self.scan_plan(tier, prefilter)
+        return ScanStream(symbols, self.advanced_ceiling_scan, 'total_score',
+                          top_k=top_k, min_score=min_score, max_workers=max_workers,
+                          on_provisional=on_provisional, journal=journal, name='advanced')
+
+    def daily_advanced_scan(self, on_provisional=None, max_workers: int = 4, resume: bool = True,
+                            tier: str = None, prefilter: bool = False,
+                            shard_queue: ShardQueue = None) -> List[Dict]:
         """
         🌅 GELİŞTİRİLMİŞ GÜNLÜK TARAMA
+        shard_queue verilirse veya BIST_SHARD_QUEUE tanımlıysa parçalı / dağıtık modda
+        Ön süzgeç varsayılan olarak kapalıdır; eşikler prefilter=True ve
+        BIST_PREFILTER_SHADOW=1 (gölge mod) ile ölçülen recall'a göre ayarlanmadan açılmamalı
         """
         results = []
         scan_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -403,21 +425,34 @@ class AdvancedCeilingScanner:
         print(f"🎯 GELİŞTİRİLMİŞ TAVAN TARAMASI V2.0 BAŞLADI: {scan_time}")
         print("=" * 70)
         
-        for i, symbol in enumerate(self.bist_stocks):
-            try:
-                result = self.advanced_ceiling_scan(symbol)
-                
-                # Minimum skor 2.0
-                if result.get('total_score', 0) >= 2.0:
-                    results.append(result)
-                
-                # İlerleme
-                if (i + 1) % 50 == 0:
-                    print(f"⏳ {i + 1}/{len(self.bist_stocks)} hisse tarandı...")
-                    
-            except Exception as e:
-                print(f"❌ {symbol} hata: {e}")
-                continue
+        if shard_queue is None and os.getenv('BIST_SHARD_QUEUE'):
+            shard_queue = ShardQueue(os.getenv('BIST_SHARD_QUEUE'))
+        if shard_queue is not None:
+            return self.sharded_scan(shard_queue, max_workers=max_workers, resume=resume, tier=tier,
+                                     prefilter=prefilter)
+        
+        stream = self.iter_advanced_scan(on_provisional=on_provisional, max_workers=max_workers,
+                                         journal=ScanJournal('advanced') if resume else None, tier=tier,
+                                         prefilter=prefilter)
+        if prefilter:
+            self.print_prefilter_report()
+        
+        for result in stream:
+            # Minimum skor 2.0
+            if result.get('total_score', 0) >= 2.0:
+                results.append(result)
+            
+            # İlerleme
+            if stream.scanned % 50 == 0:
+                print(f"⏳ {stream.scanned}/{stream.total} hisse tarandı...")
+        
+        if stream.resumed:
+            print(f"♻️ {stream.resumed} hisse önceki yarım taramanın günlüğünden alındı")
+        if stream.failed:
+            print(f"❌ {stream.failed} hisse hata nedeniyle taranamadı")
+        
+        if prefilter:
+            self.record_prefilter_recall(results)
         
         # Skoruna göre sırala
         results.sort(key=lambda x: x.get('total_score', 0), reverse=True)
@@ -4,11 +4,14 @@ Gelişmiş Teknik Analiz
 Tüm teknik göstergeleri kullanan kapsamlı analiz sistemi
 """
 
-import yfinance as yf
 import pandas as pd
 import numpy as np
-import talib
 from typing import Dict, Any, List
+from lazy_imports import lazy_import
+import providers
+
+# Ağır bağımlılıklar ilk kullanımda yüklenir
+talib = lazy_import('talib')
 
 class AdvancedTechnicalAnalyzer:
     def __init__(self):
@@ -263,8 +266,7 @@ class AdvancedTechnicalAnalyzer:
         """Kapsamlı analiz"""
         try:
             # Veri çek
-            ticker = yf.Ticker(symbol)
-            data = ticker.history(period='90d')
+            data = providers.history(symbol, period='90d')
             
             if len(data) < 50:
                 return {'error': 'Yetersiz veri'}
@@ -4,7 +4,6 @@ Alpha Vantage Gerçek Zamanlı BİST Veri Çekme Modülü
 Gerçek zamanlı (1-15 dakika gecikmeli) BİST hisse senedi verilerini Alpha Vantage API'dan çeker.
 """
 
-import requests
 import pandas as pd
 import time
 import logging
@@ -12,6 +11,12 @@ import os
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 import json
+from lazy_imports import lazy_import
+import providers
+from tracing import inc, traced
+
+# Ağır bağımlılıklar ilk kullanımda yüklenir
+requests = lazy_import('requests')
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +24,8 @@ class AlphaVantageRealTimeFetcher:
     def __init__(self):
         """Alpha Vantage gerçek zamanlı veri çekici başlat"""
         self.api_key = os.getenv('ALPHA_VANTAGE_API_KEY')
-        self.base_url = "https://www.alphavantage.co/query"
+        # Yerel stub sunucu için değiştirilebilir (bkz. provider_stub_server)
+        self.base_url = os.getenv('ALPHA_VANTAGE_BASE_URL', "https://www.alphavantage.co/query")
         self.call_count = 0
         self.max_calls_per_minute = 5  # Free tier limit
         self.last_call_time = 0
@@ -37,6 +43,7 @@ class AlphaVantageRealTimeFetcher:
             wait_time = 12 - (current_time - self.last_call_time)
             logger.info(f"Rate limit - {wait_time:.1f} saniye bekleniyor...")
             time.sleep(wait_time)
+            inc('rate_limit_wait_seconds_total', wait_time, provider='alphavantage')
         
         self.last_call_time = time.time()
         self.call_count += 1
@@ -64,7 +71,7 @@ class AlphaVantageRealTimeFetcher:
         
         try:
             logger.debug(f"Alpha Vantage API çağrısı: {symbol} ({interval})")
-            response = requests.get(self.base_url, params=params, timeout=30)
+            response = providers.http_get(self.base_url, params=params, timeout=30)
             
             if response.status_code != 200:
                 logger.error(f"API çağrısı başarısız: {response.status_code}")
@@ -136,7 +143,7 @@ class AlphaVantageRealTimeFetcher:
         
         try:
             logger.debug(f"Global Quote API: {symbol}")
-            response = requests.get(self.base_url, params=params, timeout=20)
+            response = providers.http_get(self.base_url, params=params, timeout=20)
             
             if response.status_code != 200:
                 return None
@@ -172,6 +179,7 @@ class AlphaVantageRealTimeFetcher:
             logger.error(f"Global Quote hatası ({bist_symbol}): {e}")
             return None
     
+    @traced('realtime_ceiling_scan', provider='alphavantage')
     def get_real_time_ceiling_stocks(self, symbols: List[str], threshold: float = 9.0) -> List[Dict]:
         """
         Gerçek zamanlı tavan yapan hisseleri bul
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Sürekli Çalışan Analiz Servisi (Daemon)
+Fiyat deposu, teknik analiz önbelleği, temel bilgi önbelleği ve tahmin modeli
+süreç boyunca bellekte kalır. Zamanlanmış taramalardan önce bir ısınma görevi
+tüm geçmişi yükler; taramalar tetiklendiğinde sadece son bar indirilir.
+
+Zamanlama:
+    08:00  Isınma (geçmiş + model)
+    08:25  Son bar güncelleme
+    08:30  Hibrit tavan taraması (daily_ceiling_automation)
+    08:55  Son bar güncelleme
+    09:00  Günlük analiz (main.BISTAnalyzer)
+    18:00  Akşam özeti
+    18:30  Tahmin sonuçlarının işlenmesi (outcome_tracker)
+    Cumartesi 10:00  İdeal profilin 5 yıllık geçmişten yeniden kalibrasyonu (profile_aggregation)
+    Cumartesi 11:00  Tahmin modelinin özellik deposundan parçalı yeniden eğitimi
+    Seans içinde dakikada bir: kademeli tarama (hot 5 dk, warm 1 saat, cold günde bir)
+
+Kullanım:
+    python analysis_daemon.py          # sürekli çalış
+    python analysis_daemon.py now      # ısın, taramaları hemen çalıştır ve çık
+"""
+
+import asyncio
+import functools
+import logging
+import sys
+import time
+from datetime import datetime
+
+import schedule
+
+from price_store import PriceStore
+from main import BISTAnalyzer
+from hybrid_ceiling_scanner import HybridCeilingScanner
+from daily_ceiling_automation import DailyCeilingAutomation
+from outcome_tracker import OutcomeTracker
+from profile_aggregation import calibrate_ideal_profile
+from tiered_scheduler import TieredScanScheduler, ceiling_alert_consumer
+from tracing import start_run
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisDaemon:
+    def __init__(self, warmup_period: str = "6mo"):
+        """Paylaşılan depo ve sıcak bileşenlerle servisi başlat"""
+        # Son bar güncellemeleri zamanlanmış olduğu için okuma sırasında tazeleme yapılmaz
+        self.price_store = PriceStore(warmup_period=warmup_period, max_age_seconds=24 * 3600)
+        self.hybrid_scanner = HybridCeilingScanner(price_store=self.price_store)
+        self.analyzer = BISTAnalyzer(price_store=self.price_store,
+                                     history_store=self.hybrid_scanner.history_store)
+        self.automation = DailyCeilingAutomation(scanner=self.hybrid_scanner)
+        self.outcome_tracker = OutcomeTracker(self.hybrid_scanner.history_store.path,
+                                              price_store=self.price_store)
+        self.tiered_scheduler = TieredScanScheduler(
+            self.hybrid_scanner.hybrid_scan, 'hybrid_score', self.hybrid_scanner.bist_stocks,
+            price_store=self.price_store,
+            on_result=ceiling_alert_consumer(self.hybrid_scanner.send_telegram_alert, 'hybrid_score')
+        )
+        self.loop = asyncio.new_event_loop()
+        self.last_warm_up = None
+
+    def universe(self):
+        """Tüm bileşenlerin kullandığı sembollerin birleşimi"""
+        symbols = list(self.analyzer.data_fetcher.bist_symbols) + list(self.hybrid_scanner.bist_stocks)
+        return list(dict.fromkeys(s.replace('.IS', '') for s in symbols))
+
+    def warm_up_job(self):
+        """Geçmiş fiyatları ve modeli belleğe yükle"""
+        started = time.perf_counter()
+        logger.info("Isınma başlıyor...")
+        self.price_store.warm_up(self.universe())
+        self.price_store.warm_up(['XU100'], period="5d")
+        self.hybrid_scanner.universe.update_liquidity(self.price_store, self.universe())
+        self.analyzer.prediction_model._ensure_model_loaded()
+        self.last_warm_up = datetime.now()
+        logger.info(f"Isınma tamamlandı: {time.perf_counter() - started:.1f} sn")
+
+    def refresh_job(self):
+        """Sadece son barları güncelle (ısınma yapılmadıysa önce ısın)"""
+        if self.last_warm_up is None or self.last_warm_up.date() != datetime.now().date():
+            self.warm_up_job()
+            return
+        started = time.perf_counter()
+        self.price_store.refresh_last_bar()
+        logger.info(f"Son bar güncellemesi: {time.perf_counter() - started:.1f} sn")
+
+    def morning_scan_job(self):
+        """Hibrit tavan taraması (08:30)"""
+        self.refresh_job()
+        self.automation.morning_scan_job()
+        # Sabah taraması tüm evreni kapsar: kademeleri bu skorlarla başlat
+        latest = self.hybrid_scanner.history_store.latest_scan('hybrid', day=datetime.now().date())
+        if latest:
+            self.tiered_scheduler.seed_scores(latest['results'])
+
+    def intraday_tick_job(self):
+        """Süresi dolan kademeleri yeniden tara (dakikada bir)"""
+        if self.last_warm_up is None:
+            return
+        try:
+            if self.tiered_scheduler.due():
+                # Sektör toplamları ve korelasyonlar turda bir kez, son barlarla güncellenir
+                self.hybrid_scanner.refresh_market_context()
+                self.tiered_scheduler.tick()
+        except Exception as e:
+            logger.error(f"Kademeli tarama hatası: {e}")
+
+    def daily_analysis_job(self):
+        """Günlük BİST analizi (09:00) - kalıcı olay döngüsünde çalışır"""
+        self.refresh_job()
+        started = time.perf_counter()
+        try:
+            self.loop.run_until_complete(self.analyzer.run_daily_analysis())
+        except Exception as e:
+            logger.error(f"Günlük analiz hatası: {e}")
+        logger.info(f"Günlük analiz süresi: {time.perf_counter() - started:.1f} sn")
+
+    def evening_summary_job(self):
+        """Akşam özeti (18:00)"""
+        self.automation.evening_summary_job()
+
+    def outcome_job(self):
+        """Kapanıştan sonra günün tahminlerini gerçekleşen tavanlarla eşleştir (18:30)"""
+        self.refresh_job()
+        try:
+            self.outcome_tracker.update()
+            summary = self.outcome_tracker.format_summary()
+            print(summary)
+            self.hybrid_scanner.send_telegram_alert(summary)
+        except Exception as e:
+            logger.error(f"Tahmin sonucu güncelleme hatası: {e}")
+
+    def calibration_job(self):
+        """Canlı sinyal ideal profilini çok yıllık tavan öncesi dağılımından yeniden hesapla (haftalık)"""
+        started = time.perf_counter()
+        try:
+            result = calibrate_ideal_profile(period="5y", data_fetcher=self.analyzer.data_fetcher)
+            logger.info(f"İdeal profil kalibrasyonu: {result['events']} pencere "
+                        f"({time.perf_counter() - started:.1f} sn)")
+        except Exception as e:
+            logger.error(f"İdeal profil kalibrasyon hatası: {e}")
+
+    def training_job(self):
+        """Tahmin modelini özellik deposundan parçalı olarak yeniden eğit (haftalık)"""
+        store = self.analyzer.feature_store
+        try:
+            if not store.summary()['labelled']:
+                # İlk çalıştırma: çok yıllık geçmişi doldur
+                store.backfill(self.analyzer.data_fetcher, period="5y")
+            report = self.analyzer.prediction_model.train_out_of_core()
+            if report:
+                logger.info(f"Model eğitimi: {report['trained_rows']} satır, "
+                            f"{report['rows_per_second']} satır/sn")
+        except Exception as e:
+            logger.error(f"Model eğitim hatası: {e}")
+
+    @staticmethod
+    def _run(job):
+        """Görevi yeni bir metrik çalıştırması olarak başlat (özetler önceki görevleri içermesin)"""
+        @functools.wraps(job)
+        def wrapper():
+            start_run()
+            return job()
+        return wrapper
+
+    def setup_schedule(self):
+        """Görevleri zamanla"""
+        schedule.every().day.at("08:00").do(self._run(self.warm_up_job))
+        schedule.every().day.at("08:25").do(self._run(self.refresh_job))
+        schedule.every().day.at("08:30").do(self._run(self.morning_scan_job))
+        schedule.every().day.at("08:55").do(self._run(self.refresh_job))
+        schedule.every().day.at("09:00").do(self._run(self.daily_analysis_job))
+        schedule.every().day.at("18:00").do(self._run(self.evening_summary_job))
+        schedule.every().day.at("18:30").do(self._run(self.outcome_job))
+        schedule.every().saturday.at("10:00").do(self._run(self.calibration_job))
+        schedule.every().saturday.at("11:00").do(self._run(self.training_job))
+        schedule.every(1).minutes.do(self._run(self.intraday_tick_job))
+        logger.info("Daemon zamanlaması kuruldu: 08:00 ısınma, 08:30 tarama, 09:00 analiz, "
+                    "18:00 özet, 18:30 tahmin sonuçları, seans içi kademeli tarama")
+
+    def run_forever(self):
+        """Zamanlanmış görevleri saniye hassasiyetiyle bekle"""
+        self.setup_schedule()
+        # Servis gün içinde başlatıldıysa hemen ısın
+        self.warm_up_job()
+        try:
+            while True:
+                schedule.run_pending()
+                time.sleep(1)
+        except KeyboardInterrupt:
+            logger.info("Daemon durduruldu")
+        finally:
+            self.loop.close()
+
+    def run_once_now(self):
+        """Isın ve sabah görevlerini hemen çalıştır"""
+        self.warm_up_job()
+        self.morning_scan_job()
+        self.daily_analysis_job()
+        self.loop.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    daemon = AnalysisDaemon()
+    if len(sys.argv) > 1 and sys.argv[1] == "now":
+        daemon.run_once_now()
+    else:
+        daemon.run_forever()
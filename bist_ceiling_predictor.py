@@ -1,16 +1,21 @@
 import pandas as pd
 import numpy as np
-import yfinance as yf
-from ta.momentum import RSIIndicator, StochasticOscillator, WilliamsRIndicator
-from ta.trend import MACD, CCIIndicator, ADXIndicator, EMAIndicator, SMAIndicator
-from ta.volatility import BollingerBands
-from ta.volume import OnBalanceVolumeIndicator
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
 from datetime import datetime, timedelta
+from feature_cache import build_feature_frames
+from lazy_imports import lazy_import
+import providers
+from compiled_trees import CompiledEnsemble, compile_model
+
+# Ağır bağımlılıklar ilk kullanımda yüklenir
+ta = lazy_import('ta')
+sklearn_ensemble = lazy_import('sklearn.ensemble')
+sklearn_model_selection = lazy_import('sklearn.model_selection')
 import warnings
 warnings.filterwarnings("ignore")
 
+# Eğitilen modelin sklearn'siz kopyası (cron tahminleri için)
+COMPILED_MODEL_FILE = "ceiling_rf_compiled.npz"
+
 def load_symbols(filename="bist_symbols.csv", min_count=5):
     """
     CSV'den sembol yükler. Örnek dosya:
@@ -33,7 +38,10 @@ def load_symbols(filename="bist_symbols.csv", min_count=5):
 
 def get_data(symbol, start, end):
     try:
-        data = yf.download(symbol, start=start, end=end, progress=False)
+        data = providers.download(symbol, start=start, end=end, progress=False)
+        # Yeni yfinance sürümleri tek sembolde de çok seviyeli kolon döndürür
+        if isinstance(data.columns, pd.MultiIndex):
+            data.columns = data.columns.get_level_values(0)
         data = data.dropna()
         return data
     except Exception as e:
@@ -42,21 +50,21 @@ def get_data(symbol, start, end):
 
 def add_technical_indicators(df):
     if df.empty: return df
-    df['rsi'] = RSIIndicator(df['Close']).rsi()
-    df['macd'] = MACD(df['Close']).macd()
-    df['stoch'] = StochasticOscillator(df['High'], df['Low'], df['Close']).stoch()
-    df['cci'] = CCIIndicator(df['High'], df['Low'], df['Close']).cci()
-    df['adx'] = ADXIndicator(df['High'], df['Low'], df['Close']).adx()
-    bb = BollingerBands(df['Close'])
+    df['rsi'] = ta.momentum.RSIIndicator(df['Close']).rsi()
+    df['macd'] = ta.trend.MACD(df['Close']).macd()
+    df['stoch'] = ta.momentum.StochasticOscillator(df['High'], df['Low'], df['Close']).stoch()
+    df['cci'] = ta.trend.CCIIndicator(df['High'], df['Low'], df['Close']).cci()
+    df['adx'] = ta.trend.ADXIndicator(df['High'], df['Low'], df['Close']).adx()
+    bb = ta.volatility.BollingerBands(df['Close'])
     df['bb_high'] = bb.bollinger_hband()
     df['bb_low'] = bb.bollinger_lband()
-    df['obv'] = OnBalanceVolumeIndicator(df['Close'], df['Volume']).on_balance_volume()
-    df['ema_10'] = EMAIndicator(df['Close'], window=10).ema_indicator()
-    df['sma_10'] = SMAIndicator(df['Close'], window=10).sma_indicator()
-    df['sma_20'] = SMAIndicator(df['Close'], window=20).sma_indicator()
-    df['sma_50'] = SMAIndicator(df['Close'], window=50).sma_indicator()
-    df['sma_200'] = SMAIndicator(df['Close'], window=200).sma_indicator()
-    df['williams_r'] = WilliamsRIndicator(df['High'], df['Low'], df['Close']).williams_r()
+    df['obv'] = ta.volume.OnBalanceVolumeIndicator(df['Close'], df['Volume']).on_balance_volume()
+    df['ema_10'] = ta.trend.EMAIndicator(df['Close'], window=10).ema_indicator()
+    df['sma_10'] = ta.trend.SMAIndicator(df['Close'], window=10).sma_indicator()
+    df['sma_20'] = ta.trend.SMAIndicator(df['Close'], window=20).sma_indicator()
+    df['sma_50'] = ta.trend.SMAIndicator(df['Close'], window=50).sma_indicator()
+    df['sma_200'] = ta.trend.SMAIndicator(df['Close'], window=200).sma_indicator()
+    df['williams_r'] = ta.momentum.WilliamsRIndicator(df['High'], df['Low'], df['Close']).williams_r()
     # Golden Cross: 50 günlük SMA, 200 günlük SMA'nın üstüne çıktı mı
     df['golden_cross'] = (df['sma_50'] > df['sma_200']).astype(int)
     # Kesişim anı (bugün 50>200 ve dün <=200 ise yeni golden cross)
@@ -65,15 +73,23 @@ def add_technical_indicators(df):
 
 def mark_ceiling_days(df):
     df = df.copy()
-    df['ceiling'] = False
-    for i in range(1, len(df)):
-        prev_close = df['Close'].iloc[i-1]
-        tavan = round(prev_close * 1.10, 2)
-        # BIST'te tavan fiyat küsuratı virgül sonrası 2 hane
-        if abs(df['High'].iloc[i] - tavan) < 0.02:
-            df.loc[df.index[i], 'ceiling'] = True
+    # BIST'te tavan fiyat küsuratı virgül sonrası 2 hane
+    tavan = (df['Close'].shift(1) * 1.10).round(2)
+    df['ceiling'] = ((df['High'] - tavan).abs() < 0.02).fillna(False).astype(bool)
     return df
 
+def compute_features(df):
+    """Ham OHLCV tablosundan tüm göstergeleri ve etiket kolonlarını hesapla"""
+    df = add_technical_indicators(df)
+    df = mark_ceiling_days(df)
+    df = mark_speculative(df)
+    return df
+
+def build_feature_frames_for(symbols, start, end, max_workers=None, cache_dir="feature_cache"):
+    """Sembollerin özellik tablolarını paralel ve önbellekli olarak hazırla"""
+    return build_feature_frames(symbols, start, end, get_data, compute_features,
+                                cache_dir=cache_dir, max_workers=max_workers)
+
 def mark_speculative(df):
     # Spekülatif tavan: Ani yüksek hacim + ani fiyat değişimi + düşük ortalama hacim
     df['volume_change'] = df['Volume'].pct_change().fillna(0)
@@ -90,21 +106,18 @@ def create_feature_label_df(df):
         'sma_50', 'sma_200', 'williams_r', 'golden_cross', 'golden_cross_signal',
         'volume_change', 'price_jump', 'low_volume', 'speculative'
     ]
-    df = df.dropna(subset=feat_cols)
-    feature_df = df[feat_cols]
+    df = df.dropna(subset=feat_cols).copy()
+    feature_df = df[feat_cols].copy()
     # Ertesi gün ceiling mi?
     df['target'] = df['ceiling'].shift(-1, fill_value=False)
     feature_df['target'] = df['target']
     return feature_df
 
-def train_predict(symbols, start, end):
+def train_predict(symbols, start, end, max_workers=None):
     all_feat = []
-    for sym in symbols:
-        df = get_data(sym, start, end)
+    frames = build_feature_frames_for(symbols, start, end, max_workers=max_workers)
+    for sym, df in frames.items():
         if len(df) < 60: continue
-        df = add_technical_indicators(df)
-        df = mark_ceiling_days(df)
-        df = mark_speculative(df)
         feats = create_feature_label_df(df)
         feats['symbol'] = sym
         all_feat.append(feats)
@@ -113,32 +126,42 @@ def train_predict(symbols, start, end):
     y = dataset['target'].astype(int)
     if y.sum() < 10:
         print("Tavan gün sayısı çok az, model zayıf olabilir!")
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, stratify=y)
-    model = RandomForestClassifier(n_estimators=150, class_weight='balanced', random_state=42, max_depth=8)
+    X_train, X_test, y_train, y_test = sklearn_model_selection.train_test_split(X, y, test_size=0.2, stratify=y)
+    model = sklearn_ensemble.RandomForestClassifier(n_estimators=150, class_weight='balanced', random_state=42, max_depth=8)
     model.fit(X_train, y_train)
     print("Test seti doğruluk oranı:", model.score(X_test, y_test))
     return model, dataset
 
-def predict_next_ceiling(model, symbols, lookback_days=30):
+def predict_next_ceiling(model=None, symbols=(), lookback_days=30, max_workers=None):
+    """
+    model: Eğitilmiş RandomForest veya derlenmiş kopyası (CompiledEnsemble);
+    verilmezse COMPILED_MODEL_FILE sklearn yüklemeden açılır
+    """
+    model = CompiledEnsemble.load(COMPILED_MODEL_FILE) if model is None else compile_model(model)
     today = datetime.now().date()
     start = (today - timedelta(days=lookback_days)).strftime('%Y-%m-%d')
-    candidates = []
-    for sym in symbols:
-        df = get_data(sym, start, datetime.now().strftime('%Y-%m-%d'))
+    # Aynı tahmin penceresinin kaydı önbellekten gelir, sadece yeni günler indirilir
+    frames = build_feature_frames_for(symbols, start, datetime.now().strftime('%Y-%m-%d'),
+                                      max_workers=max_workers)
+    latest_rows = []
+    for sym, df in frames.items():
         if len(df) < 20: continue
-        df = add_technical_indicators(df)
-        df = mark_ceiling_days(df)
-        df = mark_speculative(df)
         feats = create_feature_label_df(df)
         if len(feats) < 2: continue
-        latest = feats.iloc[[-2]]
-        X_latest = latest.drop(columns=['target', 'symbol'], errors='ignore')
-        pred = model.predict(X_latest)
-        proba = model.predict_proba(X_latest)[0][1]
-        gcross = bool(latest['golden_cross_signal'].values[0])
-        spec = bool(latest['speculative'].values[0])
-        if pred[0] == 1 and proba > 0.45:
-            candidates.append((sym, proba, gcross, spec))
+        latest_rows.append(feats.iloc[[-2]].assign(symbol=sym))
+    if not latest_rows:
+        print("Tahmin için yeterli veri yok")
+        return
+    latest = pd.concat(latest_rows)
+    # Tüm semboller tek toplu değerlendirmede
+    X_latest = latest.drop(columns=['target', 'symbol'], errors='ignore')
+    probas = model.positive_proba(X_latest)
+    candidates = []
+    for sym, proba, gcross, spec in zip(latest['symbol'], probas,
+                                        latest['golden_cross_signal'], latest['speculative']):
+        # Eski koşul (predict == 1 ve olasılık > 0.45): ikili sınıfta predict == 1 <=> olasılık > 0.5
+        if proba > 0.5:
+            candidates.append((sym, float(proba), bool(gcross), bool(spec)))
     candidates = sorted(candidates, key=lambda x: -x[1])
     print("Tahmini tavan adayı hisseler (sembol, olasılık, yeni golden_cross, spekülatif):")
     for sym, proba, gc, spec in candidates:
@@ -149,4 +172,8 @@ if __name__ == "__main__":
     start = (datetime.now() - timedelta(days=240)).strftime('%Y-%m-%d')
     end = datetime.now().strftime('%Y-%m-%d')
     model, dataset = train_predict(symbols, start, end)
+    compile_model(model).save(COMPILED_MODEL_FILE)
+    # Zaman sıralı örneklem dışı değerlendirme
+    from walk_forward import walk_forward_from_dataset, print_report
+    print_report(walk_forward_from_dataset(dataset.sort_index(), train_days=60, test_days=10))
     predict_next_ceiling(model, symbols)
\ No newline at end of file
@@ -4,112 +4,48 @@ BİST Hisse Senedi Veri Çekme Modülü
 Bu modül BİST'ten hisse senedi verilerini çeker ve işler.
 """
 
-import yfinance as yf
+import numpy as np
 import pandas as pd
-import requests
 from datetime import datetime, timedelta
 import logging
 from typing import List, Dict, Any, Optional
 import time
+from data_plan import DataPlanner, DataRequest
+from price_store import slice_period
+from price_panel import PricePanel
+from symbol_universe import get_universe
+from lazy_imports import lazy_import
+import providers
+from tracing import inc
+
+# Ağır bağımlılıklar ilk kullanımda yüklenir
+requests = lazy_import('requests')
 
 logger = logging.getLogger(__name__)
 
 class BISTDataFetcher:
-    def __init__(self):
-        """BİST veri çekici başlat"""
+    def __init__(self, price_store=None):
+        """BİST veri çekici başlat (price_store verilirse veriler bellekten okunur)"""
+        self.price_store = price_store
         self.bist_symbols = []
         self.base_url = "https://query1.finance.yahoo.com/v1/finance/screener"
         self._load_bist_symbols()
     
     def _load_bist_symbols(self):
         """BİST 100 sembollerini yükle"""
-        # EKSİKSİZ BİST hisselerinin KAPSAMLI listesi - tüm aktif hisseler
-        self.bist_symbols = [
-            # Ana bankalar ve finansal
-            'AKBNK.IS', 'GARAN.IS', 'ISCTR.IS', 'YKBNK.IS', 'HALKB.IS', 'VAKBN.IS', 'SKBNK.IS', 'TSKB.IS',
-            'SISE.IS', 'BIMAS.IS', 'SAHOL.IS', 'DOHOL.IS', 'KCHOL.IS',
-            
-            # Havacılık ve ulaştırma
-            'THYAO.IS', 'PGSUS.IS', 'CLEBI.IS', 'TAVHL.IS',
-            
-            # Teknoloji ve telekomünikasyon
-            'TCELL.IS', 'TTKOM.IS', 'ASELS.IS', 'LOGO.IS', 'NETAS.IS',
-            
-            # Metal ve madencilik
-            'EREGL.IS', 'TUPRS.IS', 'KRDMD.IS', 'ALTIN.IS', 'KOZAL.IS', 'KOZAA.IS', 'KRDMA.IS',
-            'IZMDC.IS',  # EKSİKTİ - %8.01 artış yapan
-            
-            # Perakende ve tüketim
-            'ARCLK.IS', 'MGROS.IS', 'SOKM.IS', 'ULKER.IS', 'MAVI.IS', 'CCOLA.IS',
-            
-            # Enerji ve kimya
-            'PETKM.IS', 'AYGAZ.IS', 'AKSA.IS', 'BRSAN.IS', 'GUBRF.IS', 'EUPWR.IS', 'EGEEN.IS',
-            'YESIL.IS',  # EKSİKTİ - %7.74 artış yapan
-            
-            # İnşaat ve gayrimenkul
-            'ENKAI.IS', 'ALGYO.IS', 'EKGYO.IS', 'ISGYO.IS', 'TOASO.IS',
-            'ADGYO.IS',  # EKSİKTİ - %7.69 artış yapan
-            
-            # Otomotiv ve sanayi
-            'OTKAR.IS', 'TTRAK.IS', 'BRISA.IS', 'VESTL.IS', 'PARSN.IS',
-            
-            # Gıda ve içecek
-            'BANVT.IS', 'TBORG.IS',
-            'PINSU.IS',  # EKSİKTİ - %6.51 artış yapan
-            
-            # Tekstil ve deri
-            'ALBRK.IS', 'DITAS.IS', 'KARSN.IS',
-            
-            # Cam ve seramik
-            'SISE.IS',
-            
-            # Kağıt ve ambalaj
-            'CEMTS.IS', 'BAGFS.IS',
-            'FLAP.IS',   # EKSİKTİ - %6.24 artış yapan
-            
-            # İlaç ve sağlık
-            'DEVA.IS', 'HEKTS.IS',
-            
-            # Holding ve konglomera
-            'HUBVC.IS',  # EKSİKTİ - %7.57 artış yapan
-            'ISGSY.IS',  # EKSİKTİ - %7.00 artış yapan
-            'INCRM.IS',  # EKSİKTİ - %6.78 artış yapan
-            
-            # Diğer finansal
-            'CRDFA.IS',  # EKSİKTİ - %6.11 artış yapan
-            'AYEN.IS',   # EKSİKTİ - %5.70 artış yapan
-            
-            # Teknoloji ve yazılım
-            'KRONT.IS',  # EKSİKTİ - %5.35 artış yapan
-            
-            # Enerji ve petrokimya
-            'PATEK.IS',  # EKSİKTİ - %5.33 artış yapan
-            
-            # Lojistik ve taşımacılık
-            'KAPLM.IS',  # EKSİKTİ - %5.26 artış yapan
-            
-            # Mevcut diğer hisseler
-            'ALARK.IS', 'BARMA.IS', 'DOCO.IS', 'GLYHO.IS', 'IHLAS.IS', 'IHYAY.IS',
-            'IPEKE.IS', 'ISKUR.IS', 'JANTS.IS', 'KONYA.IS', 'KONTR.IS', 'MPARK.IS',
-            'ODAS.IS', 'OYAKC.IS', 'PENTA.IS', 'PKART.IS', 'POLHO.IS', 'PRKME.IS',
-            'QUAGR.IS', 'RTALB.IS', 'SNGYO.IS', 'TMSN.IS',
-            
-            # Tavan potansiyeli olan diğer hisseler
-            'AVOD.IS', 'FROTO.IS', 'KORDS.IS', 'BIZIM.IS', 'GOODY.IS',
-            'TRGYO.IS', 'BFREN.IS', 'ADEL.IS', 'DOAS.IS', 'SARKY.IS',
-            'SODA.IS',
-            
-            # Yeni eklenen potansiyel tavanlar
-            'MAKTK.IS', 'IZINV.IS', 'GRNYO.IS', 'INVES.IS', 'SKTAS.IS',
-            'YYAPI.IS', 'TSPOR.IS', 'TRHOL.IS', 'PCILT.IS', 'MRGYO.IS'
-        ]
+        # Ortak sembol evreninden (bist_universe.json), tekrarlar atılmış olarak
+        self.bist_symbols = get_universe().symbols('core', suffix=True)
         logger.info(f"Toplam {len(self.bist_symbols)} BİST sembolü yüklendi")
     
     def get_stock_data(self, symbol: str, period: str = "1mo") -> Optional[pd.DataFrame]:
         """Belirli bir hisse için veri çek"""
         try:
-            ticker = yf.Ticker(symbol)
-            data = ticker.history(period=period)
+            if self.price_store is not None:
+                data = self.price_store.get_history(symbol, period)
+                if data is None:
+                    data = pd.DataFrame()
+            else:
+                data = providers.history(symbol, period=period)
             
             if data.empty:
                 logger.warning(f"{symbol} için veri bulunamadı")
@@ -133,9 +69,11 @@ class BISTDataFetcher:
                 if data is not None:
                     all_data[symbol] = data
                     
-                # API limitini aşmamak için kısa bekleme
+                # API limitini aşmamak için kısa bekleme (bellekten okurken gerekmez)
                 if i % 10 == 0:
-                    time.sleep(1)
+                    if self.price_store is None:
+                        time.sleep(1)
+                        inc('rate_limit_wait_seconds_total', 1, provider='yfinance')
                     logger.info(f"İşlenen: {i+1}/{len(self.bist_symbols)}")
                     
             except Exception as e:
@@ -145,6 +83,42 @@ class BISTDataFetcher:
         logger.info(f"Toplam {len(all_data)} hisse için veri çekildi")
         return all_data
     
+    def get_all_bist_panel(self, period: str = "1mo", dtype=np.float32) -> PricePanel:
+        """Tüm BİST verisini işlem havuzlarıyla paylaşılabilir tek bir panel olarak döndür"""
+        return PricePanel.from_frames(self.get_all_bist_data(period), dtype=dtype)
+    
+    def fetch_requests(self, requests: List[DataRequest]) -> Dict[str, Dict[str, pd.DataFrame]]:
+        """
+        Analizörlerin veri isteklerini birleştirip asgari sayıda indirme yap
+        
+        Her sembol bir kez, istenen en uzun dönemle indirilir; her analizöre
+        kendi dönemine göre kesilmiş tablolar döner: {requester: {sembol.IS: df}}
+        """
+        planner = DataPlanner(requests)
+        fetched = {}
+        
+        for step in planner.plan():
+            for i, symbol in enumerate(step['symbols']):
+                data = self.get_stock_data(symbol, step['period'])
+                if data is not None:
+                    fetched[symbol] = data
+                # API limitini aşmamak için kısa bekleme (bellekten okurken gerekmez)
+                if self.price_store is None and i % 10 == 9:
+                    time.sleep(1)
+                    inc('rate_limit_wait_seconds_total', 1, provider='yfinance')
+        
+        results = {}
+        for request in requests:
+            results[request.requester] = {
+                symbol: slice_period(fetched[symbol], request.period)
+                for symbol in request.symbols if symbol in fetched
+            }
+        return results
+    
+    def get_data_for(self, symbols: List[str], period: str = "1mo") -> Dict[str, pd.DataFrame]:
+        """Sadece verilen semboller için veri çek (tüm evreni indirmeden)"""
+        return self.fetch_requests([DataRequest(symbols, period, 'single')])['single']
+    
     def get_previous_day_ceiling_stocks(self, threshold: float = 0.095) -> List[Dict]:
         """Önceki gün tavan yapan hisseleri bul"""
         logger.info("Önceki gün tavan yapan hisseler aranıyor...")
@@ -240,10 +214,12 @@ class BISTDataFetcher:
         """Genel piyasa bilgilerini getir"""
         try:
             # XU100 endeksi
-            xu100 = yf.Ticker("XU100.IS")
-            xu100_data = xu100.history(period="2d")
+            if self.price_store is not None:
+                xu100_data = self.price_store.get_history("XU100.IS", "2d")
+            else:
+                xu100_data = providers.history("XU100.IS", period="2d")
             
-            if len(xu100_data) >= 2:
+            if xu100_data is not None and len(xu100_data) >= 2:
                 today_close = xu100_data['Close'].iloc[-1]
                 yesterday_close = xu100_data['Close'].iloc[-2]
                 change = (today_close - yesterday_close) / yesterday_close * 100
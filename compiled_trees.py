@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Derlenmiş Ağaç Topluluğu Değerlendiricisi
+Eğitilmiş sklearn orman (RandomForest / ExtraTrees) ve gradyan artırma
+(GradientBoosting, ikili sınıf) modellerini bitişik NumPy düğüm dizilerine
+düzleştirir ve sklearn yüklemeden toplu olasılık hesaplar.
+
+Düzleştirilmiş biçim (tüm ağaçlar tek dizide, ağaç kökleri 'roots' ile):
+    feature       Düğümün böldüğü özellik (yapraklarda 0)
+    threshold     Bölme eşiği; X[feature] <= threshold ise sola gidilir
+    left / right  Çocuk düğümler; yapraklar kendilerini gösterir
+    missing_left  NaN değerin sola gidip gitmediği
+    value         Yaprak çıktısı: orman için pozitif sınıf olasılığı,
+                  artırma için ağacın ham (log-odds) katkısı
+
+Değerlendirme tüm ağaçlar ve tüm satırlar için seviye seviye ilerler
+(ağaç derinliği kadar adım). sklearn ile aynı sonuç için:
+- Girdi float32'ye çevrilir (sklearn ağaçları float32 ile karşılaştırır)
+- Ağaç katkıları sklearn'deki sırayla toplanır
+- Ölçekleyici (StandardScaler) (X - mean) / scale olarak uygulanır
+
+Dosya sıkıştırılmamış .npz'dir; load(mmap_mode='r') dizileri doğrudan dosyadan
+bellek eşlemeli açar, böylece aynı modeli yükleyen işlemler düğüm dizilerini
+işletim sistemi sayfa önbelleği üzerinden paylaşır.
+
+Kullanım:
+    compiled = compile_models([(0.6, rf), (0.4, gb)], scaler=scaler)
+    compiled.save("compiled.npz")
+    probabilities = CompiledEnsemble.load("compiled.npz", mmap_mode='r').positive_proba(X)
+"""
+
+import json
+import logging
+import math
+import zipfile
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FOREST = 'forest'
+BOOSTING = 'boosting'
+BLOCK_ROWS = 4096
+_ARRAYS = ('feature', 'threshold', 'left', 'right', 'missing_left', 'value', 'roots')
+
+
+class CompiledTrees:
+    def __init__(self, kind: str, feature: np.ndarray, threshold: np.ndarray, left: np.ndarray,
+                 right: np.ndarray, missing_left: np.ndarray, value: np.ndarray, roots: np.ndarray,
+                 depth: int, learning_rate: float = 1.0, baseline: float = 0.0,
+                 children: Optional[np.ndarray] = None):
+        """
+        kind: FOREST (yaprak olasılıklarının ortalaması) veya BOOSTING
+        (baseline + learning_rate x yaprak katkıları toplamı, sigmoid)
+        depth: En derin ağacın derinliği (değerlendirme adım sayısı)
+        children: Hazır (sağ, sol) sıralı çocuk dizisi (dosyadan); yoksa hesaplanır
+        """
+        if kind not in (FOREST, BOOSTING):
+            raise ValueError(f"Bilinmeyen topluluk türü: {kind}")
+        self.kind = kind
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.missing_left = missing_left
+        self.value = value
+        self.roots = roots
+        self.depth = int(depth)
+        self.learning_rate = float(learning_rate)
+        self.baseline = float(baseline)
+        # 2 x düğüm + sola_git -> sonraki düğüm (sağ, sol sırasıyla)
+        self._children = children if children is not None else np.stack([right, left], axis=1).ravel()
+
+    def __len__(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    # --- sklearn'den dışa aktarma ---
+
+    @classmethod
+    def from_sklearn(cls, model: Any) -> 'CompiledTrees':
+        """Eğitilmiş sklearn modelini düzleştir (sklearn sadece burada gerekir)"""
+        estimators = getattr(model, 'estimators_', None)
+        if estimators is None:
+            raise ValueError("Model eğitilmemiş")
+        classes = list(getattr(model, 'classes_', []))
+        if len(classes) != 2:
+            raise ValueError(f"Sadece ikili sınıflandırıcılar derlenebilir ({len(classes)} sınıf)")
+
+        if isinstance(estimators, np.ndarray):
+            # GradientBoostingClassifier: (aşama, 1) regresyon ağaçları
+            if estimators.ndim != 2 or estimators.shape[1] != 1:
+                raise ValueError("Sadece ikili gradyan artırma modelleri derlenebilir")
+            trees = [estimator.tree_ for estimator in estimators[:, 0]]
+            leaf_values = [tree.value[:, 0, 0] for tree in trees]
+            return cls._from_trees(BOOSTING, trees, leaf_values, learning_rate=model.learning_rate,
+                                   baseline=_boosting_baseline(model))
+
+        trees = [estimator.tree_ for estimator in estimators]
+        leaf_values = []
+        for tree in trees:
+            # DecisionTreeClassifier.predict_proba ile aynı normalizasyon
+            counts = tree.value[:, 0, :]
+            normalizer = counts.sum(axis=1)
+            normalizer[normalizer == 0.0] = 1.0
+            leaf_values.append(counts[:, 1] / normalizer)
+        return cls._from_trees(FOREST, trees, leaf_values)
+
+    @classmethod
+    def _from_trees(cls, kind: str, trees: List[Any], leaf_values: List[np.ndarray],
+                    learning_rate: float = 1.0, baseline: float = 0.0) -> 'CompiledTrees':
+        sizes = np.array([tree.node_count for tree in trees], dtype=np.int64)
+        roots = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.int64)
+
+        feature, threshold, left, right, missing_left = [], [], [], [], []
+        for tree, root in zip(trees, roots):
+            nodes = np.arange(tree.node_count, dtype=np.int64)
+            is_leaf = tree.children_left == -1
+            feature.append(np.where(is_leaf, 0, tree.feature).astype(np.int64))
+            threshold.append(np.where(is_leaf, np.inf, tree.threshold))
+            left.append(root + np.where(is_leaf, nodes, tree.children_left))
+            right.append(root + np.where(is_leaf, nodes, tree.children_right))
+            missing = getattr(tree, 'missing_go_to_left', None)
+            missing_left.append(np.zeros(tree.node_count, dtype=bool) if missing is None
+                                else np.asarray(missing, dtype=bool))
+
+        return cls(kind, np.concatenate(feature), np.concatenate(threshold).astype(np.float64),
+                   np.concatenate(left), np.concatenate(right), np.concatenate(missing_left),
+                   np.concatenate(leaf_values).astype(np.float64), roots,
+                   depth=max(tree.max_depth for tree in trees),
+                   learning_rate=learning_rate, baseline=baseline)
+
+    # --- Değerlendirme ---
+
+    def leaves(self, X32: np.ndarray) -> np.ndarray:
+        """(ağaç, satır) yaprak düğüm indeksleri; X32 float32 (satır, özellik)"""
+        n_rows, n_features = X32.shape
+        flat = np.ascontiguousarray(X32).ravel()
+        offsets = (np.arange(n_rows, dtype=np.int64) * n_features)[None, :]
+        nodes = np.repeat(self.roots[:, None], n_rows, axis=1)
+        has_missing = self.missing_left.any()
+        for _ in range(self.depth):
+            x = flat.take(self.feature.take(nodes) + offsets)
+            go_left = x <= self.threshold.take(nodes)
+            if has_missing:
+                go_left |= np.isnan(x) & self.missing_left.take(nodes)
+            nodes = self._children.take(2 * nodes + go_left)
+        return nodes
+
+    def decision(self, X32: np.ndarray) -> np.ndarray:
+        """Orman: pozitif sınıf olasılığı; artırma: ham log-odds skoru"""
+        values = self.value[self.leaves(X32)]
+        if self.kind == FOREST:
+            out = np.zeros(len(X32))
+            for tree_values in values:
+                out += tree_values
+            out /= len(values)
+            return out
+        out = np.full(len(X32), self.baseline)
+        for tree_values in values:
+            out += self.learning_rate * tree_values
+        return out
+
+    def positive_proba(self, X32: np.ndarray) -> np.ndarray:
+        """Pozitif sınıf (tavan) olasılığı"""
+        scores = self.decision(X32)
+        if self.kind == BOOSTING:
+            # math.exp (libm) scipy.special.expit ile bit düzeyinde aynıdır; np.exp son basamakta ayrışabilir
+            exp = np.fromiter((math.exp(-max(s, -700.0)) for s in scores), dtype=np.float64, count=len(scores))
+            return 1.0 / (1.0 + exp)
+        return scores
+
+    # --- Kayıt ---
+
+    def to_arrays(self, prefix: str) -> Dict[str, np.ndarray]:
+        arrays = {f"{prefix}{name}": getattr(self, name) for name in _ARRAYS}
+        arrays[f"{prefix}children"] = self._children
+        arrays[f"{prefix}params"] = np.array([self.depth, self.learning_rate, self.baseline])
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, kind: str, arrays: Any, prefix: str) -> 'CompiledTrees':
+        depth, learning_rate, baseline = arrays[f"{prefix}params"]
+        return cls(kind, *(arrays[f"{prefix}{name}"] for name in _ARRAYS),
+                   depth=int(depth), learning_rate=learning_rate, baseline=baseline,
+                   children=arrays.get(f"{prefix}children"))
+
+
+def _boosting_baseline(model: Any) -> float:
+    """Gradyan artırmanın başlangıç (init) ham tahmini; varsayılan init sabittir"""
+    n_features = getattr(model, 'n_features_in_', 1)
+    if hasattr(model, '_raw_predict_init'):
+        return float(model._raw_predict_init(np.zeros((1, n_features), dtype=np.float32))[0, 0])
+    prior = float(model.init_.class_prior_[1])
+    return float(np.log(prior / (1 - prior)))
+
+
+class CompiledEnsemble:
+    def __init__(self, components: Sequence[Tuple[float, CompiledTrees]],
+                 mean: Optional[np.ndarray] = None, scale: Optional[np.ndarray] = None,
+                 feature_names: Optional[Sequence[str]] = None):
+        """
+        components: [(ağırlık, derlenmiş topluluk)]; olasılık ağırlıklı toplamdır
+        mean / scale: StandardScaler parametreleri (yoksa ölçekleme yapılmaz)
+        feature_names: DataFrame girdilerinde kolon sırası
+        """
+        self.components = [(float(weight), trees) for weight, trees in components]
+        self.mean = mean
+        self.scale = scale
+        self.feature_names = list(feature_names) if feature_names is not None else None
+
+    @property
+    def n_trees(self) -> int:
+        return sum(len(trees) for _, trees in self.components)
+
+    def _matrix(self, X: Any) -> np.ndarray:
+        if self.feature_names is not None and hasattr(X, 'columns'):
+            X = X[self.feature_names]
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        if self.mean is not None:
+            X = X - self.mean
+        if self.scale is not None:
+            X = X / self.scale
+        return X
+
+    def positive_proba(self, X: Any, block_rows: int = BLOCK_ROWS) -> np.ndarray:
+        """(satır,) pozitif sınıf olasılıkları; büyük girdiler satır blokları halinde"""
+        X = self._matrix(X)
+        out = np.empty(len(X))
+        for start in range(0, len(X), block_rows):
+            X32 = X[start:start + block_rows].astype(np.float32)
+            block = np.zeros(len(X32))
+            for weight, trees in self.components:
+                block = block + trees.positive_proba(X32) * weight
+            out[start:start + block_rows] = block
+        return out
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        """sklearn uyumlu (satır, 2) olasılık dizisi"""
+        positive = self.positive_proba(X)
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, X: Any) -> np.ndarray:
+        """sklearn uyumlu sınıf tahmini (eşitlikte negatif sınıf)"""
+        return (self.positive_proba(X) > 0.5).astype(np.int64)
+
+    # --- Kayıt ---
+
+    def save(self, path: str):
+        """Tek .npz dosyasına yaz (sadece NumPy ile okunabilir)"""
+        header = {
+            'kinds': [trees.kind for _, trees in self.components],
+            'weights': [weight for weight, _ in self.components],
+            'feature_names': self.feature_names,
+        }
+        arrays = {'header': np.array(json.dumps(header))}
+        for i, (_, trees) in enumerate(self.components):
+            arrays.update(trees.to_arrays(f"c{i}_"))
+        if self.mean is not None:
+            arrays['mean'] = np.asarray(self.mean, dtype=np.float64)
+        if self.scale is not None:
+            arrays['scale'] = np.asarray(self.scale, dtype=np.float64)
+        with open(path, 'wb') as f:
+            np.savez(f, **arrays)
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: Optional[str] = None) -> 'CompiledEnsemble':
+        """mmap_mode='r': diziler kopyalanmadan dosyadan bellek eşlemeli açılır"""
+        if mmap_mode:
+            arrays = _npz_memmap(path, mmap_mode)
+        else:
+            with np.load(path, allow_pickle=False) as npz:
+                arrays = {name: npz[name] for name in npz.files}
+        header = json.loads(str(arrays['header']))
+        components = [(weight, CompiledTrees.from_arrays(kind, arrays, f"c{i}_"))
+                      for i, (kind, weight) in enumerate(zip(header['kinds'], header['weights']))]
+        return cls(components, arrays.get('mean'), arrays.get('scale'), header.get('feature_names'))
+
+
+def _npz_memmap(path: str, mmap_mode: str = 'r') -> Dict[str, np.ndarray]:
+    """
+    Sıkıştırılmamış .npz içindeki .npy dizilerini bellek eşlemeli aç
+
+    np.load .npz için mmap_mode'u yok sayar; np.savez üyeleri sıkıştırmadan
+    sakladığı için her dizinin dosyadaki konumu zip yerel başlığından bulunur.
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as f:
+        for info in archive.infolist():
+            name = info.filename[:-4] if info.filename.endswith('.npy') else info.filename
+            if info.compress_type != zipfile.ZIP_STORED:
+                arrays[name] = np.lib.format.read_array(archive.open(info), allow_pickle=False)
+                continue
+            # Yerel dosya başlığı: 30 bayt + dosya adı + ek alan
+            f.seek(info.header_offset + 26)
+            name_length, extra_length = np.frombuffer(f.read(4), dtype='<u2')
+            f.seek(info.header_offset + 30 + int(name_length) + int(extra_length))
+            version = np.lib.format.read_magic(f)
+            read_header = (np.lib.format.read_array_header_1_0 if version == (1, 0)
+                           else np.lib.format.read_array_header_2_0)
+            shape, fortran_order, dtype = read_header(f)
+            if dtype.hasobject:
+                raise ValueError(f"{name}: nesne dizileri bellek eşlenemez")
+            if not shape:
+                # Skaler (ör. başlık metni) doğrudan okunur
+                arrays[name] = np.fromfile(f, dtype=dtype, count=1).reshape(())
+                continue
+            arrays[name] = np.memmap(f, dtype=dtype, mode=mmap_mode, offset=f.tell(), shape=shape,
+                                     order='F' if fortran_order else 'C')
+    return arrays
+
+
+def compile_models(models: Sequence[Tuple[float, Any]], scaler: Any = None) -> CompiledEnsemble:
+    """
+    [(ağırlık, sklearn modeli)] listesini derle
+
+    scaler: Modellerden önce uygulanan StandardScaler (isteğe bağlı)
+    """
+    components = [(weight, CompiledTrees.from_sklearn(model)) for weight, model in models]
+    names = getattr(models[0][1], 'feature_names_in_', None) if models else None
+    mean = getattr(scaler, 'mean_', None) if scaler is not None else None
+    scale = getattr(scaler, 'scale_', None) if scaler is not None else None
+    compiled = CompiledEnsemble(components, mean, scale, names)
+    logger.info(f"Topluluk derlendi: {compiled.n_trees} ağaç, "
+                f"{sum(t.n_nodes for _, t in compiled.components)} düğüm")
+    return compiled
+
+
+def compile_model(model: Any) -> CompiledEnsemble:
+    """Tek sklearn modelini derle; zaten derlenmişse aynen döndür"""
+    if isinstance(model, CompiledEnsemble):
+        return model
+    return compile_models([(1.0, model)])
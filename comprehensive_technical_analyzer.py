@@ -9,6 +9,8 @@ import numpy as np
 import logging
 from typing import List, Dict, Any
 from bist_data_fetcher import BISTDataFetcher
+from event_windows import EventWindows, pre_ceiling_features
+from profile_aggregation import group_stats
 
 # Simplified technical analysis without external dependencies
 def simple_sma(data, period):
@@ -66,7 +68,8 @@ class ComprehensiveTechnicalAnalyzer:
             close = data['Close'].values
             volume = data['Volume'].values
             
-            indicators = pd.DataFrame(index=data.index)
+            # Seriler konum indeksli; tarih indeksi en sonda verilir (hizalama NaN üretmesin)
+            indicators = pd.DataFrame(index=pd.RangeIndex(len(data)))
             
             # 1. TREND İNDİKATÖRLERİ
             # Moving Averages
@@ -165,6 +168,7 @@ class ComprehensiveTechnicalAnalyzer:
             # SAR (simplified - basic trend indicator)
             indicators['SAR_Signal'] = np.where(close_series > indicators['SMA_20'], 1, -1)
             
+            indicators.index = data.index
             return indicators
             
         except Exception as e:
@@ -178,59 +182,38 @@ class ComprehensiveTechnicalAnalyzer:
         # Tüm BİST hisselerinin verilerini çek
         all_data = self.data_fetcher.get_all_bist_data(period=f"{days_back + 10}d")
         
-        pre_ceiling_indicators = []
-        
+        # Teknik göstergeleri sembol başına bir kez hesapla
+        indicator_frames = {}
         for symbol, data in all_data.items():
             if data.empty or len(data) < 30:
                 continue
                 
             try:
-                # Teknik göstergeleri hesapla
                 indicators = self.calculate_all_indicators(data)
-                if indicators.empty:
-                    continue
-                
-                # Tavan günlerini bul
-                for i in range(25, len(data)):  # En az 25 gün geçmiş veri
-                    current_price = data['Close'].iloc[i]
-                    previous_price = data['Close'].iloc[i-1]
-                    
-                    if previous_price == 0:
-                        continue
-                        
-                    daily_change = ((current_price - previous_price) / previous_price) * 100
-                    
-                    # Tavan günü mü? (%9+ artış)
-                    if daily_change >= 9.0:
-                        # Tavan öncesi 1-3 gün arası analiz et
-                        for days_before in range(1, 4):
-                            pre_index = i - days_before
-                            
-                            if pre_index < 0 or pre_index >= len(indicators):
-                                continue
-                                
-                            # Tüm göstergeleri topla
-                            indicator_data = {
-                                'symbol': symbol.replace('.IS', ''),
-                                'days_before_ceiling': days_before,
-                                'ceiling_date': data.index[i],
-                                'ceiling_change': daily_change,
-                                'pre_date': data.index[pre_index]
-                            }
-                            
-                            # Her göstergeyi ekle
-                            for col in indicators.columns:
-                                value = indicators[col].iloc[pre_index]
-                                if pd.notna(value) and np.isfinite(value):
-                                    indicator_data[col] = value
-                                    
-                            # Sadece yeterli veri varsa ekle
-                            if len(indicator_data) > 10:  # En az 10 gösterge
-                                pre_ceiling_indicators.append(indicator_data)
-                            
+                if not indicators.empty:
+                    indicator_frames[symbol] = indicators
             except Exception as e:
                 logger.debug(f"{symbol} teknik gösterge analiz hatası: {e}")
                 continue
+        
+        # Tavan günleri (%9+ artış, en az 25 gün geçmiş) ve 1-3 gün öncesinin
+        # göstergeleri olay penceresi çıkarıcısıyla tek geçişte
+        pre_ceiling_indicators = []
+        if indicator_frames:
+            prices = pre_ceiling_features(EventWindows.from_frames({s: all_data[s] for s in indicator_frames}))
+            events = prices.events(min_row=25)
+            ceiling_change = prices.column('daily_change')[events]
+            frame = EventWindows.from_frames(indicator_frames).to_frame(events, lags=(1, 2, 3),
+                                                                       ceiling_change=ceiling_change)
+            base = ['symbol', 'days_before_ceiling', 'ceiling_date', 'ceiling_change', 'pre_date']
+            values = frame.drop(columns=base)
+            finite = np.isfinite(values.to_numpy())
+            for position, row in enumerate(frame[base].to_dict('records')):
+                row.update({col: value for col, value, ok in zip(values.columns, values.iloc[position], finite[position])
+                            if ok})
+                # Sadece yeterli veri varsa ekle (en az 10 gösterge)
+                if len(row) > 10:
+                    pre_ceiling_indicators.append(row)
                 
         logger.info(f"Toplam {len(pre_ceiling_indicators)} tavan öncesi teknik veri noktası bulundu")
         return pre_ceiling_indicators
@@ -241,46 +224,39 @@ class ComprehensiveTechnicalAnalyzer:
             return {}
             
         # Tüm gösterge isimlerini topla
-        all_indicators = set()
-        for data_point in pre_ceiling_data:
-            all_indicators.update([k for k in data_point.keys() 
-                                 if k not in ['symbol', 'days_before_ceiling', 'ceiling_date', 'ceiling_change', 'pre_date']])
+        frame = pd.DataFrame(pre_ceiling_data)
+        all_indicators = sorted(c for c in frame.columns
+                                if c not in ['symbol', 'days_before_ceiling', 'ceiling_date', 'ceiling_change', 'pre_date'])
+        
+        # Gün bazında kolonlu istatistikler (aşırı değerler filtrelenir, en az 10 veri noktası)
+        stats = group_stats(frame, 'days_before_ceiling', all_indicators, min_count=10, limit=1e10)
         
         analysis = {}
         
-        # Gün bazında grupla
         for days_before in range(1, 4):
-            day_data = [d for d in pre_ceiling_data if d['days_before_ceiling'] == days_before]
+            day_count = int((frame['days_before_ceiling'] == days_before).sum())
             
-            if not day_data:
+            if not day_count:
                 continue
                 
             day_analysis = {
-                'total_signals': len(day_data),
+                'total_signals': day_count,
                 'indicator_averages': {},
                 'indicator_medians': {},
                 'indicator_ranges': {},
                 'significant_patterns': []
             }
             
-            # Her gösterge için istatistikleri hesapla
-            for indicator in sorted(all_indicators):
-                values = []
-                for data_point in day_data:
-                    if indicator in data_point and pd.notna(data_point[indicator]):
-                        val = data_point[indicator]
-                        if np.isfinite(val) and abs(val) < 1e10:  # Aşırı değerleri filtrele
-                            values.append(val)
-                
-                if len(values) >= 10:  # En az 10 veri noktası
-                    day_analysis['indicator_averages'][indicator] = np.mean(values)
-                    day_analysis['indicator_medians'][indicator] = np.median(values)
-                    day_analysis['indicator_ranges'][indicator] = {
-                        'min': np.min(values),
-                        'max': np.max(values),
-                        'std': np.std(values),
-                        'count': len(values)
-                    }
+            day_stats = stats.xs(days_before, level=0) if days_before in stats.index.get_level_values(0) else stats.iloc[:0]
+            for indicator, row in day_stats.reindex([i for i in all_indicators if i in day_stats.index]).iterrows():
+                day_analysis['indicator_averages'][indicator] = row['mean']
+                day_analysis['indicator_medians'][indicator] = row['median']
+                day_analysis['indicator_ranges'][indicator] = {
+                    'min': row['min'],
+                    'max': row['max'],
+                    'std': row['std'],
+                    'count': int(row['count'])
+                }
             
             analysis[f'{days_before}_days_before'] = day_analysis
         
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Artımlı Kayan Korelasyon Motoru
+Tüm evrenin günlük getirileri arasındaki kayan pencere (varsayılan 20 gün)
+korelasyon matrisini tutar. Her yeni barda N x N matris baştan hesaplanmaz;
+pencereye giren ve pencereden çıkan getiri satırlarının dış çarpımları
+birikimli toplamlara eklenir / çıkarılır:
+
+    C[i, j] = Σ x_i x_j          (ortak geçerli günler)
+    P[i, j] = Σ x_i  m_j         (j'nin de geçerli olduğu günlerde x_i toplamı)
+    Q[i, j] = Σ x_i² m_j
+    M[i, j] = Σ m_i  m_j         (ortak geçerli gün sayısı)
+
+Eksik günler (işlem görmeyen, yeni listelenen semboller) çift bazında
+dışarıda kalır. Aynı günün barı gün içinde güncellenirse satır yerinde
+değiştirilir. Kayan nokta birikimini sınırlamak için belirli aralıklarla
+toplamlar halka tampondan yeniden kurulur.
+
+Sorgular:
+    engine.neighbours('GRNYO')             # bu hafta GRNYO ile birlikte hareket edenler
+    engine.clusters(threshold=0.6)         # birlikte hareket eden gruplar
+    engine.group_correlation([...])        # elle seçilmiş grubun ortalama korelasyonu
+"""
+
+import time
+import logging
+import threading
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from price_panel import PricePanel
+from price_store import normalize_symbol
+from tracing import observe
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW = 20
+# Bu kadar güncellemede bir toplamlar halka tampondan yeniden kurulur
+REBUILD_EVERY = 250
+
+
+class CorrelationEngine:
+    def __init__(self, symbols: Iterable[str], window: int = DEFAULT_WINDOW, min_periods: int = 10,
+                 rebuild_every: int = REBUILD_EVERY):
+        """
+        symbols: Takip edilecek evren (sıra korunur, tekrarlar atılır)
+        window: Korelasyon penceresi (işlem günü)
+        min_periods: Bir çiftin korelasyonu için gereken en az ortak gün
+        """
+        self.symbols = list(dict.fromkeys(normalize_symbol(s) for s in symbols))
+        self._index = {s: i for i, s in enumerate(self.symbols)}
+        self.window = window
+        self.min_periods = min_periods
+        self.rebuild_every = rebuild_every
+
+        n = len(self.symbols)
+        # Halka tampon: satır = gün, eksik getiriler 0 ve maske 0
+        self._returns = np.zeros((window, n))
+        self._mask = np.zeros((window, n))
+        self._dates: List[Optional[date]] = [None] * window
+        self._head = -1
+        self.last_date: Optional[date] = None
+        self._clear_sums()
+        self._updates_since_rebuild = 0
+        self._lock = threading.Lock()
+
+    def _clear_sums(self):
+        n = len(self.symbols)
+        self._c = np.zeros((n, n))
+        self._p = np.zeros((n, n))
+        self._q = np.zeros((n, n))
+        self._m = np.zeros((n, n))
+
+    def _rebuild(self):
+        """Birikimli toplamları halka tampondan yeniden kur"""
+        x, m = self._returns, self._mask
+        self._c = x.T @ x
+        self._p = x.T @ m
+        self._q = (x * x).T @ m
+        self._m = m.T @ m
+        self._updates_since_rebuild = 0
+
+    def _replace_row(self, slot: int, x: np.ndarray, m: np.ndarray):
+        """Halka tampondaki satırı değiştir: eski satırın katkısı çıkar, yenisi eklenir (tek rank-2 güncelleme)"""
+        rows = np.vstack([x, self._returns[slot]])
+        masks = np.vstack([m, self._mask[slot]])
+        signs = np.array([[1.0], [-1.0]])
+        self._c += (signs * rows).T @ rows
+        self._p += (signs * rows).T @ masks
+        self._q += (signs * rows * rows).T @ masks
+        self._m += (signs * masks).T @ masks
+        self._returns[slot] = x
+        self._mask[slot] = m
+
+    # --- Besleme ---
+
+    def seed(self, frames: Dict[str, pd.DataFrame]) -> int:
+        """Pencereyi {sembol: OHLCV} tablolarının son günlerinden tek seferde doldur"""
+        panel = PricePanel.from_frames({s: f for s, f in frames.items() if normalize_symbol(s) in self._index},
+                                       dtype=np.float64)
+        with self._lock:
+            self._returns[:] = 0
+            self._mask[:] = 0
+            self._dates = [None] * self.window
+            self._head = -1
+            self.last_date = None
+            if len(panel) and panel.values.shape[1] >= 2:
+                close = panel.column('Close')
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    returns = close[:, 1:] / close[:, :-1] - 1
+                returns = returns[:, -self.window:]
+                days = returns.shape[1]
+                columns = [self._index[s] for s in panel.symbols]
+                valid = np.isfinite(returns)
+                self._returns[:days, columns] = np.where(valid, returns, 0).T
+                self._mask[:days, columns] = valid.T
+                self._head = days - 1
+                axis = pd.to_datetime(panel.dates[-days:], utc=True)
+                if panel.tz:
+                    axis = axis.tz_convert(panel.tz)
+                self._dates[:days] = [d.date() for d in axis]
+                self.last_date = self._dates[self._head]
+            self._rebuild()
+        logger.info(f"Korelasyon motoru: {len(panel)} sembol, {max(self._head + 1, 0)} gün yüklendi")
+        return len(panel)
+
+    def push(self, day: date, returns: Dict[str, float]) -> float:
+        """
+        Bir günün getirilerini işle (sürenin ms cinsinden değerini döndürür)
+
+        Yeni gün pencerenin en eski satırını çıkarır; son günle aynı tarih
+        gün içi güncelleme sayılır ve son satırın yerine geçer. Daha eski
+        tarihler yok sayılır. Getirisi verilmeyen semboller o gün eksik sayılır.
+        """
+        started = time.perf_counter()
+        x = np.zeros(len(self.symbols))
+        m = np.zeros(len(self.symbols))
+        for symbol, value in returns.items():
+            i = self._index.get(normalize_symbol(symbol))
+            if i is not None and value is not None and np.isfinite(value):
+                x[i] = value
+                m[i] = 1.0
+
+        with self._lock:
+            if self.last_date is not None and day < self.last_date:
+                return 0.0
+            if self.last_date is None or day > self.last_date:
+                self._head = (self._head + 1) % self.window
+                self.last_date = day
+            self._dates[self._head] = day
+            self._replace_row(self._head, x, m)
+            self._updates_since_rebuild += 1
+            if self._updates_since_rebuild >= self.rebuild_every:
+                self._rebuild()
+
+        elapsed = time.perf_counter() - started
+        observe('correlation_update_seconds', elapsed)
+        return elapsed * 1000
+
+    def update(self, price_store=None, frames: Optional[Dict[str, pd.DataFrame]] = None) -> float:
+        """
+        Fiyat deposundaki (ağ erişimi olmadan) veya verilen tablolardaki son
+        barı işle; son barı en güncel tarihte olmayan veya önceki günü eksik
+        olan semboller o gün eksik sayılır (çok günlük getiri karışmaz)
+        """
+        if frames is None:
+            frames = {s: price_store.peek(s) for s in self.symbols}
+        bars = {}
+        for symbol, frame in frames.items():
+            if frame is None or len(frame) < 2:
+                continue
+            bars[symbol] = (frame.index[-1].date(), frame.index[-2].date(),
+                            frame['Close'].iat[-1], frame['Close'].iat[-2])
+        if not bars:
+            return 0.0
+        day = max(bar[0] for bar in bars.values())
+        with self._lock:
+            if self.last_date is None or day > self.last_date:
+                previous_day = self.last_date
+            else:
+                previous_day = self._dates[(self._head - 1) % self.window]
+        returns = {s: current / previous - 1 for s, (last, before, current, previous) in bars.items()
+                   if last == day and previous and (previous_day is None or before == previous_day)}
+        return self.push(day, returns)
+
+    # --- Sorgular ---
+
+    def _correlation(self, rows: np.ndarray) -> np.ndarray:
+        """Verilen satırların tüm evrenle çift bazlı korelasyonu (satır, N)"""
+        n = self._m[rows]
+        sx, sy = self._p[rows], self._p[:, rows].T
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = self._c[rows] - sx * sy / n
+            var_x = self._q[rows] - sx * sx / n
+            var_y = self._q[:, rows].T - sy * sy / n
+            corr = cov / np.sqrt(var_x * var_y)
+        corr[(n < self.min_periods) | ~(var_x > 1e-12) | ~(var_y > 1e-12)] = np.nan
+        return np.clip(corr, -1.0, 1.0)
+
+    def matrix(self, symbols: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """Korelasyon matrisi (varsayılan: tüm evren)"""
+        keys = self._keys(symbols)
+        rows = np.array([self._index[s] for s in keys], dtype=np.int64)
+        with self._lock:
+            corr = self._correlation(rows)[:, rows]
+        return pd.DataFrame(corr, index=keys, columns=keys)
+
+    def neighbours(self, symbol: str, k: int = 10, min_corr: float = 0.5) -> List[Tuple[str, float]]:
+        """Sembolle birlikte hareket eden en yüksek korelasyonlu k sembol"""
+        i = self._index.get(normalize_symbol(symbol))
+        if i is None:
+            return []
+        with self._lock:
+            row = self._correlation(np.array([i]))[0]
+        row[i] = np.nan
+        order = np.argsort(-np.nan_to_num(row, nan=-np.inf), kind='stable')[:k]
+        return [(self.symbols[j], float(row[j])) for j in order if row[j] >= min_corr]
+
+    def clusters(self, threshold: float = 0.6, min_size: int = 3,
+                 symbols: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Birlikte hareket eden gruplar (büyükten küçüğe)
+
+        En çok komşusu olan sembolden başlayarak grup kurulur; bir aday ancak
+        grubun en az yarısıyla korelasyonu eşiği geçiyorsa gruba katılır
+        (rastgele yüksek çiftler üzerinden zincirlenme olmaz). symbols
+        verilirse sadece o semboller arasında aranır (örn. günün hareketlileri).
+        """
+        keys = self._keys(symbols)
+        rows = np.array([self._index[s] for s in keys], dtype=np.int64)
+        with self._lock:
+            corr = self._correlation(rows)[:, rows]
+        adjacency = corr >= threshold
+        np.fill_diagonal(adjacency, False)
+        degree = adjacency.sum(axis=1)
+
+        assigned = np.zeros(len(keys), dtype=bool)
+        groups = []
+        for seed in np.argsort(-degree, kind='stable'):
+            if degree[seed] < min_size - 1:
+                break
+            if assigned[seed]:
+                continue
+            members = [seed]
+            candidates = np.flatnonzero(adjacency[seed] & ~assigned)
+            for candidate in candidates[np.argsort(-corr[seed, candidates], kind='stable')]:
+                if adjacency[candidate, members].mean() >= 0.5:
+                    members.append(candidate)
+            if len(members) < min_size:
+                continue
+            assigned[members] = True
+            block = corr[np.ix_(members, members)]
+            groups.append({'members': [keys[j] for j in members],
+                           'mean_corr': float(np.nanmean(block[~np.eye(len(members), dtype=bool)]))})
+        return sorted(groups, key=lambda g: (-len(g['members']), -g['mean_corr']))
+
+    def group_correlation(self, symbols: Iterable[str]) -> Optional[float]:
+        """Grubun çift bazlı ortalama korelasyonu (hesaplanamıyorsa None)"""
+        keys = self._keys(symbols)
+        if len(keys) < 2:
+            return None
+        corr = self.matrix(keys).to_numpy()
+        off_diagonal = corr[~np.eye(len(keys), dtype=bool)]
+        if np.isnan(off_diagonal).all():
+            return None
+        return float(np.nanmean(off_diagonal))
+
+    def _keys(self, symbols: Optional[Iterable[str]]) -> List[str]:
+        if symbols is None:
+            return list(self.symbols)
+        return [s for s in dict.fromkeys(normalize_symbol(s) for s in symbols) if s in self._index]
+
+
+if __name__ == "__main__":
+    import sys
+    from price_store import PriceStore
+    from symbol_universe import get_universe
+
+    logging.basicConfig(level=logging.INFO)
+    universe = get_universe().symbols('extended')
+    store = PriceStore(warmup_period="3mo")
+    store.warm_up(universe)
+    engine = CorrelationEngine(universe)
+    engine.seed({s: store.peek(s) for s in universe if s in store})
+
+    print(f"🔗 KORELASYON MOTORU ({engine.window} gün, son gün {engine.last_date})")
+    for symbol in sys.argv[1:]:
+        print(f"\n{symbol} ile birlikte hareket edenler:")
+        for neighbour, corr in engine.neighbours(symbol):
+            print(f"   {neighbour:8s} {corr:+.2f}")
+    print("\nBirlikte hareket eden gruplar:")
+    for group in engine.clusters()[:10]:
+        print(f"   ({group['mean_corr']:+.2f}) {', '.join(group['members'])}")
@@ -38,4 +38,10 @@ def main():
         time.sleep(60)  # Her dakika kontrol et
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == "daemon":
+        # Bileşenleri bellekte tutan sürekli servis modu
+        from analysis_daemon import AnalysisDaemon
+        AnalysisDaemon().run_forever()
+    else:
+        main()
\ No newline at end of file
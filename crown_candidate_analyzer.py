@@ -9,6 +9,7 @@ import numpy as np
 import logging
 from typing import List, Dict, Any
 from bist_data_fetcher import BISTDataFetcher
+from data_plan import DataRequest
 from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
@@ -362,12 +363,21 @@ class CrownCandidateAnalyzer:
         else:
             return "ZAYIF POTANSIYEL"
     
-    def analyze_crown_candidates(self, candidate_stocks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Tavan kralı adaylarını analiz et"""
+    def data_request(self, candidate_stocks: List[Dict[str, Any]]) -> DataRequest:
+        """Sadece analiz edilecek adaylar için 90 günlük veri ihtiyacı"""
+        symbols = [stock['symbol'] for stock in candidate_stocks
+                   if stock['symbol'] not in self.known_crown_stocks]
+        return DataRequest(symbols, period="90d", requester="crown_candidates")
+    
+    def analyze_crown_candidates(self, candidate_stocks: List[Dict[str, Any]],
+                                 all_data: Dict[str, pd.DataFrame] = None) -> List[Dict[str, Any]]:
+        """Tavan kralı adaylarını analiz et (all_data: birleşik plandan gelen hazır veri)"""
         logger.info("Tavan kralı adayları analiz ediliyor...")
         
-        # 90 günlük veri al (daha uzun geçmiş için)
-        all_data = self.data_fetcher.get_all_bist_data(period="90d")
+        # 90 günlük veri sadece adaylar için alınır
+        if all_data is None:
+            request = self.data_request(candidate_stocks)
+            all_data = self.data_fetcher.fetch_requests([request])[request.requester]
         
         crown_candidates = []
         
@@ -6,12 +6,15 @@ Sürekli tavan yapan hisselerin önceki sinyallerini analiz eder.
 
 import pandas as pd
 import numpy as np
-import yfinance as yf
 from datetime import datetime, timedelta
 import logging
 from typing import List, Dict, Any
 from bist_data_fetcher import BISTDataFetcher
 from technical_analyzer import TechnicalAnalyzer
+from lazy_imports import lazy_import
+
+# Ağır bağımlılıklar ilk kullanımda yüklenir
+yf = lazy_import('yfinance')
 
 logger = logging.getLogger(__name__)
 
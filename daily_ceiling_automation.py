@@ -13,8 +13,9 @@ from datetime import datetime
 from hybrid_ceiling_scanner import HybridCeilingScanner
 
 class DailyCeilingAutomation:
-    def __init__(self):
-        self.scanner = HybridCeilingScanner()
+    def __init__(self, scanner: HybridCeilingScanner = None):
+        # Daemon modunda sıcak (önbellekli) tarayıcı dışarıdan verilir
+        self.scanner = scanner or HybridCeilingScanner()
         
     def morning_scan_job(self):
         """
@@ -55,19 +56,10 @@ class DailyCeilingAutomation:
         try:
             print(f"\n📊 AKŞAM DEĞERLENDİRME: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
             
-            # Bugünün tarama sonuçlarını oku (en son rapor)
-            import glob
-            import json
+            # Bugünün tarama sonuçlarını oku (en son tarama)
+            report_data = self.scanner.history_store.latest_scan('hybrid', day=datetime.now().date())
             
-            today = datetime.now().strftime("%Y%m%d")
-            report_files = glob.glob(f"ceiling_scan_report_{today}_*.json")
-            
-            if report_files:
-                latest_report = max(report_files)
-                
-                with open(latest_report, 'r', encoding='utf-8') as f:
-                    report_data = json.load(f)
-                
+            if report_data:
                 candidates = report_data['results']
                 high_risk = [r for r in candidates if r['risk_level'] == 'YÜKSEK']
                 
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Veri İhtiyacı Planlama Modülü
+Analizörler hangi sembollere ve ne kadar geçmişe ihtiyaç duyduklarını
+DataRequest ile bildirir. DataPlanner bu istekleri birleştirip her sembolü
+bir kez, istenen en uzun dönemle indiren asgari bir plan çıkarır.
+
+Örnek:
+    planner = DataPlanner()
+    planner.add(DataRequest(['PINSU', 'GRNYO'], '30d', 'next_week_kings'))
+    planner.add(DataRequest(['GRNYO', 'KAPLM'], '90d', 'crown_candidates'))
+    planner.plan()
+    # [{'period': '90d', 'symbols': ['GRNYO.IS', 'KAPLM.IS']},
+    #  {'period': '30d', 'symbols': ['PINSU.IS']}]
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional
+
+from price_store import period_to_rows_or_days
+
+logger = logging.getLogger(__name__)
+
+# 'Nd' dönemleri işlem günü sayısıdır; takvim gününe kaba çevrim katsayısı
+TRADING_TO_CALENDAR = 1.5
+
+
+def period_in_calendar_days(period: str) -> float:
+    """Dönemleri karşılaştırmak için yaklaşık takvim günü karşılığı"""
+    kind, amount = period_to_rows_or_days(period)
+    return amount * TRADING_TO_CALENDAR if kind == 'rows' else float(amount)
+
+
+def with_suffix(symbol: str) -> str:
+    """'THYAO' -> 'THYAO.IS' (ek zaten varsa dokunma)"""
+    symbol = symbol.strip().upper()
+    return symbol if symbol.endswith('.IS') else f"{symbol}.IS"
+
+
+class DataRequest:
+    def __init__(self, symbols: Iterable[str], period: str = "1mo", requester: str = ""):
+        """
+        Bir analizörün veri ihtiyacı
+
+        symbols: İhtiyaç duyulan semboller (.IS ekli veya eksiz)
+        period: Gereken geçmiş (yfinance period biçimi: '30d', '3mo', '1y')
+        requester: İsteği yapan analizörün adı (sonuçlar bu adla döner)
+        """
+        self.symbols = list(dict.fromkeys(with_suffix(s) for s in symbols))
+        self.period = period
+        self.requester = requester
+
+    def __repr__(self) -> str:
+        return f"DataRequest({self.requester!r}, {len(self.symbols)} sembol, {self.period})"
+
+
+class DataPlanner:
+    def __init__(self, requests: Optional[List[DataRequest]] = None):
+        """Veri isteklerini toplayan planlayıcı"""
+        self.requests: List[DataRequest] = list(requests or [])
+
+    def add(self, request: DataRequest) -> "DataPlanner":
+        self.requests.append(request)
+        return self
+
+    def symbol_periods(self) -> Dict[str, str]:
+        """Her sembol için istenen en uzun dönem"""
+        periods: Dict[str, str] = {}
+        for request in self.requests:
+            for symbol in request.symbols:
+                current = periods.get(symbol)
+                if current is None or period_in_calendar_days(request.period) > period_in_calendar_days(current):
+                    periods[symbol] = request.period
+        return periods
+
+    def plan(self) -> List[Dict[str, object]]:
+        """Aynı dönemle indirilecek sembolleri grupla (uzun dönem önce)"""
+        groups: Dict[str, List[str]] = {}
+        for symbol, period in self.symbol_periods().items():
+            groups.setdefault(period, []).append(symbol)
+        plan = [{'period': period, 'symbols': symbols} for period, symbols in groups.items()]
+        plan.sort(key=lambda step: period_in_calendar_days(step['period']), reverse=True)
+
+        requested = sum(len(r.symbols) for r in self.requests)
+        unique = sum(len(step['symbols']) for step in plan)
+        logger.info(f"Veri planı: {len(self.requests)} istek, {requested} sembol talebi -> {unique} indirme")
+        return plan
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Olay Penceresi Çıkarıcı
+Tavan öncesi çalışmalarının (ağırlıklı profil, tavan öncesi sinyaller,
+kapsamlı / basit teknik profil) ortak işi: her tavan gününden 1-4 gün
+öncesinin göstergelerini toplamak. Gösterge başına ve gecikme başına .iloc
+döngüsü yerine:
+
+1. Sembol tabloları satır hizalı tek bir (sembol, satır, gösterge) dizisine
+   paketlenir. Satır, sembolün kendi tablosundaki sırasıdır; böylece
+   "i - gün" gecikmesi eski döngülerdeki .iloc[i - gün] ile birebir aynıdır.
+2. Kayan ortalamalar kümülatif toplam farklarıyla tüm evren için bir kerede
+   hesaplanır.
+3. Olaylar (sembol, satır) çiftleri olarak bulunur ve (olay, gecikme,
+   gösterge) dizisi tek bir gelişmiş indeksleme işlemiyle çıkarılır.
+
+Kullanım:
+    ohlcv = EventWindows.from_frames(fetcher.get_all_bist_data("65d"))
+    features = pre_ceiling_features(ohlcv)
+    events = features.events(min_row=20)
+    tensor = features.extract(events, lags=(1, 2, 3, 4), min_row=20)   # (olay, 4, gösterge)
+    records = features.to_frame(events, lags=(1, 2, 3, 4), min_row=20)
+"""
+
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from price_store import normalize_symbol
+
+logger = logging.getLogger(__name__)
+
+CEILING_CHANGE = 9.0
+PRE_CEILING_FEATURES = ('close', 'volume', 'daily_change', 'volume_ratio', 'momentum_5d', 'rsi',
+                        'price_momentum', 'volume_momentum')
+
+Events = Tuple[np.ndarray, np.ndarray]
+
+
+def rolling_sum(values: np.ndarray, window: int, exclusive: bool = False) -> np.ndarray:
+    """
+    Satır ekseninde (axis=1) kayan toplam, kümülatif toplam farkıyla
+
+    exclusive=True: satırın kendisi hariç önceki 'window' satır
+    Pencere dolmayan satırlar NaN'dır.
+    """
+    rows = values.shape[1]
+    cumsum = np.zeros((values.shape[0], rows + 1) + values.shape[2:])
+    np.cumsum(values, axis=1, out=cumsum[:, 1:])
+    out = np.full(values.shape, np.nan)
+    end = rows if exclusive else rows + 1
+    offset = 1 if exclusive else 0
+    # Satır r için toplam: cumsum[r + 1 - offset] - cumsum[r + 1 - offset - window]
+    start_row = window - 1 + offset
+    if start_row < rows:
+        out[:, start_row:] = cumsum[:, window:end] - cumsum[:, :end - window]
+    return out
+
+
+class EventWindows:
+    def __init__(self, values: np.ndarray, features: Sequence[str], symbols: List[str],
+                 indexes: List[pd.Index], lengths: np.ndarray):
+        """
+        values: (sembol, satır, gösterge) dizi; sembolün tablosu bittikten sonraki satırlar NaN
+        indexes: Her sembolün tarih indeksi (satır -> tarih)
+        lengths: Her sembolün satır sayısı
+        """
+        self.values = values
+        self.features = list(features)
+        self.symbols = list(symbols)
+        self.indexes = indexes
+        self.lengths = lengths
+        self._feature_index = {f: i for i, f in enumerate(self.features)}
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame], columns: Optional[Sequence[str]] = None,
+                    min_rows: int = 1) -> 'EventWindows':
+        """
+        {sembol: tablo} sözlüğünden satır hizalı dizi oluştur
+
+        Tablolar OHLCV veya aynı indeksli gösterge tabloları olabilir;
+        columns verilmezse ilk tablonun kolonları kullanılır.
+        """
+        frames = {normalize_symbol(s): f for s, f in frames.items() if f is not None and len(f) >= min_rows}
+        if columns is None:
+            columns = list(next(iter(frames.values())).columns) if frames else []
+        lengths = np.array([len(f) for f in frames.values()], dtype=np.int64)
+        values = np.full((len(frames), int(lengths.max()) if len(lengths) else 0, len(columns)), np.nan)
+        for i, frame in enumerate(frames.values()):
+            values[i, :len(frame)] = frame.reindex(columns=list(columns)).to_numpy(dtype=np.float64)
+        return cls(values, columns, list(frames.keys()), [f.index for f in frames.values()], lengths)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def column(self, name: str) -> np.ndarray:
+        """Tek göstergenin (sembol, satır) görünümü"""
+        return self.values[:, :, self._feature_index[name]]
+
+    def with_features(self, columns: Dict[str, np.ndarray]) -> 'EventWindows':
+        """Aynı satır hizasında, verilen (sembol, satır) dizilerinden yeni gösterge seti"""
+        values = np.stack([np.asarray(v, dtype=np.float64) for v in columns.values()], axis=2)
+        return EventWindows(values, list(columns), self.symbols, self.indexes, self.lengths)
+
+    # --- Olaylar ---
+
+    def events(self, feature: str = 'daily_change', threshold: float = CEILING_CHANGE,
+               min_row: int = 0) -> Events:
+        """Göstergenin eşiği geçtiği (sembol, satır) çiftleri (sembol ve satır sırasında)"""
+        values = self.column(feature)
+        rows = np.arange(values.shape[1])
+        with np.errstate(invalid='ignore'):
+            mask = (values >= threshold) & (rows >= min_row)
+        return np.nonzero(mask)
+
+    def extract(self, events: Events, lags: Sequence[int] = (1, 2, 3, 4), min_row: int = 0,
+                features: Optional[Sequence[str]] = None) -> np.ndarray:
+        """
+        (olay, gecikme, gösterge) dizisi; tek gelişmiş indeksleme işlemi
+
+        Gecikmeli satır min_row'dan küçükse (yetersiz geçmiş) değerler NaN'dır.
+        """
+        symbols, rows = events
+        lagged = rows[:, None] - np.asarray(lags)[None, :]
+        columns = [self._feature_index[f] for f in features] if features else slice(None)
+        out = self.values[symbols[:, None], np.clip(lagged, 0, None)][:, :, columns]
+        out[lagged < min_row] = np.nan
+        return out
+
+    def to_frame(self, events: Events, lags: Sequence[int] = (1, 2, 3, 4), min_row: int = 0,
+                 ceiling_change: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """
+        Olay pencerelerinin uzun tablosu: her (olay, gecikme) bir satır
+
+        Kolonlar: symbol, days_before_ceiling, ceiling_date, ceiling_change,
+        pre_date ve tüm göstergeler. Yetersiz geçmişli satırlar atılır.
+        ceiling_change verilmezse olay satırının daily_change göstergesi kullanılır.
+        """
+        symbols, rows = events
+        lags = np.asarray(lags)
+        tensor = self.extract(events, lags, min_row)
+        n_events, n_lags = len(rows), len(lags)
+        event_ids = np.repeat(np.arange(n_events), n_lags)
+        lag_values = np.tile(lags, n_events)
+        pre_rows = rows[event_ids] - lag_values
+        keep = pre_rows >= max(min_row, 0)
+
+        frame = pd.DataFrame(tensor.reshape(n_events * n_lags, -1), columns=self.features)
+        frame.insert(0, 'symbol', np.asarray(self.symbols, dtype=object)[symbols][event_ids])
+        frame.insert(1, 'days_before_ceiling', lag_values)
+        frame.insert(2, 'ceiling_date', [self.indexes[s][r] for s, r in zip(symbols[event_ids], rows[event_ids])])
+        if ceiling_change is None:
+            ceiling_change = (self.column('daily_change')[symbols, rows] if 'daily_change' in self._feature_index
+                              else np.full(n_events, np.nan))
+        frame.insert(3, 'ceiling_change', np.asarray(ceiling_change)[event_ids])
+        frame.insert(4, 'pre_date', [self.indexes[s][max(r, 0)] for s, r in zip(symbols[event_ids], pre_rows)])
+        return frame[keep].reset_index(drop=True)
+
+
+def pre_ceiling_features(ohlcv: EventWindows) -> EventWindows:
+    """
+    Tavan öncesi çalışmalarının ortak göstergeleri (eski döngülerle aynı tanımlar):
+
+    daily_change     (C[r] / C[r-1] - 1) x 100; önceki kapanış 0 ise 0
+    volume_ratio     V[r] / önceki 20 satırın ortalaması; ortalama 0 veya geçmiş yetersizse 1
+    momentum_5d      Önceki 5 satırın günlük değişimlerinin ortalaması
+    rsi              Son 14 fark üzerinden basit ortalamalı RSI; kayıp yoksa 100
+    price_momentum   C[r] / önceki 3 kapanışın ortalaması - 1 (x100)
+    volume_momentum  V[r] / V[r-1]; önceki hacim 0 ise 1
+    """
+    close = ohlcv.column('Close')
+    volume = ohlcv.column('Volume')
+    previous_close = np.concatenate([np.full((len(ohlcv), 1), np.nan), close[:, :-1]], axis=1)
+    previous_volume = np.concatenate([np.full((len(ohlcv), 1), np.nan), volume[:, :-1]], axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change = (close - previous_close) / previous_close * 100
+        daily_change = np.where(previous_close > 0, change, 0.0)
+
+        average_volume_20 = rolling_sum(np.nan_to_num(volume), 20, exclusive=True) / 20
+        volume_ratio = np.where(average_volume_20 > 0, volume / average_volume_20, 1.0)
+
+        # İlk satırın değişimi yoktur; momentum sadece tam 5 günlük pencerede tanımlıdır
+        momentum_5d = rolling_sum(np.nan_to_num(change, nan=0.0), 5, exclusive=True) / 5
+        momentum_5d[:, :6] = np.nan
+
+        delta = close - previous_close
+        gains = rolling_sum(np.nan_to_num(np.clip(delta, 0, None)), 14) / 14
+        losses = rolling_sum(np.nan_to_num(np.clip(-delta, 0, None)), 14) / 14
+        rsi = np.where(losses == 0, 100.0, 100 - 100 / (1 + gains / losses))
+        rsi[:, :14] = np.nan
+
+        average_price_3 = rolling_sum(close, 3, exclusive=True) / 3
+        price_momentum = np.where(average_price_3 > 0, (close - average_price_3) / average_price_3 * 100, 0.0)
+
+        volume_momentum = np.where(previous_volume > 0, volume / previous_volume, 1.0)
+
+    # Tablonun bittiği satırlar NaN kalır
+    beyond = np.arange(close.shape[1])[None, :] >= ohlcv.lengths[:, None]
+    columns = {
+        'close': close, 'volume': volume, 'daily_change': daily_change, 'volume_ratio': volume_ratio,
+        'momentum_5d': momentum_5d, 'rsi': rsi, 'price_momentum': price_momentum,
+        'volume_momentum': volume_momentum,
+    }
+    for values in columns.values():
+        values[beyond] = np.nan
+    return ohlcv.with_features(columns)
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Özellik Önbelleği Modülü
+Bu modül ham fiyat ve özellik tablolarını (sembol, indirme başlangıcı)
+anahtarıyla diske kaydeder. Sonraki çalıştırmalarda sadece eksik günleri
+indirir; özellikler her zaman istenen pencerenin tamamı üzerinde yeniden
+hesaplanır. Böylece önbellekli çalıştırma aynı pencereyle yapılan soğuk
+çalıştırmayla aynı sonucu verir: tüm seriye bakan göstergeler (kantiller,
+ilk satırdan tohumlanan RSI / MACD / ADX / EMA) pencere dışındaki satırları
+görmez. Semboller işlem havuzunda paralel hazırlanır.
+"""
+
+import os
+import pickle
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# sma_200 gibi uzun pencereli göstergeler için istenen başlangıçtan önce
+# indirilen takvim günü payı (~200 işlem günü)
+WARMUP_DAYS = 320
+
+
+def _to_date(value) -> datetime:
+    """'YYYY-MM-DD' metni veya datetime değerini datetime'a çevir"""
+    if isinstance(value, datetime):
+        return value
+    return datetime.strptime(str(value)[:10], '%Y-%m-%d')
+
+
+def _slice_dates(df: pd.DataFrame, start=None, end=None) -> pd.DataFrame:
+    """[start, end) aralığındaki satırları döndür (tz bilgisinden bağımsız)"""
+    if df is None or df.empty:
+        return df
+    index = df.index
+    mask = pd.Series(True, index=index)
+    if start is not None:
+        mask &= index >= pd.Timestamp(_to_date(start), tz=index.tz)
+    if end is not None:
+        mask &= index < pd.Timestamp(_to_date(end), tz=index.tz)
+    return df[mask.values]
+
+
+class FeatureCache:
+    def __init__(self, cache_dir: str = "feature_cache"):
+        """Özellik önbelleğini başlat (sadece indirmeler önbelleklenir, özellikler tam hesaplanır)"""
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _path(self, symbol: str, fetched_from: str) -> str:
+        return os.path.join(self.cache_dir, f"{symbol.replace('/', '_')}_{fetched_from}.pkl")
+
+    def load(self, symbol: str, fetched_from: str) -> Optional[Dict]:
+        """Sembolün bu başlangıçla indirilmiş önbellek kaydını yükle"""
+        path = self._path(symbol, fetched_from)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            logger.warning(f"{symbol} önbelleği okunamadı, yeniden hesaplanacak: {e}")
+            return None
+
+    def save(self, symbol: str, entry: Dict):
+        """Sembolün önbellek kaydını atomik olarak yaz"""
+        path = self._path(symbol, entry['fetched_from'])
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def get_frame(self, symbol: str, start: str, end: str,
+                  fetch_fn: Callable[[str, str, str], pd.DataFrame],
+                  compute_fn: Callable[[pd.DataFrame], pd.DataFrame]) -> pd.DataFrame:
+        """
+        [start, end) aralığı için özellik tablosunu döndür
+
+        - Bu başlangıç için kayıt yoksa: ısınma payıyla birlikte tamamı indirilir.
+        - Kayıt sadece sonda eksikse: sadece eksik günler indirilir.
+        - Kayıt istenen sondan ileriye uzanıyorsa: ham veri end'de kesilir ve
+          özellikler kaydedilmeden o pencere için hesaplanır (ileriye bakış yok).
+        """
+        fetch_start = (_to_date(start) - timedelta(days=WARMUP_DAYS)).strftime('%Y-%m-%d')
+        entry = self.load(symbol, fetch_start)
+
+        if entry is None:
+            raw = fetch_fn(symbol, fetch_start, end)
+            entry = {
+                'raw': raw,
+                'features': compute_fn(raw.copy()) if not raw.empty else raw,
+                'fetched_from': fetch_start,
+                'fetched_until': end,
+            }
+            self.save(symbol, entry)
+            logger.debug(f"{symbol}: {len(raw)} satır baştan hesaplandı")
+
+        elif _to_date(end) > _to_date(entry['fetched_until']):
+            raw = entry['raw']
+            new_raw = fetch_fn(symbol, entry['fetched_until'], end)
+            if not raw.empty and not new_raw.empty:
+                new_raw = new_raw[new_raw.index > raw.index[-1]]
+
+            if not new_raw.empty:
+                combined = pd.concat([raw, new_raw])
+                entry['raw'] = combined
+                entry['features'] = compute_fn(combined.copy())
+                logger.debug(f"{symbol}: {len(new_raw)} yeni satır indirildi, özellikler yeniden hesaplandı")
+
+            entry['fetched_until'] = end
+            self.save(symbol, entry)
+
+        elif _to_date(end) < _to_date(entry['fetched_until']):
+            raw = _slice_dates(entry['raw'], end=end)
+            features = compute_fn(raw.copy()) if not raw.empty else raw
+            return _slice_dates(features, start, end)
+
+        return _slice_dates(entry['features'], start, end)
+
+
+def _build_one(symbol: str, start: str, end: str, cache_dir: str,
+               fetch_fn, compute_fn) -> pd.DataFrame:
+    """İşlem havuzu içinde tek sembol için özellik tablosu hazırla"""
+    cache = FeatureCache(cache_dir)
+    return cache.get_frame(symbol, start, end, fetch_fn, compute_fn)
+
+
+def build_feature_frames(symbols: List[str], start: str, end: str,
+                         fetch_fn: Callable[[str, str, str], pd.DataFrame],
+                         compute_fn: Callable[[pd.DataFrame], pd.DataFrame],
+                         cache_dir: str = "feature_cache",
+                         max_workers: Optional[int] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Sembollerin özellik tablolarını paralel ve önbellekli olarak hazırla
+
+    fetch_fn ve compute_fn modül seviyesinde tanımlı fonksiyonlar olmalıdır
+    (işlem havuzuna pickle ile gönderilirler). max_workers=1 verilirse havuz
+    kullanılmadan sırayla çalışılır.
+    """
+    frames = {}
+    symbols = list(dict.fromkeys(symbols))
+
+    if max_workers == 1 or len(symbols) <= 1:
+        for sym in symbols:
+            try:
+                frames[sym] = _build_one(sym, start, end, cache_dir, fetch_fn, compute_fn)
+            except Exception as e:
+                logger.error(f"{sym} özellik hazırlama hatası: {e}")
+        return frames
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(_build_one, sym, start, end, cache_dir, fetch_fn, compute_fn): sym
+            for sym in symbols
+        }
+        for future in as_completed(futures):
+            sym = futures[future]
+            try:
+                frames[sym] = future.result()
+            except Exception as e:
+                logger.error(f"{sym} özellik hazırlama hatası: {e}")
+
+    # Sonuçları giriş sırasıyla döndür
+    return {sym: frames[sym] for sym in symbols if sym in frames}
@@ -0,0 +1,474 @@
+#!/usr/bin/env python3
+"""
+Günlük Özellik Deposu
+StockPredictionModel.create_features'ın 16 özelliğini iç içe analiz
+sözlükleri yerine fiyat tablolarından, tüm semboller ve tüm günler için
+vektörel olarak hesaplar ve (sembol, tarih) başına bir satır olarak SQLite'a
+yazar. Ertesi gün tavan etiketi (next_day_ceiling) o günün seansı kapandıkça doldurulur.
+
+Eğitim ve toplu tahmin sözlük kurmadan hazır diziyi okur:
+
+    store = DailyFeatureStore()
+    store.append(fetcher.get_all_bist_data("6mo"))          # günlük çalıştırmadan sonra
+    X, y, dates, symbols = store.training_matrix()            # etiketli satırlar
+    X, symbols, day = store.inference_matrix()                # en son gün
+
+Çok yıllık geçmiş sembol parçalarıyla doldurulur; büyük veri setleri parça
+parça okunarak eğitilir (StockPredictionModel.train_out_of_core):
+
+    python feature_store.py backfill --period 5y
+    python feature_store.py train
+
+Özellik tanımları TechnicalAnalyzer.analyze_stock ile aynıdır (ta kütüphanesinin
+RSI / MACD / Stochastic formülleri); tek fark volatilitenin analiz penceresinin
+tamamı yerine son VOLATILITY_WINDOW getiriden hesaplanmasıdır. Tanımsız
+(ısınma süresi dolmamış) değerler create_features'ın varsayılanlarıyla doldurulur.
+"""
+
+import os
+import time
+import sqlite3
+import logging
+import threading
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from event_windows import EventWindows
+from outcome_tracker import CEILING_THRESHOLD
+from price_store import normalize_symbol
+from scan_journal import SESSION_CLOSE
+
+logger = logging.getLogger(__name__)
+
+# StockPredictionModel.create_features sırası ve eksik değer varsayılanları
+FEATURE_DEFAULTS = {
+    'rsi': 50.0, 'macd': 0.0, 'macd_signal': 0.0, 'price_change_1d': 0.0, 'price_change_5d': 0.0,
+    'volume_ratio_20': 1.0, 'volume_ratio_5': 1.0, 'volume_momentum': 1.0, 'technical_score': 50.0,
+    'ceiling_score': 0.0, 'momentum_score': 0.0, 'pattern_score': 0.0, 'sentiment_score': 0.5,
+    'xu100_change': 0.0, 'volatility': 5.0, 'momentum_continuation': 0.0,
+}
+FEATURE_COLUMNS = tuple(FEATURE_DEFAULTS)
+OHLCV = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+# analyze_stock en az 20 satır ister
+MIN_ROWS = 20
+# Günlük analiz 1 aylık veriyle (~21 getiri) çalışır
+VOLATILITY_WINDOW = 21
+# Günlük eklemede çekilen geçmiş (RSI / MACD üstel ortalamalarının oturması için)
+HISTORY_PERIOD = "6mo"
+# Parçalı eğitimde bir parçadaki satır sayısı (16 özellik x 8 bayt x 250 bin ~ 32 MB)
+TRAINING_CHUNK_ROWS = 250_000
+# Geçmiş doldurmada bir seferde çekilen sembol sayısı
+BACKFILL_CHUNK_SYMBOLS = 50
+# Her eklemede etiketi aranan son satır sayısı (tatil / eksik gün payı)
+LABEL_LOOKBACK = 5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS features (
+    symbol TEXT NOT NULL,
+    date TEXT NOT NULL,
+    {columns},
+    close REAL,
+    next_day_change REAL,
+    next_day_ceiling INTEGER,
+    PRIMARY KEY (symbol, date)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_features_date ON features(date);
+CREATE INDEX IF NOT EXISTS idx_features_label ON features(next_day_ceiling, date);
+""".format(columns=',\n    '.join(f'{c} REAL' for c in FEATURE_COLUMNS))
+
+
+def _date_strings(index: pd.DatetimeIndex) -> np.ndarray:
+    """Tarih indeksini 'YYYY-MM-DD' dizisine çevir (yerel takvim günü; strftime'dan hızlı)"""
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return np.datetime_as_string(index.values.astype('datetime64[D]'))
+
+
+def _series_frame(windows: EventWindows, column: str) -> pd.DataFrame:
+    """(satır, sembol) tablosu; pandas pencere işlemleri her sembolde ayrı çalışır"""
+    return pd.DataFrame(windows.column(column).T)
+
+
+def panel_features(windows: EventWindows) -> Dict[str, np.ndarray]:
+    """
+    create_features kolonlarını (sembol, satır) dizileri olarak hesapla
+
+    Satır r, sembol tablosunun r. satırına kadar olan kısmıyla analyze_stock
+    çalıştırılmış gibidir. sentiment_score ve xu100_change fiyattan
+    türetilmez, varsayılan değerlerle döner.
+    """
+    open_, high, low, close, volume = (_series_frame(windows, c) for c in OHLCV)
+    previous_close = close.shift(1)
+
+    # RSI (Wilder; ta.momentum.RSIIndicator)
+    diff = close.diff(1)
+    up = diff.where(diff > 0, 0.0)
+    down = -diff.where(diff < 0, 0.0)
+    ema_up = up.ewm(alpha=1 / 14, min_periods=14, adjust=False).mean()
+    ema_down = down.ewm(alpha=1 / 14, min_periods=14, adjust=False).mean()
+    rsi = pd.DataFrame(np.where(ema_down == 0, 100, 100 - (100 / (1 + ema_up / ema_down))))
+
+    # MACD (ta.trend.MACD)
+    macd = (close.ewm(span=12, min_periods=12, adjust=False).mean() -
+            close.ewm(span=26, min_periods=26, adjust=False).mean())
+    macd_signal = macd.ewm(span=9, min_periods=9, adjust=False).mean()
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        price_change_1d = (close - previous_close) / previous_close * 100
+        price_change_5d = (close - close.shift(5)) / close.shift(5) * 100
+        momentum_10d = ((close - close.shift(10)) / close.shift(10) * 100).fillna(0)
+        momentum_20d = ((close - close.shift(20)) / close.shift(20) * 100).fillna(0)
+        daily_change = price_change_1d.where(previous_close > 0, 0.0)
+
+        # Hacim
+        average_20 = volume.rolling(20).mean()
+        average_5 = volume.rolling(5).mean()
+        volume_ratio_20 = (volume / average_20).where(average_20 > 0, 1.0)
+        volume_ratio_5 = (volume / average_5).where(average_5 > 0, 1.0)
+        recent_average = (volume.shift(1) + volume.shift(2)) / 2
+        volume_momentum = (volume.shift(1) / recent_average).where(recent_average > 0, 1.0)
+
+        # Stochastic %K
+        lowest_low = low.rolling(14).min()
+        stoch_k = 100 * (close - lowest_low) / (high.rolling(14).max() - lowest_low)
+
+        gap = (open_ - previous_close) / previous_close * 100
+        volatility = close.pct_change().rolling(VOLATILITY_WINDOW).std() * 100
+
+    continuation = (previous_close > close.shift(2)) & (close > previous_close)
+    breakout_up = close > high.rolling(5).max() * 1.02
+    gap_up = gap > 2
+    resistance_break = close > high.rolling(10).max() * 0.99
+
+    # Hacim sinyali (explosive / very_high / high / above_average / normal / low) ve alarmları
+    volume_levels = [volume_ratio_20 > 3.0, volume_ratio_20 > 2.0, volume_ratio_20 > 1.5,
+                     volume_ratio_20 > 1.2, volume_ratio_20 > 0.8]
+    volume_spike = (volume_ratio_20 > 2.0) | (volume_ratio_5 > 1.8)
+    explosive_alert = volume_ratio_20 > 2.5
+    acceleration = volume_momentum > 1.8
+
+    # Teknik skor (_calculate_technical_score); NaN karşılaştırmaları yanlıştır, analiz ile aynı
+    technical_score = pd.DataFrame(40.0, index=close.index, columns=close.columns)
+    technical_score += np.select([rsi > 70, rsi < 30, rsi > 50], [-15, 20, 12], -8)
+    technical_score += np.where(macd > macd_signal, 12, -12)
+    technical_score += np.select(volume_levels, [25, 18, 12, 6, 0], -10)
+    technical_score += 15 * volume_spike + 20 * explosive_alert + 12 * acceleration + 15 * continuation
+    technical_score += np.select([stoch_k > 80, stoch_k < 20], [-12, 12], 0)
+    technical_score += np.select([price_change_5d > 10, price_change_5d > 5], [10, 5], 0)
+    technical_score += np.select([momentum_20d > 20, momentum_20d > 10], [8, 4], 0)
+    technical_score = technical_score.clip(0, 100)
+
+    # Tavan potansiyeli (_calculate_ceiling_potential)
+    ceiling_score = pd.DataFrame(np.select(volume_levels[:3], [40, 30, 20], 0))
+    ceiling_score += 15 * volume_spike + 10 * explosive_alert + 15 * continuation
+    ceiling_score += 10 * (price_change_5d > 5) + 15 * breakout_up + 10 * gap_up + 10 * resistance_break
+    ceiling_score += 10 * (close < 20) + 5 * (volatility > 8)
+    ceiling_score = ceiling_score.clip(upper=100)
+
+    momentum_score = 20 * continuation + 15 * (price_change_5d > 5) + 10 * (momentum_10d > 10) + 10 * (daily_change > 3)
+    pattern_score = 30 * breakout_up + 20 * gap_up + 25 * resistance_break
+
+    columns = {
+        'rsi': rsi, 'macd': macd, 'macd_signal': macd_signal,
+        'price_change_1d': price_change_1d, 'price_change_5d': price_change_5d,
+        'volume_ratio_20': volume_ratio_20, 'volume_ratio_5': volume_ratio_5, 'volume_momentum': volume_momentum,
+        'technical_score': technical_score, 'ceiling_score': ceiling_score,
+        'momentum_score': momentum_score, 'pattern_score': pattern_score,
+        'sentiment_score': None, 'xu100_change': None,
+        'volatility': volatility, 'momentum_continuation': continuation,
+    }
+    shape = windows.values.shape[:2]
+    return {name: (np.full(shape, FEATURE_DEFAULTS[name]) if value is None
+                   else np.asarray(value, dtype=np.float64).T)
+            for name, value in columns.items()}
+
+
+class DailyFeatureStore:
+    def __init__(self, path: str = "daily_features.db"):
+        """Günlük özellik deposu (bağlantı ilk kullanımda açılır)"""
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # --- Yazma ---
+
+    @staticmethod
+    def _windows(frames: Dict[str, pd.DataFrame]) -> Optional[EventWindows]:
+        frames = {s: f for s, f in frames.items() if f is not None and len(f) >= MIN_ROWS}
+        return EventWindows.from_frames(frames, columns=OHLCV) if frames else None
+
+    @staticmethod
+    def _labels(windows: EventWindows, dates: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (sembol, satır) ertesi gün değişimi ve tavan etiketi; son satırda NaN
+
+        Ertesi günü bugünün henüz kapanmamış seansı olan satırlar da NaN kalır
+        (gün içi bar kesin kapanış değildir, bkz. OutcomeTracker.refresh_labels).
+        """
+        close = windows.column('Close')
+        following = np.concatenate([close[:, 1:], np.full((len(windows), 1), np.nan)], axis=1)
+        if datetime.now().time() < SESSION_CLOSE:
+            today = date.today().isoformat()
+            for s, symbol_dates in enumerate(dates):
+                if len(symbol_dates) >= 2 and symbol_dates[-1] == today:
+                    following[s, len(symbol_dates) - 2] = np.nan
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change = following / close - 1
+        return change, np.where(np.isfinite(change), change >= CEILING_THRESHOLD, np.nan)
+
+    def append(self, frames: Dict[str, pd.DataFrame], days: Optional[int] = 1,
+               sentiment_score: float = 0.5, xu100_change: float = 0.0) -> int:
+        """
+        Her sembolün son 'days' satırının özelliklerini ekle (days=None: tüm geçmiş)
+
+        sentiment_score ve xu100_change sadece en son tarihli satırlara yazılır;
+        daha eski satırlar varsayılan değerleri alır. Aynı (sembol, tarih) tekrar
+        eklenirse özellikler güncellenir; etiket sadece yeni değer biliniyorsa
+        değişir. Son LABEL_LOOKBACK satırın etiketleri de ertesi günün seansı
+        kapandıysa doldurulur.
+        Eklenen satır sayısını döndürür.
+        """
+        windows = self._windows(frames)
+        if windows is None:
+            return 0
+        features = panel_features(windows)
+        dates = [_date_strings(index) for index in windows.indexes]
+        change, label = self._labels(windows, dates)
+        rows = np.arange(windows.values.shape[1])[None, :]
+        lengths = windows.lengths[:, None]
+        valid = (rows >= MIN_ROWS - 1) & (rows < lengths)
+        selected = valid & (rows >= lengths - days) if days is not None else valid
+        symbol_ids, row_ids = np.nonzero(selected)
+        if not len(symbol_ids):
+            return 0
+
+        date_values = np.array([dates[s][r] for s, r in zip(symbol_ids, row_ids)], dtype=object)
+        latest = date_values == max(date_values)
+
+        matrix = np.stack([features[c][symbol_ids, row_ids] for c in FEATURE_COLUMNS], axis=1)
+        defaults = np.array([FEATURE_DEFAULTS[c] for c in FEATURE_COLUMNS])
+        matrix = np.where(np.isfinite(matrix), matrix, defaults)
+        matrix[latest, FEATURE_COLUMNS.index('sentiment_score')] = sentiment_score
+        matrix[latest, FEATURE_COLUMNS.index('xu100_change')] = xu100_change
+
+        symbols = np.asarray(windows.symbols, dtype=object)[symbol_ids]
+        closes = windows.column('Close')[symbol_ids, row_ids]
+        changes = change[symbol_ids, row_ids]
+        labels = label[symbol_ids, row_ids]
+        records = [
+            (symbols[i], date_values[i], *matrix[i].tolist(), float(closes[i]),
+             None if np.isnan(changes[i]) else float(changes[i]),
+             None if np.isnan(labels[i]) else int(labels[i]))
+            for i in range(len(symbol_ids))
+        ]
+        columns = ', '.join(FEATURE_COLUMNS)
+        updates = ', '.join(f'{c} = excluded.{c}' for c in FEATURE_COLUMNS)
+        with self._lock, self.conn:
+            self.conn.executemany(
+                f"INSERT INTO features (symbol, date, {columns}, close, next_day_change, next_day_ceiling) "
+                f"VALUES ({', '.join('?' * (len(FEATURE_COLUMNS) + 5))}) "
+                f"ON CONFLICT (symbol, date) DO UPDATE SET {updates}, close = excluded.close, "
+                "next_day_change = COALESCE(excluded.next_day_change, features.next_day_change), "
+                "next_day_ceiling = COALESCE(excluded.next_day_ceiling, features.next_day_ceiling)",
+                records
+            )
+        labelled = self._update_labels(windows, change, label, dates)
+        logger.info(f"Özellik deposu: {len(records)} satır eklendi, {labelled} etiket dolduruldu")
+        return len(records)
+
+    def backfill(self, data_fetcher=None, symbols: Optional[Iterable[str]] = None, period: str = "5y",
+                 chunk_size: int = BACKFILL_CHUNK_SYMBOLS) -> Dict[str, Any]:
+        """
+        Tüm evrenin çok yıllık geçmişini özellik ve etiketleriyle doldur
+
+        Semboller chunk_size'lık parçalar halinde çekilir; her parçanın tüm
+        günleri tek vektörel geçişte hesaplanıp yazılır. Satır/sn raporlanır.
+        """
+        if data_fetcher is None:
+            from bist_data_fetcher import BISTDataFetcher
+            data_fetcher = BISTDataFetcher()
+        symbols = list(symbols) if symbols is not None else list(data_fetcher.bist_symbols)
+        started = time.perf_counter()
+        rows = 0
+        for start in range(0, len(symbols), chunk_size):
+            chunk = symbols[start:start + chunk_size]
+            frames = data_fetcher.get_data_for(chunk, period=period)
+            rows += self.append(frames, days=None)
+            elapsed = time.perf_counter() - started
+            logger.info(f"Geçmiş doldurma: {min(start + chunk_size, len(symbols))}/{len(symbols)} sembol, "
+                        f"{rows} satır ({rows / elapsed if elapsed else 0:.0f} satır/sn)")
+        elapsed = time.perf_counter() - started
+        return {'symbols': len(symbols), 'rows': rows, 'seconds': round(elapsed, 1),
+                'rows_per_second': round(rows / elapsed, 1) if elapsed else None}
+
+    def update_labels(self, frames: Dict[str, pd.DataFrame], lookback: int = LABEL_LOOKBACK) -> int:
+        """Son satırların ertesi gün tavan etiketlerini kapanmış seanslardan doldur / düzelt"""
+        windows = self._windows(frames)
+        if windows is None:
+            return 0
+        dates = [_date_strings(index) for index in windows.indexes]
+        change, label = self._labels(windows, dates)
+        return self._update_labels(windows, change, label, dates, lookback)
+
+    def _update_labels(self, windows: EventWindows, change: np.ndarray, label: np.ndarray,
+                       dates: List[np.ndarray], lookback: int = LABEL_LOOKBACK) -> int:
+        rows = np.arange(change.shape[1])[None, :]
+        known = np.isfinite(change) & (rows >= windows.lengths[:, None] - 1 - lookback)
+        symbol_ids, row_ids = np.nonzero(known)
+        records = [(float(change[s, r]), int(label[s, r]), windows.symbols[s], dates[s][r])
+                   for s, r in zip(symbol_ids, row_ids)]
+        with self._lock, self.conn:
+            cursor = self.conn.executemany(
+                "UPDATE features SET next_day_change = ?, next_day_ceiling = ? "
+                "WHERE symbol = ? AND date = ?",
+                records
+            )
+        return max(cursor.rowcount, 0)
+
+    # --- Okuma ---
+
+    @staticmethod
+    def _select(where: List[str], columns: Sequence[str], extra: Sequence[str] = ()) -> str:
+        unknown = set(columns) - set(FEATURE_COLUMNS)
+        if unknown:
+            raise ValueError(f"Bilinmeyen özellik kolonları: {', '.join(sorted(unknown))}")
+        query = f"SELECT symbol, date, {', '.join(list(columns) + list(extra))} FROM features"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        # (date, symbol) sırası tarih indeksinden okunur, ayrıca sıralama yapılmaz
+        return query + " ORDER BY date, symbol"
+
+    def _query(self, where: List[str], params: List[Any], columns: Sequence[str],
+               extra: Sequence[str] = ()) -> pd.DataFrame:
+        return pd.read_sql_query(self._select(where, columns, extra), self.conn, params=params)
+
+    @staticmethod
+    def _training_filter(start: Optional[str], end: Optional[str],
+                         symbols: Optional[Iterable[str]]) -> Tuple[List[str], List[Any]]:
+        where, params = ["next_day_ceiling IS NOT NULL"], []
+        if start:
+            where.append("date >= ?")
+            params.append(str(start)[:10])
+        if end:
+            where.append("date < ?")
+            params.append(str(end)[:10])
+        if symbols is not None:
+            keys = [normalize_symbol(s) for s in symbols]
+            where.append(f"symbol IN ({', '.join('?' * len(keys))})")
+            params.extend(keys)
+        return where, params
+
+    def training_matrix(self, start: Optional[str] = None, end: Optional[str] = None,
+                        columns: Sequence[str] = FEATURE_COLUMNS,
+                        symbols: Optional[Iterable[str]] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Etiketli satırlar: (X, y, tarihler, semboller); tarih sıralı
+
+        X bitişik float64 (satır, özellik) dizisidir; start / end 'YYYY-MM-DD'
+        (end hariç).
+        """
+        where, params = self._training_filter(start, end, symbols)
+        frame = self._query(where, params, columns, extra=('next_day_ceiling',))
+        X = np.ascontiguousarray(frame[list(columns)].to_numpy(dtype=np.float64))
+        y = frame['next_day_ceiling'].to_numpy(dtype=np.int64)
+        return X, y, frame['date'].to_numpy(), frame['symbol'].to_numpy()
+
+    def iter_training_chunks(self, chunk_rows: int = TRAINING_CHUNK_ROWS, start: Optional[str] = None,
+                             end: Optional[str] = None, columns: Sequence[str] = FEATURE_COLUMNS,
+                             symbols: Optional[Iterable[str]] = None) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Etiketli satırları tarih sırasında en fazla chunk_rows satırlık (X, y)
+        parçaları halinde oku; bellekte aynı anda tek parça bulunur
+        """
+        where, params = self._training_filter(start, end, symbols)
+        query = self._select(where, columns, extra=('next_day_ceiling',))
+        # Okuma ayrı bağlantıdan yapılır; WAL sayesinde günlük eklemeleri beklemez
+        conn = sqlite3.connect(self.path)
+        try:
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_rows)
+                if not rows:
+                    break
+                block = np.array([row[2:] for row in rows], dtype=np.float64)
+                yield np.ascontiguousarray(block[:, :-1]), block[:, -1].astype(np.int64)
+        finally:
+            conn.close()
+
+    def inference_matrix(self, day: Optional[str] = None,
+                         columns: Sequence[str] = FEATURE_COLUMNS) -> Tuple[np.ndarray, List[str], Optional[str]]:
+        """Bir günün (varsayılan: en son gün) tüm sembolleri: (X, semboller, gün)"""
+        day = str(day)[:10] if day else self.latest_date()
+        if day is None:
+            return np.empty((0, len(columns))), [], None
+        frame = self._query(["date = ?"], [day], columns)
+        return np.ascontiguousarray(frame[list(columns)].to_numpy(dtype=np.float64)), list(frame['symbol']), day
+
+    def latest_date(self) -> Optional[str]:
+        row = self.conn.execute("SELECT MAX(date) FROM features").fetchone()
+        return row[0] if row else None
+
+    def summary(self) -> Dict[str, Any]:
+        row = self.conn.execute(
+            "SELECT COUNT(*), COUNT(next_day_ceiling), COALESCE(SUM(next_day_ceiling), 0), "
+            "COUNT(DISTINCT symbol), MIN(date), MAX(date) FROM features"
+        ).fetchone()
+        return dict(zip(('rows', 'labelled', 'positives', 'symbols', 'first_date', 'last_date'), row))
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Günlük özellik deposu")
+    parser.add_argument('command', choices=['status', 'backfill', 'train'])
+    parser.add_argument('--path', default="daily_features.db")
+    parser.add_argument('--period', default="5y", help="Geçmiş doldurma süresi")
+    parser.add_argument('--chunk-size', type=int, default=BACKFILL_CHUNK_SYMBOLS)
+    parser.add_argument('--chunk-rows', type=int, default=TRAINING_CHUNK_ROWS)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    store = DailyFeatureStore(args.path)
+    if args.command == 'backfill':
+        report = store.backfill(period=args.period, chunk_size=args.chunk_size)
+        print(f"📥 {report['rows']} satır, {report['symbols']} sembol, {report['seconds']} sn "
+              f"({report['rows_per_second']} satır/sn)")
+    elif args.command == 'train':
+        from prediction_model import StockPredictionModel
+        report = StockPredictionModel(feature_store=store).train_out_of_core(chunk_rows=args.chunk_rows)
+        if report:
+            print(f"🧠 {report['rows']} satır, {report['chunks']} parça, {report['seconds']} sn "
+                  f"({report['rows_per_second']} satır/sn)")
+        else:
+            print("❌ Eğitim yapılamadı")
+
+    summary = store.summary()
+    print(f"🗃️ {summary['rows']} satır, {summary['symbols']} sembol "
+          f"({summary['first_date']} - {summary['last_date']})")
+    print(f"🏷️ {summary['labelled']} etiketli, {summary['positives']} tavan")
+
+
+if __name__ == "__main__":
+    main()
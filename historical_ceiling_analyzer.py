@@ -6,13 +6,17 @@ Son 1 aydaki tavan yapan hisseleri analiz eder ve ortak paternleri bulur.
 
 import pandas as pd
 import numpy as np
-import yfinance as yf
 from datetime import datetime, timedelta
 import logging
 from typing import List, Dict, Any
 from bist_data_fetcher import BISTDataFetcher
 from technical_analyzer import TechnicalAnalyzer
 from prediction_model import StockPredictionModel
+from outcome_tracker import OutcomeTracker
+from lazy_imports import lazy_import
+
+# Ağır bağımlılıklar ilk kullanımda yüklenir
+yf = lazy_import('yfinance')
 
 logger = logging.getLogger(__name__)
 
@@ -326,6 +330,14 @@ def main():
     print(f"   • Başarı oranı: %{performance.get('success_rate', 0):.1f}")
     print(f"   • Yüksek güven: %{performance.get('high_confidence_rate', 0):.1f}")
     
+    # Gerçek tahminlerin canlı sonuçları (outcome_tracker tarafından biriktirilir)
+    live_metrics = OutcomeTracker().rolling_metrics(days=30)
+    if live_metrics:
+        print(f"\n📡 CANLI TAHMİN SONUÇLARI (son 30 gün):")
+        for m in live_metrics:
+            print(f"   • {m['scanner']}: isabet %{m['precision'] * 100:.1f} "
+                  f"({m['hits']}/{m['predictions']}), yakalanan tavan %{m['recall'] * 100:.1f}")
+    
     print(f"\n🏆 EN ÇOK TAVAN YAPAN HİSSELER:")
     top_stocks = patterns.get('top_ceiling_stocks', [])[:5]
     for i, (stock, count) in enumerate(top_stocks, 1):
@@ -9,76 +9,62 @@
 Günlük Sabah Taraması: Her gün 08:30'da çalışır
 """
 
-import yfinance as yf
-import talib
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple
-import requests
-import json
+import os
+import time
+from lazy_imports import lazy_import
+import providers
+from scan_history import ScanHistoryStore
+from scan_journal import ScanJournal
+from symbol_universe import get_universe
+from prefilter import PreFilter
+from sector_engine import SectorEngine
+from correlation_engine import CorrelationEngine
+from tracing import export_all, observe, record_cache_stats, span
+from shard_queue import ShardQueue
+from universe_scan import UniverseScanMixin
+from streaming_scan import ScanStream, combine_consumers, print_provisional, telegram_consumer
 
-class HybridCeilingScanner:
-    def __init__(self):
-        self.bist_stocks = [
-            'AKBNK', 'GARAN', 'ISCTR', 'YKBNK', 'HALKB', 'VAKBN', 'SISE', 'THYAO', 'BIMAS', 'KOZAL',
-            'ASELS', 'KCHOL', 'EREGL', 'PETKM', 'TUPRS', 'TCELL', 'SAHOL', 'EKGYO', 'KOZAA', 'GUBRF',
-            'TOASO', 'TTKOM', 'FROTO', 'ARCLK', 'AKSA', 'KRDMD', 'TAVHL', 'PGSUS', 'MGROS', 'VESTL',
-            'SOKM', 'BRMEN', 'SAMAT', 'EKIZ', 'KAPLM', 'MRSHL', 'EUKYO', 'ICBCT', 'SAFKR', 'BARMA',
-            'ADEL', 'AEFES', 'AFYON', 'AGESA', 'AGHOL', 'AGROT', 'AHGAZ', 'AKENR', 'AKGRT',
-            'AKMGY', 'ALARK', 'ALBRK', 'ALKIM', 'ALMAD', 'ANADOLU', 'ANACM', 'ASUZU', 'ATEKS',
-            'AVGYO', 'AVHOL', 'AVISA', 'AVTUR', 'AYDEM', 'AYEN', 'BAGFS', 'BAHKM', 'BAKAB',
-            'BANVT', 'BASCM', 'BASGZ', 'BAYRK', 'BERA', 'BEYAZ', 'BIGCH', 'BINHO', 'BIOEN',
-            'BIZIM', 'BJKAS', 'BLCYT', 'BNTAS', 'BOBET', 'BORLS', 'BOSSA', 'BRISA', 'BRKSN',
-            'BRKVY', 'BSOKE', 'BTCIM', 'BUCIM', 'BURCE', 'BURVA', 'CCOLA', 'CEMAS', 'CEMTS',
-            'CIMSA', 'CLEBI', 'CMBTN', 'CMENT', 'CONSE', 'COSMO', 'CRDFA', 'CRFSA', 'CUSAN',
-            'CVKMD', 'CWENE', 'DAGI', 'DAPGM', 'DARDL', 'DENGE', 'DERHL', 'DERIM', 'DESA',
-            'DESPC', 'DEVA', 'DGATE', 'DGNMO', 'DITAS', 'DMSAS', 'DOCO', 'DOGUB', 'DOHOL',
-            'DURDO', 'DYOBY', 'DZGYO', 'ECILC', 'ECZYT', 'EGEEN', 'EGGUB', 'EGPRO', 'EGSER',
-            'EKSUN', 'ELITE', 'EMKEL', 'EMNIS', 'ENERY', 'ENJSA', 'ENKAI', 'ERBOS', 'ERSU',
-            'ESCAR', 'EUKYO', 'EUREN', 'EUYO', 'EYGYO', 'FENER', 'FLAP', 'FMIZP', 'FONET',
-            'FORMT', 'FORTE', 'FRIGO', 'GEDIK', 'GEDZA', 'GENIL', 'GENTS', 'GEREL', 'GESAN',
-            'GIPTA', 'GLBMD', 'GLYHO', 'GMTAS', 'GOKNR', 'GOLTS', 'GOODY', 'GOZDE', 'GRNYO',
-            'GRSEL', 'GSDDE', 'GSDHO', 'GSRAY', 'GWIND', 'HATEK', 'HATSN', 'HDFGS', 'HEDEF',
-            'HEKTS', 'HURGZ', 'HUNER', 'HZNDR', 'ICBCT', 'IDGYO', 'IEYHO', 'IHEVA', 'IHGZT',
-            'IHLAS', 'IHLGM', 'IHYAY', 'IMASM', 'INDES', 'INFO', 'INTEM', 'INVES', 'IPEKE',
-            'ISBIR', 'ISBTR', 'ISGSY', 'ISKUR', 'ISMEN', 'IZENR', 'IZFAS', 'IZINV', 'JANTS',
-            'KAPLM', 'KAREL', 'KARSN', 'KARTN', 'KATMR', 'KAYSE', 'KENT', 'KERVN', 'KFEIN',
-            'KGYO', 'KIMMR', 'KLGYO', 'KLKIM', 'KLNMA', 'KLRHO', 'KLSER', 'KLSYN', 'KMPUR',
-            'KNFRT', 'KONKA', 'KONTR', 'KONYA', 'KOPOL', 'KORDC', 'KORDS', 'KOTON', 'KRDMA',
-            'KRDMB', 'KRGYO', 'KRONT', 'KRPLS', 'KRSTL', 'KRTEK', 'KRVGD', 'KSTUR', 'KUTPO',
-            'KZBGY', 'LIDER', 'LIDFA', 'LILAK', 'LINK', 'LKMNH', 'LOGO', 'LRSHO', 'LUKSK',
-            'MACKO', 'MAKIM', 'MAKTK', 'MANAS', 'MARBL', 'MARKA', 'MEDTR', 'MEGAP', 'MEPET',
-            'MERCN', 'MERKO', 'METRO', 'MHRGY', 'MMCAS', 'MNDTR', 'MOBTL', 'MPARK', 'MRSHL',
-            'MSGYO', 'MTRKS', 'MTRYO', 'MZHLD', 'NATEN', 'NETAS', 'NIBAS', 'NUGYO', 'NUHCM',
-            'ODAS', 'OFSYM', 'ONCSM', 'ORCAY', 'ORMA', 'OSTIM', 'OTKAR', 'OYAKC', 'OYYAT',
-            'OZBAL', 'OZGYO', 'OZKGY', 'OZRDN', 'OZSUB', 'PAPIL', 'PARSN', 'PASEU', 'PATEK',
-            'PCILT', 'PEGYO', 'PEKGY', 'PENGD', 'PENTA', 'PETUN', 'PINSU', 'PKART', 'PKENT',
-            'PLTUR', 'PNLSN', 'POLHO', 'POLTK', 'PRDGS', 'PRKAB', 'PRKME', 'PRZMA', 'PSDTC',
-            'QUAGR', 'RALYH', 'RAYSG', 'RNPOL', 'RODRG', 'ROYAL', 'RUBNS', 'RYGYO', 'SAFKR',
-            'SANEL', 'SANFM', 'SANKO', 'SARKY', 'SASA', 'SAYAS', 'SEKFK', 'SEKUR', 'SELEC',
-            'SELGD', 'SELVA', 'SEYKM', 'SILVR', 'SIMGE', 'SKBNK', 'SKYLP', 'SMART', 'SMRTG',
-            'SNKRN', 'SODA', 'SONME', 'SRVGY', 'SUMAS', 'SUNTK', 'SUWEN', 'TARKM', 'TATEN',
-            'TBORG', 'TDGYO', 'TEKTU', 'TERA', 'TEZOL', 'TMSN', 'TRCAS', 'TRGYO', 'TRILC',
-            'TSGYO', 'TSKB', 'TTRAK', 'TUCLK', 'TUKAS', 'TURGG', 'ULUUN', 'ULUSE', 'ULUFA',
-            'UMPAS', 'UNLU', 'USAK', 'VAKKO', 'VANGD', 'VBTYZ', 'VERUS', 'VESBE', 'VKGYO',
-            'VKING', 'VRGYO', 'YAPRK', 'YATAS', 'YAYLA', 'YESIL', 'YGGYO', 'YGYO', 'YKSLN',
-            'YUNSA', 'ZEDUR', 'ZOREN', 'ZRGYO'
-        ]
+# Ağır bağımlılıklar ilk kullanımda yüklenir
+talib = lazy_import('talib')
+requests = lazy_import('requests')
+
+class HybridCeilingScanner(UniverseScanMixin):
+    scanner_name = 'hybrid'
+    score_key = 'hybrid_score'
+    min_score = 30
+    scan_method = 'hybrid_scan'
+
+    def __init__(self, price_store=None, history_store: ScanHistoryStore = None,
+                 prefilter: PreFilter = None):
+        # Verilirse fiyat geçmişi bellekteki depodan okunur (daemon modu)
+        self.price_store = price_store
+        # Pahalı (talib) aşamadan önce ucuz son bar süzgeci
+        self.prefilter = prefilter or PreFilter.preset('hybrid')
+        # Tarama sonuçları JSON dosyaları yerine indeksli geçmiş deposuna yazılır
+        self.history_store = history_store or ScanHistoryStore()
+        # Sembol listesi ve sektörler ortak evren dosyasından (bist_universe.json)
+        self.universe = get_universe()
+        self.bist_stocks = self.universe.symbols('extended')
         
-        # Sektör grupları
-        self.sector_groups = {
-            'REIT': ['GRNYO', 'PEKGY', 'EKGYO', 'AVGYO', 'DZGYO', 'IDGYO', 'KLGYO', 'KRGYO', 'MSGYO', 'NUGYO', 'PEGYO', 'RYGYO', 'TRGYO', 'VKGYO', 'VRGYO', 'YGGYO'],
-            'BANKACILIK': ['AKBNK', 'GARAN', 'ISCTR', 'YKBNK', 'HALKB', 'VAKBN', 'SKBNK', 'TSKB'],
-            'SANAYİ': ['POLTK', 'CEMAS', 'JANTS', 'SISE', 'EREGL', 'TUPRS', 'ASELS'],
-            'GIDA': ['PENGD', 'BIZIM', 'CCOLA', 'AEFES', 'PINSU'],
-            'TEKNOLOJİ': ['KAREL', 'LOGO', 'LINK', 'SMART', 'NETAS'],
-            'OTOMOTİV': ['FROTO', 'ARCLK', 'OTKAR', 'BRISA', 'TTRAK'],
-            'ENERJİ': ['PETKM', 'AYDEM', 'ENERY', 'AYEN', 'CWENE'],
-            'İNŞAAT': ['KRDMD', 'ENKAI', 'MERKO', 'SANEL'],
-            'TEKSTİL': ['ATEKS', 'YUNSA', 'YATAS', 'SASA'],
-            'METAL': ['EREGL', 'TUPRS', 'SARKY', 'OZBAL']
-        }
+        # Sektör grupları ve taramada bir kez hesaplanan sektör toplamları
+        self.sector_groups = self.universe.sector_groups
+        self.sector_engine = SectorEngine(self.universe)
+        # Evren genelinde 20 günlük getiri korelasyonu (birlikte hareket edenler)
+        self.correlation = CorrelationEngine(self.bist_stocks)
+    
+    def get_history(self, symbol: str, period: str) -> pd.DataFrame:
+        """Fiyat geçmişini depodan veya yfinance'ten getir"""
+        if self.price_store is not None:
+            data = self.price_store.get_history(symbol, period)
+            return data if data is not None else pd.DataFrame()
+        started = time.perf_counter()
+        data = providers.history(f"{symbol}.IS", period=period)
+        observe('symbol_latency_seconds', time.perf_counter() - started, stage='fetch', scanner='hybrid')
+        return data
     
     def technical_analysis_scan(self, symbol: str) -> Dict:
         """
@@ -86,8 +72,7 @@ class HybridCeilingScanner:
         %33 tavancıları yakalar (KAPLM, EKIZ, SAMAT tarzı)
         """
         try:
-            ticker = yf.Ticker(f"{symbol}.IS")
-            data = ticker.history(period='60d')
+            data = self.get_history(symbol, '60d')
             
             if len(data) < 30:
                 return {'score': 0, 'signals': [], 'error': 'Yetersiz veri'}
@@ -195,8 +180,7 @@ class HybridCeilingScanner:
         %67 tavancıları yakalar (GRNYO, POLTK, CEMAS tarzı)
         """
         try:
-            ticker = yf.Ticker(f"{symbol}.IS")
-            data = ticker.history(period='20d')
+            data = self.get_history(symbol, '20d')
             
             if len(data) < 10:
                 return {'score': 0, 'signals': [], 'error': 'Yetersiz veri'}
@@ -251,11 +235,12 @@ class HybridCeilingScanner:
                     score += 2
                     signals.append(f'Momentum build-up ({momentum_days} gün)')
             
-            # 4. SEKTÖR KOORDİNASYONU
+            # 4. SEKTÖR KOORDİNASYONU (sektör motorunun tarama başı toplamlarından)
             sector = self.get_sector(symbol)
-            if sector:
-                score += 2
-                signals.append(f'{sector} sektör potansiyeli')
+            sector_points, sector_signal = self.sector_engine.coordination_score(symbol)
+            if sector_points:
+                score += sector_points
+                signals.append(sector_signal)
             
             # 5. PENNY STOCK ÇEKİCİLİĞİ (≤ 15 TL)
             current_price = close[-1]
@@ -274,7 +259,6 @@ class HybridCeilingScanner:
                     signals.append('Düz seyirden sudden breakout')
             
             # Varsayılan değerler
-            sector = self.get_sector(symbol)
             momentum_days = 0
             volatile_days = 0
             
@@ -284,6 +268,8 @@ class HybridCeilingScanner:
                 'signals': signals,
                 'type': 'speculation',
                 'sector': sector,
+                'sector_stats': self.sector_engine.stats(symbol),
+                'comovers': self.correlation.neighbours(symbol, k=5),
                 'price': current_price,
                 'momentum_days': momentum_days,
                 'volatile_days': volatile_days
@@ -294,10 +280,7 @@ class HybridCeilingScanner:
     
     def get_sector(self, symbol: str) -> str:
         """Hissenin sektörünü bul"""
-        for sector, stocks in self.sector_groups.items():
-            if symbol in stocks:
-                return sector
-        return 'Diğer'
+        return self.universe.sector_of(symbol)
     
     def hybrid_scan(self, symbol: str) -> Dict:
         """
@@ -343,10 +326,41 @@ class HybridCeilingScanner:
             'all_signals': technical['signals'] + speculation['signals']
         }
     
-    def daily_scan(self) -> List[Dict]:
+    def refresh_correlations(self):
+        """Korelasyon penceresini ilk seferde doldur, sonra sadece son barı işle"""
+        self.ensure_price_store(self.bist_stocks)
+        if self.correlation.last_date is None:
+            self.correlation.seed({s: self.price_store.peek(s) for s in self.bist_stocks})
+        else:
+            self.correlation.update(self.price_store)
+
+    def refresh_market_context(self):
+        """Sektör toplamları ve korelasyon penceresi (tarama başında bir kez)"""
+        self.refresh_sectors()
+        self.refresh_correlations()
+
+    def iter_scan(self, top_k: int = 10, on_provisional=None, max_workers: int = 4,
+                  min_score: float = 30, journal=None, tier: str = None,
+                  prefilter: bool = False) -> ScanStream:
+        """
+        ⚡ AKIŞLI TARAMA
+        Her hisse tamamlandıkça sonucu üretir; stream.top() o ana kadarki en iyi
+        top_k adayı verir, on_provisional en iyi liste değiştikçe çağrılır
+        """
+        symbols = self.scan_plan(tier, prefilter)
+        return ScanStream(symbols, self.hybrid_scan, 'hybrid_score',
+                          top_k=top_k, min_score=min_score, max_workers=max_workers,
+                          on_provisional=on_provisional, journal=journal, name='hybrid')
+
+    def daily_scan(self, on_provisional=None, max_workers: int = 4, resume: bool = True,
+                   tier: str = None, prefilter: bool = False,
+                   shard_queue: ShardQueue = None) -> List[Dict]:
         """
         🌅 GÜNLÜK SABAH TARAMASI
-        Tüm BİST hisselerini tara ve skorla
+        Tüm BİST hisselerini tara ve skorla (shard_queue verilirse veya
+        BIST_SHARD_QUEUE tanımlıysa parçalı / dağıtık modda)
+        Ön süzgeç varsayılan olarak kapalıdır; eşikler prefilter=True ve
+        BIST_PREFILTER_SHADOW=1 (gölge mod) ile ölçülen recall'a göre ayarlanmadan açılmamalı
         """
         results = []
         scan_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -354,21 +368,35 @@ class HybridCeilingScanner:
         print(f"🎯 HİBRİT TAVAN TARAMASI BAŞLADI: {scan_time}")
         print("=" * 60)
         
-        for i, symbol in enumerate(self.bist_stocks):
-            try:
-                result = self.hybrid_scan(symbol)
-                
+        if shard_queue is None and os.getenv('BIST_SHARD_QUEUE'):
+            shard_queue = ShardQueue(os.getenv('BIST_SHARD_QUEUE'))
+        if shard_queue is not None:
+            return self.sharded_scan(shard_queue, max_workers=max_workers, resume=resume, tier=tier,
+                                     prefilter=prefilter)
+        
+        stream = self.iter_scan(on_provisional=on_provisional, max_workers=max_workers,
+                                journal=ScanJournal('hybrid') if resume else None, tier=tier,
+                                prefilter=prefilter)
+        if prefilter:
+            self.print_prefilter_report()
+        
+        with span('daily_scan', scanner='hybrid'):
+            for result in stream:
                 # Sadece belirli bir skor üstündeki hisseleri kaydet
                 if result['hybrid_score'] >= 30:  # Minimum %30 skor
                     results.append(result)
                 
                 # İlerleme göstergesi
-                if (i + 1) % 50 == 0:
-                    print(f"⏳ {i + 1}/{len(self.bist_stocks)} hisse tarandı...")
-                    
-            except Exception as e:
-                print(f"❌ {symbol} hata: {e}")
-                continue
+                if stream.scanned % 50 == 0:
+                    print(f"⏳ {stream.scanned}/{stream.total} hisse tarandı...")
+        
+        if stream.resumed:
+            print(f"♻️ {stream.resumed} hisse önceki yarım taramanın günlüğünden alındı")
+        if stream.failed:
+            print(f"❌ {stream.failed} hisse hata nedeniyle taranamadı")
+        
+        if prefilter:
+            self.record_prefilter_recall(results)
         
         # Skoruna göre sırala
         results.sort(key=lambda x: x['hybrid_score'], reverse=True)
@@ -448,20 +476,26 @@ class HybridCeilingScanner:
             print(f"❌ Telegram gönderim hatası: {e}")
             return False
     
-    def run_daily_scan(self):
+    def run_daily_scan(self, provisional_alerts: bool = False):
         """
         🚀 GÜNLÜK TARAMAYI ÇALIŞTIR VE BİLDİR
+        provisional_alerts: Tarama sürerken geçici en iyi adayları Telegram'a da gönder
         """
         print("🎯 HİBRİT TAVAN TARAMA SİSTEMİ")
         print("=" * 50)
         print("🔍 Teknik Analiz + Early Warning Kombinasyonu")
         print("📅 Günlük sabah taraması başlatılıyor...\n")
         
-        # Taramayı çalıştır
-        results = self.daily_scan()
+        # Taramayı çalıştır (geçici en iyi adaylar tarama sürerken gösterilir)
+        on_provisional = combine_consumers(
+            print_provisional,
+            telegram_consumer(self.send_telegram_alert, 'hybrid_score') if provisional_alerts else None
+        )
+        results = self.daily_scan(on_provisional=on_provisional)
         
         # Sonuçları formatla
-        message = self.format_results(results)
+        with span('ranking', scanner='hybrid'):
+            message = self.format_results(results)
         
         # Console'a yazdır
         print("\n" + "=" * 60)
@@ -470,32 +504,28 @@ class HybridCeilingScanner:
         print(message)
         
         # Telegram'a gönder
-        self.send_telegram_alert(message)
+        with span('notification', scanner='hybrid'):
+            self.send_telegram_alert(message)
         
         # Detaylı raporu dosyaya kaydet
-        self.save_detailed_report(results)
+        with span('report', scanner='hybrid'):
+            self.save_detailed_report(results)
+        
+        if self.price_store is not None:
+            record_cache_stats('price_store', self.price_store.stats['hits'], self.price_store.stats['misses'])
+        export_all('hybrid_scan')
         
         return results
     
     def save_detailed_report(self, results: List[Dict]):
         """
-        📝 DETAYLI RAPORU DOSYAYA KAYDET
+        📝 DETAYLI RAPORU TARAMA GEÇMİŞİNE KAYDET
         """
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"ceiling_scan_report_{timestamp}.json"
-            
-            report_data = {
-                'scan_time': datetime.now().isoformat(),
-                'total_scanned': len(self.bist_stocks),
-                'candidates_found': len(results),
-                'results': results
-            }
-            
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump(report_data, f, ensure_ascii=False, indent=2)
-            
-            print(f"💾 Detaylı rapor kaydedildi: {filename}")
+            scan_id = self.history_store.record_scan(
+                'hybrid', results, total_scanned=len(self.bist_stocks), score_key='hybrid_score'
+            )
+            print(f"💾 Detaylı rapor kaydedildi: {self.history_store.path} (tarama #{scan_id})")
             
         except Exception as e:
             print(f"❌ Rapor kaydetme hatası: {e}")
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tembel (Lazy) Import Modülü
+Bu modül ağır bağımlılıkları (yfinance, talib, ta, sklearn, bs4, telegram)
+ilk kullanıma kadar yüklemeyen hafif modül vekilleri sağlar.
+
+Kullanım:
+    from lazy_imports import lazy_import
+    yf = lazy_import('yfinance')      # burada hiçbir şey yüklenmez
+    yf.Ticker('THYAO.IS')             # yfinance ilk erişimde yüklenir
+"""
+
+import importlib
+import importlib.util
+import sys
+import threading
+import types
+from typing import Dict
+
+_LOCK = threading.RLock()
+_PROXIES: Dict[str, "LazyModule"] = {}
+
+
+class LazyModule(types.ModuleType):
+    """İlk öznitelik erişiminde gerçek modülü yükleyen vekil modül"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__['_lazy_name'] = name
+        self.__dict__['_lazy_module'] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            with _LOCK:
+                module = self.__dict__['_lazy_module']
+                if module is None:
+                    module = importlib.import_module(self.__dict__['_lazy_name'])
+                    self.__dict__['_lazy_module'] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "yüklü" if self.__dict__['_lazy_module'] is not None else "yüklenmedi"
+        return f"<LazyModule '{self.__dict__['_lazy_name']}' ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Modül için (paylaşılan) tembel vekil döndür"""
+    with _LOCK:
+        proxy = _PROXIES.get(name)
+        if proxy is None:
+            proxy = LazyModule(name)
+            _PROXIES[name] = proxy
+        return proxy
+
+
+def is_available(name: str) -> bool:
+    """Modül yüklemeden kurulu olup olmadığını kontrol et"""
+    if name in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def is_loaded(name: str) -> bool:
+    """Modül şu ana kadar gerçekten yüklendi mi"""
+    return name in sys.modules
@@ -9,25 +9,34 @@ import numpy as np
 import logging
 from typing import List, Dict, Any
 from bist_data_fetcher import BISTDataFetcher
+from universe_scan import warmed_price_store
+from scan_journal import ScanJournal
+from symbol_universe import get_universe
+from streaming_scan import ScanStream, print_provisional
+from profile_aggregation import load_ideal_profile
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# İlk 60 günlük tavan öncesi bulgularından elle çıkarılan profil
+DEFAULT_IDEAL_PROFILE = {
+    'RSI': {'min': 64, 'max': 72, 'ideal': 68},
+    'Volume_Ratio': {'min': 1.5, 'ideal': 1.6},
+    'BB_Position': {'min': 80, 'ideal': 87},
+    'Stochastic_K': {'min': 65, 'ideal': 72},
+    'Price_vs_SMA20': {'min': 8, 'ideal': 13},
+    'Daily_Change': {'min': 2, 'ideal': 4},
+    'Momentum_5D': {'min': 5, 'ideal': 10}
+}
+
 class LiveSignalScanner:
-    def __init__(self):
-        """Canlı sinyal tarama sistemi"""
-        self.data_fetcher = BISTDataFetcher()
+    def __init__(self, price_store=None):
+        """Canlı sinyal tarama sistemi (price_store verilirse veriler bellekten okunur)"""
+        self.data_fetcher = BISTDataFetcher(price_store=price_store)
         
-        # İdeal tavan öncesi teknik profil (bulgularımızdan)
-        self.ideal_profile = {
-            'RSI': {'min': 64, 'max': 72, 'ideal': 68},
-            'Volume_Ratio': {'min': 1.5, 'ideal': 1.6},
-            'BB_Position': {'min': 80, 'ideal': 87},
-            'Stochastic_K': {'min': 65, 'ideal': 72},
-            'Price_vs_SMA20': {'min': 8, 'ideal': 13},
-            'Daily_Change': {'min': 2, 'ideal': 4},
-            'Momentum_5D': {'min': 5, 'ideal': 10}
-        }
+        # İdeal tavan öncesi teknik profil: kalibre edilmiş dosya (profile_aggregation) varsa
+        # çok yıllık tavan öncesi dağılımından, yoksa ilk bulgulardan
+        self.ideal_profile = load_ideal_profile(default=DEFAULT_IDEAL_PROFILE)
         
     def calculate_current_technical_indicators(self, data: pd.DataFrame) -> Dict[str, Any]:
         """Güncel teknik göstergeleri hesapla"""
@@ -274,44 +283,60 @@ class LiveSignalScanner:
             'max_possible': max_possible
         }
     
-    def scan_all_stocks(self) -> List[Dict[str, Any]]:
+    def scan_symbol(self, symbol: str, period: str = "30d") -> Dict[str, Any]:
+        """Tek hisseyi tara (veri yetersizse None)"""
+        data = self.data_fetcher.get_stock_data(symbol, period)
+        if data is None or data.empty or len(data) < 25:
+            return None
+        
+        # Güncel teknik göstergeleri hesapla
+        indicators = self.calculate_current_technical_indicators(data)
+        if not indicators:
+            return None
+        
+        # Sinyal puanını hesapla
+        signal_analysis = self.calculate_signal_score(indicators)
+        return {
+            'symbol': symbol.replace('.IS', ''),
+            'current_price': indicators['Current_Price'],
+            'last_update': indicators['Last_Update'],
+            'signal_score': signal_analysis['total_score'],
+            'indicators': indicators,
+            'signal_analysis': signal_analysis
+        }
+    
+    def ensure_price_store(self, symbols: List[str]):
+        """Veri çekici deposuz kurulduysa akışlı taramadan önce depoyu doldur"""
+        if self.data_fetcher.price_store is None:
+            self.data_fetcher.price_store = warmed_price_store(symbols)
+    
+    def iter_scan_all_stocks(self, top_k: int = 10, on_provisional=None, max_workers: int = 4,
+                             min_score: float = 35, journal=None, tier: str = None) -> ScanStream:
+        """Hisseleri tamamlandıkça üreten akışlı tarama (bkz. streaming_scan.ScanStream)"""
+        symbols = self.data_fetcher.bist_symbols
+        if tier is not None:
+            universe = get_universe()
+            if not universe.has_liquidity and self.data_fetcher.price_store is not None:
+                universe.update_liquidity(self.data_fetcher.price_store, symbols)
+            symbols = universe.filter(symbols, tier=tier, suffix=True)
+        self.ensure_price_store(symbols)
+        return ScanStream(symbols, self.scan_symbol, 'signal_score',
+                          top_k=top_k, min_score=min_score, max_workers=max_workers,
+                          on_provisional=on_provisional, journal=journal, name='live_signal')
+    
+    def scan_all_stocks(self, on_provisional=None, max_workers: int = 4, resume: bool = True,
+                        tier: str = None) -> List[Dict[str, Any]]:
         """Tüm BİST hisselerini tara"""
         logger.info("Tüm BİST hisseleri tavan öncesi sinyaller için taranıyor...")
         
-        # Son 30 günlük veri al
-        all_data = self.data_fetcher.get_all_bist_data(period="30d")
-        
         signal_results = []
         
-        for symbol, data in all_data.items():
-            if data.empty or len(data) < 25:
-                continue
-                
-            try:
-                # Güncel teknik göstergeleri hesapla
-                indicators = self.calculate_current_technical_indicators(data)
-                
-                if not indicators:
-                    continue
-                
-                # Sinyal puanını hesapla
-                signal_analysis = self.calculate_signal_score(indicators)
-                
-                # Sadece belirli bir eşiğin üstündeki hisseleri al
-                if signal_analysis['total_score'] >= 35:  # En az 35 puan
-                    result = {
-                        'symbol': symbol.replace('.IS', ''),
-                        'current_price': indicators['Current_Price'],
-                        'last_update': indicators['Last_Update'],
-                        'signal_score': signal_analysis['total_score'],
-                        'indicators': indicators,
-                        'signal_analysis': signal_analysis
-                    }
-                    signal_results.append(result)
-                    
-            except Exception as e:
-                logger.debug(f"{symbol} tarama hatası: {e}")
-                continue
+        journal = ScanJournal('live_signal') if resume else None
+        for result in self.iter_scan_all_stocks(on_provisional=on_provisional, max_workers=max_workers,
+                                                journal=journal, tier=tier):
+            # Sadece belirli bir eşiğin üstündeki hisseleri al
+            if result['signal_score'] >= 35:  # En az 35 puan
+                signal_results.append(result)
         
         # Skor bazında sırala
         signal_results.sort(key=lambda x: x['signal_score'], reverse=True)
@@ -329,7 +354,7 @@ def main():
     print("=" * 70)
     
     # Tüm hisseleri tara
-    signal_stocks = scanner.scan_all_stocks()
+    signal_stocks = scanner.scan_all_stocks(on_provisional=print_provisional)
     
     if not signal_stocks:
         print("❌ Şu anda sinyal veren hisse bulunamadı!")
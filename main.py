@@ -19,6 +19,11 @@ from technical_analyzer import TechnicalAnalyzer
 from news_analyzer import NewsAnalyzer
 from telegram_bot import TelegramNotifier
 from prediction_model import StockPredictionModel
+from scan_history import ScanHistoryStore
+from feature_store import DailyFeatureStore, HISTORY_PERIOD
+from prefilter import PreFilter
+from universe_scan import warmed_price_store
+from tracing import export_all, inc, observe, record_cache_stats, span
 
 # Çevre değişkenlerini yükle
 load_dotenv()
@@ -35,16 +40,30 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class BISTAnalyzer:
-    def __init__(self):
-        """BİST analiz sistemini başlat"""
+    def __init__(self, price_store=None, history_store: ScanHistoryStore = None,
+                 prefilter: PreFilter = None, feature_store: DailyFeatureStore = None):
+        """
+        BİST analiz sistemini başlat
+
+        price_store: Daemon modunda paylaşılan fiyat deposu
+        history_store: Tahminlerin sonuç takibi için yazıldığı tarama geçmişi
+        prefilter: Teknik analizden önce uygulanan ucuz son bar süzgeci
+        feature_store: Tahmin modelinin günlük özellik / etiket deposu
+        """
         logger.info("BİST Analiz Sistemi başlatılıyor...")
         
         # Modülleri başlat
-        self.data_fetcher = BISTDataFetcher()
+        self.data_fetcher = BISTDataFetcher(price_store=price_store)
         self.technical_analyzer = TechnicalAnalyzer()
         self.news_analyzer = NewsAnalyzer()
         self.telegram_notifier = TelegramNotifier()
-        self.prediction_model = StockPredictionModel()
+        self.feature_store = feature_store or DailyFeatureStore()
+        self.prediction_model = StockPredictionModel(feature_store=self.feature_store)
+        self.history_store = history_store or ScanHistoryStore()
+        self.prefilter = prefilter or PreFilter.preset('bist_analyzer')
+        
+        # Teknik analiz önbelleği: sembol -> (son bar zamanı, satır sayısı, analiz)
+        self.indicator_cache = {}
         
         logger.info("Tüm modüller başlatıldı")
         
@@ -53,28 +72,47 @@ class BISTAnalyzer:
         try:
             logger.info("Günlük analiz başlatılıyor...")
             
+            # 0. Evreni en uzun dönemle (özellik deposu) bir kez toplu indir; sonraki
+            # 2d / 5d / 1mo / 6mo istekleri aynı depodan kesilerek okunur
+            with span('warm_up', pipeline='daily_analysis'):
+                self.ensure_price_store()
+            
             # 1. Bugün tavan yapan hisseleri bul
-            todays_ceiling_stocks = self.get_todays_ceiling_stocks()
+            with span('fetch_todays_ceilings', pipeline='daily_analysis'):
+                todays_ceiling_stocks = self.get_todays_ceiling_stocks()
             
             # 2. Önceki gün tavan yapan hisseleri analiz et
-            previous_day_data = self.get_previous_day_ceiling_stocks()
+            with span('fetch_previous_ceilings', pipeline='daily_analysis'):
+                previous_day_data = self.get_previous_day_ceiling_stocks()
             
             # 3. Tüm hisseler için teknik analiz yap
-            technical_analysis = await self.perform_technical_analysis()
+            with span('indicators', pipeline='daily_analysis'):
+                technical_analysis = await self.perform_technical_analysis()
             
             # 4. Piyasa haberlerini analiz et
-            news_analysis = self.analyze_market_news()
+            with span('news', pipeline='daily_analysis'):
+                news_analysis = self.analyze_market_news()
             
             # 5. Piyasa bilgilerini al
-            market_info = self.data_fetcher.get_market_info()
+            with span('fetch_market_info', pipeline='daily_analysis'):
+                market_info = self.data_fetcher.get_market_info()
             
-            # 6. Potansiyel tavan hisselerini tahmin et
-            predictions = self.predict_potential_ceiling_stocks(
-                technical_analysis, news_analysis, market_info
-            )
+            # 6. Günün özelliklerini depoya yaz, model varsa olasılıkları toplu hesapla
+            with span('feature_store', pipeline='daily_analysis'):
+                probabilities = self.update_feature_store(news_analysis, market_info)
             
-            # 7. Telegram'a gönder (bugün tavan yapanlar + yarın potansiyeli olanlar)
-            await self.send_telegram_message(predictions, market_info, news_analysis, todays_ceiling_stocks)
+            # 7. Potansiyel tavan hisselerini tahmin et
+            with span('ranking', pipeline='daily_analysis'):
+                predictions = self.predict_potential_ceiling_stocks(
+                    technical_analysis, news_analysis, market_info, probabilities
+                )
+                # Ön süzgeçte elenenler de taranmış sayılır
+                total_scanned = self.prefilter.last_report.get('total', len(technical_analysis))
+                self.record_predictions(predictions, total_scanned)
+            
+            # 8. Telegram'a gönder (bugün tavan yapanlar + yarın potansiyeli olanlar)
+            with span('notification', pipeline='daily_analysis'):
+                await self.send_telegram_message(predictions, market_info, news_analysis, todays_ceiling_stocks)
             
             logger.info("Günlük analiz tamamlandı")
             
@@ -85,6 +123,21 @@ class BISTAnalyzer:
                 await self.telegram_notifier.send_error_notification(str(e))
             except:
                 pass
+        finally:
+            self.export_metrics()
+    
+    def ensure_price_store(self):
+        """Depo verilmediyse (daemon dışı) tüm çalıştırma için tek bir depo doldur"""
+        if self.data_fetcher.price_store is None:
+            self.data_fetcher.price_store = warmed_price_store(self.data_fetcher.bist_symbols,
+                                                               period=HISTORY_PERIOD)
+    
+    def export_metrics(self):
+        """Önbellek oranlarını ekleyip metrikleri dışa aktar"""
+        price_store = self.data_fetcher.price_store
+        if price_store is not None:
+            record_cache_stats('price_store', price_store.stats['hits'], price_store.stats['misses'])
+        export_all('daily_analysis')
     
     def get_todays_ceiling_stocks(self) -> List[Dict]:
         """Bugün tavan yapan hisseleri getir"""
@@ -115,11 +168,29 @@ class BISTAnalyzer:
             # Tüm BİST hisselerinin verilerini çek
             all_data = self.data_fetcher.get_all_bist_data(period="1mo")
             
+            # Sıralamada zaten elenecek düşüş trendindekiler göstergelere girmez
+            survivors = self.prefilter.apply(list(all_data), frames=all_data)
+            all_data = {symbol: all_data[symbol] for symbol in survivors}
+            
             technical_results = []
             
             for symbol, data in all_data.items():
                 try:
-                    analysis = self.technical_analyzer.analyze_stock(symbol, data)
+                    # Aynı veri üzerinde analizi tekrar etme; seans içinde refresh_last_bar
+                    # son barı aynı tarih ve uzunlukla yeniden yazdığı için kapanış/hacim de anahtarda
+                    cache_key = ((data.index[-1], len(data), float(data['Close'].iloc[-1]),
+                                  float(data['Volume'].iloc[-1])) if len(data) else None)
+                    cached = self.indicator_cache.get(symbol)
+                    if cached is not None and cached[0] == cache_key:
+                        analysis = dict(cached[1])
+                        inc('cache_requests_total', cache='indicator', result='hit')
+                    else:
+                        started = time.perf_counter()
+                        analysis = self.technical_analyzer.analyze_stock(symbol, data)
+                        observe('symbol_latency_seconds', time.perf_counter() - started, stage='indicators')
+                        inc('cache_requests_total', cache='indicator', result='miss')
+                        if analysis:
+                            self.indicator_cache[symbol] = (cache_key, dict(analysis))
                     if analysis:
                         technical_results.append(analysis)
                         
@@ -157,8 +228,23 @@ class BISTAnalyzer:
             logger.error(f"Haber analizi hatası: {e}")
             return {'sentiment': {'sentiment': 'neutral', 'score': 0.5}, 'stock_mentions': {}}
     
+    def update_feature_store(self, news_analysis: Dict, market_info: Dict) -> Dict[str, float]:
+        """Günün özellik satırlarını ve gelen etiketleri depoya yaz; {sembol: olasılık} döndür"""
+        try:
+            all_data = self.data_fetcher.get_all_bist_data(period=HISTORY_PERIOD)
+            self.feature_store.append(
+                all_data,
+                sentiment_score=news_analysis.get('sentiment', {}).get('score', 0.5),
+                xu100_change=(market_info or {}).get('xu100_change', 0.0)
+            )
+            return self.prediction_model.predict_from_store()
+        except Exception as e:
+            logger.error(f"Özellik deposu hatası: {e}")
+            return {}
+    
     def predict_potential_ceiling_stocks(self, technical_analysis: List[Dict], 
-                                       news_analysis: Dict, market_info: Dict) -> List[Dict]:
+                                       news_analysis: Dict, market_info: Dict,
+                                       probabilities: Dict[str, float] = None) -> List[Dict]:
         """Potansiyel tavan yapabilecek hisseleri tahmin et"""
         logger.info("Tavan tahminleri yapılıyor...")
         try:
@@ -166,7 +252,7 @@ class BISTAnalyzer:
             
             # Hisseleri tahmin modeli ile değerlendir
             ranked_stocks = self.prediction_model.rank_stocks_by_potential(
-                technical_analysis, market_info, sentiment_score
+                technical_analysis, market_info, sentiment_score, probabilities
             )
             
             # En yüksek potansiyeli olanları seç (skor > 70) - daha katı filtre
@@ -182,6 +268,14 @@ class BISTAnalyzer:
             logger.error(f"Tahmin hatası: {e}")
             return []
     
+    def record_predictions(self, predictions: List[Dict], total_scanned: int):
+        """Tahminleri sonuç takibi için tarama geçmişine yaz"""
+        try:
+            self.history_store.record_scan('bist_analyzer', predictions, total_scanned,
+                                           score_key='prediction_score')
+        except Exception as e:
+            logger.error(f"Tahmin kaydetme hatası: {e}")
+    
     async def send_telegram_message(self, predictions: List[Dict], 
                                    market_info: Dict, news_analysis: Dict,
                                    todays_ceiling_stocks: List[Dict] = None):
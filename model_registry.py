@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Model Kayıt Defteri Modülü
+Bu modül eğitilmiş modelleri ölçekleyici (scaler), özellik listesi ve eğitim
+bilgileriyle birlikte sürümlü olarak saklar.
+
+Dizin yapısı:
+    models/<isim>/LATEST              -> son sürüm numarası
+    models/<isim>/v0001/meta.json     -> sürüm, özellikler, eğitim bilgileri
+    models/<isim>/v0001/artifacts.joblib
+    models/<isim>/v0001/compiled.npz      -> (isteğe bağlı) sklearn'siz değerlendirme için
+                                             düzleştirilmiş ağaçlar (bkz. compiled_trees)
+
+Artefaktlar joblib ile sıkıştırılmadan yazılır. joblib mmap_mode sadece düz
+numpy dizilerini (ör. ölçekleyici parametreleri) eşler; sklearn ağaçları
+yüklenirken düğüm dizilerini işleme özel belleğe kopyalar, yani işlemler arası
+paylaşılmaz. Paylaşım için compiled.npz kullanılır: load_compiled düz düğüm
+dizilerini dosyadan bellek eşlemeli açar ve aynı sürümü yükleyen işlemler
+bunları işletim sistemi sayfa önbelleği üzerinden paylaşır. Aynı işlem içinde
+yüklenen sürüm bellekte tek kopya olarak tutulur.
+"""
+
+import os
+import json
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+COMPILED_FILE = 'compiled.npz'
+
+# İşlem içi paylaşılan yüklenmiş artefaktlar: (kök, isim, sürüm) -> kayıt
+_LOADED: Dict[tuple, Dict[str, Any]] = {}
+_LOCK = threading.Lock()
+
+
+class ModelRegistry:
+    def __init__(self, root: str = "models"):
+        """Model kayıt defterini başlat"""
+        self.root = root
+
+    def _model_dir(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def _version_dir(self, name: str, version: int) -> str:
+        return os.path.join(self._model_dir(name), f"v{version:04d}")
+
+    def list_versions(self, name: str) -> List[int]:
+        """Kayıtlı sürümleri artan sırada döndür"""
+        model_dir = self._model_dir(name)
+        if not os.path.isdir(model_dir):
+            return []
+        versions = []
+        for entry in os.listdir(model_dir):
+            if entry.startswith('v') and entry[1:].isdigit():
+                if os.path.exists(os.path.join(model_dir, entry, 'meta.json')):
+                    versions.append(int(entry[1:]))
+        return sorted(versions)
+
+    def latest_version(self, name: str) -> Optional[int]:
+        """Son sürüm numarasını döndür (yoksa None)"""
+        latest_file = os.path.join(self._model_dir(name), 'LATEST')
+        try:
+            with open(latest_file, 'r') as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            versions = self.list_versions(name)
+            return versions[-1] if versions else None
+
+    def save(self, name: str, artifacts: Dict[str, Any],
+             feature_columns: Optional[List[str]] = None,
+             metadata: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Artefaktları yeni bir sürüm olarak kaydet ve sürüm numarasını döndür
+
+        artifacts: Birlikte saklanacak nesneler (ör. {'rf': ..., 'gb': ..., 'scaler': ...})
+        """
+        import joblib
+
+        versions = self.list_versions(name)
+        version = (versions[-1] + 1) if versions else 1
+        version_dir = self._version_dir(name, version)
+        os.makedirs(version_dir, exist_ok=False)
+
+        # mmap ile açılabilmesi için sıkıştırma kullanılmaz
+        joblib.dump(artifacts, os.path.join(version_dir, 'artifacts.joblib'), compress=0)
+
+        meta = {
+            'name': name,
+            'version': version,
+            'created_at': datetime.now().isoformat(),
+            'feature_columns': list(feature_columns or []),
+            'artifact_keys': sorted(artifacts.keys()),
+            'training': metadata or {},
+        }
+        with open(os.path.join(version_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2, default=str)
+
+        # LATEST dosyasını en son yaz: yarım kalan kayıt yüklenmez
+        latest_file = os.path.join(self._model_dir(name), 'LATEST')
+        tmp_file = f"{latest_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w') as f:
+            f.write(str(version))
+        os.replace(tmp_file, latest_file)
+
+        logger.info(f"Model kaydedildi: {name} v{version}")
+        return version
+
+    def metadata(self, name: str, version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Sadece meta bilgisini oku (artefaktları yüklemeden)"""
+        version = version or self.latest_version(name)
+        if version is None:
+            return None
+        try:
+            with open(os.path.join(self._version_dir(name, version), 'meta.json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except OSError:
+            return None
+
+    def load(self, name: str, version: Optional[int] = None,
+             mmap_mode: Optional[str] = 'r') -> Optional[Dict[str, Any]]:
+        """
+        Sürümü yükle: {'artifacts': ..., 'meta': ...}
+
+        Aynı işlemde daha önce yüklenmişse bellekteki kopya döndürülür.
+        """
+        version = version or self.latest_version(name)
+        if version is None:
+            return None
+
+        key = (os.path.abspath(self.root), name, version)
+        with _LOCK:
+            if key in _LOADED:
+                return _LOADED[key]
+
+            import joblib
+
+            meta = self.metadata(name, version)
+            path = os.path.join(self._version_dir(name, version), 'artifacts.joblib')
+            if meta is None or not os.path.exists(path):
+                logger.warning(f"Model sürümü eksik: {name} v{version}")
+                return None
+
+            artifacts = joblib.load(path, mmap_mode=mmap_mode)
+            record = {'artifacts': artifacts, 'meta': meta}
+            _LOADED[key] = record
+            logger.info(f"Model yüklendi: {name} v{version}")
+            return record
+
+    def save_compiled(self, name: str, version: int, compiled: Any) -> str:
+        """Derlenmiş topluluğu (CompiledEnsemble) mevcut sürümün yanına yaz"""
+        path = os.path.join(self._version_dir(name, version), COMPILED_FILE)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        compiled.save(tmp_path)
+        os.replace(tmp_path, path)
+        return path
+
+    def load_compiled(self, name: str, version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Derlenmiş sürümü sklearn yüklemeden aç: {'compiled': ..., 'meta': ...}
+
+        Sürüm derlenmemişse None döner (çağıran load() ile devam eder).
+        """
+        version = version or self.latest_version(name)
+        if version is None:
+            return None
+
+        key = (os.path.abspath(self.root), name, version, COMPILED_FILE)
+        with _LOCK:
+            if key in _LOADED:
+                return _LOADED[key]
+
+            path = os.path.join(self._version_dir(name, version), COMPILED_FILE)
+            meta = self.metadata(name, version)
+            if meta is None or not os.path.exists(path):
+                return None
+
+            from compiled_trees import CompiledEnsemble
+
+            record = {'compiled': CompiledEnsemble.load(path, mmap_mode='r'), 'meta': meta}
+            _LOADED[key] = record
+            logger.info(f"Derlenmiş model yüklendi: {name} v{version}")
+            return record
+
+    def preload(self, name: str, version: Optional[int] = None) -> bool:
+        """
+        Çalışan işlemleri başlatmadan önce modeli yükle
+
+        Derlenmiş sürüm varsa o yüklenir (düğüm dizileri sayfa önbelleğinden
+        paylaşılır); yoksa joblib artefaktları yüklenir ve fork ile açılan
+        işlemler bunları sadece yazma-anında-kopyalama ile paylaşır.
+        """
+        return self.load_compiled(name, version) is not None or self.load(name, version) is not None
+
+
+def clear_loaded_cache():
+    """İşlem içi yüklenmiş model önbelleğini temizle"""
+    with _LOCK:
+        _LOADED.clear()
@@ -4,13 +4,16 @@ Haber Analizi Modülü
 Bu modül finansal haberleri toplar ve analiz eder.
 """
 
-import requests
-from bs4 import BeautifulSoup
 import pandas as pd
 from datetime import datetime, timedelta
 import logging
 from typing import List, Dict, Any, Optional
 import re
+from lazy_imports import lazy_import
+import providers
+
+# Ağır bağımlılıklar ilk kullanımda yüklenir
+bs4 = lazy_import('bs4')
 
 logger = logging.getLogger(__name__)
 
@@ -78,10 +81,10 @@ class NewsAnalyzer:
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
             }
             
-            response = requests.get(self.news_sources['investing'], headers=headers, timeout=10)
+            response = providers.http_get(self.news_sources['investing'], headers=headers, timeout=10)
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = bs4.BeautifulSoup(response.content, 'html.parser')
                 
                 # Haber başlıklarını bul (site yapısına göre ayarlanabilir)
                 news_items = soup.find_all('article', class_='js-article-item')
@@ -118,10 +121,10 @@ class NewsAnalyzer:
             }
             
             # Bigpara API benzeri endpoint (gerçek bir endpoint olabilir)
-            response = requests.get(self.news_sources['bigpara'], headers=headers, timeout=10)
+            response = providers.http_get(self.news_sources['bigpara'], headers=headers, timeout=10)
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = bs4.BeautifulSoup(response.content, 'html.parser')
                 
                 # Haber başlıklarını bul
                 news_items = soup.find_all('h3')
@@ -10,6 +10,7 @@ import logging
 from typing import List, Dict, Any
 from datetime import datetime, timedelta
 from bist_data_fetcher import BISTDataFetcher
+from data_plan import DataRequest
 
 logger = logging.getLogger(__name__)
 
@@ -404,21 +405,31 @@ class NextWeekKingsPredictor:
         
         return bonus
     
-    def predict_next_week_kings(self) -> List[Dict[str, Any]]:
-        """Gelecek haftanın krallarını tahmin et"""
+    def all_candidates(self) -> Dict[str, str]:
+        """Analiz edilecek semboller ve kategorileri"""
+        return {
+            **{symbol: "current_king" for symbol in self.current_kings},
+            **{symbol: "strong_candidate" for symbol in self.strong_candidates},
+            **{symbol: "fresh_candidate" for symbol in self.fresh_candidates}
+        }
+    
+    def data_request(self) -> DataRequest:
+        """Sadece aday hisseler için 30 günlük veri ihtiyacı"""
+        return DataRequest(self.all_candidates().keys(), period="30d", requester="next_week_kings")
+    
+    def predict_next_week_kings(self, all_data: Dict[str, pd.DataFrame] = None) -> List[Dict[str, Any]]:
+        """Gelecek haftanın krallarını tahmin et (all_data: birleşik plandan gelen hazır veri)"""
         logger.info("Gelecek haftanın potansiyel tavan kralları tahmin ediliyor...")
         
-        # 30 günlük veri al
-        all_data = self.data_fetcher.get_all_bist_data(period="30d")
+        # 30 günlük veri sadece adaylar için alınır
+        if all_data is None:
+            request = self.data_request()
+            all_data = self.data_fetcher.fetch_requests([request])[request.requester]
         
         predictions = []
         
         # Tüm adayları analiz et
-        all_candidates = {
-            **{symbol: "current_king" for symbol in self.current_kings},
-            **{symbol: "strong_candidate" for symbol in self.strong_candidates},
-            **{symbol: "fresh_candidate" for symbol in self.fresh_candidates}
-        }
+        all_candidates = self.all_candidates()
         
         for symbol, category in all_candidates.items():
             symbol_with_suffix = symbol + '.IS'
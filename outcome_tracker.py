@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Tahmin Sonucu Takibi
+Tarayıcıların tarama geçmişine (scan_history) yazdığı tahminleri, hedef
+seansın gerçekleşen tavan etiketleriyle eşleştirir. Her güncellemede sadece
+yeni tahmin satırları değerlendirilir; sonuçlar tarayıcı / gün / skor dilimi
+bazında özet tablolara eklenir. Kayan pencere isabet, kesinlik (precision) ve
+duyarlılık (recall) değerleri bu özetlerden hesaplanır.
+
+Hedef seans: Seans kapanışından önce yapılan tahmin aynı günün, sonra
+yapılan tahmin bir sonraki işlem gününün tavanını tahmin eder.
+
+Kullanım:
+    tracker = OutcomeTracker(price_store=store)
+    tracker.update()                      # kapanıştan sonra
+    tracker.rolling_metrics(days=20)
+"""
+
+import sqlite3
+import logging
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from price_store import PriceStore, normalize_symbol
+from scan_journal import SESSION_CLOSE
+
+logger = logging.getLogger(__name__)
+
+# Kapanışın önceki kapanışa göre bu orandan fazla artması tavan sayılır
+CEILING_THRESHOLD = 0.095
+
+# Skor ölçeği 0-100 olmayan tarayıcılar için dilim genişliği
+BUCKET_WIDTHS = {'advanced': 1.0}
+DEFAULT_BUCKET_WIDTH = 10.0
+
+# Etiketi bu kadar işlem günü gelmeyen tahminler beklemeden çıkarılır
+LABEL_GRACE_DAYS = 5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_labels (
+    trade_date TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    limit_up INTEGER NOT NULL,
+    PRIMARY KEY (trade_date, symbol)
+);
+CREATE TABLE IF NOT EXISTS prediction_outcomes (
+    scanner TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    target_date TEXT NOT NULL,
+    score REAL,
+    bucket REAL,
+    hit INTEGER NOT NULL,
+    PRIMARY KEY (scanner, symbol, target_date)
+);
+CREATE TABLE IF NOT EXISTS outcome_daily (
+    scanner TEXT NOT NULL,
+    target_date TEXT NOT NULL,
+    predictions INTEGER NOT NULL DEFAULT 0,
+    hits INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (scanner, target_date)
+);
+CREATE TABLE IF NOT EXISTS outcome_bucket_daily (
+    scanner TEXT NOT NULL,
+    bucket REAL NOT NULL,
+    target_date TEXT NOT NULL,
+    predictions INTEGER NOT NULL DEFAULT 0,
+    hits INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (scanner, bucket, target_date)
+);
+CREATE TABLE IF NOT EXISTS tracker_state (
+    key TEXT PRIMARY KEY,
+    value INTEGER
+);
+"""
+
+
+def score_bucket(scanner: str, score: float) -> float:
+    width = BUCKET_WIDTHS.get(scanner, DEFAULT_BUCKET_WIDTH)
+    return float(int((score or 0) // width) * width)
+
+
+def limit_up_labels(frame: pd.DataFrame, threshold: float = CEILING_THRESHOLD) -> Dict[str, bool]:
+    """Günlük bar tablosundan {'YYYY-MM-DD': tavan mı} sözlüğü"""
+    if frame is None or len(frame) < 2:
+        return {}
+    change = frame['Close'].pct_change()
+    labels = (change >= threshold).iloc[1:]
+    return {ts.date().isoformat(): bool(flag) for ts, flag in labels.items()}
+
+
+class OutcomeTracker:
+    def __init__(self, db_path: str = "scan_history.db", price_store: Optional[PriceStore] = None):
+        """
+        db_path: Tarama geçmişi veritabanı (tahminler buradan okunur, özetler buraya yazılır)
+        price_store: Gerçekleşen fiyatlar için depo (verilmezse yeni bir depo açılır)
+        """
+        self.db_path = db_path
+        self.price_store = price_store or PriceStore(warmup_period="1mo")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _has_scan_results(self) -> bool:
+        return self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'scan_results'"
+        ).fetchone() is not None
+
+    def _watermark(self) -> int:
+        row = self.conn.execute("SELECT value FROM tracker_state WHERE key = 'last_rowid'").fetchone()
+        return row['value'] if row else 0
+
+    def refresh_labels(self, symbols: Iterable[str], period: str = "1mo") -> int:
+        """Sembollerin gerçekleşen tavan etiketlerini güncelle (tamamlanmış seanslar)"""
+        today = date.today().isoformat()
+        session_open = datetime.now().time() < SESSION_CLOSE
+        rows = []
+        for symbol in dict.fromkeys(normalize_symbol(s) for s in symbols):
+            frame = self.price_store.get_history(symbol, period)
+            for day, flag in limit_up_labels(frame).items():
+                # Bugünün barı seans bitmeden kesinleşmez
+                if day == today and session_open:
+                    continue
+                rows.append((day, symbol, int(flag)))
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO daily_labels (trade_date, symbol, limit_up) VALUES (?, ?, ?)", rows
+            )
+        return len(rows)
+
+    def _trading_days(self) -> List[str]:
+        return [row['trade_date'] for row in
+                self.conn.execute("SELECT DISTINCT trade_date FROM daily_labels ORDER BY trade_date")]
+
+    @staticmethod
+    def _target_date(scan_time: str, trading_days: List[str]) -> Optional[str]:
+        """Tahminin ait olduğu seans (etiketi henüz yoksa None)"""
+        scanned = datetime.fromisoformat(scan_time)
+        day = scanned.date().isoformat()
+        after_close = scanned.time() >= SESSION_CLOSE
+        for trade_day in trading_days:
+            if trade_day > day or (trade_day == day and not after_close):
+                return trade_day
+        return None
+
+    def update(self, universe: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """
+        Yeni tahmin satırlarını sonuçlandır ve özet tabloları artımlı güncelle
+
+        universe: Duyarlılık (recall) paydası için etiketlenecek semboller
+            (varsayılan: fiyat deposundaki tüm semboller)
+        """
+        if not self._has_scan_results():
+            return {'evaluated': 0, 'pending': 0}
+
+        watermark = self._watermark()
+        new_rows = self.conn.execute(
+            "SELECT rowid, scanner, scan_time, symbol, score FROM scan_results WHERE rowid > ? ORDER BY rowid",
+            (watermark,)
+        ).fetchall()
+        if not new_rows:
+            return {'evaluated': 0, 'pending': 0}
+
+        symbols = {row['symbol'] for row in new_rows}
+        symbols.update(normalize_symbol(s) for s in (universe or self.price_store.symbols()))
+        self.refresh_labels(symbols)
+
+        trading_days = self._trading_days()
+        labels = {}
+        evaluated = pending = 0
+        new_watermark = watermark
+        outcomes = []
+        stale_before = trading_days[-LABEL_GRACE_DAYS] if len(trading_days) >= LABEL_GRACE_DAYS else ''
+        for row in new_rows:
+            target = self._target_date(row['scan_time'], trading_days)
+            if target is None:
+                # Hedef seans henüz kapanmadı; sonraki güncellemede tekrar bakılır
+                pending += 1
+                continue
+            if target not in labels:
+                labels[target] = {r['symbol']: r['limit_up'] for r in self.conn.execute(
+                    "SELECT symbol, limit_up FROM daily_labels WHERE trade_date = ?", (target,))}
+            hit = labels[target].get(row['symbol'])
+            if hit is not None:
+                outcomes.append((row['scanner'], row['symbol'], target, row['score'],
+                                 score_bucket(row['scanner'], row['score']), int(hit)))
+            elif target >= stale_before:
+                # Fiyatı henüz gelmemiş sembol; uzun süre gelmezse (işlem durdurma, kotasyon dışı) atlanır
+                pending += 1
+                continue
+            if pending == 0:
+                new_watermark = row['rowid']
+
+        with self._lock, self.conn:
+            for outcome in outcomes:
+                scanner, symbol, target, score, bucket, hit = outcome
+                # Aynı gün birden çok taramada çıkan sembol bir kez sayılır
+                inserted = self.conn.execute(
+                    "INSERT OR IGNORE INTO prediction_outcomes (scanner, symbol, target_date, score, bucket, hit) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", outcome
+                ).rowcount
+                if not inserted:
+                    continue
+                evaluated += 1
+                self.conn.execute(
+                    "INSERT INTO outcome_daily (scanner, target_date, predictions, hits) VALUES (?, ?, 1, ?) "
+                    "ON CONFLICT(scanner, target_date) DO UPDATE SET "
+                    "predictions = predictions + 1, hits = hits + excluded.hits",
+                    (scanner, target, hit)
+                )
+                self.conn.execute(
+                    "INSERT INTO outcome_bucket_daily (scanner, bucket, target_date, predictions, hits) "
+                    "VALUES (?, ?, ?, 1, ?) ON CONFLICT(scanner, bucket, target_date) DO UPDATE SET "
+                    "predictions = predictions + 1, hits = hits + excluded.hits",
+                    (scanner, bucket, target, hit)
+                )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO tracker_state (key, value) VALUES ('last_rowid', ?)", (new_watermark,)
+            )
+
+        logger.info(f"Tahmin sonuçları: {evaluated} yeni satır değerlendirildi, {pending} bekliyor")
+        return {'evaluated': evaluated, 'pending': pending}
+
+    def rolling_metrics(self, days: int = 20, scanner: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Son 'days' işlem günü için tarayıcı bazında isabet / kesinlik / duyarlılık
+
+        precision = isabetli tahmin / tahmin
+        recall    = yakalanan tavan / o günlerdeki toplam tavan
+        """
+        since = (date.today() - timedelta(days=days)).isoformat()
+        query = ("SELECT d.scanner, SUM(d.predictions) AS predictions, SUM(d.hits) AS hits, "
+                 "SUM(c.ceilings) AS ceilings, COUNT(*) AS days "
+                 "FROM outcome_daily d JOIN ("
+                 "  SELECT trade_date, SUM(limit_up) AS ceilings FROM daily_labels "
+                 "  WHERE trade_date >= ? GROUP BY trade_date"
+                 ") c ON c.trade_date = d.target_date "
+                 "WHERE d.target_date >= ?")
+        params: List[Any] = [since, since]
+        if scanner:
+            query += " AND d.scanner = ?"
+            params.append(scanner)
+        query += " GROUP BY d.scanner ORDER BY d.scanner"
+
+        metrics = []
+        with self._lock:
+            rows = self.conn.execute(query, params).fetchall()
+        for row in rows:
+            predictions, hits, ceilings = row['predictions'] or 0, row['hits'] or 0, row['ceilings'] or 0
+            metrics.append({
+                'scanner': row['scanner'],
+                'days': row['days'],
+                'predictions': predictions,
+                'hits': hits,
+                'ceilings': ceilings,
+                'precision': hits / predictions if predictions else 0.0,
+                'recall': hits / ceilings if ceilings else 0.0,
+            })
+        return metrics
+
+    def bucket_metrics(self, scanner: str, days: int = 60) -> List[Dict[str, Any]]:
+        """Skor dilimi bazında isabet oranı (kalibrasyon tablosu)"""
+        since = (date.today() - timedelta(days=days)).isoformat()
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT bucket, SUM(predictions) AS predictions, SUM(hits) AS hits "
+                "FROM outcome_bucket_daily WHERE scanner = ? AND target_date >= ? "
+                "GROUP BY bucket ORDER BY bucket DESC",
+                (scanner, since)
+            ).fetchall()
+        return [
+            {
+                'bucket': row['bucket'],
+                'predictions': row['predictions'],
+                'hits': row['hits'],
+                'hit_rate': row['hits'] / row['predictions'] if row['predictions'] else 0.0,
+            }
+            for row in rows
+        ]
+
+    def format_summary(self, days: int = 20) -> str:
+        """Telegram / konsol için kısa performans özeti"""
+        metrics = self.rolling_metrics(days)
+        if not metrics:
+            return "📉 Henüz sonuçlanmış tahmin yok."
+        message = f"📈 TAHMİN PERFORMANSI (son {days} gün)\n"
+        for m in metrics:
+            message += (f"• {m['scanner']}: isabet %{m['precision'] * 100:.0f} "
+                        f"({m['hits']}/{m['predictions']}), yakalanan tavan %{m['recall'] * 100:.0f}\n")
+        return message
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    tracker = OutcomeTracker()
+    tracker.update()
+    print(tracker.format_summary())
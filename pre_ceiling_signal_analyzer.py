@@ -10,6 +10,7 @@ import logging
 from typing import List, Dict, Any
 from bist_data_fetcher import BISTDataFetcher
 from technical_analyzer import TechnicalAnalyzer
+from event_windows import EventWindows, pre_ceiling_features
 
 logger = logging.getLogger(__name__)
 
@@ -26,106 +27,18 @@ class PreCeilingSignalAnalyzer:
         # Tüm BİST hisselerinin verilerini çek
         all_data = self.data_fetcher.get_all_bist_data(period=f"{days_back + 5}d")
         
-        pre_ceiling_data = []
-        
-        for symbol, data in all_data.items():
-            if data.empty or len(data) < 10:
-                continue
-                
-            try:
-                # Tavan günlerini bul
-                for i in range(5, len(data)):  # En az 5 gün önceki veri olsun
-                    current_price = data['Close'].iloc[i]
-                    previous_price = data['Close'].iloc[i-1]
-                    
-                    if previous_price == 0:
-                        continue
-                        
-                    daily_change = ((current_price - previous_price) / previous_price) * 100
-                    
-                    # Tavan günü mü? (%9+ artış)
-                    if daily_change >= 9.0:
-                        # Tavan öncesi 1-4 gün arası verileri analiz et
-                        for days_before in range(1, 5):
-                            pre_index = i - days_before
-                            
-                            if pre_index < 20:  # Yeterli geçmiş veri yoksa geç
-                                continue
-                                
-                            # Tavan öncesi günün verileri
-                            pre_data = data.iloc[pre_index-19:pre_index+1]  # 20 günlük window
-                            
-                            if len(pre_data) < 20:
-                                continue
-                                
-                            # O günün fiyat bilgileri
-                            pre_close = data['Close'].iloc[pre_index]
-                            pre_volume = data['Volume'].iloc[pre_index]
-                            pre_high = data['High'].iloc[pre_index]
-                            pre_low = data['Low'].iloc[pre_index]
-                            
-                            # Önceki günle karşılaştırma
-                            if pre_index > 0:
-                                prev_close = data['Close'].iloc[pre_index-1] 
-                                prev_volume = data['Volume'].iloc[pre_index-1]
-                                pre_daily_change = ((pre_close - prev_close) / prev_close * 100) if prev_close > 0 else 0
-                            else:
-                                prev_close = pre_close
-                                prev_volume = pre_volume
-                                pre_daily_change = 0
-                            
-                            # Volume analizi
-                            if pre_index >= 20:
-                                avg_volume_20 = data['Volume'].iloc[pre_index-20:pre_index].mean()
-                                volume_ratio = pre_volume / avg_volume_20 if avg_volume_20 > 0 else 1
-                            else:
-                                volume_ratio = 1
-                                
-                            # Son 5 gün momentum
-                            momentum_5d = []
-                            for j in range(max(0, pre_index-5), pre_index):
-                                if j > 0:
-                                    momentum_change = ((data['Close'].iloc[j] - data['Close'].iloc[j-1]) / data['Close'].iloc[j-1] * 100)
-                                    momentum_5d.append(momentum_change)
-                            
-                            avg_momentum_5d = np.mean(momentum_5d) if momentum_5d else 0
-                            
-                            # RSI hesapla (basit)
-                            rsi_window = min(14, pre_index)
-                            if pre_index >= rsi_window:
-                                closes = data['Close'].iloc[pre_index-rsi_window:pre_index+1]
-                                gains = closes.diff().clip(lower=0)
-                                losses = (-closes.diff()).clip(lower=0)
-                                avg_gain = gains.mean()
-                                avg_loss = losses.mean()
-                                
-                                if avg_loss == 0:
-                                    rsi = 100
-                                else:
-                                    rs = avg_gain / avg_loss
-                                    rsi = 100 - (100 / (1 + rs))
-                            else:
-                                rsi = 50
-                                
-                            pre_ceiling_data.append({
-                                'symbol': symbol.replace('.IS', ''),
-                                'days_before_ceiling': days_before,
-                                'ceiling_date': data.index[i],
-                                'ceiling_change': daily_change,
-                                'pre_date': data.index[pre_index],
-                                'pre_price': pre_close,
-                                'pre_volume': pre_volume,
-                                'volume_ratio': volume_ratio,
-                                'pre_daily_change': pre_daily_change,
-                                'avg_momentum_5d': avg_momentum_5d,
-                                'rsi': rsi,
-                                'price_range': pre_close,
-                                'volume_momentum': pre_volume / prev_volume if prev_volume > 0 else 1
-                            })
-                            
-            except Exception as e:
-                logger.debug(f"{symbol} pre-ceiling analiz hatası: {e}")
-                continue
+        # Tavan günlerinden (%9+ artış) 1-4 gün öncesi, en az 20 gün geçmişle;
+        # tüm pencereler olay penceresi çıkarıcısıyla tek geçişte çıkarılır
+        features = pre_ceiling_features(EventWindows.from_frames(all_data, min_rows=10))
+        events = features.events(min_row=5)
+        frame = features.to_frame(events, lags=(1, 2, 3, 4), min_row=20)
+        frame = frame.rename(columns={'close': 'pre_price', 'volume': 'pre_volume',
+                                      'daily_change': 'pre_daily_change', 'momentum_5d': 'avg_momentum_5d'})
+        frame['price_range'] = frame['pre_price']
+        columns = ['symbol', 'days_before_ceiling', 'ceiling_date', 'ceiling_change', 'pre_date', 'pre_price',
+                   'pre_volume', 'volume_ratio', 'pre_daily_change', 'avg_momentum_5d', 'rsi', 'price_range',
+                   'volume_momentum']
+        pre_ceiling_data = frame[columns].to_dict('records')
                 
         logger.info(f"Toplam {len(pre_ceiling_data)} tavan öncesi veri noktası bulundu")
         return pre_ceiling_data
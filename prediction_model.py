@@ -6,24 +6,48 @@ Bu modül makine öğrenmesi ile tavan yapabilecek hisseleri tahmin eder.
 
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Iterable, Tuple
 import pickle
 import os
+import time
+from datetime import datetime
+from model_registry import ModelRegistry
+from compiled_trees import compile_models
+from price_store import normalize_symbol
+from lazy_imports import lazy_import
+from tracing import set_gauge
+
+# sklearn sadece eğitim veya kayıtlı model kullanımında yüklenir
+sklearn_ensemble = lazy_import('sklearn.ensemble')
+sklearn_preprocessing = lazy_import('sklearn.preprocessing')
+sklearn_model_selection = lazy_import('sklearn.model_selection')
 
 logger = logging.getLogger(__name__)
 
+# Özellik deposundan eğitilen modellerin meta 'source' değerleri
+STORE_SOURCES = ('feature_store', 'feature_store_chunks')
+
 class StockPredictionModel:
-    def __init__(self):
-        """Tahmin modeli sınıfını başlat"""
+    def __init__(self, feature_store=None):
+        """
+        Tahmin modeli sınıfını başlat
+
+        feature_store: Günlük özellik deposu (DailyFeatureStore); verilirse eğitim
+        ve toplu tahmin depodaki hazır diziden yapılabilir
+        """
         self.model = None
-        self.scaler = StandardScaler()
+        self.scaler = None  # Eğitimde veya model yüklenirken atanır
+        self.compiled = None  # sklearn'siz değerlendirme (bkz. compiled_trees)
+        self.training_source = None  # Eğitim verisinin kaynağı (kayıt meta bilgisinden)
         self.feature_columns = []
         self.model_trained = False
-        self.model_file = "stock_prediction_model.pkl"
+        self.model_file = "stock_prediction_model.pkl"  # Eski tek dosyalık kayıt
+        self.model_name = "stock_prediction"
+        self.model_version = None
+        self.registry = ModelRegistry()
+        self.feature_store = feature_store
+        self._load_attempted = False
         
         # YENİ! Genişletilmiş özellik isimleri
         self.base_features = [
@@ -32,8 +56,9 @@ class StockPredictionModel:
             'ceiling_score', 'momentum_score', 'pattern_score', 'sentiment_score', 
             'xu100_change', 'volatility', 'momentum_continuation'
         ]
+        self.feature_columns = list(self.base_features)
         
-        self._load_model()
+        # Model ilk tahminde yüklenir (bkz. _ensure_model_loaded)
     
     def create_features(self, analysis_data: Dict[str, Any], 
                        market_info: Dict[str, Any] = None,
@@ -116,31 +141,161 @@ class StockPredictionModel:
     
     def train_model(self, historical_data: List[Dict[str, Any]]) -> bool:
         """Modeli eğit"""
+        # Veri hazırlama
+        X, y = self.prepare_training_data(historical_data)
+        return self._fit(X, y)
+    
+    def train_from_store(self, start: Optional[str] = None, end: Optional[str] = None) -> bool:
+        """Modeli özellik deposundaki etiketli satırlarla eğit (start / end: 'YYYY-MM-DD', end hariç)"""
+        if self.feature_store is None:
+            logger.warning("Özellik deposu tanımlı değil")
+            return False
+        X, y, dates, _ = self.feature_store.training_matrix(start, end, columns=self.feature_columns)
+        return self._fit(X, y, {'source': 'feature_store',
+                                'first_date': str(dates[0]) if len(dates) else None,
+                                'last_date': str(dates[-1]) if len(dates) else None})
+    
+    def train_out_of_core(self, chunk_source: Callable[[], Iterable[Tuple[np.ndarray, np.ndarray]]] = None,
+                          chunk_rows: int = 250_000, n_estimators: int = 100, n_stages: int = 100,
+                          holdout_fraction: float = 0.2) -> Optional[Dict[str, Any]]:
+        """
+        Belleğe sığmayan veri setleriyle parçalı eğitim
+        
+        chunk_source: Her çağrıda (X, y) parçalarını tarih sırasında veren fonksiyon
+        (varsayılan: özellik deposunun iter_training_chunks'ı). İlk geçişte ölçekleyici
+        partial_fit ile öğrenilir; ikinci geçişte her parça ormana yeni ağaçlar, boosting
+        modeline yeni aşamalar ekler (warm_start). Ağaç / aşama artışları toplam
+        n_estimators / n_stages'e (_fit ile aynı, 100) ulaşacak şekilde parça sayısına
+        bölünür. Son parçanın en fazla holdout_fraction kadar satırı zaman sıralı
+        doğrulamada skorlanır, ardından en güncel veri modelden eksik kalmasın diye
+        o satırlarla da eğitilir. Dönüş: eğitim raporu (satır/sn dahil); eğitim
+        yapılamazsa None.
+        """
+        if chunk_source is None:
+            if self.feature_store is None:
+                logger.warning("Özellik deposu tanımlı değil")
+                return None
+            chunk_source = lambda: self.feature_store.iter_training_chunks(chunk_rows, columns=self.feature_columns)
+        
+        started = time.perf_counter()
+        logger.info("Parçalı model eğitimi başlatılıyor...")
+        
+        # 1. geçiş: ölçekleyici ve parça etiketleri (artış sayısı için)
+        scaler = sklearn_preprocessing.StandardScaler()
+        labels = []
+        for X, y in chunk_source():
+            scaler.partial_fit(X)
+            labels.append(np.asarray(y))
+        n_chunks = len(labels)
+        rows = sum(len(y) for y in labels)
+        positives = int(sum(np.sum(y) for y in labels))
+        if rows < 50 or not positives:
+            logger.warning("Eğitim için yeterli veri yok")
+            return None
+        
+        # Doğrulama: son parçanın sonu, toplam satırların en fazla holdout_fraction'ı
+        holdout_rows = min(len(labels[-1]), max(1, int(rows * holdout_fraction)))
+        pieces = list(labels[:-1]) + [labels[-1][:len(labels[-1]) - holdout_rows], labels[-1][-holdout_rows:]]
+        increments = max(1, sum(len(np.unique(y)) >= 2 for y in pieces))
+        trees_per_increment = int(np.ceil(n_estimators / increments))
+        stages_per_increment = int(np.ceil(n_stages / increments))
+        rf_model = sklearn_ensemble.RandomForestClassifier(
+            n_estimators=0, max_depth=10, random_state=42, warm_start=True
+        )
+        gb_model = sklearn_ensemble.GradientBoostingClassifier(
+            n_estimators=0, max_depth=6, random_state=42, warm_start=True
+        )
+        
+        def fit_increment(X: np.ndarray, y: np.ndarray) -> bool:
+            if len(np.unique(y)) < 2:
+                return False
+            rf_model.n_estimators += trees_per_increment
+            gb_model.n_estimators += stages_per_increment
+            rf_model.fit(X, y)
+            gb_model.fit(X, y)
+            return True
+        
+        # 2. geçiş: parça parça eğitim
+        fit_started = time.perf_counter()
+        trained_rows = 0
+        holdout = None
+        for index, (X, y) in enumerate(chunk_source()):
+            X = scaler.transform(X)
+            if index == n_chunks - 1:
+                split = len(X) - holdout_rows
+                X, y, holdout = X[:split], y[:split], (X[split:], y[split:])
+            if not len(X) or not fit_increment(X, y):
+                logger.debug(f"Parça {index + 1} tek sınıf içeriyor, atlandı")
+                continue
+            trained_rows += len(X)
+            logger.info(f"Parça {index + 1}/{n_chunks}: {trained_rows} satır "
+                        f"({trained_rows / (time.perf_counter() - fit_started):.0f} satır/sn)")
+        
+        # Doğrulama skorları en güncel satırlar eğitime katılmadan önce alınır
+        scores = {}
+        if holdout is not None and trained_rows:
+            scores['rf_accuracy'] = float(rf_model.score(*holdout))
+            scores['gb_accuracy'] = float(gb_model.score(*holdout))
+            logger.info(f"Random Forest doğruluk: {scores['rf_accuracy']:.3f}")
+            logger.info(f"Gradient Boosting doğruluk: {scores['gb_accuracy']:.3f}")
+        if holdout is not None and fit_increment(*holdout):
+            trained_rows += len(holdout[0])
+        fit_seconds = time.perf_counter() - fit_started
+        if not trained_rows:
+            logger.warning("İki sınıf içeren eğitim parçası yok")
+            return None
+        
+        self.scaler = scaler
+        self.model = {'rf': rf_model, 'gb': gb_model, 'scaler': scaler}
+        self.compiled = None  # _save_model yeniden derler
+        report = {
+            'trained_at': datetime.now().isoformat(),
+            'source': 'feature_store_chunks',
+            'rows': int(rows),
+            'positive_rows': int(positives),
+            'trained_rows': int(trained_rows),
+            'chunks': int(n_chunks),
+            'holdout_rows': int(holdout_rows),
+            'rf_trees': int(rf_model.n_estimators),
+            'gb_stages': int(gb_model.n_estimators),
+            'seconds': round(time.perf_counter() - started, 1),
+            'rows_per_second': round(trained_rows / fit_seconds, 1) if fit_seconds else None,
+        }
+        report.update(scores)
+        logger.info(f"Parçalı eğitim: {trained_rows} satır, {report['seconds']} sn "
+                    f"({report['rows_per_second']} satır/sn)")
+        set_gauge('training_rows_per_second', report['rows_per_second'] or 0.0, model=self.model_name)
+        
+        self.model_trained = True
+        self._load_attempted = True
+        self._save_model(report)
+        return report
+    
+    def _fit(self, X: np.ndarray, y: np.ndarray, training_info: Dict[str, Any] = None) -> bool:
+        """Hazır (X, y) dizileriyle ensemble modeli eğit ve kaydet"""
         try:
             logger.info("Model eğitimi başlatılıyor...")
             
-            # Veri hazırlama
-            X, y = self.prepare_training_data(historical_data)
-            
             if len(X) < 50:  # Minimum veri kontrolü
                 logger.warning("Eğitim için yeterli veri yok")
                 return False
             
             # Veriyi ölçekle
+            self.scaler = sklearn_preprocessing.StandardScaler()
             X_scaled = self.scaler.fit_transform(X)
             
             # Eğitim/test ayırma
-            X_train, X_test, y_train, y_test = train_test_split(
+            X_train, X_test, y_train, y_test = sklearn_model_selection.train_test_split(
                 X_scaled, y, test_size=0.2, random_state=42
             )
             
             # Model oluştur (Random Forest + Gradient Boosting ensemble)
-            rf_model = RandomForestClassifier(
+            rf_model = sklearn_ensemble.RandomForestClassifier(
                 n_estimators=100, 
                 max_depth=10, 
                 random_state=42
             )
-            gb_model = GradientBoostingClassifier(
+            gb_model = sklearn_ensemble.GradientBoostingClassifier(
                 n_estimators=100, 
                 max_depth=6, 
                 random_state=42
@@ -156,6 +311,7 @@ class StockPredictionModel:
                 'gb': gb_model,
                 'scaler': self.scaler
             }
+            self.compiled = None  # _save_model yeniden derler
             
             # Test skorları
             rf_score = rf_model.score(X_test, y_test)
@@ -165,7 +321,15 @@ class StockPredictionModel:
             logger.info(f"Gradient Boosting doğruluk: {gb_score:.3f}")
             
             self.model_trained = True
-            self._save_model()
+            self._load_attempted = True
+            self._save_model({
+                'trained_at': datetime.now().isoformat(),
+                'rows': int(len(X)),
+                'positive_rows': int(np.sum(y)),
+                'rf_accuracy': float(rf_score),
+                'gb_accuracy': float(gb_score),
+                **(training_info or {}),
+            })
             
             return True
             
@@ -173,11 +337,27 @@ class StockPredictionModel:
             logger.error(f"Model eğitim hatası: {e}")
             return False
     
+    def evaluate_walk_forward(self, historical_data: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+        """Zaman sıralı walk-forward değerlendirmesi yap (her veri noktasında 'date' olmalı)"""
+        from walk_forward import walk_forward_evaluate
+        
+        X, y = self.prepare_training_data(historical_data)
+        dates = np.array([str(data_point.get('date', ''))[:10] for data_point in historical_data])
+        
+        result = walk_forward_evaluate(X, y, dates, **kwargs)
+        summary = result['summary']
+        if summary:
+            logger.info(f"Walk-forward: {summary['scored_folds']} katman, "
+                        f"precision {summary['mean_precision'] or 0:.3f}, "
+                        f"recall {summary['mean_recall'] or 0:.3f}")
+        return result
+    
     def predict_ceiling_probability(self, analysis_data: Dict[str, Any],
                                   market_info: Dict[str, Any] = None,
                                   sentiment_score: float = 0.5) -> float:
         """Tavan yapma olasılığını tahmin et"""
-        if not self.model_trained or not self.model:
+        self._ensure_model_loaded()
+        if not self._has_model():
             # Model eğitilmemişse basit heuristik kullan
             return self._simple_heuristic_prediction(analysis_data, sentiment_score)
         
@@ -186,22 +366,52 @@ class StockPredictionModel:
             features = self.create_features(analysis_data, market_info, sentiment_score)
             features_array = np.array([features])
             
-            # Özellikleri ölçekle
-            features_scaled = self.scaler.transform(features_array)
-            
-            # Her iki modelden tahmin al
-            rf_prob = self.model['rf'].predict_proba(features_scaled)[0][1]
-            gb_prob = self.model['gb'].predict_proba(features_scaled)[0][1]
-            
             # Ensemble tahmini (ağırlıklı ortalama)
-            ensemble_prob = (rf_prob * 0.6 + gb_prob * 0.4)
-            
-            return float(ensemble_prob)
+            return float(self._ensemble_proba(features_array)[0])
             
         except Exception as e:
             logger.error(f"Tahmin hatası: {e}")
             return self._simple_heuristic_prediction(analysis_data, sentiment_score)
     
+    def predict_batch(self, X: np.ndarray) -> Optional[np.ndarray]:
+        """(satır, özellik) dizisi için ensemble tavan olasılıkları; model yoksa None"""
+        self._ensure_model_loaded()
+        if not self._has_model() or not len(X):
+            return None
+        return self._ensemble_proba(X)
+    
+    @property
+    def trained_on_store(self) -> bool:
+        """Model özellik deposunun (6 aylık geçmişle hesaplanan) satırlarıyla mı eğitildi"""
+        self._ensure_model_loaded()
+        return self._has_model() and self.training_source in STORE_SOURCES
+    
+    def _has_model(self) -> bool:
+        return self.model_trained and (self.compiled is not None or bool(self.model))
+    
+    def _ensemble_proba(self, X: np.ndarray) -> np.ndarray:
+        """0.6 x RF + 0.4 x GB; derlenmiş kopya varsa sklearn'siz (sonuç birebir aynı)"""
+        if self.compiled is not None:
+            return self.compiled.positive_proba(X)
+        X_scaled = self.scaler.transform(X)
+        rf_prob = self.model['rf'].predict_proba(X_scaled)[:, 1]
+        gb_prob = self.model['gb'].predict_proba(X_scaled)[:, 1]
+        return rf_prob * 0.6 + gb_prob * 0.4
+    
+    def predict_from_store(self, day: Optional[str] = None) -> Dict[str, float]:
+        """Özellik deposundaki bir günün (varsayılan: en son gün) tüm sembolleri için olasılıklar"""
+        if self.feature_store is None:
+            return {}
+        try:
+            X, symbols, _ = self.feature_store.inference_matrix(day, columns=self.feature_columns)
+            probabilities = self.predict_batch(X)
+        except Exception as e:
+            logger.error(f"Toplu tahmin hatası: {e}")
+            return {}
+        if probabilities is None:
+            return {}
+        return dict(zip(symbols, probabilities.astype(float).tolist()))
+    
     def _simple_heuristic_prediction(self, analysis_data: Dict[str, Any], 
                                    sentiment_score: float) -> float:
         """YENİ GELİŞMİŞ TAHMİN - Volume momentum + Pattern recognition"""
@@ -367,24 +577,73 @@ class StockPredictionModel:
                       'ADGYO', 'IZINV']  # IZINV de momentum hissesi oldu
         return symbol in speculative
     
-    def _save_model(self):
-        """Modeli kaydet"""
+    def _save_model(self, training_info: Dict[str, Any] = None):
+        """Model, scaler ve özellik listesini sürümlü olarak kaydet"""
+        self.training_source = (training_info or {}).get('source')
         try:
-            with open(self.model_file, 'wb') as f:
-                pickle.dump(self.model, f)
-            logger.info("Model kaydedildi")
+            artifacts = {
+                'rf': self.model['rf'],
+                'gb': self.model['gb'],
+                'scaler': self.scaler
+            }
+            self.model_version = self.registry.save(
+                self.model_name, artifacts,
+                feature_columns=self.feature_columns,
+                metadata=training_info
+            )
         except Exception as e:
             logger.error(f"Model kaydetme hatası: {e}")
+            return
+        
+        # Daemon / cron tahminleri sklearn yüklemeden derlenmiş kopyayı kullanır
+        try:
+            self.compiled = compile_models([(0.6, self.model['rf']), (0.4, self.model['gb'])],
+                                           scaler=self.scaler)
+            self.registry.save_compiled(self.model_name, self.model_version, self.compiled)
+        except Exception as e:
+            logger.warning(f"Model derlenemedi, sklearn ile tahmin yapılacak: {e}")
+    
+    def _ensure_model_loaded(self):
+        """Modeli ilk ihtiyaçta bir kez yükle"""
+        if self._load_attempted:
+            return
+        self._load_attempted = True
+        self._load_model()
     
     def _load_model(self):
-        """Modeli yükle"""
+        """Modeli yükle (önce derlenmiş kopya, sonra kayıt defteri, yoksa eski pickle dosyası)"""
         try:
+            compiled = self.registry.load_compiled(self.model_name)
+            if compiled is not None:
+                self.compiled = compiled['compiled']
+                self.feature_columns = compiled['meta'].get('feature_columns') or self.feature_columns
+                self.model_version = compiled['meta'].get('version')
+                self.training_source = (compiled['meta'].get('training') or {}).get('source')
+                self.model_trained = True
+                return
+            
+            record = self.registry.load(self.model_name)
+            if record is not None:
+                artifacts = record['artifacts']
+                self.model = artifacts
+                self.scaler = artifacts.get('scaler', self.scaler)
+                self.feature_columns = record['meta'].get('feature_columns') or self.feature_columns
+                self.model_version = record['meta'].get('version')
+                self.training_source = (record['meta'].get('training') or {}).get('source')
+                self.model_trained = True
+                return
+            
             if os.path.exists(self.model_file):
                 with open(self.model_file, 'rb') as f:
-                    self.model = pickle.load(f)
-                self.scaler = self.model.get('scaler', StandardScaler())
-                self.model_trained = True
-                logger.info("Model yüklendi")
+                    loaded = pickle.load(f)
+                # Eski kayıtlar bazen sadece modeli içeriyordu
+                if isinstance(loaded, dict) and 'rf' in loaded and 'gb' in loaded:
+                    self.model = loaded
+                    self.scaler = loaded.get('scaler', self.scaler)
+                    self.model_trained = True
+                    logger.info("Model eski dosyadan yüklendi")
+                else:
+                    logger.warning("Eski model dosyası scaler içermiyor - heuristik kullanılacak")
             else:
                 logger.info("Kayıtlı model bulunamadı")
         except Exception as e:
@@ -392,8 +651,19 @@ class StockPredictionModel:
     
     def rank_stocks_by_potential(self, stocks_analysis: List[Dict[str, Any]],
                                market_info: Dict[str, Any] = None,
-                               sentiment_score: float = 0.5) -> List[Dict[str, Any]]:
-        """Hisseleri gerçek tavan potansiyellerine göre sırala"""
+                               sentiment_score: float = 0.5,
+                               probabilities: Dict[str, float] = None) -> List[Dict[str, Any]]:
+        """
+        Hisseleri gerçek tavan potansiyellerine göre sırala
+
+        probabilities: Özellik deposundan toplu hesaplanmış {sembol: olasılık};
+        içinde olmayan hisseler tek tek tahmin edilir. Model depodan eğitildiyse
+        tek tek tahmin (1 aylık analiz sözlüğü, farklı girdi dağılımı) yapılmaz:
+        depo tahmini varken depoda olmayan hisseler atlanır, hiç yoksa heuristik
+        kullanılır.
+        """
+        probabilities = probabilities or {}
+        store_model = self.trained_on_store
         ranked_stocks = []
         
         # Piyasa durumunu kontrol et
@@ -411,9 +681,16 @@ class StockPredictionModel:
                 if price_change_1d < -3.0 or price_change_5d < -8.0:
                     continue
                 
-                ceiling_prob = self.predict_ceiling_probability(
-                    stock_data, market_info, sentiment_score
-                )
+                ceiling_prob = probabilities.get(normalize_symbol(stock_data.get('symbol', '')))
+                if ceiling_prob is None and store_model:
+                    if probabilities:
+                        logger.debug(f"{stock_data.get('symbol')} özellik deposunda yok, atlandı")
+                        continue
+                    ceiling_prob = self._simple_heuristic_prediction(stock_data, sentiment_score)
+                elif ceiling_prob is None:
+                    ceiling_prob = self.predict_ceiling_probability(
+                        stock_data, market_info, sentiment_score
+                    )
                 
                 # Piyasa cezası uygula
                 ceiling_prob = max(0.0, ceiling_prob - market_penalty)
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Ucuz Ön Süzgeç (Pre-filter) Modülü
+Pahalı aşamalardan (talib göstergeleri, ticker.info, model) önce tüm evrenin
+son bar ölçütlerini fiyat paneli üzerinde tek bir vektörel geçişte hesaplar
+ve sadece hareketli sembolleri sonraki aşamaya bırakır:
+
+    change_1d              Son günlük değişim (%)
+    change_5d              5 günlük değişim (%)
+    volume_ratio           Son hacim / önceki 20 gün ortalaması
+    range_pct              Son gün (Yüksek - Düşük) / Kapanış (%)
+    resistance_proximity   Son kapanış / önceki 20 günün en yükseği (%)
+
+Zorunlu koşullar (fiyat bandı, asgari geçmiş, düşüş sınırları) hepsi
+sağlanmalıdır; hareket ölçütlerinden (activity) en az biri sağlanmalıdır.
+
+Gölge modunda (shadow=True veya BIST_PREFILTER_SHADOW=1) hiçbir sembol
+elenmez; tarama bitince elenecek olanlar arasında nihai eşiği geçen aday
+olup olmadığı (recall) raporlanır. Eşikler bu raporla ayarlanır.
+"""
+
+import os
+import time
+import logging
+import warnings
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from price_panel import PricePanel
+from price_store import PriceStore, normalize_symbol
+from tracing import inc, set_gauge
+
+logger = logging.getLogger(__name__)
+
+FEATURES = ('change_1d', 'change_5d', 'volume_ratio', 'range_pct', 'resistance_proximity')
+LOOKBACK = 20
+
+# Tarayıcı bazlı varsayılan ölçütler (nihai skor eşiklerine göre geniş tutulmuştur)
+PRESETS: Dict[str, Dict[str, Any]] = {
+    # hybrid_score >= 30
+    'hybrid': {
+        'min_history': 10,
+        'activity': {'change_1d': 2.0, 'change_5d': 4.0, 'volume_ratio': 1.2,
+                     'range_pct': 5.0, 'resistance_proximity': 90.0},
+    },
+    # total_score >= 2.0 (ticker.info çağrısı da sadece kalanlar için yapılır)
+    'advanced': {
+        'min_history': 14,
+        'activity': {'change_1d': 3.0, 'change_5d': 5.0, 'volume_ratio': 1.5, 'range_pct': 5.0},
+    },
+    # rank_stocks_by_potential'ın düşüş eleme kuralının aynısı (recall kaybı yok)
+    'bist_analyzer': {
+        'min_history': 2,
+        'min_change_1d': -3.0,
+        'min_change_5d': -8.0,
+    },
+    # Ek adaylarda olasılık >= 60
+    'today_ceiling': {
+        'min_history': 30,
+        'activity': {'change_1d': 1.0, 'change_5d': 3.0, 'volume_ratio': 1.2},
+    },
+}
+
+
+def last_bar_features(panel: PricePanel, lookback: int = LOOKBACK) -> pd.DataFrame:
+    """Paneldeki her sembolün son bar ölçütleri (tek vektörel geçiş)"""
+    if len(panel) == 0:
+        return pd.DataFrame(columns=('history', 'price') + FEATURES)
+
+    close = panel.column('Close').astype(np.float64)
+    high = panel.column('High').astype(np.float64)
+    low = panel.column('Low').astype(np.float64)
+    volume = panel.column('Volume').astype(np.float64)
+
+    valid = ~np.isnan(close)
+    n_days = close.shape[1]
+    rows = np.arange(close.shape[0])
+    # Her sembolün son geçerli günü (listeden çıkmış semboller için daha erken olabilir)
+    last = n_days - 1 - np.argmax(valid[:, ::-1], axis=1)
+
+    def at(values: np.ndarray, offset: int) -> np.ndarray:
+        index = last - offset
+        out = values[rows, np.clip(index, 0, None)]
+        return np.where(index >= 0, out, np.nan)
+
+    def window(values: np.ndarray) -> np.ndarray:
+        index = last[:, None] - np.arange(1, lookback + 1)
+        out = values[rows[:, None], np.clip(index, 0, None)]
+        return np.where(index >= 0, out, np.nan)
+
+    price = at(close, 0)
+    # Tamamen boş pencereler (yeni listelenen semboller) NaN üretir
+    with np.errstate(divide='ignore', invalid='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        change_1d = (price / at(close, 1) - 1) * 100
+        change_5d = (price / at(close, 5) - 1) * 100
+        average_volume = np.nanmean(window(volume), axis=1)
+        volume_ratio = np.where(average_volume > 0, at(volume, 0) / average_volume, np.nan)
+        range_pct = (at(high, 0) - at(low, 0)) / price * 100
+        resistance_proximity = price / np.nanmax(window(high), axis=1) * 100
+
+    return pd.DataFrame({
+        'history': valid.sum(axis=1),
+        'price': price,
+        'change_1d': change_1d,
+        'change_5d': change_5d,
+        'volume_ratio': volume_ratio,
+        'range_pct': range_pct,
+        'resistance_proximity': resistance_proximity,
+    }, index=panel.symbols)
+
+
+class PreFilter:
+    def __init__(self, name: str = '', min_history: int = 2, min_price: float = 0.0,
+                 max_price: float = np.inf, min_change_1d: float = -np.inf,
+                 min_change_5d: float = -np.inf, activity: Optional[Dict[str, float]] = None,
+                 shadow: Optional[bool] = None):
+        """
+        name: Raporlarda ve metriklerde kullanılan aşama adı
+        min_history / min_price / max_price / min_change_*: Zorunlu koşullar
+        activity: {ölçüt: eşik}; en az biri sağlanmalı (boşsa koşul yok)
+        shadow: Eleme yapma, sadece recall ölç (varsayılan: BIST_PREFILTER_SHADOW)
+        """
+        unknown = set(activity or {}) - set(FEATURES)
+        if unknown:
+            raise ValueError(f"Bilinmeyen ön süzgeç ölçütü: {', '.join(sorted(unknown))}")
+        self.name = name
+        self.min_history = min_history
+        self.min_price = min_price
+        self.max_price = max_price
+        self.min_change_1d = min_change_1d
+        self.min_change_5d = min_change_5d
+        self.activity = dict(activity or {})
+        if shadow is None:
+            shadow = os.getenv('BIST_PREFILTER_SHADOW', '0') == '1'
+        self.shadow = shadow
+        self.last_report: Dict[str, Any] = {}
+        self.last_pruned: List[str] = []
+
+    @classmethod
+    def preset(cls, name: str, **overrides) -> 'PreFilter':
+        """Tarayıcı için hazır ölçütlerle ön süzgeç"""
+        config = dict(PRESETS[name])
+        config.update(overrides)
+        return cls(name=name, **config)
+
+    def evaluate(self, features: pd.DataFrame) -> pd.Series:
+        """Her sembol için geçti / kaldı (NaN ölçütler sağlanmamış sayılır)"""
+        keep = ((features['history'] >= self.min_history)
+                & (features['price'] >= self.min_price)
+                & (features['price'] <= self.max_price))
+        # Düşüş sınırları: ölçülemeyen değişim elemeye sebep olmaz
+        keep &= ~(features['change_1d'] < self.min_change_1d)
+        keep &= ~(features['change_5d'] < self.min_change_5d)
+        if self.activity:
+            active = np.zeros(len(features), dtype=bool)
+            for feature, threshold in self.activity.items():
+                active |= (features[feature] >= threshold).to_numpy()
+            keep &= active
+        return keep
+
+    def apply(self, symbols: Iterable[str], price_store: Optional[PriceStore] = None,
+              frames: Optional[Dict[str, pd.DataFrame]] = None,
+              panel: Optional[PricePanel] = None) -> List[str]:
+        """
+        Sembolleri süz; veri paneli, {sembol: tablo} sözlüğü veya fiyat
+        deposundan alınır. Verisi olmayan semboller elenmez (pahalı aşama
+        kendi verisini çekmeyi dener). Giriş sırası ve biçimi korunur.
+        """
+        started = time.perf_counter()
+        symbols = list(symbols)
+        if panel is None:
+            if frames is None:
+                frames = {}
+                for symbol in symbols:
+                    frame = price_store.peek(symbol) if price_store is not None else None
+                    if frame is not None:
+                        frames[symbol] = frame.iloc[-(LOOKBACK + 6):]
+            panel = PricePanel.from_frames(frames, dtype=np.float64)
+
+        features = last_bar_features(panel)
+        keep = self.evaluate(features)
+        pruned = {s for s in features.index[~keep.to_numpy()]}
+        self.last_pruned = [s for s in symbols if normalize_symbol(s) in pruned]
+        survivors = [s for s in symbols if normalize_symbol(s) not in pruned]
+
+        by_rule = {feature: int((features[feature] >= threshold).sum())
+                   for feature, threshold in self.activity.items()}
+        self.last_report = {
+            'name': self.name,
+            'total': len(symbols),
+            'evaluated': len(features),
+            'kept': len(survivors),
+            'pruned': len(self.last_pruned),
+            'no_data': len(symbols) - len(features),
+            'by_rule': by_rule,
+            'shadow': self.shadow,
+            'seconds': time.perf_counter() - started,
+        }
+        inc('prefilter_pruned_total', len(self.last_pruned), stage=self.name)
+        set_gauge('prefilter_kept', len(survivors), stage=self.name)
+        logger.info(f"Ön süzgeç ({self.name}): {len(symbols)} sembolden {len(self.last_pruned)} elendi, "
+                    f"{len(survivors)} kaldı" + (" [gölge mod]" if self.shadow else "")
+                    + f" ({self.last_report['seconds'] * 1000:.0f} ms)")
+        return symbols if self.shadow else survivors
+
+    def record_recall(self, results: List[Dict[str, Any]], score_key: str,
+                      threshold: float) -> Optional[Dict[str, Any]]:
+        """
+        Nihai eşiği geçen adaylardan kaçının ön süzgeçten geçtiğini ölç
+        (sadece gölge modunda anlamlıdır: elenenler de taranmıştır)
+        """
+        if not self.shadow or not self.last_report:
+            return None
+        pruned = {normalize_symbol(s) for s in self.last_pruned}
+        finalists = [normalize_symbol(r['symbol']) for r in results
+                     if r.get('symbol') and (r.get(score_key) or 0) >= threshold]
+        missed = [s for s in finalists if s in pruned]
+        recall = 1 - len(missed) / len(finalists) if finalists else 1.0
+        report = {'finalists': len(finalists), 'missed': missed, 'recall': recall,
+                  'prune_rate': self.last_report['pruned'] / max(self.last_report['total'], 1)}
+        self.last_report.update(report)
+        set_gauge('prefilter_recall', recall, stage=self.name)
+        logger.info(f"Ön süzgeç recall ({self.name}): {recall:.1%} "
+                    f"({len(finalists)} adaydan {len(missed)} kaçırılırdı"
+                    + (f": {', '.join(missed[:10])}" if missed else "") + ")")
+        return report
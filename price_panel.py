@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Paylaşımlı Fiyat Paneli Modülü
+Sembol bazlı OHLCV tablolarını (get_all_bist_data çıktısı) tek bir bitişik
+diziye paketler:
+
+    values[sembol, gün, kolon]   float32 / float64, kolonlar: Open High Low Close Volume
+    dates                        ortak tarih ekseni (UTC nanosaniye)
+    symbols                      sembol indeksi
+
+Panel multiprocessing.shared_memory ile veya np.memmap dosyası olarak
+yayımlanır; işçi süreçler küçük bir tanıtıcı (handle) alıp aynı belleğe
+kopyasız bağlanır ve sembol başına salt okunur görünümler kullanır. Böylece
+işlem havuzları tabloları her işçiye pickle ile göndermez.
+
+Kullanım:
+    panel = PricePanel.from_frames(fetcher.get_all_bist_data("6mo"))
+    with panel.publish_shared() as handle:
+        results = map_symbols(handle, scan_fn, max_workers=8)
+"""
+
+import os
+import json
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from price_store import normalize_symbol
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+
+
+def _to_ns(index: pd.DatetimeIndex) -> np.ndarray:
+    """UTC tarih indeksini int64 nanosaniyeye çevir (indeksin çözünürlüğünden bağımsız)"""
+    return index.tz_localize(None).values.astype('datetime64[ns]').view(np.int64)
+
+
+class PricePanel:
+    def __init__(self, values: np.ndarray, dates: np.ndarray, symbols: List[str],
+                 starts: np.ndarray, tz: Optional[str] = None, _owner=None):
+        """
+        values: (sembol, gün, 5) dizi; sembolün verisi olmayan günler NaN
+        dates: int64 UTC nanosaniye tarih ekseni
+        starts: Her sembolün ilk geçerli gün indeksi
+        """
+        self.values = values
+        self.dates = dates
+        self.symbols = list(symbols)
+        self.starts = starts
+        self.tz = tz
+        self._index = {s: i for i, s in enumerate(self.symbols)}
+        self._date_index = pd.DatetimeIndex(pd.to_datetime(dates, utc=True))
+        if tz:
+            self._date_index = self._date_index.tz_convert(tz)
+        # Paylaşımlı bellek / memmap nesnesi (panel yaşadıkça açık kalmalı)
+        self._owner = _owner
+
+    # --- Oluşturma ---
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame], dtype=np.float32) -> 'PricePanel':
+        """Sembol -> OHLCV tablosu sözlüğünden panel oluştur"""
+        frames = {normalize_symbol(s): f for s, f in frames.items() if f is not None and not f.empty}
+        if not frames:
+            return cls(np.empty((0, 0, len(COLUMNS)), dtype=dtype), np.empty(0, dtype=np.int64), [],
+                       np.empty(0, dtype=np.int64))
+
+        tz = None
+        indexes = []
+        for frame in frames.values():
+            index = frame.index
+            if index.tz is not None:
+                tz = tz or str(index.tz)
+                index = index.tz_convert('UTC')
+            else:
+                index = index.tz_localize('UTC')
+            indexes.append(index)
+        axis = indexes[0]
+        for index in indexes[1:]:
+            axis = axis.union(index)
+        dates = _to_ns(axis)
+
+        symbols = list(frames.keys())
+        values = np.full((len(symbols), len(dates), len(COLUMNS)), np.nan, dtype=dtype)
+        starts = np.zeros(len(symbols), dtype=np.int64)
+        for i, (frame, index) in enumerate(zip(frames.values(), indexes)):
+            positions = np.searchsorted(dates, _to_ns(index))
+            values[i, positions] = frame.reindex(columns=list(COLUMNS)).to_numpy(dtype=dtype)
+            starts[i] = positions[0]
+        return cls(values, dates, symbols, starts, tz)
+
+    # --- Okuma ---
+
+    def __contains__(self, symbol: str) -> bool:
+        return normalize_symbol(symbol) in self._index
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.values.nbytes + self.dates.nbytes)
+
+    def array(self, symbol: str) -> np.ndarray:
+        """Sembolün (gün, 5) salt okunur görünümü (ilk geçerli günden itibaren)"""
+        i = self._index[normalize_symbol(symbol)]
+        view = self.values[i, self.starts[i]:]
+        view.flags.writeable = False
+        return view
+
+    def frame(self, symbol: str) -> Optional[pd.DataFrame]:
+        """
+        Sembolün OHLCV tablosu
+
+        Tarih ekseninde boşluk yoksa tablo paneldeki belleğin görünümüdür
+        (kopya yapılmaz); diğer sembollerin işlem gördüğü ama bu sembolün
+        görmediği günler varsa bu satırlar atılır.
+        """
+        key = normalize_symbol(symbol)
+        if key not in self._index:
+            return None
+        i = self._index[key]
+        start = self.starts[i]
+        data = self.array(key)
+        index = self._date_index[start:]
+        missing = np.isnan(data[:, 3])
+        if missing.any():
+            data, index = data[~missing], index[~missing]
+        return pd.DataFrame(data, index=index, columns=list(COLUMNS), copy=False)
+
+    def frames(self, symbols: Optional[Iterable[str]] = None) -> Dict[str, pd.DataFrame]:
+        """get_all_bist_data biçiminde {sembol.IS: tablo} sözlüğü"""
+        return {f"{s}.IS": self.frame(s) for s in (symbols or self.symbols)}
+
+    def column(self, name: str) -> np.ndarray:
+        """Tek kolonun (sembol, gün) görünümü; vektörel taramalar için"""
+        return self.values[:, :, COLUMNS.index(name)]
+
+    # --- Yayımlama ---
+
+    def _meta(self) -> Dict[str, Any]:
+        return {
+            'shape': list(self.values.shape),
+            'dtype': self.values.dtype.str,
+            'symbols': self.symbols,
+            'starts': self.starts.tolist(),
+            'dates': self.dates.tolist(),
+            'tz': self.tz,
+        }
+
+    def publish_shared(self, name: Optional[str] = None) -> 'SharedPanelHandle':
+        """Paneli paylaşımlı belleğe kopyala; işçilere gönderilecek tanıtıcıyı döndür"""
+        shm = shared_memory.SharedMemory(name=name, create=True, size=max(self.values.nbytes, 1))
+        target = np.ndarray(self.values.shape, dtype=self.values.dtype, buffer=shm.buf)
+        target[:] = self.values
+        logger.info(f"Fiyat paneli paylaşıldı: {shm.name} ({len(self.symbols)} sembol, "
+                    f"{self.values.nbytes / 1e6:.1f} MB)")
+        return SharedPanelHandle(shm.name, self._meta(), _shm=shm)
+
+    def save_memmap(self, path: str) -> str:
+        """Paneli <path>.npy + <path>.json olarak diske yaz (np.memmap ile açılır)"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        np.save(f"{path}.npy", np.ascontiguousarray(self.values))
+        with open(f"{path}.json", 'w', encoding='utf-8') as f:
+            json.dump(self._meta(), f)
+        return path
+
+    @classmethod
+    def open_memmap(cls, path: str) -> 'PricePanel':
+        """save_memmap ile yazılmış paneli salt okunur bellek eşlemeli aç"""
+        with open(f"{path}.json", 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        values = np.load(f"{path}.npy", mmap_mode='r')
+        return cls._from_meta(values, meta, owner=values)
+
+    @classmethod
+    def _from_meta(cls, values: np.ndarray, meta: Dict[str, Any], owner=None) -> 'PricePanel':
+        return cls(values, np.asarray(meta['dates'], dtype=np.int64), meta['symbols'],
+                   np.asarray(meta['starts'], dtype=np.int64), meta.get('tz'), _owner=owner)
+
+
+class SharedPanelHandle:
+    """Paylaşımlı panelin işçilere gönderilen (pickle edilebilir) tanıtıcısı"""
+
+    def __init__(self, shm_name: str, meta: Dict[str, Any], _shm=None):
+        self.shm_name = shm_name
+        self.meta = meta
+        self._shm = _shm
+
+    def __getstate__(self):
+        return {'shm_name': self.shm_name, 'meta': self.meta, '_shm': None}
+
+    def attach(self) -> PricePanel:
+        """Paylaşımlı belleğe kopyasız bağlan ve salt okunur panel döndür"""
+        shm = shared_memory.SharedMemory(name=self.shm_name)
+        if self._shm is None:
+            # Bağlanan süreç segmentin sahibi değildir; çıkışta silinmemeli (Python < 3.13)
+            try:
+                resource_tracker.unregister(shm._name, 'shared_memory')
+            except Exception:
+                pass
+        values = np.ndarray(tuple(self.meta['shape']), dtype=np.dtype(self.meta['dtype']), buffer=shm.buf)
+        values.flags.writeable = False
+        return PricePanel._from_meta(values, self.meta, owner=shm)
+
+    def release(self):
+        """Segmenti serbest bırak (sadece yayımlayan süreç)"""
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+_worker_panel: Optional[PricePanel] = None
+
+
+def _init_worker(handle: SharedPanelHandle):
+    global _worker_panel
+    _worker_panel = handle.attach()
+
+
+def _run_symbol(fn: Callable[[str, pd.DataFrame], Any], symbol: str) -> Any:
+    return fn(symbol, _worker_panel.frame(symbol))
+
+
+def map_symbols(handle: SharedPanelHandle, fn: Callable[[str, pd.DataFrame], Any],
+                symbols: Optional[List[str]] = None, max_workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    fn(sembol, tablo) fonksiyonunu işlem havuzunda her sembol için çalıştır
+
+    Her işçi paylaşımlı panele bir kez bağlanır; işçilere sadece sembol adı
+    gönderilir. fn modül seviyesinde tanımlı olmalıdır (pickle edilir).
+    """
+    symbols = symbols or handle.meta['symbols']
+    results = {}
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(handle,)) as executor:
+        futures = {executor.submit(_run_symbol, fn, symbol): symbol for symbol in symbols}
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                results[symbol] = future.result()
+            except Exception as e:
+                logger.error(f"{symbol} panel işçisi hatası: {e}")
+    return {symbol: results[symbol] for symbol in symbols if symbol in results}
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Fiyat Deposu Modülü
+Bu modül sembol bazlı günlük OHLCV verilerini bellekte tutar. Veri bir kez
+geniş bir aralıkla yüklenir (warm-up); sonraki taramalarda sadece son barlar
+toplu olarak indirilip mevcut tabloya eklenir.
+
+Semboller '.IS' eki olmadan veya ekli verilebilir; depo içinde eksiz tutulur.
+"""
+
+import re
+import time
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import pandas as pd
+
+import providers
+
+logger = logging.getLogger(__name__)
+
+_PERIOD_PATTERN = re.compile(r'^(\d+)(d|wk|mo|y)$')
+
+
+def normalize_symbol(symbol: str) -> str:
+    """'THYAO.IS' -> 'THYAO'"""
+    symbol = symbol.strip().upper()
+    return symbol[:-3] if symbol.endswith('.IS') else symbol
+
+
+def period_to_rows_or_days(period: str) -> tuple:
+    """
+    yfinance period metnini dilimleme kuralına çevir
+
+    'Nd' -> ('rows', N)   son N işlem günü (Yahoo 'range' davranışı)
+    'Nwk'/'Nmo'/'Ny' -> ('days', takvim günü)
+    """
+    match = _PERIOD_PATTERN.match(period)
+    if not match:
+        return ('days', 365)
+    value, unit = int(match.group(1)), match.group(2)
+    if unit == 'd':
+        return ('rows', value)
+    return ('days', value * {'wk': 7, 'mo': 31, 'y': 366}[unit])
+
+
+def slice_period(frame: pd.DataFrame, period: str) -> pd.DataFrame:
+    """Tablonun son 'period' kadarlık kısmını döndür"""
+    kind, amount = period_to_rows_or_days(period)
+    if kind == 'rows':
+        return frame.iloc[-amount:]
+    start = pd.Timestamp.now(tz=frame.index.tz) - pd.Timedelta(days=amount)
+    return frame[frame.index >= start]
+
+
+class PriceStore:
+    def __init__(self, warmup_period: str = "6mo", max_age_seconds: int = 15 * 60):
+        """
+        Fiyat deposunu başlat
+
+        warmup_period: İlk yüklemede indirilecek geçmiş
+        max_age_seconds: Bu süreden eski semboller bir sonraki okumada tazelenir
+        """
+        self.warmup_period = warmup_period
+        self.max_age_seconds = max_age_seconds
+        self._frames: Dict[str, pd.DataFrame] = {}
+        self._refreshed_at: Dict[str, float] = {}
+        self._lock = threading.RLock()
+        self.stats = {'hits': 0, 'misses': 0, 'refreshes': 0}
+
+    def __contains__(self, symbol: str) -> bool:
+        return normalize_symbol(symbol) in self._frames
+
+    def symbols(self) -> List[str]:
+        with self._lock:
+            return list(self._frames.keys())
+
+    def peek(self, symbol: str) -> Optional[pd.DataFrame]:
+        """Depodaki tabloyu ağ erişimi ve tazeleme yapmadan döndür (yoksa None)"""
+        with self._lock:
+            return self._frames.get(normalize_symbol(symbol))
+
+    def get_history(self, symbol: str, period: str = "1mo") -> Optional[pd.DataFrame]:
+        """
+        Sembol için istenen dönemi döndür
+
+        Depoda yeterli ve taze veri varsa ağ erişimi yapılmaz; eksikse tüm
+        warm-up dönemi, bayatsa sadece son barlar indirilir.
+        """
+        key = normalize_symbol(symbol)
+        with self._lock:
+            frame = self._frames.get(key)
+            fresh = time.time() - self._refreshed_at.get(key, 0) <= self.max_age_seconds
+
+        if frame is None or not self._covers(frame, period):
+            self.stats['misses'] += 1
+            fetch_period = self._wider_period(period)
+            frame = self._download_one(key, fetch_period)
+            if frame is None or frame.empty:
+                return None
+            self._store(key, frame)
+        elif not fresh:
+            self.stats['misses'] += 1
+            self.refresh_last_bar([key])
+            frame = self._frames.get(key)
+        else:
+            self.stats['hits'] += 1
+
+        return self._slice(frame, period)
+
+    def to_panel(self, symbols: Optional[Iterable[str]] = None, period: Optional[str] = None,
+                 dtype=None):
+        """Depodaki tabloları paylaşımlı fiyat paneline paketle"""
+        from price_panel import PricePanel
+        keys = [normalize_symbol(s) for s in symbols] if symbols is not None else self.symbols()
+        with self._lock:
+            frames = {k: self._frames[k] for k in keys if k in self._frames}
+        if period:
+            frames = {k: slice_period(f, period) for k, f in frames.items()}
+        return PricePanel.from_frames(frames, **({'dtype': dtype} if dtype is not None else {}))
+
+    def warm_up(self, symbols: Iterable[str], period: Optional[str] = None,
+                batch_size: int = 50) -> int:
+        """Sembollerin geçmişini toplu olarak indir ve depoya yükle"""
+        period = period or self.warmup_period
+        keys = list(dict.fromkeys(normalize_symbol(s) for s in symbols))
+        loaded = 0
+        for i in range(0, len(keys), batch_size):
+            batch = keys[i:i + batch_size]
+            for key, frame in self._download_batch(batch, period).items():
+                self._store(key, frame)
+                loaded += 1
+        logger.info(f"Fiyat deposu ısındı: {loaded}/{len(keys)} sembol ({period})")
+        return loaded
+
+    def refresh_last_bar(self, symbols: Optional[Iterable[str]] = None,
+                         batch_size: int = 100) -> int:
+        """Sadece son barları indirip mevcut tablolara ekle / güncelle"""
+        keys = list(dict.fromkeys(normalize_symbol(s) for s in (symbols or self.symbols())))
+        updated = 0
+        for i in range(0, len(keys), batch_size):
+            batch = keys[i:i + batch_size]
+            for key, recent in self._download_batch(batch, "5d").items():
+                with self._lock:
+                    existing = self._frames.get(key)
+                if existing is None or existing.empty:
+                    self._store(key, recent)
+                else:
+                    merged = pd.concat([existing[existing.index < recent.index[0]], recent])
+                    self._store(key, merged)
+                updated += 1
+        self.stats['refreshes'] += 1
+        logger.info(f"Son bar güncellendi: {updated}/{len(keys)} sembol")
+        return updated
+
+    def _store(self, key: str, frame: pd.DataFrame):
+        with self._lock:
+            self._frames[key] = frame
+            self._refreshed_at[key] = time.time()
+
+    @staticmethod
+    def _covers(frame: pd.DataFrame, period: str) -> bool:
+        """Depodaki tablo istenen dönemi kapsıyor mu"""
+        kind, amount = period_to_rows_or_days(period)
+        if kind == 'rows':
+            return len(frame) >= amount
+        start = pd.Timestamp.now(tz=frame.index.tz) - pd.Timedelta(days=amount)
+        # İlk bar dönem başından en fazla bir hafta sonra olmalı (tatiller)
+        return frame.index[0] <= start + pd.Timedelta(days=7)
+
+    @staticmethod
+    def _slice(frame: pd.DataFrame, period: str) -> pd.DataFrame:
+        return slice_period(frame, period)
+
+    def _wider_period(self, period: str) -> str:
+        """İstenen dönem ile warm-up döneminden geniş olanı seç"""
+        req_kind, req_amount = period_to_rows_or_days(period)
+        _, warm_days = period_to_rows_or_days(self.warmup_period)
+        req_days = req_amount * 1.5 if req_kind == 'rows' else req_amount
+        return period if req_days > warm_days else self.warmup_period
+
+    def _download_one(self, key: str, period: str) -> Optional[pd.DataFrame]:
+        try:
+            data = providers.history(f"{key}.IS", period=period)
+            return data if not data.empty else None
+        except Exception as e:
+            logger.error(f"{key} fiyat verisi çekilemedi: {e}")
+            return None
+
+    def _download_batch(self, keys: List[str], period: str) -> Dict[str, pd.DataFrame]:
+        """Birden çok sembolü tek istekte indir; başarısız olursa tek tek dene"""
+        result = {}
+        if not keys:
+            return result
+        try:
+            tickers = [f"{k}.IS" for k in keys]
+            # Ticker.history ile aynı biçim: düzeltilmiş fiyatlar, saat dilimli indeks
+            data = providers.download(tickers, period=period, group_by='ticker', auto_adjust=True,
+                               ignore_tz=False, progress=False, threads=True)
+            for key, ticker in zip(keys, tickers):
+                if isinstance(data.columns, pd.MultiIndex):
+                    if ticker not in data.columns.get_level_values(0):
+                        continue
+                    frame = data[ticker]
+                else:
+                    frame = data
+                frame = frame.dropna(how='all')
+                if not frame.empty:
+                    result[key] = frame
+        except Exception as e:
+            logger.warning(f"Toplu indirme başarısız, tek tek denenecek: {e}")
+
+        for key in keys:
+            if key not in result:
+                frame = self._download_one(key, period)
+                if frame is not None:
+                    result[key] = frame
+        return result
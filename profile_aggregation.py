@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+Profil Toplama Katmanı
+Tavan öncesi çalışmalarının (kapsamlı / basit teknik profil, tavan öncesi
+sinyaller, ağırlıklı profil) sözlük listeleri üzerindeki gösterge başına
+döngüleri yerine kolon bazlı grup istatistikleri:
+
+    group_stats        days_before_ceiling / sektör / kademe gruplarında
+                       adet, ortalama, medyan, std, min, max ve yüzdelikler
+    group_histograms   Grup başına sabit kutulu histogramlar
+    QuantileSketch     Bellek sınırlı, birleştirilebilir akan yüzdelik özeti
+                       (KLL tipi sıkıştırıcı; ~1.7/k sıra hatası)
+    StreamingProfile   Yılların verisini parça parça işleyen akan grup istatistikleri
+
+calibrate_ideal_profile, canlı sinyal tarayıcısının ideal profilini çok yıllık
+geçmişteki tüm tavan öncesi pencerelerin yüzdeliklerinden yeniden hesaplar ve
+ideal_profile.json dosyasına yazar; LiveSignalScanner dosya varsa onu kullanır.
+
+Kullanım:
+    python profile_aggregation.py calibrate --period 5y
+    python profile_aggregation.py show
+"""
+
+import os
+import json
+import time
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from event_windows import EventWindows, pre_ceiling_features
+from symbol_universe import get_universe
+
+logger = logging.getLogger(__name__)
+
+IDEAL_PROFILE_FILE = os.getenv('BIST_IDEAL_PROFILE', os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                                  'ideal_profile.json'))
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90)
+# İdeal profil eşikleri: tavan öncesi dağılımın çeyrekleri ve medyanı
+PROFILE_QUANTILES = {'min': 25, 'ideal': 50, 'max': 75}
+PROFILE_INDICATORS = ('RSI', 'Volume_Ratio', 'BB_Position', 'Stochastic_K', 'Price_vs_SMA20',
+                      'Daily_Change', 'Momentum_5D')
+# Kalibrasyonun geçerli sayılması için gereken en az tavan öncesi pencere
+MIN_PROFILE_EVENTS = 30
+
+
+def _clean(values: pd.DataFrame, limit: Optional[float]) -> pd.DataFrame:
+    """Sonsuz ve (limit verilirse) |değer| >= limit olan değerleri NaN yap"""
+    values = values.apply(pd.to_numeric, errors='coerce').astype(np.float64)
+    mask = np.isfinite(values.to_numpy())
+    if limit is not None:
+        mask &= np.abs(values.to_numpy()) < limit
+    return values.where(mask)
+
+
+def _numeric_columns(frame: pd.DataFrame, exclude: Sequence[str]) -> List[str]:
+    return [c for c in frame.columns if c not in exclude and pd.api.types.is_numeric_dtype(frame[c])]
+
+
+def group_stats(frame: pd.DataFrame, by, columns: Optional[Sequence[str]] = None,
+                percentiles: Sequence[float] = DEFAULT_PERCENTILES, min_count: int = 1,
+                limit: Optional[float] = None) -> pd.DataFrame:
+    """
+    Grup ve gösterge başına istatistik tablosu
+
+    İndeks: (grup kolonları..., indicator); kolonlar: count, mean, median, std
+    (np.std gibi ddof=0), min, max ve p10, p25... NaN / sonsuz değerler ve
+    limit verilirse |değer| >= limit olanlar sayılmaz; geçerli değer sayısı
+    min_count'tan az olan (grup, gösterge) satırları atılır.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    if columns is None:
+        columns = _numeric_columns(frame, by)
+    columns = [c for c in columns if c in frame.columns]
+    if frame.empty or not columns:
+        return pd.DataFrame(columns=['count', 'mean', 'median', 'std', 'min', 'max'] +
+                            [f'p{p:g}' for p in percentiles])
+
+    values = _clean(frame[columns], limit)
+    keys = [frame[k].rename(k) for k in by]
+    grouped = values.groupby(keys, sort=True)
+    tables = {
+        'count': grouped.count(),
+        'mean': grouped.mean(),
+        'median': grouped.median(),
+        'std': grouped.std(ddof=0),
+        'min': grouped.min(),
+        'max': grouped.max(),
+    }
+    for p in percentiles:
+        tables[f'p{p:g}'] = grouped.quantile(p / 100)
+
+    stats = pd.concat({name: table.stack() for name, table in tables.items()}, axis=1)
+    stats.index = stats.index.set_names(by + ['indicator'])
+    stats['count'] = stats['count'].astype(np.int64)
+    return stats[stats['count'] >= max(min_count, 1)]
+
+
+def group_histograms(frame: pd.DataFrame, by, column: str, bins) -> pd.DataFrame:
+    """Grup başına histogram: satırlar gruplar, kolonlar kutular (kutu dışı değerler sayılmaz)"""
+    by = [by] if isinstance(by, str) else list(by)
+    values = _clean(frame[[column]], None)[column]
+    binned = pd.cut(values, bins=bins)
+    counts = binned.groupby([frame[k] for k in by] + [binned], observed=False).size()
+    return counts.unstack(fill_value=0)
+
+
+def indicator_summary(stats: pd.DataFrame, group) -> Dict[str, Dict[str, float]]:
+    """group_stats tablosundan tek grubun {gösterge: {istatistik: değer}} sözlüğü"""
+    try:
+        table = stats.xs(group, level=0) if not isinstance(group, tuple) else stats.loc[group]
+    except KeyError:
+        return {}
+    return {indicator: {k: (int(v) if k == 'count' else float(v)) for k, v in row.items()}
+            for indicator, row in table.iterrows()}
+
+
+class QuantileSketch:
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        """
+        KLL tipi akan yüzdelik özeti
+
+        Seviye h'deki her eleman 2^h ağırlık taşır; kapasitesini aşan seviye
+        sıralanır ve rastgele ofsetle elemanların yarısı bir üst seviyeye
+        çıkarılır. Bellek O(k log(n/k)), sıra hatası yaklaşık 1.7/k'dır.
+        """
+        self.k = k
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self._rng = np.random.default_rng(seed)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - 1 - level
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # Tek sayıda elemanda en büyüğü seviyede kalır
+                rest, items = (items[-1:], items[:-1]) if len(items) % 2 else (items[:0], items)
+                promoted = items[int(self._rng.integers(2))::2]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                self.levels[level] = rest
+            level += 1
+
+    def update(self, values) -> 'QuantileSketch':
+        """Değerleri ekle (NaN ve sonsuzlar atlanır)"""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[np.isfinite(values)]
+        if len(values):
+            self.count += len(values)
+            self.min = min(self.min, float(values.min()))
+            self.max = max(self.max, float(values.max()))
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self._compress()
+        return self
+
+    def merge(self, other: 'QuantileSketch') -> 'QuantileSketch':
+        """Başka bir özeti (ör. başka parça veya süreçten) bu özete kat"""
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def quantile(self, q):
+        """q (0-1, tek değer veya dizi) yüzdeliği; boş özette NaN"""
+        scalar = np.isscalar(q)
+        q = np.atleast_1d(np.asarray(q, dtype=np.float64))
+        if not self.count:
+            return np.nan if scalar else np.full(len(q), np.nan)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        items, cumulative = items[order], np.cumsum(weights[order])
+        positions = np.searchsorted(cumulative, q * cumulative[-1], side='left')
+        result = items[np.clip(positions, 0, len(items) - 1)]
+        result = np.where(q <= 0, self.min, np.where(q >= 1, self.max, result))
+        return float(result[0]) if scalar else result
+
+    def size(self) -> int:
+        """Bellekte tutulan eleman sayısı"""
+        return int(sum(len(items) for items in self.levels))
+
+
+class StreamingProfile:
+    def __init__(self, by, columns: Optional[Sequence[str]] = None,
+                 percentiles: Sequence[float] = DEFAULT_PERCENTILES, k: int = 200,
+                 limit: Optional[float] = None):
+        """
+        Parça parça beslenen grup istatistikleri
+
+        Ortalama / std / min / max akan momentlerden, medyan ve yüzdelikler
+        QuantileSketch özetlerinden hesaplanır; bellek grup x gösterge başına
+        sınırlıdır. summary() group_stats ile aynı biçimde tablo döndürür.
+        """
+        self.by = [by] if isinstance(by, str) else list(by)
+        self.columns = list(columns) if columns is not None else None
+        self.percentiles = tuple(percentiles)
+        self.k = k
+        self.limit = limit
+        self.rows = 0
+        self._moments: Dict[Any, np.ndarray] = {}   # (grup, gösterge) -> [adet, toplam, kareler, min, max]
+        self._sketches: Dict[Any, QuantileSketch] = {}
+
+    def update(self, frame: pd.DataFrame) -> 'StreamingProfile':
+        """Bir veri parçasını ekle"""
+        if frame is None or frame.empty:
+            return self
+        if self.columns is None:
+            self.columns = _numeric_columns(frame, self.by)
+        columns = [c for c in self.columns if c in frame.columns]
+        values = _clean(frame[columns], self.limit)
+        keys = [frame[k].rename(k) for k in self.by]
+        grouped = values.groupby(keys, sort=False)
+        table = pd.concat({
+            'count': grouped.count(), 'sum': grouped.sum(), 'squares': (values ** 2).groupby(keys, sort=False).sum(),
+            'min': grouped.min(), 'max': grouped.max(),
+        }, axis=1)
+        for group, row in table.iterrows():
+            group = group if isinstance(group, tuple) else (group,)
+            for column in columns:
+                if row[('count', column)] == 0:
+                    continue
+                key = (group, column)
+                moments = np.array([row[(stat, column)] for stat in ('count', 'sum', 'squares', 'min', 'max')])
+                previous = self._moments.get(key)
+                if previous is not None:
+                    moments = np.array([previous[0] + moments[0], previous[1] + moments[1], previous[2] + moments[2],
+                                        min(previous[3], moments[3]), max(previous[4], moments[4])])
+                self._moments[key] = moments
+
+        for group, part in values.groupby(keys, sort=False):
+            group = group if isinstance(group, tuple) else (group,)
+            for column in columns:
+                column_values = part[column].to_numpy()
+                if np.isfinite(column_values).any():
+                    self._sketches.setdefault((group, column), QuantileSketch(self.k)).update(column_values)
+        self.rows += len(frame)
+        return self
+
+    def merge(self, other: 'StreamingProfile') -> 'StreamingProfile':
+        """Başka bir akan profili (ör. başka bir işçinin) bu profile kat"""
+        for key, moments in other._moments.items():
+            previous = self._moments.get(key)
+            self._moments[key] = moments.copy() if previous is None else np.array([
+                previous[0] + moments[0], previous[1] + moments[1], previous[2] + moments[2],
+                min(previous[3], moments[3]), max(previous[4], moments[4])])
+        for key, sketch in other._sketches.items():
+            self._sketches.setdefault(key, QuantileSketch(self.k)).merge(sketch)
+        self.rows += other.rows
+        return self
+
+    def summary(self, min_count: int = 1) -> pd.DataFrame:
+        """group_stats biçiminde tablo"""
+        records, index = [], []
+        quantiles = np.array([0.5] + [p / 100 for p in self.percentiles])
+        for (group, column), (count, total, squares, low, high) in self._moments.items():
+            if count < max(min_count, 1):
+                continue
+            mean = total / count
+            estimates = self._sketches[(group, column)].quantile(quantiles)
+            record = {'count': int(count), 'mean': mean, 'median': estimates[0],
+                      'std': float(np.sqrt(max(squares / count - mean ** 2, 0.0))), 'min': low, 'max': high}
+            record.update({f'p{p:g}': v for p, v in zip(self.percentiles, estimates[1:])})
+            records.append(record)
+            index.append(group + (column,))
+        if not records:
+            return pd.DataFrame(columns=['count', 'mean', 'median', 'std', 'min', 'max'] +
+                                [f'p{p:g}' for p in self.percentiles])
+        stats = pd.DataFrame(records, index=pd.MultiIndex.from_tuples(index, names=self.by + ['indicator']))
+        return stats.sort_index()
+
+
+def add_group_columns(frame: pd.DataFrame, universe=None) -> pd.DataFrame:
+    """Sembol kolonundan sektör ve likidite kademesi (size_tier) kolonlarını ekle"""
+    universe = universe or get_universe()
+    symbols = frame['symbol'].astype(str)
+    unique = symbols.unique()
+    sectors = {s: universe.sector_of(s, default=None) or 'Bilinmiyor' for s in unique}
+    tiers = {s: universe.tier_of(s) or 'unknown' for s in unique}
+    return frame.assign(sector=symbols.map(sectors), size_tier=symbols.map(tiers))
+
+
+def profile_from_stats(stats: pd.DataFrame, indicators: Sequence[str] = PROFILE_INDICATORS,
+                       quantiles: Dict[str, float] = None) -> Dict[str, Dict[str, float]]:
+    """{gösterge: {'min', 'ideal', 'max'}} ideal profil sözlüğü (tek grubun indicator indeksli tablosu)"""
+    quantiles = quantiles or PROFILE_QUANTILES
+    profile = {}
+    for indicator in indicators:
+        if indicator not in stats.index:
+            continue
+        row = stats.loc[indicator]
+        profile[indicator] = {name: round(float(row[f'p{p:g}']), 2) for name, p in quantiles.items()}
+    return profile
+
+
+def pre_ceiling_windows(frames: Dict[str, pd.DataFrame], lags: Sequence[int] = (1, 2, 3),
+                        min_row: int = 20, indicator_frame=None) -> pd.DataFrame:
+    """
+    Tavan günlerinin (%9+) 1-3 gün öncesindeki basit teknik göstergeler (uzun tablo)
+
+    Göstergeler canlı sinyal tarayıcısıyla aynı tanımlardadır
+    (SimpleTechnicalSummary.simple_indicator_frame).
+    """
+    if indicator_frame is None:
+        from simple_technical_summary import SimpleTechnicalSummary
+        indicator_frame = SimpleTechnicalSummary.simple_indicator_frame
+    indicator_frames = {}
+    for symbol, data in frames.items():
+        if data is None or len(data) < min_row + 5:
+            continue
+        try:
+            indicator_frames[symbol] = indicator_frame(data)
+        except Exception as e:
+            logger.debug(f"{symbol} gösterge hesaplama hatası: {e}")
+    if not indicator_frames:
+        return pd.DataFrame()
+    prices = pre_ceiling_features(EventWindows.from_frames({s: frames[s] for s in indicator_frames}))
+    events = prices.events(min_row=min_row)
+    return EventWindows.from_frames(indicator_frames).to_frame(
+        events, lags=lags, min_row=min_row, ceiling_change=prices.column('daily_change')[events])
+
+
+def calibrate_ideal_profile(symbols: Optional[Iterable[str]] = None, period: str = "5y",
+                            chunk_size: int = 50, data_fetcher=None, days_before: int = 1,
+                            by: Sequence[str] = ('days_before_ceiling', 'sector', 'size_tier'),
+                            path: Optional[str] = IDEAL_PROFILE_FILE) -> Dict[str, Any]:
+    """
+    İdeal profili uzun geçmişteki tüm tavan öncesi pencerelerden yeniden hesapla
+
+    Semboller chunk_size'lık parçalar halinde çekilir ve akan profile eklenir;
+    bellek sembol sayısından ve geçmiş uzunluğundan bağımsızdır. Eşikler
+    days_before gün öncesi dağılımının çeyrekleri ve medyanıdır. path verilirse
+    sonuç JSON olarak yazılır.
+    """
+    if data_fetcher is None:
+        from bist_data_fetcher import BISTDataFetcher
+        data_fetcher = BISTDataFetcher()
+    symbols = list(symbols) if symbols is not None else list(data_fetcher.bist_symbols)
+    started = time.perf_counter()
+
+    overall = StreamingProfile('days_before_ceiling', PROFILE_INDICATORS, limit=1000)
+    grouped = StreamingProfile(list(by), PROFILE_INDICATORS, limit=1000)
+    events = 0
+    for start in range(0, len(symbols), chunk_size):
+        chunk = symbols[start:start + chunk_size]
+        frames = {s: data_fetcher.get_stock_data(s, period=period) for s in chunk}
+        windows = pre_ceiling_windows({s: f for s, f in frames.items() if f is not None})
+        if windows.empty:
+            continue
+        windows = add_group_columns(windows)
+        overall.update(windows)
+        grouped.update(windows)
+        events += int((windows['days_before_ceiling'] == days_before).sum())
+        logger.info(f"Kalibrasyon: {min(start + chunk_size, len(symbols))}/{len(symbols)} sembol, "
+                    f"{events} tavan öncesi pencere")
+
+    stats = overall.summary(min_count=MIN_PROFILE_EVENTS)
+    day_stats = stats.xs(days_before, level=0) if days_before in stats.index.get_level_values(0) else stats.iloc[:0]
+    result = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'period': period,
+        'symbols': len(symbols),
+        'days_before': days_before,
+        'events': events,
+        'quantiles': PROFILE_QUANTILES,
+        'profile': profile_from_stats(day_stats),
+        'summary': {str(day): indicator_summary(stats, day)
+                    for day in sorted(set(stats.index.get_level_values(0)))},
+        'groups': grouped.summary(min_count=MIN_PROFILE_EVENTS).reset_index().to_dict('records'),
+        'elapsed_seconds': round(time.perf_counter() - started, 1),
+    }
+    if events < MIN_PROFILE_EVENTS:
+        logger.warning(f"İdeal profil kalibrasyonu için yetersiz veri ({events} pencere)")
+        return result
+    if path:
+        save_ideal_profile(result, path)
+    return result
+
+
+def save_ideal_profile(result: Dict[str, Any], path: str = IDEAL_PROFILE_FILE):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2, default=str)
+    os.replace(tmp, path)
+    logger.info(f"İdeal profil kaydedildi: {path}")
+
+
+def load_ideal_profile(default: Optional[Dict[str, Dict[str, float]]] = None,
+                       path: str = IDEAL_PROFILE_FILE) -> Dict[str, Dict[str, float]]:
+    """
+    Kalibre edilmiş ideal profil; dosya yoksa veya okunamazsa default
+
+    Dosyada olmayan göstergeler ve eşikler default'tan tamamlanır.
+    """
+    profile = {k: dict(v) for k, v in (default or {}).items()}
+    if not path or not os.path.exists(path):
+        return profile
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            calibrated = json.load(f).get('profile', {})
+    except (OSError, ValueError) as e:
+        logger.warning(f"İdeal profil dosyası okunamadı ({path}): {e}")
+        return profile
+    for indicator, thresholds in calibrated.items():
+        profile.setdefault(indicator, {}).update({k: float(v) for k, v in thresholds.items()})
+    return profile
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Tavan öncesi profil toplama ve ideal profil kalibrasyonu")
+    parser.add_argument('command', choices=['calibrate', 'show'])
+    parser.add_argument('--period', default='5y')
+    parser.add_argument('--chunk-size', type=int, default=50)
+    parser.add_argument('--path', default=IDEAL_PROFILE_FILE)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.command == 'calibrate':
+        result = calibrate_ideal_profile(period=args.period, chunk_size=args.chunk_size, path=args.path)
+        print(f"📐 {result['events']} tavan öncesi pencere, {result['symbols']} sembol "
+              f"({result['elapsed_seconds']} sn)")
+    else:
+        if not os.path.exists(args.path):
+            print(f"❌ Kalibre edilmiş profil yok: {args.path}")
+            return
+        with open(args.path, 'r', encoding='utf-8') as f:
+            result = json.load(f)
+        print(f"📐 {result['generated_at']} - {result['period']}, {result['events']} pencere")
+    for indicator, thresholds in result['profile'].items():
+        print(f"   {indicator:15} " + "  ".join(f"{k}={v:.2f}" for k, v in thresholds.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Yerel Sağlayıcı Sunucusu (Stub)
+Kaydedilmiş Twelve Data ve Alpha Vantage kasetlerini gerçek bir HTTP
+sunucusundan sunar. Fetcher'lar temel URL'leri bu sunucuya yönlendirildiğinde
+ağ bağlantısı olmadan, gerçek HTTP yığını üzerinden çalışır.
+
+Yönlendirme:
+    http://127.0.0.1:8765/twelvedata/<yol>    -> api.twelvedata.com/<yol>
+    http://127.0.0.1:8765/alphavantage/<yol>  -> www.alphavantage.co/<yol>
+
+Kullanım:
+    python provider_stub_server.py [port] [gecikme_ms]
+    export TWELVE_DATA_BASE_URL=http://127.0.0.1:8765/twelvedata
+    export ALPHA_VANTAGE_BASE_URL=http://127.0.0.1:8765/alphavantage/query
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from providers import ProviderLayer, http_cassette_key
+
+logger = logging.getLogger(__name__)
+
+STUB_ROUTES = {
+    'twelvedata': 'api.twelvedata.com',
+    'alphavantage': 'www.alphavantage.co',
+}
+
+
+def _make_handler(provider: ProviderLayer, latency: float):
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            prefix, _, rest = parts.path.lstrip('/').partition('/')
+            host = STUB_ROUTES.get(prefix)
+            if host is None:
+                self._send(404, json.dumps({'status': 'error', 'message': f'bilinmeyen rota: {prefix}'}))
+                return
+
+            params = dict(parse_qsl(parts.query, keep_blank_values=True))
+            path = provider.cassette_path('http', http_cassette_key(host, '/' + rest, params), 'json')
+            if not os.path.exists(path):
+                self._send(404, json.dumps({'status': 'error', 'message': 'kaset bulunamadı'}))
+                return
+
+            with open(path, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+            if latency > 0:
+                time.sleep(latency)
+            self._send(record['status_code'], record['body'],
+                       record.get('headers', {}).get('Content-Type') or 'application/json')
+
+        def _send(self, status: int, body: str, content_type: str = 'application/json'):
+            payload = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            logger.debug("stub: " + format % args)
+
+    return StubHandler
+
+
+def start_stub_server(port: int = 8765, cassette_dir: Optional[str] = None,
+                      latency_ms: float = 0.0) -> Tuple[ThreadingHTTPServer, threading.Thread]:
+    """Sunucuyu arka plan iş parçacığında başlat; (sunucu, iş parçacığı) döndürür"""
+    provider = ProviderLayer(mode='replay', cassette_dir=cassette_dir)
+    server = ThreadingHTTPServer(('127.0.0.1', port), _make_handler(provider, latency_ms / 1000.0))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    logger.info(f"Sağlayıcı stub sunucusu: http://127.0.0.1:{server.server_port} ({provider.cassette_dir})")
+    return server, thread
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    latency_ms = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    server, thread = start_stub_server(port, latency_ms=latency_ms)
+    print(f"🧪 Stub sunucu çalışıyor: http://127.0.0.1:{server.server_port}")
+    for prefix, host in STUB_ROUTES.items():
+        print(f"   /{prefix}/... -> {host}")
+    try:
+        thread.join()
+    except KeyboardInterrupt:
+        server.shutdown()
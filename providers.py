@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Veri Sağlayıcı Katmanı (Kayıt / Tekrar Oynatma)
+yfinance, Twelve Data, Alpha Vantage ve kazınan HTML sayfalarına yapılan tüm
+çağrılar bu katmandan geçer. Üç çalışma modu vardır:
+
+    live    Sağlayıcılar doğrudan çağrılır (varsayılan)
+    record  Sağlayıcılar çağrılır, yanıtlar diske (kaset) yazılır
+    replay  Ağ kullanılmaz; yanıtlar kasetlerden, ayarlanabilir gecikmeyle sunulur
+
+Ortam değişkenleri:
+    BIST_PROVIDER_MODE          live | record | replay
+    BIST_PROVIDER_DIR           Kaset dizini (varsayılan: provider_cassettes)
+    BIST_REPLAY_LATENCY_MS      Tekrar oynatmada çağrı başına gecikme (varsayılan: 0)
+
+Kaset anahtarları ve kayıtları API anahtarı gibi gizli parametreleri içermez.
+JSON API kasetleri provider_stub_server ile yerel bir HTTP sunucusundan da
+sunulabilir.
+"""
+
+import os
+import json
+import time
+import pickle
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlsplit
+
+import pandas as pd
+from lazy_imports import lazy_import
+from tracing import inc, observe
+
+# Ağır bağımlılıklar ilk kullanımda yüklenir (replay modunda hiç yüklenmez)
+yf = lazy_import('yfinance')
+requests = lazy_import('requests')
+
+logger = logging.getLogger(__name__)
+
+MODES = ('live', 'record', 'replay')
+SECRET_PARAMS = {'apikey', 'api_key', 'token', 'access_token'}
+
+
+def http_cassette_key(host: str, path: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """HTTP isteği için kaset anahtarı (gizli parametreler hariç)"""
+    clean = sorted((str(k), str(v)) for k, v in (params or {}).items() if k.lower() not in SECRET_PARAMS)
+    return json.dumps([host.lower(), path or '/', clean], ensure_ascii=False)
+
+
+class ReplayResponse:
+    """requests.Response'un modüllerin kullandığı alt kümesi"""
+
+    def __init__(self, status_code: int, text: str, headers: Optional[Dict[str, str]] = None,
+                 url: str = ""):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+        self.url = url
+
+    @property
+    def content(self) -> bytes:
+        return self.text.encode('utf-8')
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.exceptions.HTTPError(f"{self.status_code} (replay): {self.url}", response=self)
+
+
+class ProviderLayer:
+    def __init__(self, mode: Optional[str] = None, cassette_dir: Optional[str] = None,
+                 replay_latency_ms: Optional[float] = None):
+        """
+        mode: 'live', 'record' veya 'replay' (varsayılan: BIST_PROVIDER_MODE)
+        cassette_dir: Kaset dizini (varsayılan: BIST_PROVIDER_DIR)
+        replay_latency_ms: Tekrar oynatmada çağrı başına yapay gecikme
+        """
+        self.mode = (mode or os.getenv('BIST_PROVIDER_MODE', 'live')).lower()
+        if self.mode not in MODES:
+            raise ValueError(f"Geçersiz sağlayıcı modu: {self.mode} ({', '.join(MODES)})")
+        self.cassette_dir = cassette_dir or os.getenv('BIST_PROVIDER_DIR', 'provider_cassettes')
+        if replay_latency_ms is None:
+            replay_latency_ms = float(os.getenv('BIST_REPLAY_LATENCY_MS', '0'))
+        self.replay_latency = replay_latency_ms / 1000.0
+        self.stats = {'calls': 0, 'recorded': 0, 'replayed': 0, 'missing': 0}
+        self._lock = threading.Lock()
+
+    # --- Kaset dosyaları ---
+
+    def cassette_path(self, kind: str, key: str, extension: str) -> str:
+        """Kaset anahtarının dosya yolu: <dizin>/<tür>/<sha1>.<uzantı>"""
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.cassette_dir, kind, f"{digest}.{extension}")
+
+    def _write(self, path: str, writer):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp.{threading.get_ident()}"
+        writer(tmp_path)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.stats['recorded'] += 1
+
+    def _replay_wait(self):
+        with self._lock:
+            self.stats['replayed'] += 1
+        inc('provider_replayed_total')
+        if self.replay_latency > 0:
+            time.sleep(self.replay_latency)
+
+    def _missing(self, description: str):
+        with self._lock:
+            self.stats['missing'] += 1
+        logger.warning(f"Kaset bulunamadı (replay): {description}")
+
+    # --- HTTP (Twelve Data, Alpha Vantage, HTML sayfaları) ---
+
+    def http_get(self, url: str, params: Optional[Dict[str, Any]] = None,
+                 headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None,
+                 session=None):
+        """requests.get / session.get karşılığı"""
+        with self._lock:
+            self.stats['calls'] += 1
+        parts = urlsplit(url)
+        query = dict(parse_qsl(parts.query, keep_blank_values=True))
+        query.update(params or {})
+        key = http_cassette_key(parts.netloc, parts.path, query)
+        path = self.cassette_path('http', key, 'json')
+
+        if self.mode == 'replay':
+            if not os.path.exists(path):
+                self._missing(url)
+                return ReplayResponse(404, '', url=url)
+            with open(path, 'r', encoding='utf-8') as f:
+                record = json.load(f)
+            self._replay_wait()
+            return ReplayResponse(record['status_code'], record['body'], record.get('headers'), url)
+
+        getter = session.get if session is not None else requests.get
+        started = time.perf_counter()
+        try:
+            response = getter(url, params=params, headers=headers, timeout=timeout)
+        except Exception:
+            inc('provider_errors_total', provider=parts.netloc)
+            raise
+        observe('provider_request_seconds', time.perf_counter() - started, provider=parts.netloc)
+        inc('provider_responses_total', provider=parts.netloc, status=response.status_code)
+
+        if self.mode == 'record':
+            record = {
+                'key': json.loads(key),
+                'status_code': response.status_code,
+                'headers': {'Content-Type': response.headers.get('Content-Type', '')},
+                'body': response.text,
+            }
+
+            def _dump(tmp_path):
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(record, f, ensure_ascii=False)
+            self._write(path, _dump)
+        return response
+
+    # --- yfinance ---
+
+    def history(self, symbol: str, **kwargs) -> pd.DataFrame:
+        """yf.Ticker(symbol).history(**kwargs) karşılığı"""
+        key = json.dumps(['history', symbol.upper(), sorted((k, str(v)) for k, v in kwargs.items())])
+        return self._frame_call('yfinance', key, lambda: yf.Ticker(symbol).history(**kwargs),
+                                f"{symbol} history", call='history')
+
+    def download(self, tickers: List[str], **kwargs) -> pd.DataFrame:
+        """yf.download(tickers, **kwargs) karşılığı"""
+        ticker_list = [tickers] if isinstance(tickers, str) else list(tickers)
+        key = json.dumps(['download', [t.upper() for t in ticker_list],
+                          sorted((k, str(v)) for k, v in kwargs.items() if k != 'progress')])
+        return self._frame_call('yfinance', key, lambda: yf.download(tickers, **kwargs),
+                                f"download {len(ticker_list)} sembol", call='download')
+
+    def info(self, symbol: str) -> Dict[str, Any]:
+        """yf.Ticker(symbol).info karşılığı"""
+        with self._lock:
+            self.stats['calls'] += 1
+        path = self.cassette_path('yfinance', json.dumps(['info', symbol.upper()]), 'json')
+
+        if self.mode == 'replay':
+            if not os.path.exists(path):
+                self._missing(f"{symbol} info")
+                return {}
+            with open(path, 'r', encoding='utf-8') as f:
+                info = json.load(f)
+            self._replay_wait()
+            return info
+
+        started = time.perf_counter()
+        info = yf.Ticker(symbol).info or {}
+        observe('provider_request_seconds', time.perf_counter() - started, provider='yfinance', call='info')
+        if self.mode == 'record':
+            def _dump(tmp_path):
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(info, f, ensure_ascii=False, default=str)
+            self._write(path, _dump)
+        return info
+
+    def _frame_call(self, kind: str, key: str, fetch, description: str, call: str = '') -> pd.DataFrame:
+        with self._lock:
+            self.stats['calls'] += 1
+        path = self.cassette_path(kind, key, 'pkl')
+
+        if self.mode == 'replay':
+            if not os.path.exists(path):
+                self._missing(description)
+                return pd.DataFrame()
+            with open(path, 'rb') as f:
+                frame = pickle.load(f)
+            self._replay_wait()
+            return frame
+
+        started = time.perf_counter()
+        try:
+            frame = fetch()
+        except Exception:
+            inc('provider_errors_total', provider=kind)
+            raise
+        observe('provider_request_seconds', time.perf_counter() - started, provider=kind, call=call)
+        if self.mode == 'record' and frame is not None:
+            def _dump(tmp_path):
+                with open(tmp_path, 'wb') as f:
+                    pickle.dump(frame, f, protocol=pickle.HIGHEST_PROTOCOL)
+            self._write(path, _dump)
+        return frame
+
+
+_provider: Optional[ProviderLayer] = None
+_provider_lock = threading.Lock()
+
+
+def get_provider() -> ProviderLayer:
+    """Süreç genelinde paylaşılan sağlayıcı katmanı (ortam değişkenlerinden kurulur)"""
+    global _provider
+    with _provider_lock:
+        if _provider is None:
+            _provider = ProviderLayer()
+            if _provider.mode != 'live':
+                logger.info(f"Sağlayıcı katmanı: {_provider.mode} ({_provider.cassette_dir})")
+        return _provider
+
+
+def set_provider(provider: Optional[ProviderLayer]):
+    """Paylaşılan katmanı değiştir (benchmark ve regresyon çalıştırmaları için)"""
+    global _provider
+    with _provider_lock:
+        _provider = provider
+
+
+def http_get(url: str, params: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None,
+             timeout: Optional[float] = None, session=None):
+    return get_provider().http_get(url, params=params, headers=headers, timeout=timeout, session=session)
+
+
+def history(symbol: str, **kwargs) -> pd.DataFrame:
+    return get_provider().history(symbol, **kwargs)
+
+
+def download(tickers: List[str], **kwargs) -> pd.DataFrame:
+    return get_provider().download(tickers, **kwargs)
+
+
+def info(symbol: str) -> Dict[str, Any]:
+    return get_provider().info(symbol)
@@ -4,16 +4,21 @@ Web Scraping ile Gerçek Zamanlı BİST Veri Çekme
 investing.com ve bigpara.com'dan gerçek zamanlı hisse fiyatları çeker.
 """
 
-import requests
 import time
 import logging
 import json
 import re
-from bs4 import BeautifulSoup
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 import concurrent.futures
 from urllib.parse import quote
+from lazy_imports import lazy_import
+import providers
+from tracing import inc, traced
+
+# Ağır bağımlılıklar ilk kullanımda yüklenir
+requests = lazy_import('requests')
+bs4 = lazy_import('bs4')
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +49,7 @@ class RealTimeWebScraper:
         if elapsed < self.min_request_interval:
             sleep_time = self.min_request_interval - elapsed
             time.sleep(sleep_time)
+            inc('rate_limit_wait_seconds_total', sleep_time, provider='web_scraper')
         self.last_request_time = time.time()
     
     def get_investing_com_data(self, symbol: str) -> Optional[Dict]:
@@ -57,13 +63,13 @@ class RealTimeWebScraper:
             url = f"https://tr.investing.com/equities/{symbol.lower()}"
             
             logger.debug(f"Investing.com request: {url}")
-            response = self.session.get(url, timeout=10)
+            response = providers.http_get(url, timeout=10, session=self.session)
             
             if response.status_code != 200:
                 logger.warning(f"Investing.com {symbol}: HTTP {response.status_code}")
                 return None
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = bs4.BeautifulSoup(response.content, 'html.parser')
             
             # Fiyat bilgilerini bul
             price_element = soup.find('span', class_=re.compile(r'text-5xl|text-2xl'))
@@ -113,12 +119,12 @@ class RealTimeWebScraper:
             url = f"https://bigpara.hurriyet.com.tr/borsa/hisseler/{symbol.lower()}/"
             
             logger.debug(f"BigPara request: {url}")
-            response = self.session.get(url, timeout=10)
+            response = providers.http_get(url, timeout=10, session=self.session)
             
             if response.status_code != 200:
                 return None
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = bs4.BeautifulSoup(response.content, 'html.parser')
             
             # Fiyat elementi
             price_element = soup.find('div', class_='price')
@@ -187,6 +193,7 @@ class RealTimeWebScraper:
         # Yoksa ilk bulunanı döndür
         return results[0]
     
+    @traced('realtime_ceiling_scan', provider='web_scraper')
     def get_real_time_ceiling_stocks(self, symbols: List[str], threshold: float = 9.0) -> List[Dict]:
         """
         Gerçek zamanlı web scraping ile tavan yapan hisseleri bul
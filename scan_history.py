@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Tarama Geçmişi Deposu
+Her tarama çalıştırması (tarayıcı, zaman, aday listesi) yalnızca eklemeli bir
+SQLite veritabanına yazılır. Sonuç satırları tarama zamanı, sembol ve
+tarayıcıya göre indekslidir; akşam özeti ve "X son 30 günde kaç kez 70+ skor
+aldı" gibi sorgular aylarca rapor biriktikten sonra da milisaniyeler sürer.
+
+Kullanım:
+    store = ScanHistoryStore()
+    store.record_scan('hybrid', results, total_scanned=400, score_key='hybrid_score')
+    store.latest_scan('hybrid', day=date.today())
+    store.score_frequency('GRNYO', min_score=70, days=30)
+"""
+
+import os
+import glob
+import json
+import sqlite3
+import logging
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from scan_journal import to_jsonable
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    scanner TEXT NOT NULL,
+    scan_time TEXT NOT NULL,
+    scan_date TEXT NOT NULL,
+    total_scanned INTEGER,
+    candidates_found INTEGER
+);
+CREATE TABLE IF NOT EXISTS scan_results (
+    scan_id INTEGER NOT NULL REFERENCES scans(id),
+    scanner TEXT NOT NULL,
+    scan_time TEXT NOT NULL,
+    scan_date TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    score REAL,
+    risk_level TEXT,
+    payload TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_scans_scanner_time ON scans(scanner, scan_time);
+CREATE INDEX IF NOT EXISTS idx_results_scan ON scan_results(scan_id);
+CREATE INDEX IF NOT EXISTS idx_results_symbol_time ON scan_results(symbol, scan_time);
+CREATE INDEX IF NOT EXISTS idx_results_scanner_date ON scan_results(scanner, scan_date, score);
+"""
+
+
+class ScanHistoryStore:
+    def __init__(self, path: str = "scan_history.db"):
+        """Tarama geçmişi veritabanı (bağlantı ilk kullanımda açılır)"""
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            # Okuyucular (akşam özeti) yazıcıyı beklemez
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def record_scan(self, scanner: str, results: List[Dict[str, Any]], total_scanned: int,
+                    score_key: str, scan_time: Optional[datetime] = None) -> int:
+        """Bir tarama çalıştırmasını ve adaylarını tek işlemde ekle; tarama kimliğini döndür"""
+        scan_time = scan_time or datetime.now()
+        time_text = scan_time.isoformat()
+        day_text = scan_time.date().isoformat()
+
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO scans (scanner, scan_time, scan_date, total_scanned, candidates_found) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (scanner, time_text, day_text, total_scanned, len(results))
+            )
+            scan_id = cursor.lastrowid
+            self.conn.executemany(
+                "INSERT INTO scan_results (scan_id, scanner, scan_time, scan_date, symbol, score, risk_level, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (scan_id, scanner, time_text, day_text, str(r.get('symbol', '')).replace('.IS', ''),
+                     float(r.get(score_key, 0) or 0), r.get('risk_level'),
+                     json.dumps(to_jsonable(r), ensure_ascii=False, default=str))
+                    for r in results
+                ]
+            )
+        return scan_id
+
+    def latest_scan(self, scanner: str, day: Optional[date] = None) -> Optional[Dict[str, Any]]:
+        """
+        Tarayıcının en son taraması (day verilirse o günün son taraması)
+
+        Dönüş: {'scan_id', 'scan_time', 'total_scanned', 'candidates_found', 'results'}
+        results skora göre azalan sırada, kaydedilen sonuç sözlükleridir.
+        """
+        query = "SELECT * FROM scans WHERE scanner = ?"
+        params: List[Any] = [scanner]
+        if day is not None:
+            query += " AND scan_date = ?"
+            params.append(day.isoformat())
+        query += " ORDER BY scan_time DESC LIMIT 1"
+
+        with self._lock:
+            scan = self.conn.execute(query, params).fetchone()
+            if scan is None:
+                return None
+            rows = self.conn.execute(
+                "SELECT payload FROM scan_results WHERE scan_id = ? ORDER BY score DESC",
+                (scan['id'],)
+            ).fetchall()
+
+        return {
+            'scan_id': scan['id'],
+            'scan_time': scan['scan_time'],
+            'total_scanned': scan['total_scanned'],
+            'candidates_found': scan['candidates_found'],
+            'results': [json.loads(row['payload']) for row in rows],
+        }
+
+    def score_frequency(self, symbol: str, min_score: float = 70, days: int = 30,
+                        scanner: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Sembolün son 'days' gündeki skor eşiği istatistikleri
+
+        Dönüş: {'appearances', 'hits', 'days_hit', 'max_score', 'last_hit'}
+        """
+        since = (date.today() - timedelta(days=days)).isoformat()
+        query = ("SELECT COUNT(*) AS appearances, "
+                 "SUM(score >= ?) AS hits, "
+                 "COUNT(DISTINCT CASE WHEN score >= ? THEN scan_date END) AS days_hit, "
+                 "MAX(score) AS max_score, "
+                 "MAX(CASE WHEN score >= ? THEN scan_time END) AS last_hit "
+                 "FROM scan_results WHERE symbol = ? AND scan_time >= ?")
+        params: List[Any] = [min_score, min_score, min_score, symbol.replace('.IS', ''), since]
+        if scanner:
+            query += " AND scanner = ?"
+            params.append(scanner)
+
+        with self._lock:
+            row = self.conn.execute(query, params).fetchone()
+        return {
+            'symbol': symbol.replace('.IS', ''),
+            'appearances': row['appearances'] or 0,
+            'hits': row['hits'] or 0,
+            'days_hit': row['days_hit'] or 0,
+            'max_score': row['max_score'],
+            'last_hit': row['last_hit'],
+        }
+
+    def symbol_history(self, symbol: str, days: int = 30,
+                       scanner: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Sembolün son 'days' gündeki skor geçmişi (eskiden yeniye)"""
+        since = (date.today() - timedelta(days=days)).isoformat()
+        query = ("SELECT scanner, scan_time, score, risk_level FROM scan_results "
+                 "WHERE symbol = ? AND scan_time >= ?")
+        params: List[Any] = [symbol.replace('.IS', ''), since]
+        if scanner:
+            query += " AND scanner = ?"
+            params.append(scanner)
+        query += " ORDER BY scan_time"
+
+        with self._lock:
+            return [dict(row) for row in self.conn.execute(query, params).fetchall()]
+
+    def frequent_high_scorers(self, min_score: float = 70, days: int = 30,
+                              scanner: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """Son 'days' günde eşiği en çok gün aşan semboller"""
+        since = (date.today() - timedelta(days=days)).isoformat()
+        query = ("SELECT symbol, COUNT(DISTINCT scan_date) AS days_hit, MAX(score) AS max_score "
+                 "FROM scan_results WHERE scan_date >= ? AND score >= ?")
+        params: List[Any] = [since, min_score]
+        if scanner:
+            query += " AND scanner = ?"
+            params.append(scanner)
+        query += " GROUP BY symbol ORDER BY days_hit DESC, max_score DESC LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            return [dict(row) for row in self.conn.execute(query, params).fetchall()]
+
+    def import_json_reports(self, pattern: str = "ceiling_scan_report_*.json",
+                            scanner: str = 'hybrid', score_key: str = 'hybrid_score') -> int:
+        """Eski JSON raporlarını veritabanına aktar (zaten aktarılmış tarama zamanları atlanır)"""
+        imported = 0
+        for path in sorted(glob.glob(pattern)):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    report = json.load(f)
+                scan_time = datetime.fromisoformat(report['scan_time'])
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"{path} okunamadı: {e}")
+                continue
+
+            with self._lock:
+                exists = self.conn.execute(
+                    "SELECT 1 FROM scans WHERE scanner = ? AND scan_time = ?",
+                    (scanner, scan_time.isoformat())
+                ).fetchone()
+            if exists:
+                continue
+            self.record_scan(scanner, report.get('results', []), report.get('total_scanned', 0),
+                             score_key, scan_time=scan_time)
+            imported += 1
+        logger.info(f"{imported} JSON raporu tarama geçmişine aktarıldı")
+        return imported
+
+
+if __name__ == "__main__":
+    import sys
+
+    store = ScanHistoryStore()
+    if len(sys.argv) > 1 and sys.argv[1] == "import":
+        print(f"📥 {store.import_json_reports()} rapor aktarıldı")
+    elif len(sys.argv) > 1:
+        stats = store.score_frequency(sys.argv[1], days=int(sys.argv[2]) if len(sys.argv) > 2 else 30)
+        print(f"📊 {stats['symbol']}: {stats['days_hit']} gün 70+ skor "
+              f"({stats['hits']}/{stats['appearances']} tarama), en yüksek {stats['max_score']}")
+    else:
+        for row in store.frequent_high_scorers():
+            print(f"🎯 {row['symbol']}: {row['days_hit']} gün, en yüksek {row['max_score']:.0f}")
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Tarama Günlüğü (Checkpoint) Modülü
+Uzun tam evren taramalarında her sembolün sonucu tamamlanır tamamlanmaz
+satır satır bir JSONL günlüğe yazılır. Tarama yarıda kesilirse (sağlayıcı
+kısıtlaması, ağ kopması, bellek) aynı veri anlık görüntüsüyle yeniden
+çalıştırıldığında tamamlanan semboller günlükten okunur, sadece kalanlar
+taranır.
+
+Günlük dosyası: scan_journal/<tarayıcı>_<anlık_görüntü>.jsonl
+"""
+
+import os
+import glob
+import json
+import time
+import logging
+import threading
+from datetime import datetime, time as dtime
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# BİST sürekli işlem seansı (yerel saat)
+SESSION_OPEN = dtime(10, 0)
+SESSION_CLOSE = dtime(18, 10)
+
+
+def default_snapshot_id(now: Optional[datetime] = None, bucket_minutes: int = 60) -> str:
+    """
+    Veri anlık görüntüsü kimliği
+
+    Seans dışında günlük barlar değişmez: 'YYYYMMDD-pre' / 'YYYYMMDD-post'.
+    Seans içinde son bar değiştiği için bucket_minutes'lik dilimlere ayrılır.
+    """
+    now = now or datetime.now()
+    day = now.strftime("%Y%m%d")
+    if now.time() < SESSION_OPEN:
+        return f"{day}-pre"
+    if now.time() >= SESSION_CLOSE:
+        return f"{day}-post"
+    minutes = now.hour * 60 + now.minute
+    bucket = minutes - minutes % bucket_minutes
+    return f"{day}-{bucket // 60:02d}{bucket % 60:02d}"
+
+
+def to_jsonable(value: Any) -> Any:
+    """NumPy / pandas değerlerini JSON'a yazılabilir hale getir"""
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return value.isoformat()
+    return value
+
+
+class ScanJournal:
+    def __init__(self, scanner: str, snapshot_id: Optional[str] = None,
+                 directory: str = "scan_journal"):
+        """
+        Tarayıcı ve anlık görüntü için günlük aç (varsa önceki kayıtlar okunur)
+
+        scanner: Tarayıcı adı ('hybrid', 'advanced', 'live_signal')
+        snapshot_id: Veri anlık görüntüsü (varsayılan: default_snapshot_id())
+        """
+        self.scanner = scanner
+        self.snapshot_id = snapshot_id or default_snapshot_id()
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f"{scanner}_{self.snapshot_id}.jsonl")
+        self._lock = threading.Lock()
+        self._completed: Dict[str, Optional[Dict[str, Any]]] = self._read()
+        if self._completed:
+            logger.info(f"{self.path}: {len(self._completed)} sembol günlükten devam ettirilecek")
+
+    def _read(self) -> Dict[str, Optional[Dict[str, Any]]]:
+        completed = {}
+        if not os.path.exists(self.path):
+            return completed
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Çökme sırasında yarım yazılmış son satır
+                    continue
+                completed[entry['symbol']] = entry.get('result')
+        return completed
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._completed
+
+    def __len__(self) -> int:
+        return len(self._completed)
+
+    def completed(self) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Tamamlanan semboller ve sonuçları (sonuç üretmeyenler için None)"""
+        with self._lock:
+            return dict(self._completed)
+
+    def record(self, symbol: str, result: Optional[Dict[str, Any]]):
+        """Sembol sonucunu günlüğe ekle ve diske yaz"""
+        line = json.dumps({'symbol': symbol, 'time': time.time(), 'result': to_jsonable(result)},
+                          ensure_ascii=False, default=str)
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._completed[symbol] = result
+
+    def reset(self):
+        """Günlüğü sil (tam yeniden tarama)"""
+        with self._lock:
+            self._completed.clear()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+def prune_journals(directory: str = "scan_journal", keep_days: int = 3) -> int:
+    """keep_days günden eski günlük dosyalarını sil"""
+    cutoff = time.time() - keep_days * 86400
+    removed = 0
+    for path in glob.glob(os.path.join(directory, "*.jsonl")):
+        if os.path.getmtime(path) < cutoff:
+            os.remove(path)
+            removed += 1
+    return removed
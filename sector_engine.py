@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Sektör Motoru
+Sembol -> sektör ters indeksi (symbol_universe) üzerinden her taramada bir kez,
+tüm evrenin son bar ölçütlerinden sektör bazlı toplamları vektörel olarak
+hesaplar:
+
+    sector_return        Üyelerin ortalama günlük değişimi (%)
+    sector_return_5d     Üyelerin ortalama 5 günlük değişimi (%)
+    breadth              Yükselen üye oranı
+    near_limit           Günlük limite yakın (>= %7) üye sayısı
+    volume_surge_share   Hacmi 20 gün ortalamasının 1.5 katını aşan üye oranı
+
+Skorlayıcılar sektör istatistiklerini ve koordinasyon puanını sözlükten O(1)
+okur; sembol başına ek veri çekme veya hesaplama yapılmaz.
+"""
+
+import time
+import logging
+import threading
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from prefilter import LOOKBACK, last_bar_features
+from price_panel import PricePanel
+from price_store import normalize_symbol
+from symbol_universe import SymbolUniverse, get_universe
+
+logger = logging.getLogger(__name__)
+
+NEAR_LIMIT_CHANGE = 7.0
+VOLUME_SURGE_RATIO = 1.5
+# Sektör toplamının anlamlı sayılması için gereken en az üye
+MIN_MEMBERS = 3
+
+
+class SectorEngine:
+    def __init__(self, universe: Optional[SymbolUniverse] = None):
+        """Sektör motoru (varsayılan: ortak sembol evreninin sektör grupları)"""
+        self.universe = universe or get_universe()
+        self.sector_stats: Dict[str, Dict[str, Any]] = {}
+        self.symbol_features: Dict[str, Dict[str, float]] = {}
+        self.updated_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def update(self, symbols: Iterable[str], price_store=None,
+               frames: Optional[Dict[str, pd.DataFrame]] = None) -> Dict[str, Dict[str, Any]]:
+        """Sektör toplamlarını tek vektörel geçişte yeniden hesapla"""
+        started = time.perf_counter()
+        if frames is None:
+            frames = {}
+            for symbol in symbols:
+                frame = price_store.peek(symbol) if price_store is not None else None
+                if frame is not None:
+                    frames[symbol] = frame.iloc[-(LOOKBACK + 6):]
+
+        features = last_bar_features(PricePanel.from_frames(frames, dtype=np.float64))
+        features['sector'] = [self.universe.sector_of(s, default=None) for s in features.index]
+        features['rising'] = features['change_1d'] > 0
+        features['near_limit'] = features['change_1d'] >= NEAR_LIMIT_CHANGE
+        features['volume_surge'] = features['volume_ratio'] >= VOLUME_SURGE_RATIO
+
+        grouped = features.dropna(subset=['sector']).groupby('sector')
+        table = grouped.agg(
+            members=('price', 'size'),
+            sector_return=('change_1d', 'mean'),
+            sector_return_5d=('change_5d', 'mean'),
+            breadth=('rising', 'mean'),
+            near_limit=('near_limit', 'sum'),
+            volume_surge_share=('volume_surge', 'mean'),
+        )
+        stats = {sector: {k: (float(v) if k not in ('members', 'near_limit') else int(v))
+                          for k, v in row.items()}
+                 for sector, row in table.iterrows()}
+        symbol_features = features[['change_1d', 'volume_ratio', 'near_limit']].to_dict('index')
+
+        with self._lock:
+            self.sector_stats = stats
+            self.symbol_features = symbol_features
+            self.updated_at = time.time()
+        logger.info(f"Sektör motoru: {len(stats)} sektör, {len(features)} sembol "
+                    f"({(time.perf_counter() - started) * 1000:.0f} ms)")
+        return stats
+
+    def sector_of(self, symbol: str) -> str:
+        return self.universe.sector_of(symbol)
+
+    def stats(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """Sembolün sektör istatistikleri (sektörü bilinmiyorsa veya hesaplanmadıysa None)"""
+        sector = self.universe.sector_of(symbol, default=None)
+        return self.sector_stats.get(sector) if sector else None
+
+    def coordination_score(self, symbol: str) -> Tuple[int, Optional[str]]:
+        """
+        Sektör koordinasyonu puanı (0-2) ve sinyal metni
+
+        2: Sembol dışında limite yakın üye var veya sektör geniş tabanlı
+           (yükselen oranı >= %60) ve ortalama >= %2 yükselişte
+        1: Yükselen oranı >= %50 ve ortalama >= %1 ya da üyelerin >= %30'unda hacim artışı
+        """
+        stats = self.stats(symbol)
+        if not stats or stats['members'] < MIN_MEMBERS:
+            return 0, None
+        own = self.symbol_features.get(normalize_symbol(symbol), {})
+        others_near_limit = stats['near_limit'] - (1 if own.get('near_limit') else 0)
+        sector = self.universe.sector_of(symbol)
+        summary = (f"getiri %{stats['sector_return']:+.1f}, yükselen %{stats['breadth'] * 100:.0f}, "
+                   f"limite yakın {stats['near_limit']}")
+
+        if others_near_limit >= 1 or (stats['breadth'] >= 0.6 and stats['sector_return'] >= 2.0):
+            return 2, f'{sector} sektör koordinasyonu ({summary})'
+        if stats['breadth'] >= 0.5 and (stats['sector_return'] >= 1.0 or stats['volume_surge_share'] >= 0.3):
+            return 1, f'{sector} sektör ısınması ({summary})'
+        return 0, None
@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+Dağıtık Parçalı Tarama Kuyruğu
+Tam evren taramasını birden çok süreç / makineye yaymak için SQLite tabanlı
+iş kuyruğu. Koordinatör sembol evrenini parçalara (shard) böler; işçiler
+parçaları süreli kira (lease) ile alır, tarar ve sonuçları aynı kuyruğa
+yazar. Süresi dolan kiralar (çöken / kopan işçi) başka bir işçiye verilir;
+koordinatör tüm parçalar bitince sonuçları birleştirip skora göre sıralar.
+
+İş kimliği tarayıcı + veri anlık görüntüsüdür (scan_journal.default_snapshot_id):
+aynı dilimde yeniden başlatılan tarama tamamlanan parçaları tekrar taramaz.
+
+Birden çok makinede kuyruk dosyası ortak bir diskte (dosya kilidi destekleyen)
+olmalıdır. WAL kipi paylaşımlı belleğe dayandığı için ağ dosya sistemlerinde
+çalışmaz; bu yüzden varsayılan günlük kipi DELETE'tir (dosya kilitleri). Tüm
+işçiler aynı makinedeyse BIST_SHARD_JOURNAL_MODE=WAL ile daha hızlı kip seçilebilir. Kuyruk yolu BIST_SHARD_QUEUE ortam değişkeniyle verilirse
+daily_scan / daily_advanced_scan koordinatör modunda çalışır.
+
+İşçi başlatma (her makinede / süreçte):
+    python shard_queue.py worker hybrid --queue /ortak/disk/shards.db
+    python shard_queue.py worker advanced --queue /ortak/disk/shards.db
+İlerleme:
+    python shard_queue.py status --queue /ortak/disk/shards.db
+"""
+
+import os
+import json
+import time
+import socket
+import sqlite3
+import logging
+import threading
+import importlib
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from scan_journal import default_snapshot_id, to_jsonable
+from streaming_scan import ScanStream
+from tracing import inc, set_gauge
+
+logger = logging.getLogger(__name__)
+
+SHARD_SIZE = 25
+LEASE_SECONDS = 300
+MAX_ATTEMPTS = 3
+# Ortak diskte güvenli kip; WAL sadece tek makine için
+JOURNAL_MODE = os.environ.get('BIST_SHARD_JOURNAL_MODE', 'DELETE')
+
+# Tarayıcı adı -> (modül, sınıf); tarama metodu ve skor eşiği sınıf özniteliklerinden (bkz. universe_scan)
+SCANNERS: Dict[str, Tuple[str, str]] = {
+    'hybrid': ('hybrid_ceiling_scanner', 'HybridCeilingScanner'),
+    'advanced': ('advanced_ceiling_scanner_v2', 'AdvancedCeilingScanner'),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    scanner TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    total_symbols INTEGER,
+    total_shards INTEGER
+);
+CREATE TABLE IF NOT EXISTS shards (
+    job_id TEXT NOT NULL REFERENCES jobs(job_id),
+    shard_no INTEGER NOT NULL,
+    symbols TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    scanned INTEGER,
+    failed INTEGER,
+    results TEXT,
+    error TEXT,
+    PRIMARY KEY (job_id, shard_no)
+);
+CREATE INDEX IF NOT EXISTS idx_shards_claim ON shards(job_id, status, lease_until);
+"""
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+class ShardQueue:
+    def __init__(self, path: str = "scan_shards.db", lease_seconds: int = LEASE_SECONDS,
+                 max_attempts: int = MAX_ATTEMPTS, journal_mode: str = JOURNAL_MODE):
+        """
+        path: Kuyruk veritabanı (tüm işçilerin erişebildiği yol)
+        lease_seconds: Bir parçanın işçide kalabileceği süre (yenilenmezse başkasına verilir)
+        max_attempts: Hata veren / kirası dolan parçanın en fazla deneme sayısı
+        journal_mode: SQLite günlük kipi; ağ diskinde DELETE, tek makinede WAL olabilir
+        """
+        self.path = path
+        self.journal_mode = journal_mode
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # Kira alma işlemleri kendi BEGIN IMMEDIATE bloklarını yönetir
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute(f"PRAGMA journal_mode={self.journal_mode}")
+            conn.execute("PRAGMA synchronous=NORMAL" if self.journal_mode.upper() == 'WAL'
+                         else "PRAGMA synchronous=FULL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _write(self, sql: str, params: Tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self.conn.execute(sql, params)
+                self.conn.execute("COMMIT")
+                return cursor
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+
+    # --- Koordinatör ---
+
+    def create_job(self, scanner: str, symbols: List[str], shard_size: int = SHARD_SIZE,
+                   snapshot_id: Optional[str] = None, reset: bool = False) -> str:
+        """
+        Sembolleri parçalara bölüp kuyruğa ekle; iş kimliğini döndür
+
+        Aynı kimlikli iş zaten varsa (yeniden başlatma) dokunulmaz;
+        reset=True önceki parçaları ve sonuçları siler.
+        """
+        job_id = f"{scanner}_{snapshot_id or default_snapshot_id()}"
+        symbols = list(dict.fromkeys(symbols))
+        shards = [symbols[i:i + shard_size] for i in range(0, len(symbols), shard_size)]
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                if reset:
+                    self.conn.execute("DELETE FROM shards WHERE job_id = ?", (job_id,))
+                    self.conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+                cursor = self.conn.execute(
+                    "INSERT OR IGNORE INTO jobs (job_id, scanner, created_at, total_symbols, total_shards) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (job_id, scanner, datetime.now().isoformat(), len(symbols), len(shards))
+                )
+                if cursor.rowcount:
+                    self.conn.executemany(
+                        "INSERT INTO shards (job_id, shard_no, symbols) VALUES (?, ?, ?)",
+                        [(job_id, no, json.dumps(shard)) for no, shard in enumerate(shards)]
+                    )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        if cursor.rowcount:
+            logger.info(f"Parçalı tarama işi {job_id}: {len(symbols)} sembol, {len(shards)} parça")
+        else:
+            logger.info(f"Parçalı tarama işi {job_id} zaten var, kalan parçalardan devam ediliyor")
+        return job_id
+
+    def latest_job(self, scanner: Optional[str] = None) -> Optional[str]:
+        query = "SELECT job_id FROM jobs"
+        params: Tuple = ()
+        if scanner:
+            query += " WHERE scanner = ?"
+            params = (scanner,)
+        with self._lock:
+            row = self.conn.execute(query + " ORDER BY created_at DESC LIMIT 1", params).fetchone()
+        return row['job_id'] if row else None
+
+    def progress(self, job_id: str) -> Dict[str, int]:
+        """Parça durumları: pending / leased / done / failed / expired (süresi dolmuş kira)"""
+        now = time.time()
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT status, lease_until < ? AS expired, COUNT(*) AS n FROM shards "
+                "WHERE job_id = ? GROUP BY status, expired", (now, job_id)
+            ).fetchall()
+        counts = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0, 'expired': 0}
+        for row in rows:
+            key = 'expired' if row['status'] == 'leased' and row['expired'] else row['status']
+            counts[key] += row['n']
+        counts['total'] = sum(counts.values())
+        return counts
+
+    def finished(self, job_id: str) -> bool:
+        counts = self.progress(job_id)
+        return counts['done'] + counts['failed'] == counts['total']
+
+    def results(self, job_id: str) -> List[Dict[str, Any]]:
+        """Tamamlanan parçaların sonuçları (birleştirilmiş, sırasız)"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT results FROM shards WHERE job_id = ? AND status = 'done' ORDER BY shard_no", (job_id,)
+            ).fetchall()
+        return [result for row in rows for result in json.loads(row['results'] or '[]')]
+
+    def totals(self, job_id: str) -> Dict[str, int]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT COALESCE(SUM(scanned), 0) AS scanned, COALESCE(SUM(failed), 0) AS failed "
+                "FROM shards WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return {'scanned': row['scanned'], 'failed': row['failed']}
+
+    # --- İşçi ---
+
+    def claim(self, job_id: str, worker_id: str) -> Optional[Tuple[int, List[str]]]:
+        """
+        Bekleyen veya kirası dolmuş bir parçayı kirala
+
+        Seçim ve kira tek yazma işleminde yapılır; aynı parçayı iki işçi alamaz.
+        """
+        now = time.time()
+        with self._lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.conn.execute(
+                    "SELECT shard_no, symbols, status FROM shards WHERE job_id = ? AND attempts < ? "
+                    "AND (status = 'pending' OR (status = 'leased' AND lease_until < ?)) "
+                    "ORDER BY shard_no LIMIT 1", (job_id, self.max_attempts, now)
+                ).fetchone()
+                if row is None:
+                    # Deneme hakkı biten kirası dolmuş parçalar başarısız sayılır
+                    self.conn.execute(
+                        "UPDATE shards SET status = 'failed', error = 'lease expired' WHERE job_id = ? "
+                        "AND status = 'leased' AND lease_until < ? AND attempts >= ?",
+                        (job_id, now, self.max_attempts)
+                    )
+                    self.conn.execute("COMMIT")
+                    return None
+                self.conn.execute(
+                    "UPDATE shards SET status = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1 "
+                    "WHERE job_id = ? AND shard_no = ?",
+                    (worker_id, now + self.lease_seconds, job_id, row['shard_no'])
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+        if row['status'] == 'leased':
+            inc('shard_lease_expired_total', job=job_id.split('_')[0])
+            logger.warning(f"{job_id} parça {row['shard_no']}: kira süresi dolmuştu, yeniden alındı")
+        return row['shard_no'], json.loads(row['symbols'])
+
+    def renew(self, job_id: str, shard_no: int, worker_id: str) -> bool:
+        """Kirayı uzat; parça başka işçiye geçmişse False"""
+        cursor = self._write(
+            "UPDATE shards SET lease_until = ? WHERE job_id = ? AND shard_no = ? AND worker = ? "
+            "AND status = 'leased'", (time.time() + self.lease_seconds, job_id, shard_no, worker_id)
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: str, shard_no: int, worker_id: str, results: List[Dict[str, Any]],
+                 scanned: int, failed: int = 0) -> bool:
+        """
+        Parça sonuçlarını yaz. Kirası dolup başka işçiye geçmiş parça da
+        henüz bitmemişse kabul edilir (aynı veriyle aynı sonuç); bitmişse yok sayılır.
+        """
+        payload = json.dumps(to_jsonable(results), ensure_ascii=False, default=str)
+        cursor = self._write(
+            "UPDATE shards SET status = 'done', worker = ?, lease_until = NULL, scanned = ?, failed = ?, "
+            "results = ?, error = NULL WHERE job_id = ? AND shard_no = ? AND status != 'done'",
+            (worker_id, scanned, failed, payload, job_id, shard_no)
+        )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: str, shard_no: int, worker_id: str, error: str):
+        """Parçayı bırak: deneme hakkı varsa kuyruğa döner, yoksa başarısız sayılır"""
+        self._write(
+            "UPDATE shards SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "worker = NULL, lease_until = NULL, error = ? "
+            "WHERE job_id = ? AND shard_no = ? AND worker = ? AND status = 'leased'",
+            (self.max_attempts, error, job_id, shard_no, worker_id)
+        )
+
+    def run_worker(self, job_id: str, scan_fn: Callable[[str], Dict[str, Any]], score_key: str,
+                   min_score: float = 0.0, max_workers: int = 4, worker_id: Optional[str] = None,
+                   stop_when_idle: bool = True, poll_seconds: float = 2.0) -> int:
+        """
+        Kiralanabilir parça kalmayana kadar parça al, tara ve sonucu yaz
+
+        Parça içinde semboller ScanStream ile paralel taranır. Kira, tarama
+        sürerken (semboller takılsa veya hata verse de) ayrı bir kalp atışı
+        iş parçacığı tarafından süresinin yarısında bir uzatılır. stop_when_idle=False ise iş bitene kadar
+        başka işçilerin kiralarının dolmasını bekler. İşlenen parça sayısını döndürür.
+        """
+        worker_id = worker_id or default_worker_id()
+        processed = 0
+        while True:
+            claimed = self.claim(job_id, worker_id)
+            if claimed is None:
+                if stop_when_idle or self.finished(job_id):
+                    return processed
+                time.sleep(poll_seconds)
+                continue
+
+            shard_no, symbols = claimed
+            results = []
+            stop = threading.Event()
+            heartbeat = threading.Thread(target=self._heartbeat, args=(job_id, shard_no, worker_id, stop),
+                                         name=f"lease-{shard_no}", daemon=True)
+            heartbeat.start()
+            try:
+                stream = ScanStream(symbols, scan_fn, score_key, max_workers=max_workers, name='shard')
+                for result in stream:
+                    if (result.get(score_key, 0) or 0) >= min_score:
+                        results.append(result)
+            except Exception as e:
+                logger.error(f"{job_id} parça {shard_no} hatası: {e}")
+                self.fail(job_id, shard_no, worker_id, str(e))
+                continue
+            finally:
+                stop.set()
+                heartbeat.join()
+
+            self.complete(job_id, shard_no, worker_id, results, stream.scanned, stream.failed)
+            processed += 1
+            inc('shards_completed_total', job=job_id.split('_')[0])
+            counts = self.progress(job_id)
+            set_gauge('shards_remaining', counts['total'] - counts['done'] - counts['failed'],
+                      job=job_id.split('_')[0])
+            logger.info(f"{job_id} parça {shard_no} tamamlandı ({len(symbols)} sembol, "
+                        f"{len(results)} aday) | {counts['done']}/{counts['total']}")
+
+    def _heartbeat(self, job_id: str, shard_no: int, worker_id: str, stop: threading.Event):
+        """Parça taranırken kirayı süresinin yarısında bir uzat"""
+        while not stop.wait(self.lease_seconds / 2):
+            try:
+                if not self.renew(job_id, shard_no, worker_id):
+                    logger.warning(f"{job_id} parça {shard_no}: kira başka işçiye geçti")
+                    return
+            except sqlite3.Error as e:
+                logger.warning(f"{job_id} parça {shard_no} kira uzatma hatası: {e}")
+
+    def wait(self, job_id: str, timeout: Optional[float] = None, poll_seconds: float = 2.0) -> bool:
+        """İş bitene kadar bekle (zaman aşımında False)"""
+        deadline = time.time() + timeout if timeout else None
+        while not self.finished(job_id):
+            if deadline and time.time() >= deadline:
+                return False
+            time.sleep(poll_seconds)
+        return True
+
+
+def run_distributed(queue: ShardQueue, scanner: str, symbols: List[str], scan_fn: Callable,
+                    score_key: str, min_score: float, max_workers: int = 4,
+                    reset: bool = False) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Koordinatör: işi oluştur, kendisi de işçi olarak çalış; diğer işçilerin
+    parçaları bitene kadar bekler ve kirası dolan parçaları kendisi tarar.
+    Sonuçları skora göre sıralı, sembol sayıları ve parça durumlarıyla döndürür.
+    """
+    job_id = queue.create_job(scanner, symbols, reset=reset)
+    processed = queue.run_worker(job_id, scan_fn, score_key, min_score=min_score,
+                                 max_workers=max_workers, stop_when_idle=False)
+    results = queue.results(job_id)
+    results.sort(key=lambda r: r.get(score_key, 0) or 0, reverse=True)
+    totals = queue.totals(job_id)
+    totals['shards'] = queue.progress(job_id)
+    totals['local_shards'] = processed
+    return results, totals
+
+
+def load_scanner(name: str):
+    """Tarayıcı örneği, tarama fonksiyonu, skor anahtarı ve asgari skor"""
+    module_name, class_name = SCANNERS[name]
+    scanner = getattr(importlib.import_module(module_name), class_name)()
+    return scanner, scanner.scan_function, scanner.score_key, scanner.min_score
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Dağıtık parçalı tarama kuyruğu")
+    parser.add_argument('command', choices=['worker', 'status'])
+    parser.add_argument('scanner', nargs='?', choices=sorted(SCANNERS), default='hybrid')
+    parser.add_argument('--queue', default=os.getenv('BIST_SHARD_QUEUE', 'scan_shards.db'))
+    parser.add_argument('--job', help="İş kimliği (varsayılan: tarayıcının en son işi)")
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--wait', type=float, default=600,
+                        help="İş yoksa yeni iş için en fazla bekleme (sn)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    queue = ShardQueue(args.queue)
+    if args.command == 'status':
+        job_id = args.job or queue.latest_job()
+        if not job_id:
+            print("❌ Kuyrukta iş yok")
+            return
+        counts = queue.progress(job_id)
+        print(f"📦 {job_id}: {counts['done']}/{counts['total']} parça tamamlandı "
+              f"(bekleyen {counts['pending']}, işlenen {counts['leased']}, "
+              f"kirası dolan {counts['expired']}, başarısız {counts['failed']})")
+        return
+
+    scanner, scan_fn, score_key, min_score = load_scanner(args.scanner)
+    deadline = time.time() + args.wait
+    job_id = args.job or queue.latest_job(args.scanner)
+    while (job_id is None or queue.finished(job_id)) and time.time() < deadline:
+        time.sleep(2)
+        job_id = args.job or queue.latest_job(args.scanner)
+    if job_id is None or queue.finished(job_id):
+        print("💤 Taranacak parça yok")
+        return
+
+    # İşçi kendi deposunu ısıtır; sektör ve korelasyon toplamları da tüm evrenden hesaplanır
+    scanner.refresh_market_context()
+    print(f"👷 İşçi {default_worker_id()} -> {job_id}")
+    processed = queue.run_worker(job_id, scan_fn, score_key, min_score=min_score, max_workers=args.threads)
+    print(f"✅ {processed} parça işlendi")
+
+
+if __name__ == "__main__":
+    main()
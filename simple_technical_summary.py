@@ -5,10 +5,11 @@ Mevcut analiz verilerini kullanarak tavan öncesi teknik profili çıkarır.
 """
 
 import pandas as pd
-import numpy as np
 import logging
 from typing import List, Dict, Any
 from bist_data_fetcher import BISTDataFetcher
+from event_windows import EventWindows, pre_ceiling_features
+from profile_aggregation import group_stats
 
 logger = logging.getLogger(__name__)
 
@@ -17,95 +18,71 @@ class SimpleTechnicalSummary:
         """Basit teknik analiz sistemi"""
         self.data_fetcher = BISTDataFetcher()
         
+    @staticmethod
+    def simple_indicator_frame(data: pd.DataFrame) -> pd.DataFrame:
+        """
+        Basit teknik göstergeleri tüm satırlar için hesapla; her satır, tablonun
+        o satıra kadar olan kısmıyla calculate_simple_technical_indicators'ın
+        vereceği değerdir (göstergelerin hepsi geçmişe bakar)
+        """
+        close = data['Close']
+        high = data['High']
+        low = data['Low']
+        volume = data['Volume']
+        
+        # Moving Averages
+        sma_5 = close.rolling(5).mean()
+        sma_10 = close.rolling(10).mean()
+        sma_20 = close.rolling(20).mean()
+        
+        # RSI (basit)
+        delta = close.diff()
+        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+        rsi = (100 - (100 / (1 + gain / loss))).where(loss != 0, 50)
+        
+        # Volume analizi
+        volume_sma_20 = volume.rolling(20).mean()
+        volume_ratio = (volume / volume_sma_20).where(volume_sma_20 > 0, 1)
+        
+        # Günlük değişim ve 5 gün momentum
+        daily_change = (close / close.shift(1) - 1) * 100
+        momentum_5d = (close / close.shift(5) - 1) * 100
+        
+        # Bollinger Band basit pozisyonu
+        bb_std = close.rolling(20).std()
+        bb_upper = sma_20 + (bb_std * 2)
+        bb_lower = sma_20 - (bb_std * 2)
+        bb_position = ((close - bb_lower) / (bb_upper - bb_lower) * 100).where(bb_upper != bb_lower, 50)
+        
+        # Stochastic basit
+        lowest_low = low.rolling(14).min()
+        highest_high = high.rolling(14).max()
+        stoch_k = ((close - lowest_low) / (highest_high - lowest_low) * 100).where(highest_high != lowest_low, 50)
+        
+        return pd.DataFrame({
+            'RSI': rsi,
+            'Volume_Ratio': volume_ratio,
+            'Daily_Change': daily_change,
+            'Momentum_5D': momentum_5d,
+            'BB_Position': bb_position,
+            'Price_vs_SMA5': ((close - sma_5) / sma_5 * 100).where(sma_5 > 0, 0),
+            'Price_vs_SMA10': ((close - sma_10) / sma_10 * 100).where(sma_10 > 0, 0),
+            'Price_vs_SMA20': ((close - sma_20) / sma_20 * 100).where(sma_20 > 0, 0),
+            'Stochastic_K': stoch_k,
+            'SMA5': sma_5,
+            'SMA10': sma_10,
+            'SMA20': sma_20,
+            'Current_Price': close
+        }, index=data.index)
+    
     def calculate_simple_technical_indicators(self, data: pd.DataFrame) -> Dict[str, Any]:
-        """Basit teknik göstergeleri hesapla"""
+        """Basit teknik göstergeleri hesapla (son satır için)"""
         if len(data) < 20:
             return {}
             
         try:
-            close = data['Close']
-            high = data['High']
-            low = data['Low']
-            volume = data['Volume']
-            
-            # Son değerler (en güncel)
-            current_close = close.iloc[-1]
-            current_volume = volume.iloc[-1]
-            
-            # Moving Averages
-            sma_5 = close.rolling(5).mean().iloc[-1] if len(close) >= 5 else current_close
-            sma_10 = close.rolling(10).mean().iloc[-1] if len(close) >= 10 else current_close
-            sma_20 = close.rolling(20).mean().iloc[-1] if len(close) >= 20 else current_close
-            
-            # RSI (basit)
-            delta = close.diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-            
-            if len(gain) >= 14 and loss.iloc[-1] != 0:
-                rs = gain.iloc[-1] / loss.iloc[-1]
-                rsi = 100 - (100 / (1 + rs))
-            else:
-                rsi = 50
-                
-            # Volume analizi
-            volume_sma_20 = volume.rolling(20).mean().iloc[-1] if len(volume) >= 20 else current_volume
-            volume_ratio = current_volume / volume_sma_20 if volume_sma_20 > 0 else 1
-            
-            # Günlük değişim
-            if len(close) >= 2:
-                daily_change = ((current_close - close.iloc[-2]) / close.iloc[-2]) * 100
-            else:
-                daily_change = 0
-                
-            # 5 gün momentum
-            if len(close) >= 6:
-                momentum_5d = ((current_close - close.iloc[-6]) / close.iloc[-6]) * 100
-            else:
-                momentum_5d = 0
-                
-            # Bollinger Band basit pozisyonu
-            if len(close) >= 20:
-                bb_middle = sma_20
-                bb_std = close.rolling(20).std().iloc[-1]
-                bb_upper = bb_middle + (bb_std * 2)
-                bb_lower = bb_middle - (bb_std * 2)
-                bb_position = (current_close - bb_lower) / (bb_upper - bb_lower) * 100 if bb_upper != bb_lower else 50
-            else:
-                bb_position = 50
-                
-            # Fiyat vs MA'lar
-            price_vs_sma5 = ((current_close - sma_5) / sma_5) * 100 if sma_5 > 0 else 0
-            price_vs_sma10 = ((current_close - sma_10) / sma_10) * 100 if sma_10 > 0 else 0
-            price_vs_sma20 = ((current_close - sma_20) / sma_20) * 100 if sma_20 > 0 else 0
-            
-            # Stochastic basit
-            if len(high) >= 14:
-                lowest_low = low.rolling(14).min().iloc[-1]
-                highest_high = high.rolling(14).max().iloc[-1]
-                if highest_high != lowest_low:
-                    stoch_k = ((current_close - lowest_low) / (highest_high - lowest_low)) * 100
-                else:
-                    stoch_k = 50
-            else:
-                stoch_k = 50
-                
-            return {
-                'RSI': rsi,
-                'Volume_Ratio': volume_ratio,
-                'Daily_Change': daily_change,
-                'Momentum_5D': momentum_5d,
-                'BB_Position': bb_position,
-                'Price_vs_SMA5': price_vs_sma5,
-                'Price_vs_SMA10': price_vs_sma10,
-                'Price_vs_SMA20': price_vs_sma20,
-                'Stochastic_K': stoch_k,
-                'SMA5': sma_5,
-                'SMA10': sma_10,
-                'SMA20': sma_20,
-                'Current_Price': current_close
-            }
-            
+            return self.simple_indicator_frame(data).iloc[-1].to_dict()
         except Exception as e:
             logger.debug(f"Teknik gösterge hesaplama hatası: {e}")
             return {}
@@ -117,52 +94,27 @@ class SimpleTechnicalSummary:
         # Tüm BİST hisselerinin verilerini çek
         all_data = self.data_fetcher.get_all_bist_data(period=f"{days_back + 5}d")
         
-        technical_profiles = []
-        
+        # Göstergeler sembol başına bir kez tüm satırlar için hesaplanır
+        indicator_frames = {}
         for symbol, data in all_data.items():
             if data.empty or len(data) < 25:
                 continue
                 
             try:
-                # Tavan günlerini bul
-                for i in range(20, len(data)):
-                    current_price = data['Close'].iloc[i]
-                    previous_price = data['Close'].iloc[i-1]
-                    
-                    if previous_price == 0:
-                        continue
-                        
-                    daily_change = ((current_price - previous_price) / previous_price) * 100
-                    
-                    # Tavan günü mü? (%9+ artış)
-                    if daily_change >= 9.0:
-                        # Tavan öncesi 1-3 gün arası teknik profil
-                        for days_before in range(1, 4):
-                            pre_index = i - days_before
-                            
-                            if pre_index < 20:  # Yeterli geçmiş veri yoksa geç
-                                continue
-                                
-                            # O güne kadar olan verileri al
-                            pre_data = data.iloc[:pre_index+1]
-                            
-                            # Teknik göstergeleri hesapla
-                            tech_indicators = self.calculate_simple_technical_indicators(pre_data)
-                            
-                            if tech_indicators:
-                                profile = {
-                                    'symbol': symbol.replace('.IS', ''),
-                                    'days_before_ceiling': days_before,
-                                    'ceiling_date': data.index[i],
-                                    'ceiling_change': daily_change,
-                                    'pre_date': data.index[pre_index]
-                                }
-                                profile.update(tech_indicators)
-                                technical_profiles.append(profile)
-                            
+                indicator_frames[symbol] = self.simple_indicator_frame(data)
             except Exception as e:
                 logger.debug(f"{symbol} teknik profil analiz hatası: {e}")
                 continue
+        
+        # Tavan günlerinden (%9+ artış) 1-3 gün öncesi, en az 20 gün geçmişle;
+        # pencereler olay penceresi çıkarıcısıyla tek geçişte çıkarılır
+        technical_profiles = []
+        if indicator_frames:
+            prices = pre_ceiling_features(EventWindows.from_frames({s: all_data[s] for s in indicator_frames}))
+            events = prices.events(min_row=20)
+            frame = EventWindows.from_frames(indicator_frames).to_frame(
+                events, lags=(1, 2, 3), min_row=20, ceiling_change=prices.column('daily_change')[events])
+            technical_profiles = frame.to_dict('records')
                 
         logger.info(f"Toplam {len(technical_profiles)} tavan öncesi teknik profil bulundu")
         return technical_profiles
@@ -180,51 +132,44 @@ class SimpleTechnicalSummary:
             'Price_vs_SMA5', 'Price_vs_SMA10', 'Price_vs_SMA20', 'Stochastic_K'
         ]
         
-        # Gün bazında grupla
+        # Gün bazında kolonlu istatistikler (aşırı değerler filtrelenir, en az 5 veri noktası)
+        frame = pd.DataFrame(technical_profiles)
+        stats = group_stats(frame, 'days_before_ceiling', technical_indicators, min_count=5, limit=1000)
+        
         for days_before in range(1, 4):
-            day_profiles = [p for p in technical_profiles if p['days_before_ceiling'] == days_before]
+            day_frame = frame[frame['days_before_ceiling'] == days_before]
             
-            if not day_profiles:
+            if day_frame.empty:
                 continue
                 
             day_analysis = {
-                'total_profiles': len(day_profiles),
+                'total_profiles': len(day_frame),
                 'averages': {},
                 'medians': {},
                 'ranges': {},
                 'signal_strengths': {}
             }
             
-            # Her gösterge için istatistikler
+            day_stats = stats.xs(days_before, level=0) if days_before in stats.index.get_level_values(0) else stats.iloc[:0]
             for indicator in technical_indicators:
-                values = []
-                for profile in day_profiles:
-                    if indicator in profile and pd.notna(profile[indicator]):
-                        val = profile[indicator]
-                        if abs(val) < 1000:  # Aşırı değerleri filtrele
-                            values.append(val)
+                if indicator not in day_stats.index:
+                    continue
+                row = day_stats.loc[indicator]
+                day_analysis['averages'][indicator] = row['mean']
+                day_analysis['medians'][indicator] = row['median']
+                day_analysis['ranges'][indicator] = {
+                    'min': row['min'],
+                    'max': row['max'],
+                    'std': row['std'],
+                    'count': int(row['count'])
+                }
                 
-                if len(values) >= 5:  # En az 5 veri noktası
-                    day_analysis['averages'][indicator] = np.mean(values)
-                    day_analysis['medians'][indicator] = np.median(values)
-                    day_analysis['ranges'][indicator] = {
-                        'min': np.min(values),
-                        'max': np.max(values),
-                        'std': np.std(values),
-                        'count': len(values)
-                    }
-                    
-                    # Sinyal gücü hesapla
-                    day_analysis['signal_strengths'][indicator] = self.calculate_signal_strength(indicator, np.mean(values))
+                # Sinyal gücü hesapla
+                day_analysis['signal_strengths'][indicator] = self.calculate_signal_strength(indicator, row['mean'])
             
             # En çok tavan yapan hisseler
-            symbol_counts = {}
-            for profile in day_profiles:
-                symbol = profile['symbol']
-                symbol_counts[symbol] = symbol_counts.get(symbol, 0) + 1
-            
-            top_symbols = sorted(symbol_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-            day_analysis['top_symbols'] = top_symbols
+            symbol_counts = day_frame['symbol'].value_counts(sort=False).sort_values(ascending=False, kind='stable')
+            day_analysis['top_symbols'] = [(symbol, int(count)) for symbol, count in symbol_counts.head(5).items()]
             
             analysis[f'{days_before}_days_before'] = day_analysis
         
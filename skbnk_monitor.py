@@ -4,10 +4,10 @@ SKBNK 18:00 Toparlanma Monitörü
 Bu script SKBNK hissesini sürekli takip eder ve kritik fiyat seviyelerinde uyarı verir.
 """
 
-import yfinance as yf
 import time
 from datetime import datetime, timedelta
 import sys
+import providers
 
 class SKBNKMonitor:
     def __init__(self):
@@ -30,8 +30,7 @@ class SKBNKMonitor:
     def get_current_price(self):
         """Güncel fiyatı al"""
         try:
-            ticker = yf.Ticker(self.symbol)
-            data = ticker.history(period='1d', interval='1m')
+            data = providers.history(self.symbol, period='1d', interval='1m')
             if len(data) > 0:
                 return data['Close'].iloc[-1]
             return None
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Başlangıç Süresi Ölçümü
+Her giriş noktasının (main, cron_scheduler, daily_ceiling_automation,
+hybrid_ceiling_scanner) temiz bir Python sürecinde import süresini ölçer,
+en pahalı modülleri listeler ve sonuçları startup_benchmark.json dosyasına
+geçmişe eklenecek şekilde kaydeder.
+
+Kullanım:
+    python startup_benchmark.py            # her giriş noktası 5 tekrar
+    python startup_benchmark.py 10         # 10 tekrar
+"""
+
+import os
+import re
+import sys
+import json
+import statistics
+import subprocess
+import time
+from datetime import datetime
+from typing import Dict, List, Any
+
+ENTRY_POINTS = ['main', 'cron_scheduler', 'daily_ceiling_automation', 'hybrid_ceiling_scanner']
+RESULTS_FILE = "startup_benchmark.json"
+HEAVY_MODULES = ['yfinance', 'talib', 'ta', 'sklearn', 'bs4', 'telegram', 'requests', 'pandas', 'numpy']
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def _run_import(module: str) -> Dict[str, Any]:
+    """Modülü yeni bir süreçte import et; duvar saati ve -X importtime çıktısını döndür"""
+    code = (
+        f"import sys; import {module}; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True, text=True
+    )
+    wall = time.perf_counter() - started
+
+    # En üst seviye importlar ve giriş noktasının doğrudan importlarının kümülatif süreleri
+    top_level = {}
+    children = {}
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        seconds = int(match.group(2)) / 1e6
+        if len(match.group(3)) == 1:
+            top_level[match.group(4)] = seconds
+        elif len(match.group(3)) == 3:
+            children[match.group(4)] = seconds
+
+    return {
+        'ok': proc.returncode == 0,
+        'wall_seconds': wall,
+        'import_seconds': top_level.get(module, 0.0),
+        'children': children,
+        'heavy_loaded': [m for m in proc.stdout.strip().split(',') if m],
+        'error': proc.stderr.strip().splitlines()[-1] if proc.returncode != 0 and proc.stderr else None,
+    }
+
+
+def benchmark_entry_point(module: str, repeats: int = 5) -> Dict[str, Any]:
+    """Bir giriş noktasını birden çok kez ölç ve özetle"""
+    runs = [_run_import(module) for _ in range(repeats)]
+    ok_runs = [r for r in runs if r['ok']]
+    if not ok_runs:
+        return {'module': module, 'ok': False, 'error': runs[-1]['error']}
+
+    last = ok_runs[-1]
+    slowest = sorted(last['children'].items(), key=lambda x: x[1], reverse=True)
+    return {
+        'module': module,
+        'ok': True,
+        'repeats': len(ok_runs),
+        'median_wall_seconds': statistics.median(r['wall_seconds'] for r in ok_runs),
+        'median_import_seconds': statistics.median(r['import_seconds'] for r in ok_runs),
+        'min_import_seconds': min(r['import_seconds'] for r in ok_runs),
+        'heavy_loaded': last['heavy_loaded'],
+        'slowest_imports': [{'module': m, 'seconds': sec} for m, sec in slowest[:8]],
+    }
+
+
+def run_benchmark(repeats: int = 5, entry_points: List[str] = None) -> Dict[str, Any]:
+    """Tüm giriş noktalarını ölç ve sonucu geçmiş dosyasına ekle"""
+    results = [benchmark_entry_point(m, repeats) for m in (entry_points or ENTRY_POINTS)]
+    record = {
+        'timestamp': datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'results': results,
+    }
+
+    history = []
+    if os.path.exists(RESULTS_FILE):
+        try:
+            with open(RESULTS_FILE, 'r', encoding='utf-8') as f:
+                history = json.load(f)
+        except (OSError, ValueError):
+            history = []
+    history.append(record)
+    with open(RESULTS_FILE, 'w', encoding='utf-8') as f:
+        json.dump(history, f, ensure_ascii=False, indent=2)
+
+    return record
+
+
+if __name__ == "__main__":
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    record = run_benchmark(repeats)
+
+    print("⏱️ BAŞLANGIÇ SÜRESİ ÖLÇÜMÜ")
+    print("=" * 70)
+    for result in record['results']:
+        if not result['ok']:
+            print(f"❌ {result['module']}: {result['error']}")
+            continue
+        print(f"📦 {result['module']}: import {result['median_import_seconds'] * 1000:.0f} ms "
+              f"(süreç {result['median_wall_seconds'] * 1000:.0f} ms)")
+        if result['heavy_loaded']:
+            print(f"   Yüklenen ağır modüller: {', '.join(result['heavy_loaded'])}")
+        for item in result['slowest_imports'][:3]:
+            print(f"   • {item['module']}: {item['seconds'] * 1000:.0f} ms")
+    print("=" * 70)
+    print(f"💾 Sonuçlar {RESULTS_FILE} dosyasına eklendi")
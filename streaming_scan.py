@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Akışlı Tarama Modülü
+Tarayıcıların sonuçları taramanın sonunu beklemeden, her sembol bittiğinde
+üretmesini sağlar. Sınırlı boyutlu bir yığın (heap) o ana kadarki en iyi K
+adayı tutar; konsol, Telegram veya yerel bir pano bu geçici listeyi taramanın
+ilk saniyelerinden itibaren alabilir.
+
+Kullanım:
+    stream = scanner.iter_scan(top_k=10, on_provisional=print_provisional)
+    for result in stream:
+        ...                     # her sembol tamamlandıkça
+    stream.top()                # son en iyi K liste
+"""
+
+import os
+import heapq
+import json
+import time
+import logging
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from tracing import inc, observe
+
+logger = logging.getLogger(__name__)
+
+ProvisionalCallback = Callable[[List[Dict[str, Any]], int, int], None]
+
+
+def is_failed(result: Optional[Dict[str, Any]]) -> bool:
+    """Tarayıcılar hataları istisna yerine {'error': ...} sonucu olarak da döndürür"""
+    return bool(result) and 'error' in result
+
+
+class TopKTracker:
+    def __init__(self, k: int, score_key: str):
+        """En yüksek skorlu K sonucu tutan sınırlı min-yığın"""
+        self.k = k
+        self.score_key = score_key
+        self._heap: List[tuple] = []
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def push(self, result: Dict[str, Any]) -> bool:
+        """Sonucu ekle; en iyi K listesi değiştiyse True döner"""
+        score = result.get(self.score_key, 0) or 0
+        entry = (score, next(self._counter), result)
+        with self._lock:
+            if len(self._heap) < self.k:
+                heapq.heappush(self._heap, entry)
+                return True
+            if score > self._heap[0][0]:
+                heapq.heapreplace(self._heap, entry)
+                return True
+        return False
+
+    def top(self) -> List[Dict[str, Any]]:
+        """En iyi K sonucu skora göre azalan sırada döndür"""
+        with self._lock:
+            entries = sorted(self._heap, key=lambda e: (e[0], -e[1]), reverse=True)
+        return [entry[2] for entry in entries]
+
+
+class ScanStream:
+    def __init__(self, symbols: Iterable[str], scan_fn: Callable[[str], Dict[str, Any]],
+                 score_key: str, top_k: int = 10, min_score: float = 0.0,
+                 max_workers: int = 4, on_provisional: Optional[ProvisionalCallback] = None,
+                 provisional_interval: float = 2.0, journal=None, name: Optional[str] = None):
+        """
+        Sembolleri paralel tarayıp sonuçları tamamlandıkça üreten akış
+
+        scan_fn: Tek sembol tarama fonksiyonu (sonuç sözlüğü döndürür)
+        score_key: Sıralamada kullanılan skor anahtarı
+        min_score: Bu skorun altındakiler en iyi K listesine alınmaz
+        on_provisional: En iyi K değiştiğinde en fazla provisional_interval
+            saniyede bir çağrılır: (en_iyi_liste, taranan, toplam)
+        journal: scan_journal.ScanJournal verilirse tamamlanan semboller
+            günlükten okunur, yeni sonuçlar anında günlüğe yazılır
+        name: Metriklerde kullanılan tarayıcı adı (varsayılan: score_key)
+        """
+        self.symbols = list(dict.fromkeys(symbols))
+        self.scan_fn = scan_fn
+        self.score_key = score_key
+        self.min_score = min_score
+        self.max_workers = max_workers
+        self.on_provisional = on_provisional
+        self.provisional_interval = provisional_interval
+        self.journal = journal
+        self.name = name or score_key
+        self.tracker = TopKTracker(top_k, score_key)
+        self.scanned = 0
+        self.resumed = 0
+        self.failed = 0
+        self.started_at = None
+        self._last_provisional = 0.0
+        self._pending_provisional = False
+
+    @property
+    def total(self) -> int:
+        return len(self.symbols)
+
+    def top(self) -> List[Dict[str, Any]]:
+        return self.tracker.top()
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        self.started_at = time.time()
+        pending = self.symbols
+        if self.journal is not None:
+            # Eski günlüklerde kalmış hata sonuçları tamamlanmış sayılmaz
+            completed = {s: r for s, r in self.journal.completed().items() if not is_failed(r)}
+            pending = [s for s in self.symbols if s not in completed]
+            for symbol in self.symbols:
+                if symbol not in completed:
+                    continue
+                self.scanned += 1
+                self.resumed += 1
+                inc('cache_requests_total', cache='scan_journal', result='hit')
+                result = completed[symbol]
+                if result:
+                    self._accept(result)
+                    yield result
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self._timed_scan, symbol): symbol for symbol in pending}
+            for future in as_completed(futures):
+                symbol = futures[future]
+                self.scanned += 1
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {'error': str(e)}
+                if is_failed(result):
+                    # Hatalı semboller (istisna veya 'error' içeren sonuç; ör. kısıtlanan /
+                    # boş indirme) günlüğe yazılmaz; yeniden çalıştırmada tekrar denenir
+                    self.failed += 1
+                    inc('scan_errors_total', scanner=self.name)
+                    logger.debug(f"{symbol} tarama hatası: {result['error']}")
+                    continue
+                if self.journal is not None:
+                    self.journal.record(symbol, result)
+                if not result:
+                    continue
+
+                self._accept(result)
+                yield result
+
+        # Son durumu her zaman bildir
+        if self._pending_provisional:
+            self._emit_provisional()
+
+    def _timed_scan(self, symbol: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            return self.scan_fn(symbol)
+        finally:
+            observe('symbol_latency_seconds', time.perf_counter() - started, stage='scan', scanner=self.name)
+
+    def _accept(self, result: Dict[str, Any]):
+        if (result.get(self.score_key, 0) or 0) >= self.min_score and self.tracker.push(result):
+            self._pending_provisional = True
+        self._maybe_emit_provisional()
+
+    def _maybe_emit_provisional(self):
+        if not self.on_provisional or not self._pending_provisional:
+            return
+        if time.time() - self._last_provisional >= self.provisional_interval:
+            self._emit_provisional()
+
+    def _emit_provisional(self):
+        self._pending_provisional = False
+        self._last_provisional = time.time()
+        if self.on_provisional:
+            try:
+                self.on_provisional(self.tracker.top(), self.scanned, self.total)
+            except Exception as e:
+                logger.error(f"Geçici sonuç bildirimi hatası: {e}")
+
+
+def print_provisional(top: List[Dict[str, Any]], scanned: int, total: int,
+                      score_key: str = None):
+    """Konsol tüketicisi: geçici en iyi listeyi yazdır"""
+    print(f"\n⏳ Geçici en iyi adaylar ({scanned}/{total} tarandı):")
+    for i, result in enumerate(top[:5], 1):
+        key = score_key or ('hybrid_score' if 'hybrid_score' in result else
+                            'total_score' if 'total_score' in result else 'signal_score')
+        print(f"   {i}. {result.get('symbol')}: {result.get(key, 0):.1f}")
+
+
+def json_file_consumer(path: str = "provisional_top.json", score_key: str = None) -> ProvisionalCallback:
+    """
+    Yerel pano tüketicisi: geçici listeyi atomik olarak JSON dosyasına yazar
+    (pano dosyayı periyodik okuyabilir)
+    """
+    def _write(top: List[Dict[str, Any]], scanned: int, total: int):
+        payload = {
+            'updated_at': datetime.now().isoformat(),
+            'scanned': scanned,
+            'total': total,
+            'top': [
+                {
+                    'symbol': r.get('symbol'),
+                    'score': r.get(score_key) if score_key else
+                    r.get('hybrid_score', r.get('total_score', r.get('signal_score'))),
+                    'risk_level': r.get('risk_level'),
+                }
+                for r in top
+            ],
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
+    return _write
+
+
+def telegram_consumer(send_fn: Callable[[str], Any], score_key: str,
+                      min_interval: float = 60.0, top_n: int = 5) -> ProvisionalCallback:
+    """
+    Telegram tüketicisi: en iyi N'in sembol kümesi değiştiğinde ve en az
+    min_interval saniye geçtiyse kısa bir geçici mesaj gönderir
+    """
+    state = {'last_sent': 0.0, 'last_symbols': None}
+
+    def _send(top: List[Dict[str, Any]], scanned: int, total: int):
+        symbols = tuple(r.get('symbol') for r in top[:top_n])
+        if symbols == state['last_symbols'] or time.time() - state['last_sent'] < min_interval:
+            return
+        message = f"⏳ GEÇİCİ TAVAN ADAYLARI ({scanned}/{total} tarandı)\n"
+        for r in top[:top_n]:
+            message += f"• {r.get('symbol')}: {r.get(score_key, 0):.0f}\n"
+        send_fn(message)
+        state['last_sent'] = time.time()
+        state['last_symbols'] = symbols
+    return _send
+
+
+def combine_consumers(*consumers: Optional[ProvisionalCallback]) -> Optional[ProvisionalCallback]:
+    """Birden çok tüketiciyi tek geri çağırma altında birleştir"""
+    active = [c for c in consumers if c]
+    if not active:
+        return None
+
+    def _all(top, scanned, total):
+        for consumer in active:
+            consumer(top, scanned, total)
+    return _all
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Sembol Evreni Kayıt Defteri
+Tüm modüllerin taradığı sembol listeleri, sektör grupları ve endeks
+üyelikleri tek bir veri dosyasından (bist_universe.json) yüklenir:
+
+- '.IS' eki normalize edilir, tekrar eden semboller atılır (uyarı loglanır)
+- Sembol -> sektör / endeks sorguları sözlük üzerinden yapılır
+- Likidite kademeleri fiyat deposundaki son işlem hacminden hesaplanır;
+  taramalar belirli bir kademeyi hedefleyebilir
+
+Kullanım:
+    universe = get_universe()
+    universe.symbols('extended')                 # tarayıcı evreni
+    universe.symbols('core', suffix=True)        # 'AKBNK.IS', ...
+    universe.update_liquidity(price_store)
+    universe.symbols('extended', tier='high')
+"""
+
+import os
+import json
+import logging
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from price_store import normalize_symbol
+
+logger = logging.getLogger(__name__)
+
+UNIVERSE_FILE = os.getenv('BIST_UNIVERSE_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                             'bist_universe.json'))
+DEFAULT_UNIVERSE = 'extended'
+TIERS = ('high', 'mid', 'low')
+# Ortalama günlük işlem hacmine (TL) göre sıralamada kademe payları: üst %20, sonraki %40, kalan
+TIER_QUANTILES = (0.20, 0.60)
+
+
+def _dedupe(symbols: Iterable[str], label: str) -> List[str]:
+    normalized = [normalize_symbol(s) for s in symbols]
+    duplicates = [s for s, count in Counter(normalized).items() if count > 1]
+    if duplicates:
+        logger.warning(f"Sembol evreni '{label}' tekrar eden semboller içeriyor: {', '.join(duplicates)}")
+    return list(dict.fromkeys(normalized))
+
+
+class SymbolUniverse:
+    def __init__(self, path: Optional[str] = None):
+        """Evren dosyasını yükle (varsayılan: BIST_UNIVERSE_FILE veya bist_universe.json)"""
+        self.path = path or UNIVERSE_FILE
+        with open(self.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        self.universes: Dict[str, List[str]] = {
+            name: _dedupe(symbols, name) for name, symbols in data.get('universes', {}).items()
+        }
+        self.sector_groups: Dict[str, List[str]] = {
+            sector: _dedupe(symbols, sector) for sector, symbols in data.get('sectors', {}).items()
+        }
+        self.indices: Dict[str, List[str]] = {
+            index: _dedupe(symbols, index) for index, symbols in data.get('indices', {}).items()
+        }
+
+        # Ters indeksler: bir sembol birden çok grupta ise ilk grup sektörü sayılır
+        self._sector_of: Dict[str, str] = {}
+        for sector, symbols in self.sector_groups.items():
+            for symbol in symbols:
+                self._sector_of.setdefault(symbol, sector)
+        self._indices_of: Dict[str, List[str]] = {}
+        for index, symbols in self.indices.items():
+            for symbol in symbols:
+                self._indices_of.setdefault(symbol, []).append(index)
+
+        self._tiers: Dict[str, str] = {}
+        self.traded_value: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    # --- Sorgular ---
+
+    def all_symbols(self) -> List[str]:
+        """Tüm evrenlerin birleşimi (sıra korunur)"""
+        return list(dict.fromkeys(s for symbols in self.universes.values() for s in symbols))
+
+    def symbols(self, universe: str = DEFAULT_UNIVERSE, tier: Optional[str] = None,
+                sector: Optional[str] = None, index: Optional[str] = None,
+                suffix: bool = False) -> List[str]:
+        """Evrenin (isteğe bağlı kademe / sektör / endeks ile süzülmüş) sembolleri"""
+        if universe not in self.universes:
+            raise KeyError(f"Bilinmeyen sembol evreni: {universe} ({', '.join(self.universes)})")
+        return self.filter(self.universes[universe], tier=tier, sector=sector, index=index, suffix=suffix)
+
+    def filter(self, symbols: Iterable[str], tier: Optional[str] = None, sector: Optional[str] = None,
+               index: Optional[str] = None, suffix: bool = False) -> List[str]:
+        """Verilen sembolleri normalize et, tekrarları at ve süz"""
+        result = list(dict.fromkeys(normalize_symbol(s) for s in symbols))
+        if tier is not None:
+            if tier not in TIERS:
+                raise ValueError(f"Geçersiz likidite kademesi: {tier} ({', '.join(TIERS)})")
+            if not self._tiers:
+                logger.warning("Likidite kademeleri hesaplanmamış, kademe süzgeci uygulanmadı")
+            else:
+                result = [s for s in result if self._tiers.get(s) == tier]
+        if sector is not None:
+            result = [s for s in result if self._sector_of.get(s) == sector]
+        if index is not None:
+            members = set(self.indices.get(index, []))
+            result = [s for s in result if s in members]
+        return [f"{s}.IS" for s in result] if suffix else result
+
+    def sector_of(self, symbol: str, default: str = 'Diğer') -> str:
+        return self._sector_of.get(normalize_symbol(symbol), default)
+
+    def indices_of(self, symbol: str) -> List[str]:
+        return list(self._indices_of.get(normalize_symbol(symbol), []))
+
+    def tier_of(self, symbol: str) -> Optional[str]:
+        return self._tiers.get(normalize_symbol(symbol))
+
+    @property
+    def has_liquidity(self) -> bool:
+        return bool(self._tiers)
+
+    # --- Likidite kademeleri ---
+
+    def update_liquidity(self, price_store, symbols: Optional[Iterable[str]] = None,
+                         lookback: int = 20) -> Dict[str, str]:
+        """
+        Likidite kademelerini fiyat deposundaki son 'lookback' günün ortalama
+        işlem hacminden (Kapanış x Hacim, TL) hesapla
+
+        Sadece depoda bulunan semboller kullanılır (ağ erişimi yapılmaz).
+        """
+        keys = [normalize_symbol(s) for s in symbols] if symbols is not None else self.all_symbols()
+        traded = {}
+        for key in keys:
+            frame = price_store.peek(key)
+            if frame is None or frame.empty:
+                continue
+            frame = frame.iloc[-lookback:]
+            value = float((frame['Close'] * frame['Volume']).mean())
+            if np.isfinite(value):
+                traded[key] = value
+
+        tiers = {}
+        if traded:
+            ranked = sorted(traded, key=traded.get, reverse=True)
+            high_end = int(np.ceil(len(ranked) * TIER_QUANTILES[0]))
+            mid_end = int(np.ceil(len(ranked) * TIER_QUANTILES[1]))
+            for position, key in enumerate(ranked):
+                tiers[key] = 'high' if position < high_end else 'mid' if position < mid_end else 'low'
+
+        with self._lock:
+            self.traded_value = traded
+            self._tiers = tiers
+        counts = Counter(tiers.values())
+        logger.info(f"Likidite kademeleri: {len(tiers)} sembol "
+                    f"(yüksek {counts['high']}, orta {counts['mid']}, düşük {counts['low']})")
+        return tiers
+
+
+_universe: Optional[SymbolUniverse] = None
+_universe_lock = threading.Lock()
+
+
+def get_universe() -> SymbolUniverse:
+    """Süreç genelinde paylaşılan sembol evreni"""
+    global _universe
+    with _universe_lock:
+        if _universe is None:
+            _universe = SymbolUniverse()
+        return _universe
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    universe = get_universe()
+    print("🌐 SEMBOL EVRENİ")
+    for name, symbols in universe.universes.items():
+        print(f"   {name:10s} {len(symbols):4d} sembol")
+    for name, symbols in universe.indices.items():
+        print(f"   {name:10s} {len(symbols):4d} sembol (endeks)")
+    print(f"   {len(universe.sector_groups)} sektör grubu")
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Sentetik Evren Benchmark Paketi
+Her tarayıcı / analizörü sentetik BİST evreni üzerinde (ağ olmadan) çalıştırır
+ve evren büyüklüğüne göre ölçeklenmesini ölçer:
+
+- Duvar saati süresi
+- Sembol başına gecikme yüzdelikleri (p50 / p90 / p99)
+- Tepe bellek (her ölçüm ayrı bir süreçte çalışır)
+
+Sonuçlar synthetic_benchmark.json dosyasına eklenir; her çalıştırma bir önceki
+çalıştırmayla karşılaştırılır ve belirgin yavaşlamalar işaretlenir. Taranan
+sembollerin tamamı hata veren ölçümler başarısız sayılır; kısmen hata veren
+ölçümler raporlanır ama karşılaştırmaya girmez (hata veren semboller erken
+döndüğü için süreleri kıyaslanamaz).
+
+Kullanım:
+    python synthetic_benchmark.py                     # 100 / 500 / 2000 sembol
+    python synthetic_benchmark.py 100 500             # seçili büyüklükler
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import resource
+import tempfile
+import contextlib
+import subprocess
+import statistics
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+RESULTS_FILE = "synthetic_benchmark.json"
+DEFAULT_SIZES = (100, 500, 2000)
+DEFAULT_DAYS = 250
+CASES = ['hybrid_daily_scan', 'advanced_daily_scan', 'live_signal_scan', 'bist_daily_analysis',
+         'today_ceiling_analysis', 'volume_revolution_scan']
+# Önceki çalıştırmaya göre bu orandan fazla yavaşlama regresyon sayılır
+REGRESSION_RATIO = 1.20
+
+
+def _timed(fn: Callable, latencies: List[float], errors: List[str]) -> Callable:
+    """Sembol başına çağrıyı ölçen sarmalayıcı"""
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+            if isinstance(result, dict) and result.get('error'):
+                errors.append(str(result['error']))
+            return result
+        except Exception as e:
+            errors.append(str(e))
+            raise
+        finally:
+            latencies.append(time.perf_counter() - started)
+    return wrapper
+
+
+def _percentiles(latencies: List[float]) -> Dict[str, float]:
+    if not latencies:
+        return {}
+    values = np.asarray(latencies) * 1000
+    return {
+        'p50_ms': float(np.percentile(values, 50)),
+        'p90_ms': float(np.percentile(values, 90)),
+        'p99_ms': float(np.percentile(values, 99)),
+        'max_ms': float(values.max()),
+    }
+
+
+def run_case(case: str, n_symbols: int, n_days: int = DEFAULT_DAYS, seed: int = 42) -> Dict[str, Any]:
+    """Tek bir ölçümü bu süreçte çalıştır"""
+    import providers
+    from price_store import PriceStore
+    from scan_history import ScanHistoryStore
+    from synthetic_market import SyntheticProvider, generate_universe
+
+    universe = generate_universe(n_symbols, n_days, seed=seed)
+    providers.set_provider(SyntheticProvider(universe))
+    symbols = list(universe.keys())
+    latencies: List[float] = []
+    errors: List[str] = []
+    workdir = tempfile.mkdtemp(prefix="bist_bench_")
+    history_store = ScanHistoryStore(os.path.join(workdir, "scan_history.db"))
+
+    # Tarama çıktıları ölçümü kirletmesin
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        started = time.perf_counter()
+        if case == 'hybrid_daily_scan':
+            from hybrid_ceiling_scanner import HybridCeilingScanner
+            scanner = HybridCeilingScanner(history_store=history_store)
+            scanner.bist_stocks = symbols
+            scanner.hybrid_scan = _timed(scanner.hybrid_scan, latencies, errors)
+            results = scanner.daily_scan(resume=False)
+        elif case == 'advanced_daily_scan':
+            from advanced_ceiling_scanner_v2 import AdvancedCeilingScanner
+            scanner = AdvancedCeilingScanner()
+            scanner.bist_stocks = symbols
+            scanner.advanced_ceiling_scan = _timed(scanner.advanced_ceiling_scan, latencies, errors)
+            results = scanner.daily_advanced_scan(resume=False)
+        elif case == 'live_signal_scan':
+            from live_signal_scanner import LiveSignalScanner
+            scanner = LiveSignalScanner()
+            scanner.data_fetcher.bist_symbols = [f"{s}.IS" for s in symbols]
+            scanner.scan_symbol = _timed(scanner.scan_symbol, latencies, errors)
+            results = scanner.scan_all_stocks(resume=False)
+        elif case == 'bist_daily_analysis':
+            # Telegram ve haber adımları hariç: veri + teknik analiz + sıralama
+            from main import BISTAnalyzer
+            price_store = PriceStore(max_age_seconds=24 * 3600)
+            price_store.warm_up(symbols + ['XU100'])
+            analyzer = BISTAnalyzer(price_store=price_store, history_store=history_store)
+            analyzer.data_fetcher.bist_symbols = [f"{s}.IS" for s in symbols]
+            analyzer.technical_analyzer.analyze_stock = _timed(
+                analyzer.technical_analyzer.analyze_stock, latencies, errors)
+            technical = asyncio.run(analyzer.perform_technical_analysis())
+            results = analyzer.predict_potential_ceiling_stocks(
+                technical, {'sentiment': {'score': 0.5}}, analyzer.data_fetcher.get_market_info())
+        elif case == 'today_ceiling_analysis':
+            # Sabit aday listeleri yerine evren: ilk 9 sembol ana aday, kalanlar ön süzgeçli ek aday
+            from today_ceiling_predictions import TodayCeilingPredictor
+            predictor = TodayCeilingPredictor(history_store=history_store)
+            predictor.top_candidates = [f"{s}.IS" for s in symbols[:9]]
+            predictor.additional_candidates = [f"{s}.IS" for s in symbols[9:]]
+            predictor.analyze_pre_market_momentum = _timed(
+                predictor.analyze_pre_market_momentum, latencies, errors)
+            results = predictor.run_today_analysis()
+        elif case == 'volume_revolution_scan':
+            # Toplu tarama metodu yok; sembol başına tarama sırayla çağrılır
+            from volume_revolution_scanner import VolumeRevolutionScanner
+            scanner = VolumeRevolutionScanner()
+            scan = _timed(scanner.revolutionary_scan, latencies, errors)
+            results = [r for r in (scan(symbol) for symbol in symbols) if 'error' not in r]
+        else:
+            raise ValueError(f"Bilinmeyen benchmark: {case}")
+        wall = time.perf_counter() - started
+
+    return {
+        'case': case,
+        'symbols': n_symbols,
+        'days': n_days,
+        'wall_seconds': wall,
+        'per_symbol': _percentiles(latencies),
+        'symbols_per_second': len(latencies) / wall if wall > 0 else 0.0,
+        'results': len(results or []),
+        'calls': len(latencies),
+        'errors': len(errors),
+        'first_error': errors[0] if errors else None,
+        # Linux'ta KB
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def _run_child(case: str, n_symbols: int, n_days: int, seed: int) -> Dict[str, Any]:
+    """Ölçümü temiz bir süreçte çalıştır (tepe bellek ve önbellekler ayrışsın)"""
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', case, str(n_symbols), str(n_days), str(seed)],
+        cwd=os.path.dirname(os.path.abspath(__file__)), capture_output=True, text=True
+    )
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else 'bilinmeyen hata'
+        return {'case': case, 'symbols': n_symbols, 'days': n_days, 'ok': False, 'error': error}
+    result = json.loads(lines[-1])
+    # Hiç sembol taranamadıysa ölçülen süre taramanın değil hata yolunun süresidir
+    result['ok'] = result['calls'] > 0 and result['errors'] < result['calls']
+    if not result['ok']:
+        result['error'] = (f"{result['errors']}/{result['calls']} sembol hata verdi: "
+                           f"{result['first_error'] or 'sembol taranmadı'}")
+    return result
+
+
+def _load_history() -> List[Dict[str, Any]]:
+    if not os.path.exists(RESULTS_FILE):
+        return []
+    try:
+        with open(RESULTS_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def _comparable(result: Dict[str, Any]) -> bool:
+    """Hatasız tamamlanan ölçümler karşılaştırılır"""
+    return bool(result.get('ok')) and not result.get('errors')
+
+
+def compare_with_previous(record: Dict[str, Any], previous: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Aynı (benchmark, büyüklük) çiftlerini önceki çalıştırmayla karşılaştır"""
+    if not previous:
+        return []
+    before = {(r['case'], r['symbols'], r.get('days')): r for r in previous['results'] if _comparable(r)}
+    comparisons = []
+    for result in record['results']:
+        old = before.get((result['case'], result['symbols'], result.get('days')))
+        if not _comparable(result) or old is None:
+            continue
+        ratio = result['wall_seconds'] / old['wall_seconds'] if old['wall_seconds'] > 0 else 1.0
+        comparisons.append({
+            'case': result['case'],
+            'symbols': result['symbols'],
+            'ratio': ratio,
+            'regression': ratio > REGRESSION_RATIO,
+        })
+    return comparisons
+
+
+def run_suite(sizes=DEFAULT_SIZES, n_days: int = DEFAULT_DAYS, cases: List[str] = None,
+              repeats: int = 1, seed: int = 42) -> Dict[str, Any]:
+    """Tüm benchmark matrisini çalıştır ve sonucu geçmişe ekle"""
+    results = []
+    for case in cases or CASES:
+        for n_symbols in sizes:
+            runs = [_run_child(case, n_symbols, n_days, seed) for _ in range(repeats)]
+            ok_runs = [r for r in runs if r.get('ok')]
+            if not ok_runs:
+                results.append(runs[-1])
+                continue
+            # Tekrarlar arasında medyan süreli çalıştırmayı raporla
+            median_wall = statistics.median(r['wall_seconds'] for r in ok_runs)
+            best = min(ok_runs, key=lambda r: abs(r['wall_seconds'] - median_wall))
+            best['repeats'] = len(ok_runs)
+            results.append(best)
+
+    history = _load_history()
+    record = {
+        'timestamp': datetime.now().isoformat(),
+        'python': sys.version.split()[0],
+        'seed': seed,
+        'results': results,
+    }
+    record['comparison'] = compare_with_previous(record, history[-1] if history else None)
+    history.append(record)
+    with open(RESULTS_FILE, 'w', encoding='utf-8') as f:
+        json.dump(history, f, ensure_ascii=False, indent=2)
+    return record
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        case, n_symbols, n_days, seed = sys.argv[2], int(sys.argv[3]), int(sys.argv[4]), int(sys.argv[5])
+        print(json.dumps(run_case(case, n_symbols, n_days, seed)))
+        sys.exit(0)
+
+    sizes = [int(a) for a in sys.argv[1:]] or list(DEFAULT_SIZES)
+    record = run_suite(sizes)
+
+    print("🧪 SENTETİK EVREN BENCHMARK")
+    print("=" * 78)
+    for result in record['results']:
+        if not result.get('ok'):
+            print(f"❌ {result['case']:22s} {result['symbols']:5d} sembol: {result['error']}")
+            continue
+        per_symbol = result['per_symbol']
+        print(f"📊 {result['case']:22s} {result['symbols']:5d} sembol: {result['wall_seconds']:7.2f} sn | "
+              f"p50 {per_symbol.get('p50_ms', 0):6.1f} ms  p99 {per_symbol.get('p99_ms', 0):6.1f} ms | "
+              f"{result['peak_rss_mb']:6.0f} MB" + (f" | {result['errors']} hata" if result['errors'] else ""))
+    for item in record['comparison']:
+        if item['regression']:
+            print(f"⚠️ Regresyon: {item['case']} ({item['symbols']} sembol) {item['ratio']:.2f}x yavaşladı")
+    print("=" * 78)
+    print(f"💾 Sonuçlar {RESULTS_FILE} dosyasına eklendi")
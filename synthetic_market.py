@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Sentetik BİST Piyasası Üreteci
+N sembol x T gün için BİST benzeri günlük OHLCV tabloları üretir:
+
+- ±%10 fiyat limitleri (önceki kapanışa göre, fiyat adımına yuvarlanmış)
+- Fiyat aralığına göre fiyat adımları (0.01 ... 2.50 TL)
+- Hacim patlamaları, tavan günlerinde artan hacim
+- Art arda tavan serileri (tavan sonrası devam olasılığı)
+- İşlem durdurma günleri (hacim 0, fiyat sabit)
+
+Üretilen evren SyntheticProvider ile sağlayıcı katmanına takılarak tüm
+tarayıcılar ağ olmadan çalıştırılabilir (bkz. synthetic_benchmark).
+"""
+
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from price_store import normalize_symbol, slice_period
+from providers import ProviderLayer, ReplayResponse
+
+logger = logging.getLogger(__name__)
+
+# BİST pay piyasası fiyat adımları: (üst sınır, adım)
+TICK_BANDS = [
+    (20.0, 0.01),
+    (50.0, 0.02),
+    (100.0, 0.05),
+    (250.0, 0.10),
+    (500.0, 0.25),
+    (1000.0, 0.50),
+    (2500.0, 1.00),
+    (np.inf, 2.50),
+]
+PRICE_LIMIT = 0.10
+
+
+def tick_size(prices: np.ndarray) -> np.ndarray:
+    """Fiyat(lar) için geçerli fiyat adımı"""
+    prices = np.asarray(prices, dtype=np.float64)
+    conditions = [prices < upper for upper, _ in TICK_BANDS]
+    return np.select(conditions, [tick for _, tick in TICK_BANDS], default=TICK_BANDS[-1][1])
+
+
+def round_to_tick(prices: np.ndarray, mode: str = 'nearest') -> np.ndarray:
+    """Fiyatları adıma yuvarla ('nearest', 'down' veya 'up')"""
+    prices = np.asarray(prices, dtype=np.float64)
+    tick = tick_size(prices)
+    steps = prices / tick
+    if mode == 'down':
+        steps = np.floor(steps + 1e-9)
+    elif mode == 'up':
+        steps = np.ceil(steps - 1e-9)
+    else:
+        steps = np.round(steps)
+    return np.round(steps * tick, 2)
+
+
+def price_limits(prev_close: np.ndarray) -> tuple:
+    """(taban, tavan) fiyatları: ±%10, adıma içeri doğru yuvarlanmış"""
+    ceiling = round_to_tick(prev_close * (1 + PRICE_LIMIT), 'down')
+    floor = round_to_tick(prev_close * (1 - PRICE_LIMIT), 'up')
+    return floor, ceiling
+
+
+def generate_universe(n_symbols: int = 500, n_days: int = 250, seed: int = 42,
+                      end: Optional[pd.Timestamp] = None, ceiling_prob: float = 0.006,
+                      streak_prob: float = 0.45, spike_prob: float = 0.03,
+                      halt_prob: float = 0.002, prefix: str = "SYN") -> Dict[str, pd.DataFrame]:
+    """
+    Sentetik evren üret
+
+    ceiling_prob: Serisi olmayan bir günde tavan olayı başlama olasılığı
+    streak_prob: Tavan ertesi günü tekrar tavan olma olasılığı
+    spike_prob: Hacim patlaması olasılığı (3-8x)
+    halt_prob: İşlem durdurma olasılığı
+
+    Dönüş: {'SYN0001': OHLCV tablosu (Europe/Istanbul saat dilimli)}
+    """
+    rng = np.random.default_rng(seed)
+    end = end if end is not None else pd.Timestamp.now(tz='Europe/Istanbul').normalize()
+    dates = pd.bdate_range(end=end.tz_localize(None) if end.tzinfo else end, periods=n_days)
+    dates = dates.tz_localize('Europe/Istanbul')
+
+    n = n_symbols
+    # Sembol özellikleri: fiyat seviyesi, oynaklık, ortalama hacim
+    prev_close = round_to_tick(np.exp(rng.uniform(np.log(2.0), np.log(600.0), n)))
+    volatility = rng.uniform(0.012, 0.045, n)
+    base_volume = np.exp(rng.uniform(np.log(2e4), np.log(5e7), n))
+    in_streak = np.zeros(n, dtype=bool)
+
+    opens = np.empty((n_days, n))
+    highs = np.empty((n_days, n))
+    lows = np.empty((n_days, n))
+    closes = np.empty((n_days, n))
+    volumes = np.empty((n_days, n))
+
+    for t in range(n_days):
+        floor, ceiling = price_limits(prev_close)
+        halted = rng.random(n) < halt_prob
+
+        # Tavan olayı: yeni başlangıç veya seri devamı
+        ceiling_day = np.where(in_streak, rng.random(n) < streak_prob, rng.random(n) < ceiling_prob)
+        ceiling_day &= ~halted
+
+        # Kalın kuyruklu günlük getiri
+        returns = rng.standard_t(4, n) * volatility / np.sqrt(2)
+        close = np.clip(round_to_tick(prev_close * (1 + returns)), floor, ceiling)
+        close = np.where(ceiling_day, ceiling, close)
+
+        gap = rng.normal(0, volatility / 3)
+        gap = np.where(ceiling_day, np.abs(gap) + volatility, gap)
+        open_ = np.clip(round_to_tick(prev_close * (1 + gap)), floor, ceiling)
+
+        wick = np.abs(rng.normal(0, volatility / 2, (2, n)))
+        high = np.clip(round_to_tick(np.maximum(open_, close) * (1 + wick[0]), 'up'), floor, ceiling)
+        low = np.clip(round_to_tick(np.minimum(open_, close) * (1 - wick[1]), 'down'), floor, ceiling)
+        high = np.where(ceiling_day, ceiling, high)
+
+        volume = base_volume * rng.lognormal(0, 0.35, n)
+        spikes = rng.random(n) < spike_prob
+        volume = np.where(spikes, volume * rng.uniform(3, 8, n), volume)
+        volume = np.where(ceiling_day, volume * rng.uniform(2, 4, n), volume)
+
+        # İşlem durdurma: fiyat sabit, hacim yok
+        open_ = np.where(halted, prev_close, open_)
+        high = np.where(halted, prev_close, high)
+        low = np.where(halted, prev_close, low)
+        close = np.where(halted, prev_close, close)
+        volume = np.where(halted, 0, volume)
+
+        opens[t], highs[t], lows[t], closes[t] = open_, high, low, close
+        volumes[t] = np.round(volume)
+        in_streak = ceiling_day | (in_streak & halted)
+        prev_close = close
+
+    universe = {}
+    for i in range(n):
+        symbol = f"{prefix}{i + 1:04d}"
+        universe[symbol] = pd.DataFrame({
+            'Open': opens[:, i],
+            'High': highs[:, i],
+            'Low': lows[:, i],
+            'Close': closes[:, i],
+            'Volume': volumes[:, i],
+        }, index=dates)
+    logger.info(f"Sentetik evren: {n} sembol x {n_days} gün")
+    return universe
+
+
+def universe_summary(universe: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
+    """Üretilen evrenin tavan / seri / durdurma istatistikleri"""
+    ceiling_days = streak_days = halted_days = 0
+    for frame in universe.values():
+        _, ceiling = price_limits(frame['Close'].shift(1).values[1:])
+        is_ceiling = np.isclose(frame['Close'].values[1:], ceiling)
+        ceiling_days += int(is_ceiling.sum())
+        streak_days += int((is_ceiling[1:] & is_ceiling[:-1]).sum())
+        halted_days += int((frame['Volume'] == 0).sum())
+    return {'symbols': len(universe), 'ceiling_days': ceiling_days,
+            'streak_days': streak_days, 'halted_days': halted_days}
+
+
+class SyntheticProvider(ProviderLayer):
+    """Sağlayıcı katmanını sentetik evrenle değiştirir (ağ ve kaset kullanılmaz)"""
+
+    def __init__(self, universe: Dict[str, pd.DataFrame], latency_ms: float = 0.0):
+        super().__init__(mode='replay', replay_latency_ms=latency_ms)
+        self.universe = universe
+
+    def _frame(self, symbol: str, period: Optional[str]) -> pd.DataFrame:
+        frame = self.universe.get(normalize_symbol(symbol))
+        if frame is None:
+            return pd.DataFrame()
+        self._replay_wait()
+        return slice_period(frame, period) if period else frame
+
+    def history(self, symbol: str, **kwargs) -> pd.DataFrame:
+        with self._lock:
+            self.stats['calls'] += 1
+        return self._frame(symbol, kwargs.get('period', '1mo'))
+
+    def download(self, tickers: List[str], **kwargs) -> pd.DataFrame:
+        with self._lock:
+            self.stats['calls'] += 1
+        ticker_list = [tickers] if isinstance(tickers, str) else list(tickers)
+        frames = {t: self._frame(t, kwargs.get('period', '1mo')) for t in ticker_list}
+        frames = {t: f for t, f in frames.items() if not f.empty}
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, axis=1)
+
+    def info(self, symbol: str) -> Dict[str, Any]:
+        frame = self.universe.get(normalize_symbol(symbol))
+        if frame is None:
+            return {}
+        # Fiyat ve hacimden tutarlı bir piyasa değeri türet
+        shares = float(frame['Volume'].median() * 200)
+        return {
+            'marketCap': float(frame['Close'].iloc[-1] * shares),
+            'sharesOutstanding': shares,
+            'floatShares': shares * 0.35,
+            'sector': 'Synthetic',
+            'industry': 'Synthetic',
+        }
+
+    def http_get(self, url: str, params=None, headers=None, timeout=None, session=None):
+        with self._lock:
+            self.stats['calls'] += 1
+        return ReplayResponse(404, '', url=url)
+
+
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO)
+    n_symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    n_days = int(sys.argv[2]) if len(sys.argv) > 2 else 250
+    universe = generate_universe(n_symbols, n_days)
+    print(f"🧪 {universe_summary(universe)}")
@@ -6,9 +6,12 @@ Bu modül hisse senetleri için teknik analiz göstergelerini hesaplar.
 
 import pandas as pd
 import numpy as np
-import ta
 from typing import Dict, List, Any, Optional
 import logging
+from lazy_imports import lazy_import
+
+# Ağır bağımlılıklar ilk kullanımda yüklenir
+ta = lazy_import('ta')
 
 logger = logging.getLogger(__name__)
 
@@ -6,18 +6,14 @@ Bu modül analiz sonuçlarını Telegram üzerinden gönderir.
 
 import asyncio
 import os
-try:
-    from telegram import Bot
-    from telegram.error import TelegramError
-    print("✅ Telegram library başarıyla yüklendi!")
-except ImportError as e:
-    # Fallback for import issues
-    print(f"⚠️ Telegram import problemi: {e}")
-    Bot = None
-    TelegramError = Exception
 import logging
 from typing import List, Dict, Any
 from datetime import datetime
+from lazy_imports import lazy_import, is_available
+
+# python-telegram-bot sadece bot gerçekten kurulurken yüklenir
+telegram = lazy_import('telegram')
+telegram_error = lazy_import('telegram.error')
 # import emoji  # Şimdilik emoji kullanmayacağız
 
 logger = logging.getLogger(__name__)
@@ -29,8 +25,8 @@ class TelegramNotifier:
         self.chat_id = os.getenv('TELEGRAM_CHAT_ID')
         self.bot = None
         
-        if self.bot_token and self.chat_id and Bot is not None:
-            self.bot = Bot(token=self.bot_token)
+        if self.bot_token and self.chat_id and is_available('telegram'):
+            self.bot = telegram.Bot(token=self.bot_token)
             logger.info("Telegram bot başlatıldı")
         else:
             logger.warning("Telegram bot token veya chat ID bulunamadı - Test modunda çalışıyor")
@@ -66,7 +62,7 @@ class TelegramNotifier:
             logger.info("Günlük analiz raporu Telegram'a gönderildi")
             return True
             
-        except TelegramError as e:
+        except telegram_error.TelegramError as e:
             logger.error(f"Telegram mesaj gönderme hatası: {e}")
             return False
         except Exception as e:
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+from feature_cache import FeatureCache
+
+DAYS = pd.bdate_range('2023-01-02', '2024-12-31')
+PRICES = pd.DataFrame({'Close': np.random.default_rng(0).lognormal(0, 0.02, len(DAYS)).cumprod()},
+                      index=DAYS)
+
+
+def fetch(symbol, start, end):
+    return PRICES[(PRICES.index >= start) & (PRICES.index < end)]
+
+
+def compute(df):
+    # Tüm seriye bakan kantil: pencere dışındaki satırlar sonucu değiştirir
+    df['low'] = (df['Close'] < df['Close'].quantile(0.25)).astype(int)
+    df['ema'] = df['Close'].ewm(span=10).mean()
+    return df
+
+
+def test_cached_frames_match_cold_runs(tmp_path):
+    warm = FeatureCache(str(tmp_path / 'warm'))
+    warm.get_frame('AAA', '2024-06-03', '2024-12-02', fetch, compute)
+    requests = [('2024-06-03', '2024-12-31'),   # sonda eksik
+                ('2024-06-03', '2024-09-02'),   # kayıttan önce biten pencere
+                ('2024-03-01', '2024-12-31')]   # farklı başlangıç
+    for start, end in requests:
+        cached = warm.get_frame('AAA', start, end, fetch, compute)
+        cold = FeatureCache(str(tmp_path / f'cold_{start}_{end}')).get_frame('AAA', start, end, fetch, compute)
+        pd.testing.assert_frame_equal(cached, cold)
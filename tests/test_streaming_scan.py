@@ -0,0 +1,27 @@
+from scan_journal import ScanJournal
+from streaming_scan import ScanStream
+
+
+def test_error_results_are_retried_on_resume(tmp_path):
+    attempts = {}
+
+    def scan(symbol):
+        attempts[symbol] = attempts.get(symbol, 0) + 1
+        if symbol == 'BBB' and attempts[symbol] == 1:
+            # AdvancedCeilingScanner gibi: istisna yerine hata sözlüğü
+            return {'symbol': symbol, 'score': 0, 'error': 'throttled'}
+        return {'symbol': symbol, 'score': 50}
+
+    def run():
+        journal = ScanJournal('test', snapshot_id='snap', directory=str(tmp_path))
+        stream = ScanStream(['AAA', 'BBB'], scan, score_key='score', max_workers=1, journal=journal)
+        return stream, list(stream)
+
+    stream, results = run()
+    assert [r['symbol'] for r in results] == ['AAA']
+    assert stream.failed == 1
+
+    stream, results = run()
+    assert sorted(r['symbol'] for r in results) == ['AAA', 'BBB']
+    assert stream.resumed == 1 and stream.failed == 0
+    assert attempts == {'AAA': 1, 'BBB': 2}
@@ -0,0 +1,30 @@
+import numpy as np
+
+from walk_forward import make_folds, walk_forward_evaluate
+
+
+def synthetic(days=150, rows_per_day=40, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = np.repeat(np.datetime64('2024-01-01') + np.arange(days), rows_per_day)
+    X = rng.normal(size=(len(dates), 5))
+    y = (X[:, 0] + 0.5 * X[:, 1] + rng.normal(scale=0.8, size=len(dates)) > 1.2).astype(int)
+    return X, y, dates
+
+
+def test_folds_leave_a_purge_gap_between_train_and_test():
+    dates = np.datetime64('2024-01-01') + np.arange(100)
+    for purge_days in (0, 1, 3):
+        for fold in make_folds(dates, train_days=30, test_days=10, purge_days=purge_days):
+            between = dates[(dates > fold['train_end']) & (dates < fold['test_start'])]
+            assert len(between) == purge_days
+
+
+def test_warm_started_forest_stays_close_to_full_refit():
+    # Delta gruplarının karışımı yaklaşıklıktır; tüm pencereyle yeniden eğitimden çok uzaklaşmamalı
+    X, y, dates = synthetic()
+    kwargs = dict(train_days=60, test_days=15, trees_initial=60, trees_per_fold=20,
+                  max_workers=2, random_state=0)
+    warm = walk_forward_evaluate(X, y, dates, ensemble='rf', **kwargs)['summary']
+    refit = walk_forward_evaluate(X, y, dates, ensemble='rf_refit', **kwargs)['summary']
+    assert warm['scored_folds'] == refit['scored_folds'] > 0
+    assert abs(warm['mean_roc_auc'] - refit['mean_roc_auc']) < 0.05
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Kademeli Gün İçi Tarama Zamanlayıcısı
+Evrenin tamamını aynı öncelikle taramak yerine sembolleri "ısı" değerine
+göre üç kademeye ayırır ve her kademeyi farklı sıklıkta yeniden tarar:
+
+    hot   Her birkaç dakikada (varsayılan 5 dk) - seans içinde
+    warm  Saatte bir - seans içinde
+    cold  Günde bir - sabah tam taraması (seed_scores) kapsar; o gün taranmamış
+          cold semboller sadece seans içinde telafi edilir
+
+Isı; son tarama skoru, hacim oranı (son gün / 20 gün ortalaması), günlük
+limite yakınlık ve son 5 gündeki tavan sayısından hesaplanır. Her taramadan
+sonra kademeler en güncel skorlarla yeniden atanır. Böylece sağlayıcı kotası
+ve işlemci, bugün tavan yapabilecek sembollere harcanır.
+
+Kullanım (daemon içinde dakikada bir):
+    scheduler = TieredScanScheduler(scanner.hybrid_scan, 'hybrid_score',
+                                    scanner.bist_stocks, price_store=store)
+    scheduler.tick()
+"""
+
+import time
+import logging
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from scan_journal import SESSION_CLOSE, SESSION_OPEN
+from streaming_scan import ScanStream
+from tracing import inc, set_gauge, span
+
+logger = logging.getLogger(__name__)
+
+TIER_INTERVALS = {
+    'hot': timedelta(minutes=5),
+    'warm': timedelta(hours=1),
+    'cold': timedelta(days=1),
+}
+PRICE_LIMIT = 0.10
+CEILING_THRESHOLD = 0.095
+# Isı bileşenlerinin ağırlıkları: skor, hacim oranı, limite yakınlık, son tavanlar
+HEAT_WEIGHTS = (0.40, 0.25, 0.25, 0.10)
+
+
+def in_session(now: datetime) -> bool:
+    return now.weekday() < 5 and SESSION_OPEN <= now.time() < SESSION_CLOSE
+
+
+class TieredScanScheduler:
+    def __init__(self, scan_fn: Callable[[str], Dict[str, Any]], score_key: str,
+                 symbols: List[str], price_store=None, hot_size: int = 25, warm_size: int = 100,
+                 max_symbols_per_tick: int = 60, max_score: float = 100.0, max_workers: int = 4,
+                 on_result: Optional[Callable[[Dict[str, Any], str], None]] = None):
+        """
+        scan_fn: Tek sembolü tarayan fonksiyon (örn. HybridCeilingScanner.hybrid_scan)
+        score_key: Sonuçtaki skor alanı
+        hot_size / warm_size: Kademe büyüklükleri (kalanlar cold)
+        max_symbols_per_tick: Bir turda taranacak en fazla sembol (kota bütçesi)
+        max_score: Skorun üst sınırı (ısı hesabında normalize etmek için)
+        on_result: Her tarama sonucunda (sonuç, kademe) ile çağrılır
+        """
+        self.scan_fn = scan_fn
+        self.score_key = score_key
+        self.symbols = list(dict.fromkeys(symbols))
+        self.price_store = price_store
+        self.hot_size = hot_size
+        self.warm_size = warm_size
+        self.max_symbols_per_tick = max_symbols_per_tick
+        self.max_score = max_score
+        self.max_workers = max_workers
+        self.on_result = on_result
+
+        self.scores: Dict[str, float] = {}
+        self.heat: Dict[str, float] = {}
+        self.last_scanned: Dict[str, datetime] = {}
+        # İlk sınıflandırmaya kadar herkes cold: ilk tur tüm evreni tarar
+        self.tiers: Dict[str, str] = {symbol: 'cold' for symbol in self.symbols}
+        self.stats = Counter()
+        self._lock = threading.Lock()
+
+    # --- Isı ve kademeler ---
+
+    def market_features(self) -> Dict[str, np.ndarray]:
+        """
+        Fiyat deposundan (ağ erişimi olmadan) hacim oranı, limite yakınlık ve
+        son 5 gündeki tavan sayısını hesapla
+        """
+        n = len(self.symbols)
+        volume_ratio = np.zeros(n)
+        proximity = np.zeros(n)
+        recent_ceilings = np.zeros(n)
+        if self.price_store is None:
+            return {'volume_ratio': volume_ratio, 'proximity': proximity, 'recent_ceilings': recent_ceilings}
+
+        for i, symbol in enumerate(self.symbols):
+            frame = self.price_store.peek(symbol)
+            if frame is None or len(frame) < 3:
+                continue
+            frame = frame.iloc[-25:]
+            close = frame['Close'].to_numpy(dtype=float)
+            volume = frame['Volume'].to_numpy(dtype=float)
+            returns = close[1:] / close[:-1] - 1
+            average_volume = volume[-21:-1].mean()
+            if average_volume > 0:
+                volume_ratio[i] = volume[-1] / average_volume
+            proximity[i] = returns[-1] / PRICE_LIMIT
+            recent_ceilings[i] = np.count_nonzero(returns[-5:] >= CEILING_THRESHOLD)
+        return {'volume_ratio': volume_ratio, 'proximity': proximity, 'recent_ceilings': recent_ceilings}
+
+    def update_tiers(self) -> Dict[str, int]:
+        """Isıyı yeniden hesapla ve kademeleri sıralamaya göre ata"""
+        features = self.market_features()
+        scores = np.array([self.scores.get(s, 0.0) for s in self.symbols]) / self.max_score
+        w_score, w_volume, w_limit, w_ceiling = HEAT_WEIGHTS
+        heat = (w_score * np.clip(scores, 0, 1)
+                + w_volume * np.clip(features['volume_ratio'] / 3, 0, 1)
+                + w_limit * np.clip(features['proximity'], 0, 1)
+                + w_ceiling * np.clip(features['recent_ceilings'] / 2, 0, 1))
+
+        order = np.argsort(-heat, kind='stable')
+        tiers = {}
+        for rank, i in enumerate(order):
+            symbol = self.symbols[i]
+            # Hiç ısınmamış semboller yer boş kalsa da cold kalır
+            if heat[i] <= 0:
+                tiers[symbol] = 'cold'
+            elif rank < self.hot_size:
+                tiers[symbol] = 'hot'
+            elif rank < self.hot_size + self.warm_size:
+                tiers[symbol] = 'warm'
+            else:
+                tiers[symbol] = 'cold'
+
+        with self._lock:
+            self.heat = {s: float(h) for s, h in zip(self.symbols, heat)}
+            self.tiers = tiers
+        counts = Counter(tiers.values())
+        for tier in TIER_INTERVALS:
+            set_gauge('scheduler_tier_size', counts[tier], tier=tier)
+        return dict(counts)
+
+    def seed_scores(self, results: List[Dict[str, Any]], scanned_at: Optional[datetime] = None):
+        """
+        Tüm evreni kapsayan bir taramanın (örn. sabah taraması) sonuçlarını işle:
+        evren o an taranmış sayılır, listede olmayanların skoru 0 kabul edilir
+        """
+        scanned_at = scanned_at or datetime.now()
+        scores = {r.get('symbol'): float(r.get(self.score_key, 0) or 0) for r in results}
+        for symbol in self.symbols:
+            self.scores[symbol] = scores.get(symbol, 0.0)
+            self.last_scanned[symbol] = scanned_at
+        return self.update_tiers()
+
+    def tier_members(self, tier: str) -> List[str]:
+        return [s for s in self.symbols if self.tiers.get(s) == tier]
+
+    # --- Zamanlama ---
+
+    def due(self, now: Optional[datetime] = None) -> List[str]:
+        """
+        Süresi dolan semboller (önce hot, sonra warm, sonra cold)
+
+        Seans dışında hiçbir sembol taranmaz (barlar değişmez). cold kademe güne
+        bir kez taranır; sabah taraması seed_scores ile tüm evreni o gün taranmış
+        saydığından cold tarama sadece sabah taraması yapılamadığında devreye
+        girer. Sonuç max_symbols_per_tick ile sınırlanır, en uzun süredir
+        taranmayan semboller önce gelir.
+        """
+        now = now or datetime.now()
+        if not in_session(now):
+            return []
+        due = []
+        for tier in ('hot', 'warm', 'cold'):
+            interval = TIER_INTERVALS[tier]
+            candidates = []
+            for symbol in self.tier_members(tier):
+                last = self.last_scanned.get(symbol)
+                if last is None or (last.date() != now.date() if tier == 'cold' else now - last >= interval):
+                    candidates.append((last or datetime.min, symbol))
+            due.extend(symbol for _, symbol in sorted(candidates))
+        return due[:self.max_symbols_per_tick]
+
+    def tick(self, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """Süresi dolan sembolleri tara, skorları ve kademeleri güncelle"""
+        now = now or datetime.now()
+        symbols = self.due(now)
+        if not symbols:
+            return []
+
+        started = time.perf_counter()
+        tiers = {s: self.tiers.get(s, 'cold') for s in symbols}
+        with span('tiered_tick', scheduler='intraday'):
+            # Sadece taranacak sembollerin son barı indirilir (kota bütçesi)
+            if self.price_store is not None and any(tiers[s] != 'cold' for s in symbols):
+                self.price_store.refresh_last_bar([s for s in symbols if tiers[s] != 'cold'])
+
+            results = []
+            stream = ScanStream(symbols, self.scan_fn, self.score_key, max_workers=self.max_workers,
+                                name='tiered')
+            for result in stream:
+                symbol = result.get('symbol')
+                self.scores[symbol] = float(result.get(self.score_key, 0) or 0)
+                self.last_scanned[symbol] = now
+                results.append(result)
+                if self.on_result:
+                    self.on_result(result, tiers.get(symbol, 'cold'))
+            # Hata veren semboller de taranmış sayılır (her turda yeniden denenmesin);
+            # seed_scores tüm sembollere eski bir zaman atadığından üzerine yazılır
+            for symbol in symbols:
+                self.last_scanned[symbol] = now
+
+            counts = self.update_tiers()
+
+        for tier, count in Counter(tiers.values()).items():
+            self.stats[f'scanned_{tier}'] += count
+            inc('scheduler_scans_total', count, tier=tier)
+        logger.info(f"Kademeli tarama: {len(symbols)} sembol ({dict(Counter(tiers.values()))}) "
+                    f"{time.perf_counter() - started:.1f} sn | kademeler: {counts}")
+        return results
+
+
+def ceiling_alert_consumer(send_fn: Callable[[str], Any], score_key: str, threshold: float = 70.0):
+    """
+    hot / warm kademede skoru eşiği ilk kez geçen semboller için anlık uyarı
+    gönderen on_result fonksiyonu (aynı gün aynı sembol için bir kez)
+    """
+    alerted = set()
+
+    def consume(result: Dict[str, Any], tier: str):
+        symbol = result.get('symbol')
+        score = result.get(score_key, 0) or 0
+        key = (symbol, datetime.now().date())
+        if tier == 'cold' or score < threshold or key in alerted:
+            return
+        alerted.add(key)
+        send_fn(f"🔥 GÜN İÇİ TAVAN ADAYI ({tier})\n\n{symbol}: {score:.1f} puan\n"
+                f"Zaman: {datetime.now().strftime('%H:%M')}")
+    return consume
@@ -4,15 +4,28 @@
 Kapsamlı teknik analiz ile bugün tavan yapabilecek hisselerin tespiti
 """
 
-import yfinance as yf
-import talib
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from lazy_imports import lazy_import
+import providers
+from scan_history import ScanHistoryStore
+from prefilter import PreFilter
+from price_store import PriceStore
+from universe_scan import warmed_price_store
+
+# Ağır bağımlılıklar ilk kullanımda yüklenir
+talib = lazy_import('talib')
 
 class TodayCeilingPredictor:
-    def __init__(self):
-        """Bugünkü tavan tahmin sistemi"""
+    def __init__(self, history_store: ScanHistoryStore = None, prefilter: PreFilter = None,
+                 price_store: PriceStore = None):
+        """Bugünkü tavan tahmin sistemi (adaylar sonuç takibi için tarama geçmişine yazılır)"""
+        self.history_store = history_store or ScanHistoryStore()
+        # Verilmezse run_today_analysis tüm adaylar için tek toplu indirmeyle doldurur
+        self.price_store = price_store
+        # Ek adaylar tam analizden önce ucuz son bar süzgecinden geçer
+        self.prefilter = prefilter or PreFilter.preset('today_ceiling')
         self.top_candidates = [
             'RTALB.IS', 'BEYAZ.IS', 'BARMA.IS', 'VERUS.IS', 'BORLS.IS',
             'GRNYO.IS', 'PCILT.IS', 'KAPLM.IS', 'PENTA.IS'
@@ -24,11 +37,17 @@ class TodayCeilingPredictor:
             'THYAO.IS', 'AKBNK.IS', 'TUPRS.IS', 'ASELS.IS', 'VESTL.IS'
         ]
     
+    def get_history(self, symbol: str) -> pd.DataFrame:
+        """Son ~90 günlük geçmiş (depo varsa ağ erişimi yapılmaz)"""
+        if self.price_store is not None:
+            data = self.price_store.get_history(symbol, '3mo')
+            return data if data is not None else pd.DataFrame()
+        return providers.history(symbol, period='90d')
+    
     def analyze_pre_market_momentum(self, symbol: str) -> dict:
         """Piyasa öncesi momentum analizi"""
         try:
-            ticker = yf.Ticker(symbol)
-            data = ticker.history(period='90d')
+            data = self.get_history(symbol)
             
             if len(data) < 30:
                 return {'error': 'Yetersiz veri'}
@@ -351,6 +370,10 @@ class TodayCeilingPredictor:
         
         all_candidates = []
         
+        # Ana ve ek adaylar tek toplu indirmeyle; analiz ve ön süzgeç aynı depodan okur
+        if self.price_store is None:
+            self.price_store = warmed_price_store(self.top_candidates + self.additional_candidates)
+        
         # Ana adayları analiz et
         print("\n🔥 ANA SÜPER ADAYLAR ANALİZİ:")
         print("-" * 50)
@@ -369,7 +392,12 @@ class TodayCeilingPredictor:
         print("\n📊 EK POTANSIYEL ADAYLAR:")
         print("-" * 50)
         
-        for symbol in self.additional_candidates:
+        # Hareketsiz ek adaylar, analizin de okuduğu aynı depo üzerinde elenir
+        additional = self.prefilter.apply(self.additional_candidates, self.price_store)
+        report = self.prefilter.last_report
+        print(f"🧹 Ön süzgeç: {report['total']} ek adaydan {report['pruned']} tanesi elendi")
+        
+        for symbol in additional:
             analysis = self.analyze_pre_market_momentum(symbol)
             if 'error' not in analysis:
                 probability = self.calculate_ceiling_probability(analysis)
@@ -382,6 +410,16 @@ class TodayCeilingPredictor:
         # Sırala
         all_candidates.sort(key=lambda x: x['ceiling_probability'], reverse=True)
         
+        # Sonuç takibi için kaydet
+        try:
+            self.history_store.record_scan(
+                'today_ceiling', all_candidates,
+                total_scanned=len(self.top_candidates) + len(self.additional_candidates),
+                score_key='ceiling_probability'
+            )
+        except Exception as e:
+            print(f"❌ Tahmin kaydetme hatası: {e}")
+        
         print(f"\n🎯 TOPLAM {len(all_candidates)} GÜÇLÜ ADAY BULUNDU!")
         print("\n👑 BUGÜNKÜ TAVAN ADAY LİSTESİ:")
         print("=" * 100)
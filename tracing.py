@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+İzleme (Tracing) ve Metrik Modülü
+Günlük analiz ve taramaların aşamalarını (veri çekme, gösterge, skorlama,
+haber, sıralama, bildirim) hafif span'lerle ölçer. Sembol ve sağlayıcı bazlı
+gecikme histogramları, önbellek isabet sayaçları ve hız sınırı bekleme süreleri
+tek bir süreç içi kayıt defterinde toplanır ve iki biçimde dışa aktarılır:
+
+- Prometheus metin biçimi (node_exporter textfile collector ile okunabilir)
+- Çalıştırma başına JSON özeti (aşama süreleri, yüzdelikler)
+
+Sürekli çalışan süreçte (analysis_daemon) her zamanlanmış görev start_run() ile
+başlar; böylece JSON özeti sadece o görevin span / histogramlarını içerir.
+Zaman damgalı özet dosyaları SUMMARY_KEEP_DAYS günden eskiyse silinir.
+
+Kullanım:
+    with span('fetch', pipeline='daily_analysis'):
+        ...
+    @traced('realtime_ceiling_scan', provider='twelvedata')
+    def get_real_time_ceiling_stocks(...): ...
+    inc('cache_requests_total', cache='indicator', result='hit')
+    observe('provider_request_seconds', 0.42, provider='yfinance')
+    start_run(); ...; export_prometheus(); export_run_summary('daily_analysis')
+"""
+
+import os
+import glob
+import json
+import time
+import bisect
+import functools
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+METRICS_DIR = os.getenv('BIST_METRICS_DIR', 'metrics')
+PROMETHEUS_FILE = 'bist_analyzer.prom'
+METRIC_PREFIX = 'bist_'
+
+# Saniye cinsinden histogram sınırları
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+# Yüzdelik hesabı için metrik başına tutulan en fazla örnek
+MAX_SAMPLES = 5000
+# JSON özetinde tutulan en fazla span (sürekli çalışan süreçte bellek sınırı)
+MAX_SPANS = 2000
+# Zaman damgalı çalıştırma özetlerinin saklanma süresi
+SUMMARY_KEEP_DAYS = 14
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(key) + ([extra] if extra else [])
+    if not items:
+        return ''
+    body = ','.join(f'{k}="{v}"' for k, v in items)
+    return '{' + body + '}'
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.total = 0.0
+        self.samples: List[float] = []
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(value)
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        """Süreç içi sayaç / histogram / gösterge kayıt defteri"""
+        self._lock = threading.Lock()
+        self.counters: Dict[str, Dict[LabelKey, float]] = {}
+        self.gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self.histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self.spans: List[Dict[str, Any]] = []
+        self.run_started = time.time()
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def set_gauge(self, name: str, value: float, **labels):
+        with self._lock:
+            self.gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def observe(self, name: str, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    def record_span(self, name: str, duration: float, labels: Dict[str, Any], error: Optional[str]):
+        self.observe('stage_duration_seconds', duration, stage=name, **labels)
+        with self._lock:
+            self.spans.append({
+                'name': name,
+                'labels': {k: str(v) for k, v in labels.items()},
+                'start': time.time() - duration,
+                'duration': duration,
+                'error': error,
+            })
+            if len(self.spans) > MAX_SPANS:
+                del self.spans[:len(self.spans) - MAX_SPANS]
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+            self.spans.clear()
+            self.run_started = time.time()
+
+    def to_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                metric = METRIC_PREFIX + name
+                lines.append(f"# TYPE {metric} counter")
+                for key, value in series.items():
+                    lines.append(f"{metric}{_format_labels(key)} {value:g}")
+            for name, series in sorted(self.gauges.items()):
+                metric = METRIC_PREFIX + name
+                lines.append(f"# TYPE {metric} gauge")
+                for key, value in series.items():
+                    lines.append(f"{metric}{_format_labels(key)} {value:g}")
+            for name, series in sorted(self.histograms.items()):
+                metric = METRIC_PREFIX + name
+                lines.append(f"# TYPE {metric} histogram")
+                for key, histogram in series.items():
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f"{metric}_bucket{_format_labels(key, ('le', f'{bound:g}'))} {cumulative}")
+                    lines.append(f"{metric}_bucket{_format_labels(key, ('le', '+Inf'))} {histogram.count}")
+                    lines.append(f"{metric}_sum{_format_labels(key)} {histogram.total:g}")
+                    lines.append(f"{metric}_count{_format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            histograms = {
+                name: [
+                    {
+                        'labels': dict(key),
+                        'count': h.count,
+                        'total_seconds': h.total,
+                        'p50': h.percentile(50),
+                        'p95': h.percentile(95),
+                        'max': max(h.samples) if h.samples else 0.0,
+                    }
+                    for key, h in series.items()
+                ]
+                for name, series in self.histograms.items()
+            }
+            counters = {name: [{'labels': dict(k), 'value': v} for k, v in series.items()]
+                        for name, series in self.counters.items()}
+            gauges = {name: [{'labels': dict(k), 'value': v} for k, v in series.items()]
+                      for name, series in self.gauges.items()}
+            spans = list(self.spans)
+        return {
+            'run_started': datetime.fromtimestamp(self.run_started).isoformat(),
+            'wall_seconds': time.time() - self.run_started,
+            'spans': spans,
+            'histograms': histograms,
+            'counters': counters,
+            'gauges': gauges,
+        }
+
+
+registry = MetricsRegistry()
+
+
+@contextmanager
+def span(name: str, **labels):
+    """Bir aşamanın süresini ölç (hata olursa span hata etiketiyle kaydedilir)"""
+    started = time.perf_counter()
+    error = None
+    try:
+        yield
+    except Exception as e:
+        error = type(e).__name__
+        raise
+    finally:
+        registry.record_span(name, time.perf_counter() - started, labels, error)
+
+
+def traced(name: str, **labels):
+    """Fonksiyonun tamamını bir span olarak ölçen dekoratör"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name, **labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def inc(name: str, value: float = 1.0, **labels):
+    registry.inc(name, value, **labels)
+
+
+def observe(name: str, value: float, **labels):
+    registry.observe(name, value, **labels)
+
+
+def set_gauge(name: str, value: float, **labels):
+    registry.set_gauge(name, value, **labels)
+
+
+def start_run():
+    """Yeni çalıştırma: metrikleri sıfırla ve süre ölçümünü şimdi başlat"""
+    registry.reset()
+
+
+def record_cache_stats(cache: str, hits: int, misses: int):
+    """Önbellek isabet oranını gösterge olarak kaydet"""
+    total = hits + misses
+    set_gauge('cache_hit_ratio', hits / total if total else 0.0, cache=cache)
+    set_gauge('cache_lookups', total, cache=cache)
+
+
+def _write_atomic(path: str, content: str):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def export_prometheus(path: Optional[str] = None) -> str:
+    """Metrikleri Prometheus metin biçiminde yaz"""
+    path = path or os.path.join(METRICS_DIR, PROMETHEUS_FILE)
+    _write_atomic(path, registry.to_prometheus())
+    return path
+
+
+def export_run_summary(run_name: str, path: Optional[str] = None) -> str:
+    """Çalıştırma özetini JSON olarak yaz"""
+    summary = registry.summary()
+    summary['run'] = run_name
+    if path is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(METRICS_DIR, f"run_summary_{run_name}_{timestamp}.json")
+        prune_run_summaries()
+    _write_atomic(path, json.dumps(summary, ensure_ascii=False, indent=2, default=str))
+    return path
+
+
+def prune_run_summaries(directory: Optional[str] = None, keep_days: int = SUMMARY_KEEP_DAYS) -> int:
+    """keep_days günden eski zaman damgalı çalıştırma özetlerini sil"""
+    cutoff = time.time() - keep_days * 86400
+    removed = 0
+    for path in glob.glob(os.path.join(directory or METRICS_DIR, "run_summary_*.json")):
+        if os.path.getmtime(path) < cutoff:
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+def export_all(run_name: str) -> Tuple[str, str]:
+    """Prometheus dosyasını ve JSON özetini birlikte yaz"""
+    try:
+        prom_path = export_prometheus()
+        summary_path = export_run_summary(run_name)
+        logger.info(f"Metrikler yazıldı: {prom_path}, {summary_path}")
+        return prom_path, summary_path
+    except OSError as e:
+        logger.error(f"Metrik dışa aktarma hatası: {e}")
+        return '', ''
@@ -4,13 +4,18 @@ Twelve Data Gerçek Zamanlı BİST Veri Çekme Modülü
 1 dakika gecikmeli gerçek zamanlı BİST hisse senedi verilerini Twelve Data API'dan çeker.
 """
 
-import requests
 import pandas as pd
 import time
 import logging
 import json
 from datetime import datetime
 from typing import List, Dict, Any, Optional
+from lazy_imports import lazy_import
+import providers
+from tracing import inc, traced
+
+# Ağır bağımlılıklar ilk kullanımda yüklenir
+requests = lazy_import('requests')
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +25,8 @@ class TwelveDataRealTimeFetcher:
         import os
         # Gerçek API key'i environment'dan al
         self.api_key = api_key or os.getenv('TWELVE_DATA_API_KEY', 'demo')
-        self.base_url = "https://api.twelvedata.com"
+        # Yerel stub sunucu için değiştirilebilir (bkz. provider_stub_server)
+        self.base_url = os.getenv('TWELVE_DATA_BASE_URL', "https://api.twelvedata.com")
         self.call_count = 0
         self.last_call_time = 0
         
@@ -33,6 +39,7 @@ class TwelveDataRealTimeFetcher:
             wait_time = 8 - (current_time - self.last_call_time)
             logger.debug(f"Rate limit - {wait_time:.1f} saniye bekleniyor...")
             time.sleep(wait_time)
+            inc('rate_limit_wait_seconds_total', wait_time, provider='twelvedata')
         
         self.last_call_time = time.time()
         self.call_count += 1
@@ -56,7 +63,7 @@ class TwelveDataRealTimeFetcher:
         
         try:
             logger.debug(f"Twelve Data Quote API: {symbol}")
-            response = requests.get(f"{self.base_url}/quote", params=params, timeout=20)
+            response = providers.http_get(f"{self.base_url}/quote", params=params, timeout=20)
             
             if response.status_code == 429:
                 logger.warning("API rate limit exceeded")
@@ -129,7 +136,7 @@ class TwelveDataRealTimeFetcher:
         
         try:
             logger.debug(f"Time Series API: {symbol} ({interval})")
-            response = requests.get(f"{self.base_url}/time_series", params=params, timeout=30)
+            response = providers.http_get(f"{self.base_url}/time_series", params=params, timeout=30)
             
             if response.status_code != 200:
                 return None
@@ -167,6 +174,7 @@ class TwelveDataRealTimeFetcher:
             logger.error(f"Time series hatası ({bist_symbol}): {e}")
             return None
     
+    @traced('realtime_ceiling_scan', provider='twelvedata')
     def get_real_time_ceiling_stocks(self, symbols: List[str], threshold: float = 9.0) -> List[Dict]:
         """
         Gerçek zamanlı tavan yapan hisseleri bul
@@ -196,7 +204,7 @@ class TwelveDataRealTimeFetcher:
                 }
                 
                 self._rate_limit_check()
-                response = requests.get(f"{self.base_url}/quote", params=params, timeout=30)
+                response = providers.http_get(f"{self.base_url}/quote", params=params, timeout=30)
                 
                 if response.status_code == 200:
                     data = response.json()
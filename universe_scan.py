@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Evren Tarama Ortak Adımları
+Hibrit ve geliştirilmiş tavan tarayıcılarının tarama öncesi hazırlığı
+(evren / likidite kademesi, fiyat deposu, sektör toplamları, ön süzgeç)
+ve parçalı (dağıtık) taraması burada tek yerde tutulur. Tarayıcı sınıfı
+sadece adını, skor anahtarını, asgari skoru ve tarama metodunu belirtir:
+
+    class HybridCeilingScanner(UniverseScanMixin):
+        scanner_name = 'hybrid'
+        score_key = 'hybrid_score'
+        min_score = 30
+        scan_method = 'hybrid_scan'
+
+Karma sınıfı kullanan tarayıcıda price_store, prefilter, universe,
+bist_stocks ve sector_engine öznitelikleri bulunmalıdır.
+"""
+
+from typing import Any, Callable, Dict, List
+
+from price_store import PriceStore
+from shard_queue import ShardQueue, run_distributed
+from tracing import span
+
+
+def warmed_price_store(symbols: List[str], period: str = "3mo") -> PriceStore:
+    """
+    Evreni tek tek değil toplu indirip doldurulmuş bir depo döndür; sembol başına
+    istek atan iş parçacıkları sağlayıcı kısıtlamasına takılırdı
+    """
+    store = PriceStore(warmup_period=period)
+    store.warm_up(symbols)
+    return store
+
+
+class UniverseScanMixin:
+    scanner_name: str = ''
+    score_key: str = ''
+    min_score: float = 0
+    scan_method: str = ''
+
+    @property
+    def scan_function(self) -> Callable[[str], Dict[str, Any]]:
+        """Tek sembolü tarayan metod (iş parçacıkları ve parça işçileri bunu çağırır)"""
+        return getattr(self, self.scan_method)
+
+    def scan_symbols(self, tier: str = None) -> List[str]:
+        """Taranacak semboller (tier verilirse sadece o likidite kademesi)"""
+        if tier is not None and not self.universe.has_liquidity and self.price_store is not None:
+            self.universe.update_liquidity(self.price_store, self.bist_stocks)
+        return self.universe.filter(self.bist_stocks, tier=tier)
+
+    def ensure_price_store(self, symbols: List[str]):
+        """Depo yoksa oluştur; pahalı aşama da aynı depodan okur"""
+        if self.price_store is None:
+            self.price_store = warmed_price_store(symbols)
+
+    def refresh_sectors(self):
+        """Sektör toplamlarını tüm evren için yeniden hesapla (tarama başında bir kez)"""
+        self.ensure_price_store(self.bist_stocks)
+        self.sector_engine.update(self.bist_stocks, self.price_store)
+
+    def refresh_market_context(self):
+        """Tarama başında evren genelinde bir kez hesaplananlar (tarayıcı genişletebilir)"""
+        self.refresh_sectors()
+
+    def apply_prefilter(self, symbols: List[str]) -> List[str]:
+        """Ucuz son bar ölçütleriyle pahalı taramaya girecek sembolleri süz"""
+        self.ensure_price_store(symbols)
+        return self.prefilter.apply(symbols, self.price_store)
+
+    def scan_plan(self, tier: str = None, prefilter: bool = False) -> List[str]:
+        """Tarama öncesi hazırlık: evren, piyasa bağlamı ve (istenirse) ön süzgeç"""
+        symbols = self.scan_symbols(tier)
+        self.refresh_market_context()
+        if prefilter:
+            symbols = self.apply_prefilter(symbols)
+        return symbols
+
+    def print_prefilter_report(self):
+        """Son ön süzgeç geçişinin özeti"""
+        report = self.prefilter.last_report
+        print(f"🧹 Ön süzgeç: {report['total']} hisseden {report['pruned']} tanesi elendi, "
+              f"{report['kept']} hisse taranacak" + (" [gölge mod]" if report.get('shadow') else ""))
+
+    def record_prefilter_recall(self, results: List[Dict]):
+        """Nihai eşiği geçen adaylara göre ön süzgeç recall'ı (gölge modunda)"""
+        self.prefilter.record_recall(results, self.score_key, self.min_score)
+
+    def sharded_scan(self, shard_queue: ShardQueue, max_workers: int = 4, resume: bool = True,
+                     tier: str = None, prefilter: bool = False) -> List[Dict]:
+        """
+        📦 PARÇALI (DAĞITIK) TARAMA
+        Bu süreç koordinatördür: evreni kuyruğa parçalar halinde yazar ve
+        kendisi de işçi olarak çalışır. Diğer süreçler / makineler
+        'python shard_queue.py worker <tarayıcı>' ile katılır; kirası dolan parçalar
+        yeniden taranır. Sonuçlar birleştirilip skora göre sıralanır.
+        """
+        symbols = self.scan_plan(tier, prefilter)
+        if prefilter:
+            self.print_prefilter_report()
+
+        with span('daily_scan', scanner=self.scanner_name, mode='sharded'):
+            results, totals = run_distributed(shard_queue, self.scanner_name, symbols, self.scan_function,
+                                              self.score_key, self.min_score, max_workers=max_workers,
+                                              reset=not resume)
+
+        shards = totals['shards']
+        print(f"📦 {shards['done']}/{shards['total']} parça tamamlandı "
+              f"({totals['local_shards']} tanesi bu süreçte), {totals['scanned']} hisse tarandı")
+        if shards['failed']:
+            print(f"⚠️ {shards['failed']} parça deneme hakkını doldurdu, sonuçlara dahil değil")
+        if totals['failed']:
+            print(f"❌ {totals['failed']} hisse hata nedeniyle taranamadı")
+
+        if prefilter:
+            self.record_prefilter_recall(results)
+
+        return results
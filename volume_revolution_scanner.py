@@ -9,58 +9,22 @@ YENİ VOLUME TEORİSİ:
 - Fundamental surprise detection
 """
 
-import yfinance as yf
-import talib
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple
+from lazy_imports import lazy_import
+import providers
+from symbol_universe import get_universe
+
+# Ağır bağımlılıklar ilk kullanımda yüklenir
+talib = lazy_import('talib')
 
 class VolumeRevolutionScanner:
     def __init__(self):
-        self.bist_stocks = [
-            'AKBNK', 'GARAN', 'ISCTR', 'YKBNK', 'HALKB', 'VAKBN', 'SISE', 'THYAO', 'BIMAS', 'KOZAL',
-            'ASELS', 'KCHOL', 'EREGL', 'PETKM', 'TUPRS', 'TCELL', 'SAHOL', 'EKGYO', 'KOZAA', 'GUBRF',
-            'TOASO', 'TTKOM', 'FROTO', 'ARCLK', 'AKSA', 'KRDMD', 'TAVHL', 'PGSUS', 'MGROS', 'VESTL',
-            'SOKM', 'BRMEN', 'SAMAT', 'EKIZ', 'KAPLM', 'MRSHL', 'EUKYO', 'ICBCT', 'SAFKR', 'BARMA',
-            'TEKTU', 'YGYO', 'PKART', 'TURGG', 'YESIL', 'BURVA', 'ADEL', 'AEFES', 'AFYON', 'AGESA',
-            'AGHOL', 'AGROT', 'AHGAZ', 'AKENR', 'AKGRT', 'AKMGY', 'ALARK', 'ALBRK', 'ALKIM',
-            'ASUZU', 'ATEKS', 'AVGYO', 'AVHOL', 'AVTUR', 'AYDEM', 'AYEN', 'BAGFS', 'BAHKM',
-            'BAKAB', 'BANVT', 'BASCM', 'BASGZ', 'BAYRK', 'BERA', 'BEYAZ', 'BIGCH', 'BINHO',
-            'BIOEN', 'BIZIM', 'BJKAS', 'BLCYT', 'BNTAS', 'BOBET', 'BORLS', 'BOSSA', 'BRISA',
-            'BRKSN', 'BRKVY', 'BSOKE', 'BTCIM', 'BUCIM', 'BURCE', 'CCOLA', 'CEMAS', 'CEMTS',
-            'CIMSA', 'CLEBI', 'CMBTN', 'CMENT', 'CONSE', 'COSMO', 'CRDFA', 'CRFSA', 'CUSAN',
-            'CVKMD', 'CWENE', 'DAGI', 'DAPGM', 'DARDL', 'DENGE', 'DERHL', 'DERIM', 'DESA',
-            'DESPC', 'DEVA', 'DGATE', 'DGNMO', 'DITAS', 'DMSAS', 'DOCO', 'DOGUB', 'DOHOL',
-            'DURDO', 'DYOBY', 'DZGYO', 'ECILC', 'ECZYT', 'EGEEN', 'EGGUB', 'EGPRO', 'EGSER',
-            'EKSUN', 'ELITE', 'EMKEL', 'EMNIS', 'ENERY', 'ENJSA', 'ENKAI', 'ERBOS', 'ERSU',
-            'ESCAR', 'EUREN', 'EUYO', 'EYGYO', 'FENER', 'FLAP', 'FMIZP', 'FONET', 'FORMT',
-            'FORTE', 'FRIGO', 'GEDIK', 'GEDZA', 'GENIL', 'GENTS', 'GEREL', 'GESAN', 'GIPTA',
-            'GLBMD', 'GLYHO', 'GMTAS', 'GOKNR', 'GOLTS', 'GOODY', 'GOZDE', 'GRNYO', 'GRSEL',
-            'GSDDE', 'GSDHO', 'GSRAY', 'GWIND', 'HATEK', 'HATSN', 'HDFGS', 'HEDEF', 'HEKTS',
-            'HURGZ', 'HUNER', 'IDGYO', 'IEYHO', 'IHEVA', 'IHGZT', 'IHLAS', 'IHLGM', 'IHYAY',
-            'IMASM', 'INDES', 'INFO', 'INTEM', 'INVES', 'IPEKE', 'ISBIR', 'ISBTR', 'ISGSY',
-            'ISKUR', 'ISMEN', 'IZENR', 'IZFAS', 'IZINV', 'JANTS', 'KAREL', 'KARSN', 'KARTN',
-            'KATMR', 'KAYSE', 'KENT', 'KERVN', 'KFEIN', 'KGYO', 'KIMMR', 'KLGYO', 'KLKIM',
-            'KLNMA', 'KLRHO', 'KLSER', 'KLSYN', 'KMPUR', 'KNFRT', 'KONKA', 'KONTR', 'KONYA',
-            'KOPOL', 'KORDS', 'KOTON', 'KRDMA', 'KRDMB', 'KRGYO', 'KRONT', 'KRPLS', 'KRSTL',
-            'KRTEK', 'KRVGD', 'KSTUR', 'KUTPO', 'KZBGY', 'LIDER', 'LIDFA', 'LILAK', 'LINK',
-            'LKMNH', 'LOGO', 'LRSHO', 'LUKSK', 'MACKO', 'MAKIM', 'MAKTK', 'MANAS', 'MARBL',
-            'MARKA', 'MEDTR', 'MEGAP', 'MEPET', 'MERCN', 'MERKO', 'METRO', 'MHRGY', 'MMCAS',
-            'MNDTR', 'MOBTL', 'MPARK', 'MSGYO', 'MTRKS', 'MTRYO', 'MZHLD', 'NATEN', 'NETAS',
-            'NIBAS', 'NUGYO', 'NUHCM', 'ODAS', 'OFSYM', 'ONCSM', 'ORCAY', 'ORMA', 'OSTIM',
-            'OTKAR', 'OYAKC', 'OYYAT', 'OZGYO', 'OZKGY', 'OZRDN', 'OZSUB', 'PAPIL', 'PARSN',
-            'PASEU', 'PATEK', 'PCILT', 'PEKGY', 'PENGD', 'PENTA', 'PETUN', 'PINSU', 'PKART',
-            'PKENT', 'PLTUR', 'PNLSN', 'POLHO', 'POLTK', 'PRDGS', 'PRKAB', 'PRKME', 'PRZMA',
-            'PSDTC', 'QUAGR', 'RALYH', 'RAYSG', 'RNPOL', 'RODRG', 'ROYAL', 'RUBNS', 'RYGYO',
-            'SANEL', 'SANFM', 'SANKO', 'SARKY', 'SASA', 'SAYAS', 'SEKFK', 'SEKUR', 'SELEC',
-            'SELGD', 'SELVA', 'SEYKM', 'SILVR', 'SKBNK', 'SKYLP', 'SMART', 'SMRTG', 'SNKRN',
-            'SONME', 'SRVGY', 'SUMAS', 'SUNTK', 'SUWEN', 'TARKM', 'TATEN', 'TBORG', 'TDGYO',
-            'TERA', 'TEZOL', 'TMSN', 'TRCAS', 'TRGYO', 'TRILC', 'TSGYO', 'TSKB', 'TTRAK',
-            'TUCLK', 'TUKAS', 'TURGG', 'ULUUN', 'ULUSE', 'ULUFA', 'UMPAS', 'UNLU', 'USAK',
-            'VAKKO', 'VANGD', 'VBTYZ', 'VERUS', 'VESBE', 'VKGYO', 'VKING', 'VRGYO', 'YAPRK',
-            'YATAS', 'YAYLA', 'YGGYO', 'YKSLN', 'YUNSA', 'ZEDUR', 'ZOREN', 'ZRGYO'
-        ]
+        # Sembol listesi ve sektörler ortak evren dosyasından (bist_universe.json)
+        self.universe = get_universe()
+        self.bist_stocks = self.universe.symbols('extended')
     
     def analyze_revolutionary_volume(self, volume_data: np.array) -> Dict:
         """
@@ -130,8 +94,7 @@ class VolumeRevolutionScanner:
         TEKTU tarzı dramatik değişimler
         """
         try:
-            ticker = yf.Ticker(f"{symbol}.IS")
-            info = ticker.info
+            info = providers.info(f"{symbol}.IS")
             
             score = 0
             signals = []
@@ -168,8 +131,7 @@ class VolumeRevolutionScanner:
         🎯 DEVRİMCİ TARAMA SİSTEMİ
         """
         try:
-            ticker = yf.Ticker(f"{symbol}.IS")
-            data = ticker.history(period='20d')
+            data = providers.history(f"{symbol}.IS", period='20d')
             
             if len(data) < 15:
                 return {'score': 0, 'signals': ['Yetersiz veri'], 'error': 'Insufficient data'}
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+İleri Yürüyen (Walk-Forward) Değerlendirme Modülü
+Bu modül zaman sıralı özellik geçmişinde kayan eğitim/test pencereleriyle
+örneklem dışı değerlendirme yapar. Ağaç topluluğu her katmanda sıfırdan
+kurulmaz; her katman sadece pencereye yeni giren günler için ağaç ekler
+(warm-start). Random Forest ağaç grupları işlem havuzunda paralel eğitilir.
+
+Etiket ertesi günün tavanıdır: eğitim penceresinin son gününün etiketi test
+penceresinin ilk gününden gelir. Bu yüzden eğitim ile test arasında
+purge_days işlem günü boşluk bırakılır.
+
+Warm-start Random Forest bir yaklaşıklıktır: her ağaç grubu sadece eğitildiği
+delta penceresini görür; katman modeli tüm pencereyle eğitilmiş bir orman
+değil, küçük pencerelerde eğitilmiş ormanların karışımıdır. Aradaki fark
+ensemble='rf_refit' (her katmanda tüm pencereyle yeniden eğitim, katmanlar
+paralel) ile ölçülebilir.
+"""
+
+import copy
+import json
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+from sklearn.metrics import accuracy_score, precision_score, recall_score, f1_score, roc_auc_score
+
+logger = logging.getLogger(__name__)
+
+
+def make_folds(dates, train_days: int = 120, test_days: int = 20,
+               step_days: Optional[int] = None, purge_days: int = 1) -> List[Dict[str, Any]]:
+    """
+    Tekil işlem günleri üzerinde kayan pencereler oluştur
+
+    Her katman için eğitim/test pencerelerinin ve bir önceki katmandan bu yana
+    pencereye yeni giren günlerin (delta) sınırlarını döndürür. Eğitimin son
+    günü ile testin ilk günü arasında purge_days gün atlanır (etiket sızıntısı).
+    """
+    step_days = step_days or test_days
+    unique_dates = np.array(sorted(set(dates)))
+    folds = []
+
+    train_start = 0
+    prev_train_end = None
+    while train_start + train_days + purge_days + test_days <= len(unique_dates):
+        train_end = train_start + train_days
+        test_start = train_end + purge_days
+        test_end = test_start + test_days
+        delta_start = train_start if prev_train_end is None else prev_train_end
+        folds.append({
+            'fold': len(folds),
+            'train_start': unique_dates[train_start],
+            'train_end': unique_dates[train_end - 1],
+            'test_start': unique_dates[test_start],
+            'test_end': unique_dates[test_end - 1],
+            'delta_start': unique_dates[delta_start],
+        })
+        prev_train_end = train_end
+        train_start += step_days
+
+    return folds
+
+
+def _fit_tree_batch(X: np.ndarray, y: np.ndarray, n_trees: int, seed: int,
+                    params: Dict[str, Any]) -> Dict[str, Any]:
+    """İşlem havuzunda bir ağaç grubu eğit"""
+    started = time.perf_counter()
+    model = RandomForestClassifier(n_estimators=n_trees, random_state=seed, n_jobs=1, **params)
+    model.fit(X, y)
+    return {'model': model, 'fit_seconds': time.perf_counter() - started}
+
+
+def _combine_batches(batches: List[RandomForestClassifier]) -> RandomForestClassifier:
+    """Ağaç gruplarını tek bir RandomForestClassifier altında birleştir"""
+    combined = copy.copy(batches[0])
+    combined.estimators_ = [tree for batch in batches for tree in batch.estimators_]
+    combined.n_estimators = len(combined.estimators_)
+    return combined
+
+
+def _fold_metrics(y_true: np.ndarray, proba: np.ndarray, threshold: float) -> Dict[str, float]:
+    """Katman metriklerini hesapla"""
+    y_pred = (proba >= threshold).astype(int)
+    metrics = {
+        'rows': int(len(y_true)),
+        'positives': int(y_true.sum()),
+        'predicted_positives': int(y_pred.sum()),
+        'accuracy': float(accuracy_score(y_true, y_pred)),
+        'precision': float(precision_score(y_true, y_pred, zero_division=0)),
+        'recall': float(recall_score(y_true, y_pred, zero_division=0)),
+        'f1': float(f1_score(y_true, y_pred, zero_division=0)),
+        'roc_auc': None,
+    }
+    if 0 < y_true.sum() < len(y_true):
+        metrics['roc_auc'] = float(roc_auc_score(y_true, proba))
+    return metrics
+
+
+def walk_forward_evaluate(X, y, dates, train_days: int = 120, test_days: int = 20,
+                          step_days: Optional[int] = None, purge_days: int = 1, ensemble: str = 'rf',
+                          trees_initial: int = 150, trees_per_fold: int = 50,
+                          max_workers: Optional[int] = None, threshold: float = 0.5,
+                          model_params: Optional[Dict[str, Any]] = None,
+                          random_state: int = 42) -> Dict[str, Any]:
+    """
+    Kayan pencereli örneklem dışı değerlendirme yap
+
+    ensemble='rf': Her katman için sadece yeni günlerden bir ağaç grubu eğitilir
+    (ilk katmanda trees_initial, sonrakilerde trees_per_fold ağaç). Gruplar
+    paralel eğitilir; katman modeli, verisi eğitim penceresinde kalan grupların
+    birleşimidir. Eski günlerin ağaçları pencereden çıkınca bırakılır
+    (yaklaşıklık, bkz. modül açıklaması).
+
+    ensemble='rf_refit': Her katman tüm eğitim penceresiyle trees_initial ağaçla
+    sıfırdan eğitilir; katmanlar birbirinden bağımsız olduğu için paralel çalışır.
+
+    ensemble='gb': GradientBoosting warm_start ile her katmanda trees_per_fold
+    aşama ekler. Boosting doğası gereği sıralı çalışır.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y).astype(int)
+    dates = np.asarray(dates)
+    folds = make_folds(dates, train_days, test_days, step_days, purge_days)
+    if not folds:
+        logger.warning("Walk-forward için yeterli gün yok")
+        return {'folds': [], 'summary': {}, 'model': None}
+
+    logger.info(f"Walk-forward: {len(folds)} katman, ensemble={ensemble}")
+    started = time.perf_counter()
+
+    if ensemble == 'gb':
+        fold_reports, model = _run_gb(X, y, dates, folds, trees_initial, trees_per_fold,
+                                      threshold, model_params, random_state)
+    else:
+        fold_reports, model = _run_rf(X, y, dates, folds, trees_initial, trees_per_fold,
+                                      max_workers, threshold, model_params, random_state,
+                                      refit=ensemble == 'rf_refit')
+
+    total_seconds = time.perf_counter() - started
+    scored = [f for f in fold_reports if f.get('metrics')]
+    summary = {
+        'ensemble': ensemble,
+        'folds': len(fold_reports),
+        'scored_folds': len(scored),
+        'total_seconds': total_seconds,
+    }
+    for key in ('precision', 'recall', 'f1', 'accuracy'):
+        values = [f['metrics'][key] for f in scored]
+        summary[f'mean_{key}'] = float(np.mean(values)) if values else None
+    aucs = [f['metrics']['roc_auc'] for f in scored if f['metrics']['roc_auc'] is not None]
+    summary['mean_roc_auc'] = float(np.mean(aucs)) if aucs else None
+
+    return {'folds': fold_reports, 'summary': summary, 'model': model}
+
+
+def _run_rf(X, y, dates, folds, trees_initial, trees_per_fold, max_workers,
+            threshold, model_params, random_state, refit: bool = False):
+    """
+    Random Forest: ağaç gruplarını paralel eğit, katmanları sırayla değerlendir
+    (refit=True ise her katmanın grubu tüm pencereyle eğitilir ve tek başına kullanılır)
+    """
+    params = {'class_weight': 'balanced', 'max_depth': 8}
+    params.update(model_params or {})
+
+    jobs = []
+    for fold in folds:
+        if refit:
+            mask = (dates >= fold['train_start']) & (dates <= fold['train_end'])
+            n_trees = trees_initial
+        else:
+            mask = (dates >= fold['delta_start']) & (dates <= fold['train_end'])
+            n_trees = trees_initial if fold['fold'] == 0 else trees_per_fold
+        jobs.append((mask, n_trees))
+
+    batches: List[Optional[Dict[str, Any]]] = [None] * len(folds)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for i, (mask, n_trees) in enumerate(jobs):
+            # Tek sınıflı delta penceresinden ağaç eğitilmez
+            if len(np.unique(y[mask])) < 2:
+                continue
+            futures[i] = executor.submit(_fit_tree_batch, X[mask], y[mask], n_trees,
+                                         random_state + i, params)
+        for i, future in futures.items():
+            batches[i] = future.result()
+
+    fold_reports = []
+    active = []
+    model = None
+    for fold, batch in zip(folds, batches):
+        if refit:
+            active = []
+        if batch is not None:
+            active.append((fold['train_end'], batch['model']))
+        # Verisi tamamen eğitim penceresinin dışında kalan grupları bırak
+        active = [(batch_end, m) for batch_end, m in active if batch_end >= fold['train_start']]
+
+        report = _fold_header(fold)
+        report['fit_seconds'] = batch['fit_seconds'] if batch else 0.0
+        report['trees'] = sum(len(m.estimators_) for _, m in active)
+        if not active:
+            fold_reports.append(report)
+            continue
+
+        model = _combine_batches([m for _, m in active])
+        report.update(_evaluate(model, X, y, dates, fold, threshold))
+        fold_reports.append(report)
+
+    return fold_reports, model
+
+
+def _run_gb(X, y, dates, folds, trees_initial, trees_per_fold, threshold,
+            model_params, random_state):
+    """Gradient Boosting: warm_start ile her katmanda aşama ekle"""
+    params = {'max_depth': 3, 'learning_rate': 0.05}
+    params.update(model_params or {})
+    model = GradientBoostingClassifier(n_estimators=0, warm_start=True,
+                                       random_state=random_state, **params)
+
+    fold_reports = []
+    for fold in folds:
+        report = _fold_header(fold)
+        mask = (dates >= fold['train_start']) & (dates <= fold['train_end'])
+        if len(np.unique(y[mask])) < 2:
+            report['fit_seconds'] = 0.0
+            fold_reports.append(report)
+            continue
+
+        model.n_estimators += trees_initial if model.n_estimators == 0 else trees_per_fold
+        started = time.perf_counter()
+        model.fit(X[mask], y[mask])
+        report['fit_seconds'] = time.perf_counter() - started
+        report['trees'] = int(model.n_estimators)
+        report.update(_evaluate(model, X, y, dates, fold, threshold))
+        fold_reports.append(report)
+
+    return fold_reports, (model if model.n_estimators else None)
+
+
+def _fold_header(fold: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'fold': fold['fold'],
+        'train_start': str(fold['train_start'])[:10],
+        'train_end': str(fold['train_end'])[:10],
+        'test_start': str(fold['test_start'])[:10],
+        'test_end': str(fold['test_end'])[:10],
+    }
+
+
+def _evaluate(model, X, y, dates, fold, threshold) -> Dict[str, Any]:
+    """Test penceresinde olasılık tahmini yap ve metrikleri döndür"""
+    mask = (dates >= fold['test_start']) & (dates <= fold['test_end'])
+    started = time.perf_counter()
+    proba = model.predict_proba(X[mask])[:, 1]
+    return {
+        'predict_seconds': time.perf_counter() - started,
+        'metrics': _fold_metrics(y[mask], proba, threshold),
+    }
+
+
+def walk_forward_from_dataset(dataset, **kwargs) -> Dict[str, Any]:
+    """bist_ceiling_predictor.train_predict veri setinden walk-forward çalıştır"""
+    X = dataset.drop(columns=['target', 'symbol'], errors='ignore')
+    y = dataset['target'].astype(int)
+    dates = dataset.index.tz_localize(None) if dataset.index.tz is not None else dataset.index
+    return walk_forward_evaluate(X.values, y.values, dates.values, **kwargs)
+
+
+def print_report(result: Dict[str, Any]):
+    """Katman metriklerini konsola yazdır"""
+    print("\n📊 WALK-FORWARD DEĞERLENDİRME")
+    print("=" * 90)
+    print(f"{'Katman':>6} {'Test aralığı':<23} {'Ağaç':>5} {'Eğitim sn':>9} "
+          f"{'Precision':>9} {'Recall':>7} {'F1':>6} {'AUC':>6}")
+    for fold in result['folds']:
+        metrics = fold.get('metrics')
+        if not metrics:
+            print(f"{fold['fold']:>6} {fold['test_start']} - {fold['test_end']}  (atlandı)")
+            continue
+        auc = f"{metrics['roc_auc']:.3f}" if metrics['roc_auc'] is not None else "  -"
+        print(f"{fold['fold']:>6} {fold['test_start']} - {fold['test_end']} {fold['trees']:>5} "
+              f"{fold['fit_seconds']:>9.2f} {metrics['precision']:>9.3f} "
+              f"{metrics['recall']:>7.3f} {metrics['f1']:>6.3f} {auc:>6}")
+    summary = result['summary']
+    if summary:
+        print("=" * 90)
+        print(f"Toplam süre: {summary['total_seconds']:.1f} sn | "
+              f"Ortalama precision: {summary['mean_precision'] or 0:.3f} | "
+              f"recall: {summary['mean_recall'] or 0:.3f}")
+
+
+def save_report(result: Dict[str, Any], filename: Optional[str] = None) -> str:
+    """Katman raporunu JSON olarak kaydet (model hariç)"""
+    if filename is None:
+        filename = f"walk_forward_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump({'summary': result['summary'], 'folds': result['folds']},
+                  f, ensure_ascii=False, indent=2)
+    return filename
+
+
+# Gece çalıştırma
+if __name__ == "__main__":
+    import sys
+    from datetime import timedelta
+    from bist_ceiling_predictor import load_symbols, build_feature_frames_for, create_feature_label_df
+    import pandas as pd
+
+    logging.basicConfig(level=logging.INFO)
+
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 730
+    symbols = load_symbols("bist_symbols.csv")
+    start = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+    end = datetime.now().strftime('%Y-%m-%d')
+
+    frames = build_feature_frames_for(symbols, start, end)
+    parts = []
+    for sym, df in frames.items():
+        feats = create_feature_label_df(df)
+        feats['symbol'] = sym
+        parts.append(feats)
+    dataset = pd.concat(parts).dropna().sort_index()
+
+    result = walk_forward_from_dataset(dataset)
+    print_report(result)
+    print(f"💾 Rapor: {save_report(result)}")
@@ -10,6 +10,7 @@ import numpy as np
 import logging
 from typing import List, Dict, Any
 from bist_data_fetcher import BISTDataFetcher
+from event_windows import EventWindows, pre_ceiling_features
 
 logger = logging.getLogger(__name__)
 
@@ -32,45 +33,71 @@ class WeightedCeilingAnalyzer:
         
         # Tüm BİST hisselerinin verilerini çek
         all_data = self.data_fetcher.get_all_bist_data(period=f"{days_back + 5}d")
+        weighted_data = self.weighted_profiles(all_data)
         
-        weighted_data = []
-        
-        for symbol, data in all_data.items():
-            if data.empty or len(data) < 25:
-                continue
-                
-            try:
-                # Tavan günlerini bul
-                for i in range(20, len(data)):  # En az 20 gün geçmiş veri
-                    current_price = data['Close'].iloc[i]
-                    previous_price = data['Close'].iloc[i-1]
-                    
-                    if previous_price == 0:
-                        continue
-                        
-                    daily_change = ((current_price - previous_price) / previous_price) * 100
-                    
-                    # Tavan günü mü? (%9+ artış)
-                    if daily_change >= 9.0:
-                        # Bu tavan için ağırlıklı öncesi verileri hesapla
-                        ceiling_profile = self.calculate_weighted_profile(data, i)
-                        
-                        if ceiling_profile:
-                            ceiling_profile.update({
-                                'symbol': symbol.replace('.IS', ''),
-                                'ceiling_date': data.index[i],
-                                'ceiling_change': daily_change,
-                                'ceiling_price': current_price
-                            })
-                            weighted_data.append(ceiling_profile)
-                            
-            except Exception as e:
-                logger.debug(f"{symbol} ağırlıklı analiz hatası: {e}")
-                continue
-                
         logger.info(f"Toplam {len(weighted_data)} ağırlıklı tavan profili oluşturuldu")
         return weighted_data
     
+    def weighted_profiles(self, all_data: Dict[str, pd.DataFrame]) -> List[Dict[str, Any]]:
+        """
+        Tüm tavanların ağırlıklı profilleri; olay penceresi çıkarıcısıyla tek
+        geçişte (calculate_weighted_profile ile aynı sonuç)
+        """
+        features = pre_ceiling_features(EventWindows.from_frames(all_data, min_rows=25))
+        # Tavan günleri (%9+ artış, en az 20 gün geçmiş)
+        events = features.events(min_row=20)
+        lags = np.array(sorted(self.day_weights))
+        names = ('volume_ratio', 'daily_change', 'rsi', 'momentum_5d', 'price_momentum')
+        tensor = features.extract(events, lags, min_row=20, features=names)
+        volume_ratio, daily_change, rsi, momentum_5d, price_momentum = np.moveaxis(tensor, 2, 0)
+        
+        valid = ~np.isnan(volume_ratio)
+        weights = np.where(valid, np.array([self.day_weights[lag] for lag in lags]), 0.0)
+        total_weight = weights.sum(axis=1)
+        divisor = np.where(total_weight > 0, total_weight, 1.0)
+        
+        def weighted(values: np.ndarray) -> np.ndarray:
+            return np.nansum(values * weights, axis=1) / divisor
+        
+        strength = (np.minimum(100, volume_ratio * 25) +
+                    np.minimum(100, np.maximum(0, daily_change) * 10) +
+                    np.minimum(100, np.abs(rsi - 60) * -1 + 70) +
+                    np.minimum(100, np.maximum(0, momentum_5d) * 15)) / 4
+        
+        averages = {
+            'weighted_volume_ratio': weighted(volume_ratio),
+            'weighted_daily_change': weighted(daily_change),
+            'weighted_rsi': weighted(rsi),
+            'weighted_momentum_5d': weighted(momentum_5d),
+            'weighted_price_momentum': weighted(price_momentum),
+        }
+        close = features.column('close')
+        ceiling_change = features.column('daily_change')
+        
+        weighted_data = []
+        for e, (s, r) in enumerate(zip(*events)):
+            profile = {key: float(values[e]) for key, values in averages.items()}
+            profile['total_weight'] = float(total_weight[e])
+            profile['signal_strength_by_day'] = {
+                int(lag): {
+                    'strength': float(strength[e, k]),
+                    'volume_ratio': float(volume_ratio[e, k]),
+                    'daily_change': float(daily_change[e, k]),
+                    'rsi': float(rsi[e, k]),
+                    'momentum_5d': float(momentum_5d[e, k]),
+                    'weight': self.day_weights[lag]
+                }
+                for k, lag in enumerate(lags) if valid[e, k]
+            }
+            profile.update({
+                'symbol': features.symbols[s],
+                'ceiling_date': features.indexes[s][r],
+                'ceiling_change': float(ceiling_change[s, r]),
+                'ceiling_price': float(close[s, r])
+            })
+            weighted_data.append(profile)
+        return weighted_data
+    
     def calculate_weighted_profile(self, data: pd.DataFrame, ceiling_index: int) -> Dict[str, Any]:
         """Bir tavan için ağırlıklı profil hesapla"""
         profile = {